@@ -0,0 +1,312 @@
+"""
+Stand-in ForensicVM server for the chunked ISO upload protocol.
+
+Implements the server side of the resumable upload used by upload_iso_chunked() in forensicVmClient.py,
+so the protocol can be exercised offline. Uploads are reassembled in a preallocated file that is moved
+into the ISO folder once every chunk has arrived.
+
+Protocol (all requests carry the X-API-KEY header):
+
+    POST  /api/upload-iso/chunks/                  {"filename", "size", "chunk_size", "sha256"} -> 201 {"upload_id", ...}
+    GET   /api/upload-iso/chunks/<id>/             -> 200 {"size", "chunk_size", "offset", "received"}
+    PATCH /api/upload-iso/chunks/<id>/             one chunk, with the headers
+                                                   Upload-Offset: <byte offset of the chunk>
+                                                   Upload-Checksum: sha256 <base64 digest of the chunk>
+                                                   -> 204, 409 on a misaligned offset, 460 on a checksum mismatch
+    POST  /api/upload-iso/chunks/<id>/complete/    -> 200 {"iso_file"}, 409 while chunks are missing
+    GET   /api/list-iso-files/                     -> 200 {"iso_files", "iso_digests"}
+
+"offset" is the number of bytes received without a gap from the start of the file and "received" lists
+the indexes of the chunks stored so far, which lets a client upload chunks in parallel and resume any of them.
+"iso_digests" maps each ISO file to its SHA-256 so a client can skip uploading content the server already has.
+
+Usage:
+    python chunked_upload_server.py --port 8000 --iso-dir ./isos --api-key your_api_key
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Status code used by the tus checksum extension when a chunk does not match its checksum
+CHECKSUM_MISMATCH = 460
+
+
+class ChunkedUploadStore:
+    """
+    Keeps the uploads in progress and reassembles their chunks.
+
+    Args:
+        iso_dir (str): The folder the completed ISO files are moved to.
+        upload_dir (str): The folder holding the partial uploads. Defaults to iso_dir/.uploads.
+    """
+
+    def __init__(self, iso_dir, upload_dir=None):
+        self.iso_dir = iso_dir
+        self.upload_dir = upload_dir or os.path.join(iso_dir, '.uploads')
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._uploads = {}
+        self._digests = {}
+
+    def _state_file(self, upload_id):
+        return os.path.join(self.upload_dir, upload_id + '.json')
+
+    def _data_file(self, upload_id):
+        return os.path.join(self.upload_dir, upload_id + '.part')
+
+    def _save(self, upload_id, upload):
+        with open(self._state_file(upload_id), 'w') as f:
+            json.dump(dict(upload, received=sorted(upload['received'])), f)
+
+    def get(self, upload_id):
+        """
+        Returns the state of an upload, or None when it does not exist.
+        """
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id):
+            return None
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None and os.path.exists(self._state_file(upload_id)):
+                with open(self._state_file(upload_id)) as f:
+                    upload = json.load(f)
+                upload['received'] = set(upload['received'])
+                self._uploads[upload_id] = upload
+            return upload
+
+    def create(self, filename, size, chunk_size):
+        """
+        Starts a new upload and preallocates its data file.
+
+        Returns:
+            str: The upload id.
+        """
+        filename = os.path.basename(filename)
+        if not filename or size < 0 or chunk_size <= 0:
+            raise ValueError("filename, size and chunk_size are required")
+        upload_id = uuid.uuid4().hex
+        upload = {'filename': filename, 'size': size, 'chunk_size': chunk_size, 'received': set()}
+        with open(self._data_file(upload_id), 'wb') as f:
+            f.truncate(size)
+        with self._lock:
+            self._uploads[upload_id] = upload
+            self._save(upload_id, upload)
+        return upload_id
+
+    def status(self, upload_id):
+        """
+        Returns the public status of an upload.
+        """
+        upload = self.get(upload_id)
+        with self._lock:
+            received = sorted(upload['received'])
+            contiguous = 0
+            while contiguous in upload['received']:
+                contiguous += 1
+        return {
+            'upload_id': upload_id,
+            'filename': upload['filename'],
+            'size': upload['size'],
+            'chunk_size': upload['chunk_size'],
+            'offset': min(contiguous * upload['chunk_size'], upload['size']),
+            'received': received,
+        }
+
+    def write_chunk(self, upload_id, offset, data):
+        """
+        Stores one chunk at its offset.
+
+        Raises:
+            ValueError: If the offset is not the start of a chunk or the length does not match.
+        """
+        upload = self.get(upload_id)
+        chunk_size = upload['chunk_size']
+        if offset % chunk_size or offset >= max(upload['size'], 1):
+            raise ValueError(f"Offset {offset} is not the start of a chunk")
+        if len(data) != min(chunk_size, upload['size'] - offset):
+            raise ValueError(f"Chunk at {offset} has {len(data)} bytes")
+        with open(self._data_file(upload_id), 'r+b') as f:
+            f.seek(offset)
+            f.write(data)
+        with self._lock:
+            upload['received'].add(offset // chunk_size)
+            self._save(upload_id, upload)
+
+    def iso_digests(self):
+        """
+        Returns the SHA-256 of every ISO file, hashing only the files that changed since the last call.
+        """
+        digests = {}
+        for name in sorted(os.listdir(self.iso_dir)):
+            path = os.path.join(self.iso_dir, name)
+            if not name.lower().endswith('.iso') or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            key = (name, stat.st_size, stat.st_mtime_ns)
+            if key not in self._digests:
+                sha256 = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for data in iter(lambda: f.read(1048576), b''):
+                        sha256.update(data)
+                self._digests[key] = sha256.hexdigest()
+            digests[name] = self._digests[key]
+        return digests
+
+    def complete(self, upload_id):
+        """
+        Moves a fully received upload into the ISO folder.
+
+        Returns:
+            str: The name of the ISO file, or None while chunks are missing.
+        """
+        upload = self.get(upload_id)
+        chunk_count = (upload['size'] + upload['chunk_size'] - 1) // upload['chunk_size']
+        with self._lock:
+            if len(upload['received']) < chunk_count:
+                return None
+            os.replace(self._data_file(upload_id), os.path.join(self.iso_dir, upload['filename']))
+            os.remove(self._state_file(upload_id))
+            del self._uploads[upload_id]
+        return upload['filename']
+
+
+class ChunkedUploadHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler of the chunked upload protocol. The store and API key are set by make_server().
+    """
+    protocol_version = "HTTP/1.1"
+    store = None
+    api_key = None
+
+    def _send_json(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        if body:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _authorized(self):
+        if self.api_key and self.headers.get('X-API-KEY') != self.api_key:
+            self._read_body()
+            self._send_json(403, {'error': 'Access denied'})
+            return False
+        return True
+
+    def _route(self):
+        match = re.fullmatch(r'/api/upload-iso/chunks/([^/]+)/(complete/)?', self.path)
+        if not match:
+            return None, False
+        return match.group(1), bool(match.group(2))
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == '/api/test/':
+            return self._send_json(200, {})
+        if self.path == '/api/list-iso-files/':
+            iso_digests = self.store.iso_digests()
+            return self._send_json(200, {'iso_files': list(iso_digests), 'iso_digests': iso_digests})
+        upload_id, complete = self._route()
+        if upload_id and not complete and self.store.get(upload_id):
+            return self._send_json(200, self.store.status(upload_id))
+        self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        body = self._read_body()
+        if self.path == '/api/upload-iso/chunks/':
+            try:
+                request = json.loads(body or b'{}')
+                upload_id = self.store.create(request.get('filename', ''), int(request.get('size', -1)),
+                                              int(request.get('chunk_size', 0)))
+            except (ValueError, TypeError) as e:
+                return self._send_json(400, {'error': str(e)})
+            return self._send_json(201, self.store.status(upload_id))
+
+        upload_id, complete = self._route()
+        if not upload_id or not complete or not self.store.get(upload_id):
+            return self._send_json(404, {'error': 'Not found'})
+        iso_file = self.store.complete(upload_id)
+        if iso_file is None:
+            return self._send_json(409, dict(self.store.status(upload_id), error='Chunks missing'))
+        self._send_json(200, {'iso_file': iso_file})
+
+    def do_PATCH(self):
+        if not self._authorized():
+            return
+        data = self._read_body()
+        upload_id, complete = self._route()
+        if not upload_id or complete or not self.store.get(upload_id):
+            return self._send_json(404, {'error': 'Not found'})
+
+        checksum = self.headers.get('Upload-Checksum', '')
+        algorithm, _, digest = checksum.partition(' ')
+        if algorithm != 'sha256' or base64.b64decode(digest or '') != hashlib.sha256(data).digest():
+            return self._send_json(CHECKSUM_MISMATCH, {'error': 'Checksum mismatch'})
+        try:
+            offset = int(self.headers.get('Upload-Offset', ''))
+            self.store.write_chunk(upload_id, offset, data)
+        except ValueError as e:
+            return self._send_json(409, {'error': str(e)})
+
+        self.send_response(204)
+        self.send_header('Upload-Offset', str(offset + len(data)))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host, port, iso_dir, api_key=None):
+    """
+    Creates the stand-in server. Call serve_forever() on the result to run it.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on, 0 for any free port.
+        iso_dir (str): The folder the completed ISO files are moved to.
+        api_key (str): The API key clients must send, None to accept any.
+
+    Returns:
+        ThreadingHTTPServer: The server.
+    """
+    os.makedirs(iso_dir, exist_ok=True)
+    handler = type('Handler', (ChunkedUploadHandler,), {
+        'store': ChunkedUploadStore(iso_dir),
+        'api_key': api_key,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in server for the chunked ISO upload protocol")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--iso-dir', default='isos')
+    parser.add_argument('--api-key', default=None)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.iso_dir, args.api_key)
+    print(f"Serving chunked ISO uploads on http://{args.host}:{server.server_address[1]}/ into {args.iso_dir}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
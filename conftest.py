@@ -0,0 +1,96 @@
+import socket
+import threading
+
+import paramiko
+import pytest
+
+
+class KeyServer(paramiko.ServerInterface):
+    """
+    Accepts the client key for any user and opens every channel. Tests subclass it to answer commands,
+    terminals and port forwards.
+    """
+
+    def __init__(self, public_key):
+        self.public_key = public_key
+        self.transport = None
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL if key == self.public_key else paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'publickey'
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+
+class SSHServer:
+    """
+    In-process SSH server on a free local port, each connection served by its own paramiko transport.
+
+    Args:
+        key_file (str): The private key file of the client, its public key is the one accepted.
+        interface (type): The ServerInterface class, created with the public key for each connection.
+        configure (callable): Optional configure(transport) called before the transport starts, to add
+                              an SFTP subsystem or restrict the algorithms.
+    """
+
+    def __init__(self, key_file, interface=KeyServer, configure=None):
+        self.key_file = key_file
+        self.public_key = paramiko.RSAKey.from_private_key_file(key_file)
+        self.host_key = paramiko.RSAKey.generate(1024)
+        self.interface = interface
+        self.configure = configure
+        self.transports = []
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self.host_key)
+            if self.configure:
+                self.configure(transport)
+            server = self.interface(self.public_key)
+            server.transport = transport
+            try:
+                transport.start_server(server=server)
+            except paramiko.SSHException:
+                continue
+            self.transports.append(transport)
+
+    def drop_connections(self):
+        for transport in self.transports:
+            transport.close()
+
+    def close(self):
+        self.sock.close()
+        self.drop_connections()
+
+
+@pytest.fixture
+def ssh_server(tmp_path):
+    """
+    Returns start(interface=KeyServer, configure=None), which starts an SSHServer accepting the key
+    written to tmp_path/mykey. The servers are closed after the test.
+    """
+    key_file = str(tmp_path / 'mykey')
+    paramiko.RSAKey.generate(1024).write_private_key_file(key_file)
+    servers = []
+
+    def start(interface=KeyServer, configure=None):
+        server = SSHServer(key_file, interface, configure)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
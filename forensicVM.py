@@ -12,6 +12,7 @@ from mailbox import _PartialFile
 import traceback
 import jarray
 import inspect
+import json
 import os
 import java.util.ArrayList as ArrayList
 from java.util import ArrayList, List, UUID, logging
@@ -135,6 +136,8 @@ class MesiVMModuleFactory(IngestModuleFactoryAdapter):
 
 class RunVMIngestModule(DataSourceIngestModule):
     _logger = Logger.getLogger(MesiVMModuleFactory.moduleName)
+    # Runner process of the conversion queue started by each ingest job
+    _queue_runners = {}
 
     def log(self, level, msg):
         self._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
@@ -183,6 +186,34 @@ class RunVMIngestModule(DataSourceIngestModule):
         json_file.write(tag_info_arr.toJSONString())
         json_file.close()
 
+    def queue_ingest(self):
+        # Queued conversions are opt-in, set with the "Queue the images sent by the Autopsy ingest
+        # module" option of the client configuration tab. Otherwise each image opens its own client window
+        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+        try:
+            with open(config_path, "r") as f:
+                return json.load(f).get("queue_ingest", False) is True
+        except Exception:
+            return False
+
+    def start_queue_runner(self):
+        # One runner per ingest job converts every data source it queued, in its own console window.
+        # The runner exits once the queue is empty, so a new one is started if it already did
+        job_id = self.context.getJobId()
+        runner = RunVMIngestModule._queue_runners.get(job_id)
+        if runner is not None and runner.isAlive():
+            return
+
+        cmd = ArrayList()
+        cmd.add("cmd")
+        cmd.add("/c")
+        cmd.add("start")
+        cmd.add("/wait")
+        cmd.add(self.pathToBAT.toString())
+        cmd.add("--run-queue")
+        self.log(Level.INFO, cmd.toString())
+        RunVMIngestModule._queue_runners[job_id] = ProcessBuilder(cmd).start()
+
     def process(self, dataSource, progressBar):
 
         if not PlatformUtil.isWindowsOS():
@@ -201,10 +232,17 @@ class RunVMIngestModule(DataSourceIngestModule):
         self.log(Level.INFO, "Running program on data source")
         cmd = ArrayList()
 
+        # Either open the client window for the data source, or queue it. The client converts
+        # the queued images one after the other, or as many at a time as configured per server
+        queued = self.queue_ingest()
         cmd.add("cmd")
         cmd.add("/c")
-        cmd.add("start")
-        cmd.add(self.pathToBAT.toString())
+        if queued:
+            cmd.add(self.pathToBAT.toString())
+            cmd.add("--enqueue")
+        else:
+            cmd.add("start")
+            cmd.add(self.pathToBAT.toString())
         cmd.add(imagePaths[0])
         cmd.add(Case.getCurrentCase().getCaseDirectory())
         cmd.add(Case.getCurrentCase().getName())
@@ -225,6 +263,8 @@ class RunVMIngestModule(DataSourceIngestModule):
         ExecUtil.execute(processBuilder, DataSourceIngestModuleProcessTerminator(self.context))
 
         if not self.context.dataSourceIngestIsCancelled():
+            if queued:
+                self.start_queue_runner()
 
             Case.getCurrentCase().addReport(reportFile.toString(), "Mesi VM", "Qemu output")
         else:
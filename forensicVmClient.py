@@ -10,15 +10,273 @@ import time
 import os
 import sys
 import subprocess
+import socket
+import select
 import requests
 from datetime import datetime
-from requests_toolbelt import MultipartEncoder
-from urllib.parse import urljoin
+from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
 try:
     import pyi_splash
 except:
     pass
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 import tempfile
+import copy
+import base64
+import codecs
+import argparse
+import contextlib
+import hashlib
+import ipaddress
+import itertools
+import struct
+import zlib
+import zipfile
+from array import array
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from requests.adapters import HTTPAdapter
+
+# Connection settings for the ForensicVM server API
+API_CONNECT_TIMEOUT = 10            # seconds to establish the TCP/TLS connection
+API_READ_TIMEOUT = 60               # seconds to wait for each read on short calls
+API_DEFAULT_TIMEOUT = (API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+API_LONG_TIMEOUT = (API_CONNECT_TIMEOUT, None)  # downloads, uploads and long server side operations
+API_POOL_CONNECTIONS = 4            # number of hosts with a cached connection pool
+API_POOL_MAXSIZE = 16               # keep-alive connections kept per host
+STARTUP_MAX_WORKERS = 8             # concurrent API queries issued by formInit
+API_CACHE_TTL = 30                  # seconds a cached list response stays valid, 0 disables the cache
+API_CACHE_SIZE = 64                 # cached responses kept per client before evicting the least recently used
+
+# Returned by ResponseCache.get() when there is no valid entry
+CACHE_MISS = object()
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL cache with LRU eviction for the decoded responses of the list endpoints.
+
+    Entries are keyed by endpoint and VM UUID, so a mutating call can invalidate exactly the
+    responses it makes stale. Values are copied on the way in and out, callers can modify them freely.
+
+    Args:
+        ttl (float): The number of seconds an entry stays valid. 0 disables the cache.
+        maxsize (int): The maximum number of entries before the least recently used one is evicted.
+
+    Example:
+        >>> cache = ResponseCache(ttl=30)
+        >>> cache.put('/api/list-plugins/', None, ['plugin_1'])
+        >>> cache.get('/api/list-plugins/')
+        ['plugin_1']
+    """
+
+    def __init__(self, ttl=API_CACHE_TTL, maxsize=API_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, endpoint, uuid=None):
+        """
+        Returns a copy of the cached value, or CACHE_MISS when it is missing or expired.
+        """
+        key = (endpoint, uuid and str(uuid))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return CACHE_MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, endpoint, uuid, value):
+        """
+        Stores a value, evicting the least recently used entries above maxsize.
+        """
+        if self.ttl <= 0:
+            return
+        key = (endpoint, uuid and str(uuid))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint=None, uuid=None):
+        """
+        Drops the entries matching the endpoint and/or the UUID. Without arguments, drops everything.
+
+        Returns:
+            int: The number of entries dropped.
+        """
+        uuid = uuid and str(uuid)
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (endpoint is None or key[0] == endpoint) and (uuid is None or key[1] == uuid)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+
+class ForensicVMApi:
+    """
+    Pooled, keep-alive client for the ForensicVM server API.
+
+    Owns a requests.Session whose connection pools are reused by every call, so the status polling
+    and the API helpers do not pay a new TCP/TLS handshake for each request. The API key is sent as a
+    default header and every request gets a default timeout.
+
+    Args:
+        base_url (str): The base URL of the API.
+        api_key (str): The API key for authentication.
+        timeout (tuple): The default (connect, read) timeout in seconds.
+        pool_connections (int): The number of per-host connection pools to keep.
+        pool_maxsize (int): The maximum number of keep-alive connections per host.
+        cache_ttl (float): The number of seconds the list responses stay in the cache.
+        cache_size (int): The maximum number of cached responses.
+
+    Example:
+        >>> api = ForensicVMApi('https://example.com', 'your_api_key')
+        >>> api.get('/api/test/').status_code
+        200
+    """
+
+    def __init__(self, base_url, api_key, timeout=API_DEFAULT_TIMEOUT,
+                 pool_connections=API_POOL_CONNECTIONS, pool_maxsize=API_POOL_MAXSIZE,
+                 cache_ttl=API_CACHE_TTL, cache_size=API_CACHE_SIZE):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self.cache = ResponseCache(cache_ttl, cache_size)
+
+        self.session = requests.Session()
+        self.session.headers.update({'X-API-KEY': api_key})
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+
+    def url(self, endpoint):
+        """
+        Builds the absolute URL of an API endpoint.
+
+        Args:
+            endpoint (str): The endpoint path, starting with a slash.
+
+        Returns:
+            str: The absolute URL.
+        """
+        return f"{self.base_url}{endpoint}"
+
+    def request(self, method, endpoint, **kwargs):
+        """
+        Sends a request through the pooled session.
+
+        Args:
+            method (str): The HTTP method.
+            endpoint (str): The endpoint path, starting with a slash.
+            **kwargs: Extra arguments passed to requests.Session.request.
+
+        Returns:
+            requests.Response: The response of the server.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self.request_count += 1
+        return self.session.request(method, self.url(endpoint), **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request('GET', endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request('POST', endpoint, **kwargs)
+
+    def patch(self, endpoint, **kwargs):
+        return self.request('PATCH', endpoint, **kwargs)
+
+    def stats(self):
+        """
+        Returns the connection reuse statistics of the session.
+
+        Returns:
+            dict: The number of requests, the number of TCP connections opened, the number of
+                  requests that reused an already open connection and the response cache hits and misses.
+        """
+        opened = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+        with self._lock:
+            request_count = self.request_count
+        return {
+            'requests': request_count,
+            'connections_opened': opened,
+            'connections_reused': max(request_count - opened, 0),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_api_clients = {}
+_api_clients_lock = threading.Lock()
+
+
+def get_api(base_url, api_key):
+    """
+    Returns the shared ForensicVMApi client for a server and API key, creating it on first use.
+
+    Args:
+        base_url (str): The base URL of the API.
+        api_key (str): The API key for authentication.
+
+    Returns:
+        ForensicVMApi: The pooled API client.
+
+    Example:
+        >>> get_api('https://example.com', 'your_api_key') is get_api('https://example.com', 'your_api_key')
+        True
+    """
+    key = (base_url.rstrip('/'), api_key)
+    with _api_clients_lock:
+        client = _api_clients.get(key)
+        if client is None:
+            client = ForensicVMApi(base_url, api_key)
+            _api_clients[key] = client
+        return client
+
+
+def report_api_stats():
+    """
+    Prints the connection reuse statistics of every API client and returns them.
+
+    Returns:
+        dict: The statistics of each client keyed by base URL.
+    """
+    report = {}
+    with _api_clients_lock:
+        clients = list(_api_clients.values())
+    for client in clients:
+        stats = client.stats()
+        report[client.base_url] = stats
+        print(f"API {client.base_url}: {stats['requests']} requests, "
+              f"{stats['connections_opened']} connections opened, "
+              f"{stats['connections_reused']} reused, "
+              f"{stats['cache_hits']} served from cache")
+    return report
 
 def insert_comment(base_url, uuid, api_key, comment_text):
     """
@@ -33,14 +291,13 @@ def insert_comment(base_url, uuid, api_key, comment_text):
     Returns:
         bool: True if the comment was successfully inserted, False otherwise.
     """
-    url = f"{base_url}/api/record_comment/"  # Replace with the actual API endpoint for inserting comments
-    headers = {'X-API-KEY': api_key}
+    endpoint = "/api/record_comment/"  # Replace with the actual API endpoint for inserting comments
     payload = {
         'comment': comment_text,
         'uuid': uuid
     }
 
-    response = requests.post(url, headers=headers, json=payload)
+    response = get_api(base_url, api_key).post(endpoint, json=payload)
 
     if response.status_code == 200:
         print('Comment inserted successfully!')
@@ -61,10 +318,9 @@ def insert_vm_metrics(base_url, uuid, api_key):
     Returns:
         bool: True if the metrics were successfully inserted, False otherwise.
     """
-    url = f"{base_url}/api/insertmetrics/{uuid}/"
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/insertmetrics/{uuid}/"
 
-    response = requests.post(url, headers=headers)
+    response = get_api(base_url, api_key).post(endpoint)
 
     if response.status_code == 200:
         print('Metrics inserted successfully!')
@@ -133,11 +389,10 @@ def remove_vm_datetime(base_url, uuid, api_key):
     Returns:
         bool: True if the datetime was successfully removed, False otherwise.
     """
-    url = f"{base_url}/api/remove_vm_datetime/"
-    headers = {'X-API-KEY': api_key}
+    endpoint = "/api/remove_vm_datetime/"
     data = {'uuid': uuid}
 
-    response = requests.post(url, headers=headers, data=data)
+    response = get_api(base_url, api_key).post(endpoint, data=data)
 
     if response.status_code == 200:
         print('Success:', response.json())
@@ -159,12 +414,10 @@ def change_vm_datetime(base_url, uuid, datetime_str, api_key):
     Returns:
         bool: True if the datetime was successfully changed, False otherwise.
     """
-    url = f"{base_url}/api/change_vm_datetime/"
-    headers = {'X-API-KEY': api_key}
+    endpoint = "/api/change_vm_datetime/"
     data = {'uuid': uuid, 'datetime': datetime_str}
-    print(headers)
 
-    response = requests.post(url, headers=headers, data=data)
+    response = get_api(base_url, api_key).post(endpoint, data=data)
 
     if response.status_code == 200:
         print('Success:', response.json())
@@ -173,6 +426,1084 @@ def change_vm_datetime(base_url, uuid, datetime_str, api_key):
         print('Failed:', response.json())
         return False
 
+# Settings of the resumable download engine
+DOWNLOAD_CHUNK_SIZE = 1048576       # bytes read from the response at a time
+DOWNLOAD_MAX_RETRIES = 5            # retries in a row without progress before giving up
+DOWNLOAD_RETRY_BACKOFF = 2          # seconds before the first retry, doubled on each retry
+DOWNLOAD_MANIFEST_INTERVAL = 16 * 1048576   # bytes written between two manifest updates
+DOWNLOAD_SEGMENT_SIZE = 16 * 1048576        # bytes fetched by one Range request in segmented mode
+DOWNLOAD_MIN_SEGMENTS = 2           # parallel connections a segmented download starts with
+DOWNLOAD_MAX_SEGMENTS = 8           # upper bound of parallel connections, below API_POOL_MAXSIZE
+DOWNLOAD_ADAPT_INTERVAL = 2.0       # seconds between two throughput measurements
+DOWNLOAD_ADAPT_GAIN = 1.1           # add a connection while throughput improves by more than 10 %
+DOWNLOAD_ADAPT_LOSS = 0.8           # retire a connection when throughput falls by more than 20 %
+DOWNLOAD_PROGRESS_INTERVAL = 0.2    # seconds between two progress callbacks in segmented mode
+SPARSE_BLOCK_SIZE = 4096            # bytes of the blocks checked for zeros by the sparse writer, one memory page
+FSCTL_SET_SPARSE = 0x000900C4       # Windows control code that lets a file have holes
+PROGRESS_MAX_RATE = 4               # progress meter redraws per second
+PROGRESS_SMOOTHING = 0.3            # weight of the newest sample in the throughput moving average
+HASH_ALGORITHMS = ('md5', 'sha1', 'sha256')   # digests recorded for downloaded artifacts
+HASH_BUFFER_LIMIT = 256 * 1048576   # bytes of out of order segments held in memory for hashing
+HASH_READ_SIZE = 1048576            # bytes read at a time when a piece has to be hashed from disk
+UPLOAD_CHUNK_SIZE = 8 * 1048576     # bytes per chunk of a chunked ISO upload
+UPLOAD_PARALLEL_CHUNKS = 4          # chunks uploaded at the same time, below API_POOL_MAXSIZE
+UPLOAD_MAX_RETRIES = 5              # retries of a chunk before the upload fails
+UPLOAD_RETRY_BACKOFF = 2            # seconds before the first retry of a chunk, doubled on each retry
+UPLOAD_CHECKSUM_MISMATCH = 460      # status returned when a chunk does not match its Upload-Checksum
+# Upload ids of the chunked uploads in progress, to resume them
+UPLOAD_STATE_FILE = os.path.join(tempfile.gettempdir(), 'forensicvm_uploads.json')
+# SHA-256 of the local ISO files, keyed on path, size and modification time
+ISO_HASH_CACHE_FILE = os.path.join(tempfile.gettempdir(), 'forensicvm_iso_hashes.json')
+# Digests of the ISO files uploaded to each server, for servers that do not list digests
+ISO_DIGEST_REGISTRY_FILE = os.path.join(tempfile.gettempdir(), 'forensicvm_iso_digests.json')
+
+class TransferCancelled(Exception):
+    """
+    Raised inside a transfer when the user cancels it.
+    """
+
+
+# Errors after which a transfer is retried from where it stopped
+RETRYABLE_TRANSFER_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class StreamHasher:
+    """
+    Computes MD5, SHA-1 and SHA-256 digests of a download while its bytes stream in.
+
+    In-order data is fed with update(). Segmented downloads complete their pieces out of order, so
+    add_segment() keeps them in a bounded reorder buffer and hashes every piece as soon as all the
+    bytes before it are hashed. A piece that does not fit in the buffer, or that was downloaded by a
+    previous session, is marked as on disk and read back from the file when its turn comes.
+
+    Args:
+        path (str): The file the download is written to, read back only for pieces not held in memory.
+        algorithms (tuple): The hashlib algorithm names.
+        buffer_limit (int): The maximum number of bytes held in the reorder buffer.
+
+    Example:
+        >>> hasher = StreamHasher('memory.bin.part')
+        >>> hasher.update(b'data')
+        >>> hasher.hexdigests()['md5']
+        '8d777f385d3dfec8815d20f7496026dc'
+    """
+
+    def __init__(self, path=None, algorithms=HASH_ALGORITHMS, buffer_limit=HASH_BUFFER_LIMIT):
+        self.path = path
+        self.algorithms = algorithms
+        self.buffer_limit = buffer_limit
+        self.position = 0
+        self.bytes_reread = 0
+        self._buffered = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._hash_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Starts over, used when a download restarts from zero.
+        """
+        with self._hash_lock, self._lock:
+            self._hashes = {name: hashlib.new(name) for name in self.algorithms}
+            self.position = 0
+            self.bytes_reread = 0
+            self._buffered = 0
+            self._pending = {}
+
+    def update(self, data):
+        """
+        Hashes the next bytes of the file, in order.
+        """
+        for hash_object in self._hashes.values():
+            hash_object.update(data)
+        self.position += len(data)
+
+    def update_from_file(self, end):
+        """
+        Hashes the bytes of the file from the current position up to end, reading them from disk.
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(self.position)
+            while self.position < end:
+                data = f.read(min(HASH_READ_SIZE, end - self.position))
+                if not data:
+                    raise IOError(f"{self.path} is shorter than {end} bytes")
+                self.bytes_reread += len(data)
+                self.update(data)
+
+    def add_segment(self, offset, length, chunks=None):
+        """
+        Adds a completed piece of the file. Thread-safe.
+
+        Args:
+            offset (int): The offset of the piece in the file.
+            length (int): The length of the piece.
+            chunks (list): The bytes of the piece, or None when they are only on disk.
+        """
+        with self._lock:
+            if chunks is not None and self._buffered + length > self.buffer_limit and offset != self.position:
+                chunks = None
+            if chunks is not None:
+                self._buffered += length
+            self._pending[offset] = (length, chunks)
+        self._drain()
+
+    def seek(self, offset):
+        """
+        Brings the digests to offset before an in-order download resumes there: starts over when
+        already past it, hashes the missing bytes from disk otherwise.
+        """
+        if self.position > offset:
+            self.reset()
+        if self.position < offset:
+            self.update_from_file(offset)
+
+    def _hash_pending(self):
+        # Called with _hash_lock held
+        while True:
+            with self._lock:
+                piece = self._pending.pop(self.position, None)
+            if piece is None:
+                return
+            length, chunks = piece
+            if chunks is None:
+                self.update_from_file(self.position + length)
+                continue
+            for chunk in chunks:
+                self.update(chunk)
+            with self._lock:
+                self._buffered -= length
+
+    def _drain(self):
+        # Only one thread hashes at a time, the others return and leave their piece in the buffer
+        while self._hash_lock.acquire(blocking=False):
+            try:
+                self._hash_pending()
+            finally:
+                self._hash_lock.release()
+            with self._lock:
+                if self.position not in self._pending:
+                    break
+
+    def finish(self, size):
+        """
+        Hashes whatever is still pending and any remaining bytes up to size from disk.
+        """
+        with self._hash_lock:
+            self._hash_pending()
+            if self.position < size:
+                self.update_from_file(size)
+
+    def hexdigests(self):
+        """
+        Returns the hex digests of the bytes hashed so far, keyed by algorithm name.
+        """
+        with self._hash_lock:
+            return {name: hash_object.hexdigest() for name, hash_object in self._hashes.items()}
+
+
+def record_download_hashes(api_key, base_url, uuid, output_file, hasher, description, raw_size=None):
+    """
+    Writes the hash manifest of a downloaded artifact and records the digests in the chain of custody.
+
+    The manifest is written next to the artifact as <output_file>.hashes.json. The digests are posted
+    with insert_comment(), so they appear in the chain of custody record of the VM. For an artifact
+    stored compressed, raw_size is given and both records say the digests are of the expanded content.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        uuid (str): The UUID of the VM the artifact comes from.
+        output_file (str): The path of the downloaded artifact.
+        hasher (StreamHasher): The hasher fed during the download.
+        description (str): A short description of the artifact, for example 'Memory dump'.
+        raw_size (int): The size of the expanded content of an artifact stored compressed. Defaults to None.
+
+    Returns:
+        dict: The hex digests keyed by algorithm name.
+
+    Example:
+        >>> record_download_hashes('your_api_key', 'https://example.com', 'vm_uuid', 'memory.bin', hasher, 'Memory dump')
+        {'md5': '...', 'sha1': '...', 'sha256': '...'}
+    """
+    digests = hasher.hexdigests()
+    size = os.path.getsize(output_file)
+    manifest = {
+        'file': os.path.basename(output_file),
+        'description': description,
+        'uuid': str(uuid),
+        'size': size,
+        'downloaded_at': datetime.now().isoformat(timespec='seconds'),
+        'hashes': digests,
+        'bytes_reread': hasher.bytes_reread,
+    }
+    stored = f"{size} bytes"
+    if raw_size is not None:
+        manifest['raw_size'] = raw_size
+        manifest['hashes_of'] = "expanded content, restored with --expand-dump"
+        stored = f"{size} bytes compressed, {raw_size} bytes expanded, hashes of the expanded content"
+    try:
+        with open(output_file + '.hashes.json', 'w') as f:
+            json.dump(manifest, f, indent=4)
+    except OSError as e:
+        print(f"Could not write the hash manifest: {str(e)}")
+
+    hash_lines = ", ".join(f"{name.upper()}: {digest}" for name, digest in digests.items())
+    print(f"{description} {output_file} ({stored}) {hash_lines}")
+    try:
+        insert_comment(base_url, uuid, api_key,
+                       f"{description} downloaded to {os.path.basename(output_file)} ({stored}). {hash_lines}")
+    except Exception as e:
+        print(f"Could not record the hashes in the chain of custody: {str(e)}")
+    return digests
+
+
+def _read_download_manifest(manifest_file):
+    try:
+        with open(manifest_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_download_manifest(manifest_file, manifest):
+    temp_file = manifest_file + '.tmp'
+    with open(temp_file, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temp_file, manifest_file)
+
+
+def mark_sparse(fileno):
+    """
+    Marks an open file as sparse, so the ranges that are never written take no disk space.
+
+    NTFS only leaves holes in files flagged with FSCTL_SET_SPARSE. The other file systems the client
+    runs on leave a hole wherever a file is extended without writing, so there is nothing to do there.
+
+    Args:
+        fileno (int): The file descriptor of the file, opened for writing.
+
+    Returns:
+        bool: True if the file is sparse, False if the file system refused.
+    """
+    if os.name != 'nt':
+        return True
+    try:
+        import msvcrt
+        returned = ctypes.c_ulong(0)
+        return bool(ctypes.windll.kernel32.DeviceIoControl(ctypes.c_void_p(msvcrt.get_osfhandle(fileno)),
+                                                           FSCTL_SET_SPARSE, None, 0, None, 0,
+                                                           ctypes.byref(returned), None))
+    except Exception as e:
+        print(f"Could not mark the file as sparse: {str(e)}")
+        return False
+
+
+def allocated_size(path):
+    """
+    Returns the number of bytes of disk space allocated to a file, less than its size when it is sparse.
+    """
+    if os.name == 'nt':
+        get_size = ctypes.windll.kernel32.GetCompressedFileSizeW
+        get_size.restype = ctypes.c_ulong
+        high = ctypes.c_ulong(0)
+        low = get_size(ctypes.c_wchar_p(os.path.abspath(path)), ctypes.byref(high))
+        return (high.value << 32) + low
+    stat = os.stat(path)
+    return stat.st_blocks * 512 if hasattr(stat, 'st_blocks') else stat.st_size
+
+
+class SparseWriter:
+    """
+    Writes a download while skipping its all-zero blocks, so the file on disk is sparse.
+
+    Guest RAM dumps are largely zero pages. Each chunk is split in blocks of block_size bytes, the runs of
+    blocks holding data are written at their offset and the zero blocks are only skipped over. Reading a
+    hole returns zeros, so the file stays byte-identical to the download and hashes the same. Skipped
+    blocks at the end of the file are covered by extending it with truncate(), done by extend() and finish().
+
+    An instance is shared by all the threads of a download, in place of their write calls, and counts the
+    logical bytes received against the physical bytes written.
+
+    Args:
+        block_size (int): The size of the blocks checked for zeros. One memory page by default.
+
+    Example:
+        >>> writer = SparseWriter()
+        >>> download_segmented('your_api_key', 'https://example.com', endpoint, 'memory.bin', writer=writer)
+        >>> print(writer.report('memory.bin'))
+        memory.bin: 4294967296 bytes, 1717986918 bytes written, 2576980378 bytes of zero pages skipped
+    """
+
+    def __init__(self, block_size=SPARSE_BLOCK_SIZE):
+        self.block_size = block_size
+        self.logical_bytes = 0
+        self.physical_bytes = 0
+        self._zero_block = bytes(block_size)
+        self._lock = threading.Lock()
+
+    def _write(self, target, data, offset):
+        if isinstance(target, int):
+            os.pwrite(target, data, offset)
+        else:
+            target.seek(offset)
+            target.write(data)
+
+    def write(self, target, data, offset):
+        """
+        Writes the blocks of data holding anything but zeros at offset of target.
+
+        Args:
+            target: An open binary file, or a file descriptor written with os.pwrite.
+            data (bytes): The bytes received.
+            offset (int): The offset of data in the file. Blocks are aligned on it.
+
+        Returns:
+            int: The number of bytes physically written.
+        """
+        block_size = self.block_size
+        zero_block = self._zero_block
+        written = 0
+        run_start = None
+        for start in range(0, len(data), block_size):
+            end = min(start + block_size, len(data))
+            is_zero = data[start:end] == (zero_block if end - start == block_size else bytes(end - start))
+            if is_zero and run_start is not None:
+                self._write(target, data[run_start:start], offset + run_start)
+                written += start - run_start
+                run_start = None
+            elif not is_zero and run_start is None:
+                run_start = start
+        if run_start is not None:
+            self._write(target, data[run_start:], offset + run_start)
+            written += len(data) - run_start
+
+        with self._lock:
+            self.logical_bytes += len(data)
+            self.physical_bytes += written
+        return written
+
+    @staticmethod
+    def extend(f, size):
+        """
+        Extends the open file f to size when zero blocks were skipped at its end.
+        """
+        f.flush()
+        if os.fstat(f.fileno()).st_size < size:
+            f.truncate(size)
+
+    @staticmethod
+    def finish(path, size):
+        """
+        The final truncate: gives the completed file its full size, whatever zero blocks ended it.
+        """
+        if os.path.getsize(path) < size:
+            os.truncate(path, size)
+
+    def report(self, path):
+        """
+        Returns a line comparing the size of the file with the bytes written and the disk space used.
+        """
+        with self._lock:
+            logical_bytes, physical_bytes = self.logical_bytes, self.physical_bytes
+        return f"{path}: {os.path.getsize(path)} bytes, {physical_bytes} bytes written, " \
+               f"{logical_bytes - physical_bytes} bytes of zero pages skipped, " \
+               f"{allocated_size(path)} bytes allocated on disk"
+
+
+def download_resumable(api_key, base_url, endpoint, output_file, progress=None,
+                       chunk_size=DOWNLOAD_CHUNK_SIZE, max_retries=DOWNLOAD_MAX_RETRIES, hasher=None, writer=None):
+    """
+    Downloads an API endpoint to a local file, resuming after failures with HTTP Range requests.
+
+    The data is written to output_file + '.part' and a sidecar manifest (output_file + '.part.json')
+    records the URL, the validators (ETag / Last-Modified), the total size and the number of bytes
+    safely written. When a previous attempt left a partial file for the same URL, the download resumes
+    from it with a Range request guarded by If-Range. If the server ignores the range or the file changed
+    on the server, the download restarts from zero. Dropped connections, timeouts and 5xx errors are
+    retried with an exponential backoff. The .part file is renamed to output_file once complete.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        endpoint (str): The endpoint path to download.
+        output_file (str): The path of the downloaded file.
+        progress (callable): Optional progress(bytes_downloaded, total_size) callback. Returning False cancels.
+        chunk_size (int): The number of bytes read at a time.
+        max_retries (int): The number of retries in a row without progress before giving up.
+        hasher (StreamHasher): Optional hasher fed with the bytes as they are written.
+        writer (SparseWriter): Optional writer that skips the zero blocks, so the file is written sparse.
+
+    Returns:
+        bool: True if the download completed, False if it was cancelled. A cancelled download keeps its
+              .part file and manifest, so the next call resumes it.
+
+    Raises:
+        requests.exceptions.HTTPError: If the server answers with a non retryable error.
+        Exception: The last error, when the retries are exhausted.
+
+    Example:
+        >>> download_resumable('your_api_key', 'https://example.com', '/api/download-memory-dump/vm_uuid/', 'memory.bin')
+        True
+    """
+    api = get_api(base_url, api_key)
+    url = api.url(endpoint)
+    part_file = output_file + '.part'
+    manifest_file = part_file + '.json'
+
+    manifest = _read_download_manifest(manifest_file)
+    if manifest.get('url') != url or not os.path.exists(part_file):
+        manifest = {'url': url, 'etag': None, 'last_modified': None, 'total_size': 0, 'bytes_downloaded': 0}
+
+    if hasher is not None:
+        hasher.path = part_file
+
+    retries = 0
+    while True:
+        offset = manifest['bytes_downloaded']
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            validator = manifest.get('etag') or manifest.get('last_modified')
+            if validator:
+                headers['If-Range'] = validator
+
+        progress_made = False
+        try:
+            response = api.get(endpoint, headers=headers, stream=True, timeout=API_LONG_TIMEOUT)
+            with response:
+                if response.status_code == 416 and offset and offset == manifest.get('total_size'):
+                    # The previous attempt already received everything
+                    break
+                if response.status_code == 416:
+                    print(f"Server rejected the resume range of {url}, restarting the download")
+                    manifest['bytes_downloaded'] = 0
+                    continue
+                response.raise_for_status()
+
+                content_range = re.match(r'bytes (\d+)-\d+/(\d+|\*)', response.headers.get('Content-Range', ''))
+                if offset and response.status_code == 206:
+                    if not content_range or int(content_range.group(1)) != offset:
+                        print(f"Unexpected Content-Range for {url}, restarting the download")
+                        manifest['bytes_downloaded'] = 0
+                        continue
+                    if content_range.group(2) != '*':
+                        manifest['total_size'] = int(content_range.group(2))
+                    print(f"Resuming download of {url} at {offset} bytes")
+                else:
+                    # Full response: the server ignored the range or the file changed, start over
+                    if offset:
+                        print(f"Server did not honour the resume range of {url}, restarting the download")
+                    offset = 0
+                    content_length = int(response.headers.get('Content-Length', 0))
+                    manifest.update({
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'total_size': content_length,
+                        'bytes_downloaded': 0,
+                    })
+
+                total_size = manifest['total_size']
+                unsaved = 0
+                if hasher is not None:
+                    hasher.seek(offset)
+                with open(part_file, 'r+b' if offset else 'wb') as f:
+                    f.truncate(offset)
+                    if writer is not None:
+                        mark_sparse(f.fileno())
+                    f.seek(offset)
+                    try:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if not chunk:
+                                continue
+                            if writer is not None:
+                                writer.write(f, chunk, manifest['bytes_downloaded'])
+                            else:
+                                f.write(chunk)
+                            if hasher is not None:
+                                hasher.update(chunk)
+                            manifest['bytes_downloaded'] += len(chunk)
+                            unsaved += len(chunk)
+                            progress_made = True
+
+                            if unsaved >= DOWNLOAD_MANIFEST_INTERVAL:
+                                f.flush()
+                                if writer is not None:
+                                    writer.extend(f, manifest['bytes_downloaded'])
+                                _write_download_manifest(manifest_file, manifest)
+                                unsaved = 0
+
+                            if progress and progress(manifest['bytes_downloaded'], total_size) is False:
+                                f.flush()
+                                if writer is not None:
+                                    writer.extend(f, manifest['bytes_downloaded'])
+                                _write_download_manifest(manifest_file, manifest)
+                                print(f"Download of {url} cancelled at {manifest['bytes_downloaded']} bytes")
+                                return False
+                    finally:
+                        # Zero blocks skipped at the end of what was received still count in the file size
+                        if writer is not None:
+                            writer.extend(f, manifest['bytes_downloaded'])
+                    f.flush()
+                _write_download_manifest(manifest_file, manifest)
+
+            if total_size and manifest['bytes_downloaded'] < total_size:
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"Connection closed at {manifest['bytes_downloaded']} of {total_size} bytes")
+            break
+
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else 0
+            if status_code < 500:
+                raise
+            error = e
+        except RETRYABLE_TRANSFER_ERRORS as e:
+            error = e
+
+        if os.path.exists(part_file):
+            _write_download_manifest(manifest_file, manifest)
+        retries = 0 if progress_made else retries + 1
+        if retries > max_retries:
+            raise error
+        delay = DOWNLOAD_RETRY_BACKOFF * (2 ** max(retries - 1, 0))
+        print(f"Download of {url} interrupted ({str(error)}), retrying in {delay} s")
+        time.sleep(delay)
+
+    if writer is not None:
+        writer.finish(part_file, manifest['total_size'] or manifest['bytes_downloaded'])
+    if hasher is not None:
+        hasher.finish(os.path.getsize(part_file))
+    os.replace(part_file, output_file)
+    try:
+        os.remove(manifest_file)
+    except OSError:
+        pass
+    return True
+
+
+class SegmentedDownload:
+    """
+    Downloads a file as many byte ranges fetched in parallel on pooled keep-alive connections.
+
+    The remote size is split into pieces of segment_size bytes that workers take from a shared list and
+    fetch with Range requests. Each piece is written at its own offset of a preallocated .part file, with
+    os.pwrite where the platform has it and a per-worker file handle otherwise. The number of workers
+    starts at min_workers and adapts to the measured throughput: a worker is added while the throughput
+    keeps improving and one is retired when it drops. The completed pieces are recorded in the same
+    sidecar manifest used by download_resumable(), so an interrupted download resumes in either mode.
+    With a SparseWriter the .part file is marked sparse before it is preallocated, so the zero blocks
+    the writer skips stay holes.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        endpoint (str): The endpoint path to download.
+        output_file (str): The path of the downloaded file.
+        segment_size (int): The number of bytes fetched by one Range request.
+        min_workers (int): The number of parallel connections to start with.
+        max_workers (int): The maximum number of parallel connections.
+        hasher (StreamHasher): Optional hasher fed with each piece once it is complete.
+        writer (SparseWriter): Optional writer that skips the zero blocks, so the file is written sparse.
+
+    Example:
+        >>> SegmentedDownload('your_api_key', 'https://example.com', '/api/download-memory-dump/vm_uuid/', 'memory.bin').run()
+        True
+    """
+
+    def __init__(self, api_key, base_url, endpoint, output_file, segment_size=DOWNLOAD_SEGMENT_SIZE,
+                 min_workers=DOWNLOAD_MIN_SEGMENTS, max_workers=DOWNLOAD_MAX_SEGMENTS,
+                 chunk_size=DOWNLOAD_CHUNK_SIZE, max_retries=DOWNLOAD_MAX_RETRIES, hasher=None, writer=None):
+        self.api = get_api(base_url, api_key)
+        self.endpoint = endpoint
+        self.url = self.api.url(endpoint)
+        self.output_file = output_file
+        self.part_file = output_file + '.part'
+        self.manifest_file = self.part_file + '.json'
+        self.segment_size = segment_size
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.hasher = hasher
+        self.writer = writer
+
+        self.total_size = 0
+        self.validator = None
+        self.manifest = {}
+        self.bytes_downloaded = 0
+        self.target_workers = self.min_workers
+        self.error = None
+        self.restart = False
+
+        self._pending = []
+        self._done = set()
+        self._failures = {}
+        self._workers = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._fd = None
+
+    def probe(self):
+        """
+        Asks for the first byte to learn the size and whether the server honours ranges.
+
+        Returns:
+            bool: True if the file can be fetched in segments.
+        """
+        response = self.api.get(self.endpoint, headers={'Range': 'bytes=0-0'}, stream=True)
+        with response:
+            response.raise_for_status()
+            content_range = re.match(r'bytes 0-0/(\d+)', response.headers.get('Content-Range', ''))
+            if response.status_code != 206 or not content_range:
+                return False
+            self.total_size = int(content_range.group(1))
+            self.validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            self.manifest = {
+                'url': self.url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'total_size': self.total_size,
+                'bytes_downloaded': 0,
+                'segment_size': self.segment_size,
+                'segments_done': [],
+            }
+        return self.total_size > self.segment_size
+
+    def _load_progress(self):
+        previous = _read_download_manifest(self.manifest_file)
+        if (previous.get('url') != self.url or previous.get('total_size') != self.total_size
+                or not os.path.exists(self.part_file)
+                or (self.validator and self.validator not in (previous.get('etag'), previous.get('last_modified')))):
+            return
+        if previous.get('segment_size') == self.segment_size:
+            self._done.update(previous.get('segments_done', []))
+        # Pieces inside the contiguous prefix written by a sequential download are complete too
+        self._done.update(range(previous.get('bytes_downloaded', 0) // self.segment_size))
+
+    def _save_manifest(self):
+        with self._lock:
+            done = sorted(self._done)
+        done_set = set(done)
+        prefix = 0
+        while prefix in done_set:
+            prefix += 1
+        self.manifest['segments_done'] = done
+        self.manifest['bytes_downloaded'] = min(prefix * self.segment_size, self.total_size)
+        _write_download_manifest(self.manifest_file, self.manifest)
+
+    def _segment_range(self, index):
+        start = index * self.segment_size
+        return start, min(start + self.segment_size, self.total_size) - 1
+
+    def _next_segment(self):
+        with self._lock:
+            if len(self._workers) > self.target_workers:
+                # Retire this worker, the throughput dropped
+                self._workers.remove(threading.current_thread())
+                return None
+            if self._cancel.is_set() or not self._pending:
+                return None
+            return self._pending.pop(0)
+
+    def _worker(self):
+        handle = None
+        if self._fd is None:
+            handle = open(self.part_file, 'r+b')
+        try:
+            while True:
+                index = self._next_segment()
+                if index is None:
+                    break
+                try:
+                    self._fetch_segment(index, handle)
+                except Exception as e:
+                    self._segment_failed(index, e)
+        finally:
+            if handle:
+                handle.close()
+            with self._lock:
+                if threading.current_thread() in self._workers:
+                    self._workers.remove(threading.current_thread())
+
+    def _fetch_segment(self, index, handle):
+        start, end = self._segment_range(index)
+        headers = {'Range': f"bytes={start}-{end}"}
+        if self.validator:
+            headers['If-Range'] = self.validator
+
+        received = 0
+        chunks = [] if self.hasher is not None else None
+        try:
+            response = self.api.get(self.endpoint, headers=headers, stream=True, timeout=API_LONG_TIMEOUT)
+            with response:
+                response.raise_for_status()
+                content_range = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+                if response.status_code != 206 or not content_range or int(content_range.group(1)) != start:
+                    # The file changed on the server, the pieces already written cannot be trusted
+                    self.restart = True
+                    self._cancel.set()
+                    return
+
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if self._cancel.is_set():
+                        raise TransferCancelled()
+                    if not chunk:
+                        continue
+                    if self.writer is not None:
+                        self.writer.write(self._fd if self._fd is not None else handle, chunk, start + received)
+                    elif self._fd is not None:
+                        os.pwrite(self._fd, chunk, start + received)
+                    else:
+                        handle.seek(start + received)
+                        handle.write(chunk)
+                    if chunks is not None:
+                        chunks.append(chunk)
+                    received += len(chunk)
+                    with self._lock:
+                        self.bytes_downloaded += len(chunk)
+
+            if received != end - start + 1:
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"Segment {index} closed at {received} of {end - start + 1} bytes")
+        except BaseException:
+            with self._lock:
+                self.bytes_downloaded -= received
+            raise
+
+        if handle is not None:
+            # The hasher may read the piece back from disk, it must not be left in this handle's buffer
+            handle.flush()
+        if self.hasher is not None:
+            self.hasher.add_segment(start, received, chunks)
+        with self._lock:
+            self._done.add(index)
+            self._failures.pop(index, None)
+
+    def _segment_failed(self, index, error):
+        if isinstance(error, TransferCancelled):
+            with self._lock:
+                self._pending.insert(0, index)
+            return
+        retryable = isinstance(error, RETRYABLE_TRANSFER_ERRORS) or (
+            isinstance(error, requests.exceptions.HTTPError) and error.response is not None
+            and error.response.status_code >= 500)
+        with self._lock:
+            failures = self._failures.get(index, 0) + 1
+            self._failures[index] = failures
+            if retryable and failures <= self.max_retries:
+                self._pending.insert(0, index)
+                print(f"Segment {index} of {self.url} failed ({str(error)}), retrying")
+                return
+            self.error = error
+        self._cancel.set()
+
+    def _spawn_workers(self):
+        with self._lock:
+            missing = min(self.target_workers, len(self._pending)) - len(self._workers)
+            for _ in range(max(missing, 0)):
+                worker = threading.Thread(target=self._worker, name="SegmentedDownload", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+    def _adapt(self, throughput, best_throughput):
+        """
+        Adds a worker while the throughput keeps growing, retires one when it falls.
+        """
+        if throughput > best_throughput * DOWNLOAD_ADAPT_GAIN and self.target_workers < self.max_workers:
+            self.target_workers += 1
+            print(f"Download throughput {throughput / 1048576:.2f} MB/s, using {self.target_workers} connections")
+        elif throughput < best_throughput * DOWNLOAD_ADAPT_LOSS and self.target_workers > self.min_workers:
+            self.target_workers -= 1
+            print(f"Download throughput {throughput / 1048576:.2f} MB/s, using {self.target_workers} connections")
+        return max(throughput, best_throughput)
+
+    def run(self, progress=None):
+        """
+        Fetches the missing pieces and renames the .part file to the output file when complete.
+
+        Args:
+            progress (callable): Optional progress(bytes_downloaded, total_size) callback, called on
+                                 this thread. Returning False cancels the download.
+
+        Returns:
+            bool: True if the download completed, False if it was cancelled.
+
+        Raises:
+            Exception: The error of a piece that could not be fetched.
+        """
+        self._load_progress()
+        segment_count = (self.total_size + self.segment_size - 1) // self.segment_size
+        self._pending = [index for index in range(segment_count) if index not in self._done]
+        self.bytes_downloaded = sum(self._segment_range(index)[1] - self._segment_range(index)[0] + 1
+                                    for index in self._done)
+        if self._done:
+            print(f"Resuming segmented download of {self.url} at {self.bytes_downloaded} bytes")
+
+        # A .part file that is not resumed is rewritten from empty: the writer skips zero blocks, so the
+        # bytes of an older download would stay wherever the new file has zeros
+        mode = 'r+b' if self._done else 'wb'
+        with open(self.part_file, mode) as f:
+            if self.writer is not None:
+                mark_sparse(f.fileno())
+            f.truncate(self.total_size)
+        if self.hasher is not None:
+            # Pieces from a previous session are only on disk, they are read back when their turn comes
+            self.hasher.path = self.part_file
+            self.hasher.reset()
+            for index in sorted(self._done):
+                start, end = self._segment_range(index)
+                self.hasher.add_segment(start, end - start + 1)
+        if hasattr(os, 'pwrite'):
+            self._fd = os.open(self.part_file, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+
+        cancelled = False
+        try:
+            best_throughput = 0
+            sample_time, sample_bytes = time.monotonic(), self.bytes_downloaded
+            last_save = sample_time
+            while True:
+                self._spawn_workers()
+                with self._lock:
+                    running = len(self._workers)
+                    finished = not self._pending and running == 0
+                if finished or (self._cancel.is_set() and running == 0):
+                    break
+
+                time.sleep(DOWNLOAD_PROGRESS_INTERVAL)
+                if progress and not self._cancel.is_set() and progress(self.bytes_downloaded, self.total_size) is False:
+                    cancelled = True
+                    self._cancel.set()
+
+                now = time.monotonic()
+                if now - sample_time >= DOWNLOAD_ADAPT_INTERVAL:
+                    throughput = (self.bytes_downloaded - sample_bytes) / (now - sample_time)
+                    best_throughput = self._adapt(throughput, best_throughput)
+                    sample_time, sample_bytes = now, self.bytes_downloaded
+                if now - last_save >= DOWNLOAD_ADAPT_INTERVAL:
+                    self._save_manifest()
+                    last_save = now
+        finally:
+            self._cancel.set()
+            for worker in list(self._workers):
+                worker.join()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._save_manifest()
+
+        if self.error:
+            raise self.error
+        if cancelled or self.restart:
+            return False
+
+        if self.writer is not None:
+            self.writer.finish(self.part_file, self.total_size)
+        if self.hasher is not None:
+            self.hasher.finish(self.total_size)
+        os.replace(self.part_file, self.output_file)
+        try:
+            os.remove(self.manifest_file)
+        except OSError:
+            pass
+        return True
+
+
+def download_segmented(api_key, base_url, endpoint, output_file, progress=None, **kwargs):
+    """
+    Downloads a large file with SegmentedDownload, falling back to download_resumable().
+
+    The fallback is used when the server does not honour Range requests, when the file is smaller
+    than one segment, or when the file changed on the server during the download.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        endpoint (str): The endpoint path to download.
+        output_file (str): The path of the downloaded file.
+        progress (callable): Optional progress(bytes_downloaded, total_size) callback. Returning False cancels.
+        **kwargs: Extra arguments passed to SegmentedDownload.
+
+    Returns:
+        bool: True if the download completed, False if it was cancelled.
+
+    Example:
+        >>> download_segmented('your_api_key', 'https://example.com', '/api/download-evidence/vm_uuid/', 'evidence.vmdk')
+        True
+    """
+    download = SegmentedDownload(api_key, base_url, endpoint, output_file, **kwargs)
+    try:
+        segmented = download.probe()
+    except RETRYABLE_TRANSFER_ERRORS as e:
+        print(f"Could not probe {download.url} ({str(e)}), downloading in one stream")
+        segmented = False
+
+    if segmented:
+        if download.run(progress):
+            return True
+        if not download.restart:
+            return False
+        print(f"{download.url} changed on the server, restarting the download")
+        for stale_file in (download.part_file, download.manifest_file):
+            if os.path.exists(stale_file):
+                os.remove(stale_file)
+
+    return download_resumable(api_key, base_url, endpoint, output_file, progress=progress,
+                              chunk_size=download.chunk_size, hasher=download.hasher, writer=download.writer)
+
+
+def format_duration(seconds):
+    """
+    Formats a number of seconds as H:MM:SS.
+    """
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressReporter:
+    """
+    Thread-safe, rate-limited progress reporting for transfers.
+
+    Transfer threads only record their progress, which costs a lock and two additions. The meter is
+    redrawn at most max_rate times per second, with a throughput smoothed by an exponential moving
+    average and the estimated time left. Tk must only be touched from the main thread, so the
+    redraw happens when the reporter is called from the main thread, or when the main thread calls
+    pump(). Cancelling the meter sets a flag every transfer thread sees in the value returned by update().
+
+    An instance is a drop-in progress(bytes_done, total_size) callback for download_resumable(),
+    download_segmented() and the uploads.
+
+    Args:
+        title (str): The title of the progress meter.
+        verb (str): The word in front of the byte counts, for example 'Downloaded'.
+        max_rate (float): The maximum number of redraws per second.
+        smoothing (float): The weight of the newest sample in the throughput moving average.
+        display (callable): Optional display(title, bytes_done, total_size, message) function returning
+                            False when the user cancelled. Defaults to sg.one_line_progress_meter.
+
+    Example:
+        >>> progress = ProgressReporter("Downloading Memory Dump")
+        >>> download_segmented('your_api_key', 'https://example.com', endpoint, 'memory.bin', progress=progress)
+        >>> progress.close()
+    """
+
+    def __init__(self, title, verb="Downloaded", max_rate=PROGRESS_MAX_RATE, smoothing=PROGRESS_SMOOTHING,
+                 display=None):
+        self.title = title
+        self.verb = verb
+        self.interval = 1.0 / max_rate
+        self.smoothing = smoothing
+        self.display = display or self._meter
+        self.bytes_done = 0
+        self.total_size = 0
+        self.throughput = None
+        self.redraws = 0
+        self.updates = 0
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._last_time = None
+        self._last_bytes = 0
+
+    def _meter(self, title, bytes_done, total_size, message):
+        return sg.one_line_progress_meter(title, bytes_done, total_size, self.title, message)
+
+    def update(self, bytes_done, total_size=None):
+        """
+        Records the progress of the transfer. Callable from any thread.
+
+        Returns:
+            bool: False once the transfer has been cancelled.
+        """
+        with self._lock:
+            self.bytes_done = bytes_done
+            if total_size is not None:
+                self.total_size = total_size
+            self.updates += 1
+        return not self.cancelled.is_set()
+
+    def add(self, byte_count):
+        """
+        Adds byte_count bytes to the progress. Callable from any thread.
+
+        Returns:
+            bool: False once the transfer has been cancelled.
+        """
+        with self._lock:
+            self.bytes_done += byte_count
+            self.updates += 1
+        return not self.cancelled.is_set()
+
+    def eta(self):
+        """
+        Returns the estimated number of seconds left, or None when unknown.
+        """
+        if not self.throughput or not self.total_size:
+            return None
+        return max(self.total_size - self.bytes_done, 0) / self.throughput
+
+    def message(self):
+        """
+        Returns the status line shown under the meter.
+        """
+        text = f"{self.verb} {self.bytes_done / 1048576:.2f} / {self.total_size / 1048576:.2f} MB"
+        if self.throughput:
+            text += f" at {self.throughput / 1048576:.2f} MB/s"
+        eta = self.eta()
+        if eta is not None:
+            text += f", {format_duration(eta)} left"
+        return text
+
+    def pump(self, force=False):
+        """
+        Redraws the meter if the rate limit allows it. Must be called from the main thread.
+
+        Args:
+            force (bool): Redraw even if the last redraw is too recent.
+
+        Returns:
+            bool: False once the transfer has been cancelled.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_time is not None and now - self._last_time < self.interval:
+                return not self.cancelled.is_set()
+            bytes_done, total_size = self.bytes_done, self.total_size
+            if self._last_time is not None and now > self._last_time:
+                sample = max(bytes_done - self._last_bytes, 0) / (now - self._last_time)
+                if self.throughput is None:
+                    self.throughput = sample
+                else:
+                    self.throughput = self.smoothing * sample + (1 - self.smoothing) * self.throughput
+            self._last_time, self._last_bytes = now, bytes_done
+
+        self.redraws += 1
+        if self.display(self.title, bytes_done, total_size, self.message()) is False:
+            self.cancelled.set()
+        return not self.cancelled.is_set()
+
+    def __call__(self, bytes_done, total_size=None):
+        self.update(bytes_done, total_size)
+        if threading.current_thread() is threading.main_thread():
+            # The last update is always drawn, it closes the meter
+            return self.pump(force=bool(self.total_size) and bytes_done >= self.total_size)
+        return not self.cancelled.is_set()
+
+    def close(self):
+        """
+        Closes the meter if it is still open.
+        """
+        if self.display == self._meter and threading.current_thread() is threading.main_thread():
+            try:
+                sg.one_line_progress_meter_cancel(self.title)
+            except Exception:
+                pass
+        print(f"{self.title}: {self.redraws} redraws for {self.updates} progress updates")
+
+
 def download_pcap(api_key, uuid, base_url, output_file):
     """
     Downloads pcap files identified by UUID using the API endpoint and saves them to a local file.
@@ -201,40 +1532,720 @@ def download_pcap(api_key, uuid, base_url, output_file):
     assert base_url, "Base URL is required"
     assert output_file, "Output file is required"
 
-    url = f"{base_url}/api/download_pcap/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/download_pcap/{uuid}/"
+
+    progress = ProgressReporter("Downloading Pcap files")
+    try:
+        hasher = StreamHasher()
+        if download_resumable(api_key, base_url, endpoint, output_file, progress=progress, hasher=hasher):
+            print(f"Pcap files download downloaded to {output_file}")
+            record_download_hashes(api_key, base_url, uuid, output_file, hasher, "Network pcap files")
+            return True
+        else:
+            print("Pcap download canceled by user, the partial download is kept")
+            return False
+
+    except requests.exceptions.HTTPError as e:
+        print(f"Error: {e.response.status_code}")
+        print(e.response.text)
+        return False
+    except Exception as e:
+        print(f"An unexpected error occurred: {str(e)}")
+        return False
+    finally:
+        progress.close()
+
+
+# Incremental pcap sync. The files are listed by /api/list-pcap-files/<uuid>/ and fetched with Range
+# requests from /api/download-pcap-file/<uuid>/<name>/
+PCAP_SYNC_OVERLAP = 65536           # bytes already synced that are fetched again to check they did not change
+PCAP_SYNC_HEAD = 4096               # bytes at the start of a synced file compared too: global header, first packets
+PCAP_SYNC_STATE_FILE = '.pcap-sync.json'    # last synced offset of each file, kept in the sync folder
+
+
+def _fetch_range(api, endpoint, offset, length):
+    # Returns the bytes of the range, or None when the server does not answer with that range
+    response = api.get(endpoint, headers={'Range': f"bytes={offset}-{offset + length - 1}"}, stream=True,
+                       timeout=API_LONG_TIMEOUT)
+    with response:
+        content_range = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+        if response.status_code != 206 or not content_range or int(content_range.group(1)) != offset:
+            return None
+        data = bytearray()
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            data += chunk[:length - len(data)]
+            if len(data) >= length:
+                break
+        return bytes(data)
+
+
+def sync_pcap_file(api_key, base_url, endpoint, path, offset, overlap=PCAP_SYNC_OVERLAP, head=PCAP_SYNC_HEAD,
+                   progress=None):
+    """
+    Brings a local copy of a growing capture file up to date by appending the bytes added since offset.
+
+    The request starts overlap bytes before offset. Those bytes must match the end of the local copy,
+    and the first head bytes, the global header and the first packets with their timestamps, must match
+    its start. Otherwise the capture was restarted or rotated on the server and the whole file is fetched
+    again. Only these two windows are compared: a capture rewritten with the same first head and last
+    overlap bytes but other bytes in between would be taken as grown. A local copy whose size is not
+    offset, because it was moved or edited, is also fetched again.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        endpoint (str): The endpoint of the remote capture file, which must honour Range requests.
+        path (str): The local copy.
+        offset (int): The number of bytes synced by the previous call.
+        overlap (int): The number of already synced bytes before offset compared with the server.
+        head (int): The number of bytes at the start of the file compared with the server.
+        progress (callable): Optional progress(bytes_fetched) callback. Returning False cancels.
+
+    Returns:
+        tuple: (mode, bytes fetched) where mode is 'append', 'full' or 'cancelled'.
+
+    Example:
+        >>> sync_pcap_file('your_api_key', 'https://example.com', '/api/download-pcap-file/vm_uuid/tap0.pcap/',
+        ...                'pcap/tap0.pcap', 1048576)
+        ('append', 24576)
+    """
+    if not os.path.exists(path) or os.path.getsize(path) != offset:
+        offset = 0
+    overlap = min(overlap, offset)
+
+    if offset:
+        with open(path, 'rb') as f:
+            synced_head = f.read(min(head, offset - overlap))
+            f.seek(offset - overlap)
+            synced_tail = f.read(overlap)
+        api = get_api(base_url, api_key)
+        if synced_head and _fetch_range(api, endpoint, 0, len(synced_head)) != synced_head:
+            print(f"The start of {endpoint} changed on the server, fetching it again")
+        else:
+            response = api.get(endpoint, headers={'Range': f"bytes={offset - overlap}-"}, stream=True,
+                               timeout=API_LONG_TIMEOUT)
+            with response:
+                if response.status_code == 416:
+                    print(f"{endpoint} is shorter than its synced copy, fetching it again")
+                else:
+                    response.raise_for_status()
+                    content_range = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+                    if (response.status_code == 206 and content_range
+                            and int(content_range.group(1)) == offset - overlap):
+                        received = b''
+                        chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+                        for chunk in chunks:
+                            received += chunk
+                            if len(received) >= overlap:
+                                break
+                        if received[:overlap] == synced_tail:
+                            fetched = 0
+                            with open(path, 'r+b') as f:
+                                f.seek(offset)
+                                for chunk in itertools.chain([received[overlap:]], chunks):
+                                    f.write(chunk)
+                                    fetched += len(chunk)
+                                    if progress and progress(fetched) is False:
+                                        return 'cancelled', fetched
+                            return 'append', fetched
+                        print(f"The synced part of {endpoint} changed on the server, fetching it again")
+                    else:
+                        print(f"{endpoint} does not honour Range requests, fetching it again")
+
+    fetched = []
+
+    def full_progress(bytes_downloaded, total_size):
+        fetched[:] = [bytes_downloaded]
+        return progress(bytes_downloaded) if progress else True
+
+    if not download_resumable(api_key, base_url, endpoint, path, progress=full_progress):
+        return 'cancelled', sum(fetched)
+    return 'full', os.path.getsize(path)
+
+
+def sync_pcap(api_key, uuid, base_url, folder, progress=None):
+    """
+    Syncs the network capture files of a VM into a local folder, fetching only the data appended since
+    the previous sync.
+
+    The last synced offset of every file is kept in PCAP_SYNC_STATE_FILE in the folder. Each file is
+    brought up to date by sync_pcap_file(), and the hashes of every file that changed are recorded in
+    the chain of custody.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        uuid (str): The UUID of the VM.
+        base_url (str): The base URL of the API.
+        folder (str): The local folder of the capture files.
+        progress (callable): Optional progress(bytes_fetched, bytes_to_fetch) callback. Returning False cancels.
+
+    Returns:
+        dict: (mode, bytes fetched) keyed by file name, or None when the server cannot list the capture
+              files, in which case download_pcap() fetches them all as a zip.
+
+    Example:
+        >>> sync_pcap('your_api_key', 'vm_uuid', 'https://example.com', 'C:\\\\cases\\\\case1\\\\pcap')
+        {'tap0.pcap': ('append', 24576)}
+    """
+    api = get_api(base_url, api_key)
+    response = api.get(f"/api/list-pcap-files/{uuid}/")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    remote_files = response.json().get('pcap_files', {})
+
+    os.makedirs(folder, exist_ok=True)
+    state_file = os.path.join(folder, PCAP_SYNC_STATE_FILE)
+    state = _read_json_file(state_file)
+    if state.get('uuid') != str(uuid):
+        state = {'uuid': str(uuid), 'files': {}}
+
+    to_fetch = sum(max(size - state['files'].get(name, {}).get('offset', 0), 0) for name, size in remote_files.items())
+    done = 0
+    results = {}
+    for name, size in sorted(remote_files.items()):
+        name = os.path.basename(name)
+        path = os.path.join(folder, name)
+        offset = state['files'].get(name, {}).get('offset', 0)
+        if offset == size and os.path.exists(path) and os.path.getsize(path) == offset:
+            results[name] = ('unchanged', 0)
+            continue
+
+        def file_progress(fetched):
+            return progress(done + fetched, to_fetch) if progress else True
+
+        try:
+            mode, fetched = sync_pcap_file(api_key, base_url, f"/api/download-pcap-file/{uuid}/{name}/", path,
+                                           offset, progress=file_progress)
+        finally:
+            # Whatever was appended before an error is kept, the next sync continues after it
+            state['files'][name] = {'offset': os.path.getsize(path) if os.path.exists(path) else 0,
+                                    'synced_at': datetime.now().isoformat(timespec='seconds')}
+            _write_json_file(state_file, state)
+        done += fetched
+        results[name] = (mode, fetched)
+        if mode == 'cancelled':
+            print("Pcap sync canceled by user, the next sync continues from the data already fetched")
+            break
+
+        hasher = StreamHasher(path)
+        hasher.finish(os.path.getsize(path))
+        print(f"{name}: {fetched} bytes fetched ({mode})")
+        record_download_hashes(api_key, base_url, uuid, path, hasher, "Network pcap file")
+    return results
+
+
+# Flow index of the network captures, built while the capture files are written
+FLOW_INDEX_EXTENSION = '.flows'
+FLOW_INDEX_MAGIC = b'FVMFLOW1'
+FLOW_READ_SIZE = 1048576            # bytes of a capture read and indexed at a time
+FLOW_MAX_RECORD = 67108864          # bytes above which a record length means the capture is corrupted
+FLOW_MAX_NAMES = 8                  # DNS names kept per address
+FLOW_TABLE_ROWS = 500               # flows shown in the flows tab
+# Columns of the flow index, each an array of the given type code
+FLOW_COLUMNS = (
+    ('protocol', 'B'), ('source', 'I'), ('source_port', 'H'), ('destination', 'I'), ('destination_port', 'H'),
+    ('packets', 'Q'), ('bytes', 'Q'), ('first_seen', 'd'), ('last_seen', 'd'),
+    ('first_offset', 'Q'), ('last_offset', 'Q'),
+)
+FLOW_PROTOCOLS = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6'}
+PCAPNG_SECTION_HEADER = 0x0A0D0D0A
+
+
+class FlowIndex:
+    """
+    Compact index of the flows of one capture file, stored as array-backed columns.
+
+    Flow i is made of the i-th item of every column of FLOW_COLUMNS. Addresses are stored as numbers
+    into the addresses list, and names maps an address to the DNS names that resolved to it. The
+    offsets are those of the first and last packet record of the flow in the capture file, so a tool can
+    seek straight to them. On disk the index is a JSON header followed by the raw bytes of each column.
+
+    Args:
+        pcap (str): The name of the capture file.
+
+    Example:
+        >>> index = FlowIndex.load('tap0.pcap.flows')
+        >>> index.query(port=443)[0]['destination']
+        '93.184.216.34'
+    """
+
+    def __init__(self, pcap=''):
+        self.pcap = pcap
+        self.columns = {name: array(typecode) for name, typecode in FLOW_COLUMNS}
+        self.addresses = []
+        self.names = {}
+        self.packets = 0
+
+    def __len__(self):
+        return len(self.columns['protocol'])
+
+    def save(self, path):
+        header = json.dumps({
+            'pcap': self.pcap,
+            'count': len(self),
+            'packets': self.packets,
+            'byteorder': sys.byteorder,
+            'columns': FLOW_COLUMNS,
+            'addresses': self.addresses,
+            'names': self.names,
+        }).encode()
+        with open(path + '.tmp', 'wb') as f:
+            f.write(FLOW_INDEX_MAGIC + struct.pack('<I', len(header)) + header)
+            for name, _ in FLOW_COLUMNS:
+                self.columns[name].tofile(f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save().
+
+        Raises:
+            ValueError: If the file is not a flow index.
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(FLOW_INDEX_MAGIC)) != FLOW_INDEX_MAGIC:
+                raise ValueError(f"{path} is not a flow index")
+            header_size, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_size))
+            index = cls(header['pcap'])
+            index.packets = header['packets']
+            index.addresses = header['addresses']
+            index.names = header['names']
+            for name, typecode in header['columns']:
+                column = array(typecode)
+                column.fromfile(f, header['count'])
+                if header['byteorder'] != sys.byteorder:
+                    column.byteswap()
+                index.columns[name] = column
+        return index
+
+    def flow(self, number):
+        """
+        Returns flow number as a dictionary.
+        """
+        flow = {name: self.columns[name][number] for name, _ in FLOW_COLUMNS}
+        source, destination = self.addresses[flow['source']], self.addresses[flow['destination']]
+        flow.update(source=source, destination=destination, pcap=self.pcap,
+                    protocol=FLOW_PROTOCOLS.get(flow['protocol'], str(flow['protocol'])),
+                    names=self.names.get(destination, []) + self.names.get(source, []))
+        return flow
+
+    def query(self, host=None, port=None, protocol=None, name=None):
+        """
+        Returns the flows matching every given criterion, as dictionaries.
+
+        Args:
+            host (str): An address, either end of the flow.
+            port (int): A port, either end of the flow.
+            protocol (str): 'TCP', 'UDP', 'ICMP' or 'ICMPv6'.
+            name (str): Part of a DNS name that resolved to either end of the flow, case insensitive.
+        """
+        addresses = None
+        if host is not None:
+            addresses = {number for number, address in enumerate(self.addresses) if address == host}
+        if name is not None:
+            named = {address for address, names in self.names.items()
+                     if any(name.lower() in dns_name.lower() for dns_name in names)}
+            named = {number for number, address in enumerate(self.addresses) if address in named}
+            addresses = named if addresses is None else addresses & named
+        protocol_number = None
+        if protocol is not None:
+            protocol_number = {label: number for number, label in FLOW_PROTOCOLS.items()}.get(protocol.upper(), -1)
+
+        columns = self.columns
+        matches = []
+        for number, (flow_protocol, source, source_port, destination, destination_port) in enumerate(zip(
+                columns['protocol'], columns['source'], columns['source_port'],
+                columns['destination'], columns['destination_port'])):
+            if protocol_number is not None and flow_protocol != protocol_number:
+                continue
+            if addresses is not None and source not in addresses and destination not in addresses:
+                continue
+            if port is not None and source_port != port and destination_port != port:
+                continue
+            matches.append(self.flow(number))
+        return matches
+
+
+def _dns_name(message, position):
+    labels = []
+    end = None
+    for _ in range(128):
+        length = message[position]
+        if length & 0xC0 == 0xC0:
+            # Compression pointer to a name earlier in the message
+            if end is None:
+                end = position + 2
+            position = struct.unpack_from('>H', message, position)[0] & 0x3FFF
+            continue
+        if length == 0:
+            return '.'.join(labels), end if end is not None else position + 1
+        labels.append(bytes(message[position + 1:position + 1 + length]).decode('ascii', 'replace'))
+        position += length + 1
+    raise ValueError("DNS name compression loop")
+
+
+class FlowIndexer:
+    """
+    Streaming parser of pcap and pcapng captures that builds a FlowIndex.
+
+    Bytes are fed in any pieces as they are written, only the incomplete record at the end is buffered.
+    Ethernet (with VLAN tags), Linux cooked, raw IP and loopback link types are decoded down to IPv4 and
+    IPv6, TCP and UDP. Packets are grouped in flows by their 5-tuple in both directions, the source of a
+    flow being the sender of its first packet. The answers of DNS responses map the addresses to the
+    names that were queried. A capture in another format marks the indexer as not valid.
+
+    Args:
+        pcap (str): The name of the capture file, stored in the index.
+
+    Example:
+        >>> indexer = FlowIndexer('tap0.pcap')
+        >>> with open('tap0.pcap', 'rb') as f:
+        ...     for data in iter(lambda: f.read(FLOW_READ_SIZE), b''):
+        ...         indexer.feed(data)
+        >>> indexer.close().save('tap0.pcap.flows')
+    """
+
+    def __init__(self, pcap=''):
+        self.index = FlowIndex(pcap)
+        self.valid = True
+        self._buffer = bytearray()
+        self._offset = 0
+        self._format = None
+        self._endian = '<'
+        self._linktype = None
+        self._scale = 1e-6
+        self._interfaces = []
+        self._flows = {}
+        self._address_numbers = {}
+
+    def feed(self, data):
+        """
+        Indexes the next bytes of the capture.
+        """
+        if not self.valid:
+            return
+        self._buffer += data
+        try:
+            position = self._parse(self._buffer)
+        except (struct.error, ValueError) as e:
+            print(f"{self.index.pcap} cannot be indexed: {str(e)}")
+            self.valid = False
+            self._buffer = bytearray()
+            return
+        del self._buffer[:position]
+        self._offset += position
+
+    def close(self):
+        """
+        Returns the index of the flows seen so far. A capture too short to have a header is not valid.
+        """
+        if self._format is None:
+            self.valid = False
+        return self.index
+
+    def _parse(self, buffer):
+        position = 0
+        if self._format is None:
+            if len(buffer) < 24:
+                return 0
+            magic = bytes(buffer[:4])
+            if magic in (b'\xd4\xc3\xb2\xa1', b'\x4d\x3c\xb2\xa1'):
+                self._endian = '<'
+            elif magic in (b'\xa1\xb2\xc3\xd4', b'\xa1\xb2\x3c\x4d'):
+                self._endian = '>'
+            elif struct.unpack_from('<I', buffer)[0] == PCAPNG_SECTION_HEADER:
+                self._format = 'pcapng'
+            else:
+                raise ValueError("not a pcap or pcapng capture")
+            if self._format is None:
+                self._format = 'pcap'
+                self._scale = 1e-9 if magic in (b'\x4d\x3c\xb2\xa1', b'\xa1\xb2\x3c\x4d') else 1e-6
+                self._linktype = struct.unpack_from(self._endian + 'I', buffer, 20)[0] & 0xFFFF
+                position = 24
+
+        if self._format == 'pcap':
+            record = struct.Struct(self._endian + 'IIII')
+            while len(buffer) - position >= 16:
+                seconds, fraction, captured, length = record.unpack_from(buffer, position)
+                if captured > FLOW_MAX_RECORD:
+                    raise ValueError(f"record of {captured} bytes at {self._offset + position}")
+                if len(buffer) - position < 16 + captured:
+                    break
+                self._packet(self._linktype, bytes(buffer[position + 16:position + 16 + captured]),
+                             seconds + fraction * self._scale, length, self._offset + position)
+                position += 16 + captured
+            return position
+
+        while len(buffer) - position >= 12:
+            if struct.unpack_from('<I', buffer, position)[0] == PCAPNG_SECTION_HEADER:
+                self._endian = '<' if struct.unpack_from('<I', buffer, position + 8)[0] == 0x1A2B3C4D else '>'
+                self._interfaces = []
+            block_type, block_length = struct.unpack_from(self._endian + 'II', buffer, position)
+            if block_length < 12 or block_length > FLOW_MAX_RECORD:
+                raise ValueError(f"block of {block_length} bytes at {self._offset + position}")
+            if len(buffer) - position < block_length:
+                break
+            self._block(block_type, bytes(buffer[position:position + block_length]), self._offset + position)
+            position += block_length
+        return position
+
+    def _block(self, block_type, block, offset):
+        endian = self._endian
+        if block_type == 1:
+            # Interface description: link type and timestamp resolution
+            linktype, = struct.unpack_from(endian + 'H', block, 8)
+            scale = 1e-6
+            option = 16
+            while option + 4 <= len(block) - 4:
+                code, length = struct.unpack_from(endian + 'HH', block, option)
+                if code == 0:
+                    break
+                if code == 9 and length >= 1:
+                    resolution = block[option + 4]
+                    scale = 2.0 ** -(resolution & 0x7F) if resolution & 0x80 else 10.0 ** -resolution
+                option += 4 + (length + 3) // 4 * 4
+            self._interfaces.append((linktype, scale))
+        elif block_type == 6:
+            # Enhanced packet
+            interface, high, low, captured, length = struct.unpack_from(endian + 'IIIII', block, 8)
+            if interface < len(self._interfaces):
+                linktype, scale = self._interfaces[interface]
+                self._packet(linktype, block[28:28 + captured], ((high << 32) | low) * scale, length, offset)
+        elif block_type == 3 and self._interfaces:
+            # Simple packet, no timestamp
+            length, = struct.unpack_from(endian + 'I', block, 8)
+            linktype, _ = self._interfaces[0]
+            self._packet(linktype, block[12:12 + min(length, len(block) - 16)], 0.0, length, offset)
+
+    def _address(self, family, raw):
+        number = self._address_numbers.get(raw)
+        if number is None:
+            number = self._address_numbers[raw] = len(self.index.addresses)
+            self.index.addresses.append(socket.inet_ntop(family, raw))
+        return number
+
+    def _packet(self, linktype, data, timestamp, length, offset):
+        if linktype == 1:
+            if len(data) < 14:
+                return
+            ethertype, = struct.unpack_from('>H', data, 12)
+            position = 14
+            while ethertype in (0x8100, 0x88A8) and len(data) >= position + 4:
+                ethertype, = struct.unpack_from('>H', data, position + 2)
+                position += 4
+        elif linktype == 113:
+            if len(data) < 16:
+                return
+            ethertype, = struct.unpack_from('>H', data, 14)
+            position = 16
+        elif linktype in (101, 12, 14):
+            if not data:
+                return
+            ethertype, position = {4: 0x0800, 6: 0x86DD}.get(data[0] >> 4, 0), 0
+        elif linktype == 0:
+            if len(data) < 4:
+                return
+            family = data[0] or data[3]
+            ethertype, position = (0x0800 if family == 2 else 0x86DD if family in (10, 24, 28, 30) else 0), 4
+        else:
+            return
+
+        if ethertype == 0x0800 and len(data) >= position + 20:
+            family = socket.AF_INET
+            header_length = (data[position] & 0x0F) * 4
+            protocol = data[position + 9]
+            fragment = struct.unpack_from('>H', data, position + 6)[0] & 0x1FFF
+            source, destination = data[position + 12:position + 16], data[position + 16:position + 20]
+            transport = position + header_length if not fragment else None
+        elif ethertype == 0x86DD and len(data) >= position + 40:
+            family = socket.AF_INET6
+            protocol = data[position + 6]
+            source, destination = data[position + 8:position + 24], data[position + 24:position + 40]
+            transport = position + 40
+        else:
+            return
+
+        source_port = destination_port = 0
+        if protocol in (6, 17) and transport is not None and len(data) >= transport + 4:
+            source_port, destination_port = struct.unpack_from('>HH', data, transport)
+            if protocol == 17 and source_port == 53:
+                try:
+                    self._dns(data[transport + 8:])
+                except (struct.error, IndexError, ValueError):
+                    pass
+
+        self.index.packets += 1
+        key = (protocol,) + ((source, source_port, destination, destination_port)
+                             if (source, source_port) <= (destination, destination_port)
+                             else (destination, destination_port, source, source_port))
+        columns = self.index.columns
+        number = self._flows.get(key)
+        if number is None:
+            number = self._flows[key] = len(self.index)
+            for name, value in (('protocol', protocol), ('source', self._address(family, source)),
+                                ('source_port', source_port), ('destination', self._address(family, destination)),
+                                ('destination_port', destination_port), ('packets', 0), ('bytes', 0),
+                                ('first_seen', timestamp), ('last_seen', timestamp),
+                                ('first_offset', offset), ('last_offset', offset)):
+                columns[name].append(value)
+        columns['packets'][number] += 1
+        columns['bytes'][number] += length
+        columns['last_seen'][number] = timestamp
+        columns['last_offset'][number] = offset
+
+    def _dns(self, message):
+        if len(message) < 12 or not message[2] & 0x80:
+            return
+        questions, answers = struct.unpack_from('>HH', message, 4)
+        position = 12
+        queried = None
+        for _ in range(questions):
+            name, position = _dns_name(message, position)
+            queried = queried or name
+            position += 4
+        for _ in range(answers):
+            name, position = _dns_name(message, position)
+            record_type, _, _, data_length = struct.unpack_from('>HHIH', message, position)
+            position += 10
+            rdata = message[position:position + data_length]
+            position += data_length
+            if (record_type, data_length) in ((1, 4), (28, 16)):
+                address = socket.inet_ntop(socket.AF_INET if record_type == 1 else socket.AF_INET6, rdata)
+                names = self.index.names.setdefault(address, [])
+                if (queried or name) not in names and len(names) < FLOW_MAX_NAMES:
+                    names.append(queried or name)
+
+
+def index_pcap_file(path):
+    """
+    Builds and saves the flow index of a capture file, as path + FLOW_INDEX_EXTENSION.
+
+    Returns:
+        FlowIndex: The index, or None when the file is not a pcap or pcapng capture.
+    """
+    indexer = FlowIndexer(os.path.basename(path))
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(FLOW_READ_SIZE), b''):
+            indexer.feed(data)
+    index = indexer.close()
+    if not indexer.valid:
+        return None
+    index.save(path + FLOW_INDEX_EXTENSION)
+    return index
+
+
+def extract_pcaps(zip_path, folder):
+    """
+    Extracts the capture files of a pcap zip, indexing their flows while they are written.
+
+    Args:
+        zip_path (str): The zip downloaded by download_pcap().
+        folder (str): The folder the capture files and their flow indexes are written to.
+
+    Returns:
+        list: The FlowIndex of every capture file.
+
+    Example:
+        >>> extract_pcaps('pcap.zip', 'pcap')
+        [<forensicVmClient.FlowIndex object at 0x...>]
+    """
+    os.makedirs(folder, exist_ok=True)
+    indexes = []
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in archive.infolist():
+            if member.is_dir():
+                continue
+            path = os.path.join(folder, os.path.basename(member.filename))
+            indexer = FlowIndexer(os.path.basename(path))
+            with archive.open(member) as source, open(path, 'wb') as target:
+                for data in iter(lambda: source.read(FLOW_READ_SIZE), b''):
+                    target.write(data)
+                    indexer.feed(data)
+            index = indexer.close()
+            if indexer.valid:
+                index.save(path + FLOW_INDEX_EXTENSION)
+                indexes.append(index)
+    return indexes
+
+
+def load_flow_indexes(folder):
+    """
+    Loads the flow indexes of the capture files of a folder.
+    """
+    indexes = []
+    if not os.path.isdir(folder):
+        return indexes
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(FLOW_INDEX_EXTENSION):
+            try:
+                indexes.append(FlowIndex.load(os.path.join(folder, name)))
+            except (OSError, ValueError) as e:
+                print(f"Could not load the flow index {name}: {str(e)}")
+    return indexes
+
+
+def query_flows(indexes, host=None, port=None, protocol=None, name=None, limit=None):
+    """
+    Queries the flows of several capture files, see FlowIndex.query().
+
+    Returns:
+        list: The matching flows as dictionaries, the largest first.
+
+    Example:
+        >>> query_flows(load_flow_indexes('pcap'), name='example.com', limit=10)
+        [{'protocol': 'TCP', 'source': '10.0.2.15', 'destination': '93.184.216.34', 'destination_port': 443, ...}]
+    """
+    flows = []
+    for index in indexes:
+        flows.extend(index.query(host, port, protocol, name))
+    flows.sort(key=lambda flow: flow['bytes'], reverse=True)
+    return flows[:limit] if limit else flows
+
+
+def flow_filter(text):
+    """
+    Turns the text of the flow filter of the GUI into query_flows() arguments: a port, an address,
+    a protocol or part of a DNS name.
+    """
+    text = text.strip()
+    if not text:
+        return {}
+    if text.isdigit():
+        return {'port': int(text)}
+    if text.upper() in FLOW_PROTOCOLS.values():
+        return {'protocol': text}
+    try:
+        return {'host': str(ipaddress.ip_address(text))}
+    except ValueError:
+        return {'name': text}
+
+
+def flow_summary(indexes, flows):
+    """
+    Returns the summary line of the flows tab of the GUI.
+    """
+    talkers = Counter()
+    for flow in flows:
+        talkers[flow['destination']] += flow['bytes']
+    top = ", ".join(f"{address} ({size} bytes)" for address, size in talkers.most_common(3))
+    return (f"{len(flows)} of {sum(len(index) for index in indexes)} flows in {len(indexes)} captures, "
+            f"{sum(flow['packets'] for flow in flows)} packets, {sum(flow['bytes'] for flow in flows)} bytes. "
+            f"Top destinations: {top or 'none'}")
 
-    try:
-        response = requests.get(url, headers=headers, stream=True)
-        response.raise_for_status()
 
-        total_size = int(response.headers.get('Content-Length', 0))
-        bytes_downloaded = 0
-
-        with open(output_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=65536):
-                if chunk:
-                    f.write(chunk)
-                    bytes_downloaded += len(chunk)
-
-                    # Update the progress bar
-                    sg.one_line_progress_meter(
-                        "Downloading Pcap files",
-                        bytes_downloaded,
-                        total_size,
-                        "key",
-                        f"Downloaded {bytes_downloaded} / {total_size} bytes",
-                    )
-        print(f"Pcap files download downloaded to {output_file}")
-        return True
+def flow_rows(flows):
+    """
+    Returns the rows of the flow table of the GUI.
+    """
+    def seen(timestamp):
+        return datetime.fromtimestamp(timestamp).isoformat(sep=' ', timespec='seconds') if timestamp else ''
 
-    except requests.exceptions.HTTPError as e:
-        print(f"Error: {response.status_code}")
-        print(response.text)
-        return False
-    except Exception as e:
-        print(f"An unexpected error occurred: {str(e)}")
-        return False
+    return [[flow['protocol'], flow['source'], flow['source_port'], flow['destination'], flow['destination_port'],
+             flow['packets'], flow['bytes'], seen(flow['first_seen']), seen(flow['last_seen']),
+             ", ".join(flow['names']), f"{flow['pcap']}@{flow['first_offset']}"] for flow in flows]
 
 
 def check_tap_interface(base_url, uuid, api_key):
@@ -251,12 +2262,11 @@ def check_tap_interface(base_url, uuid, api_key):
     """
     try:
         # URL of the web service
-        url = f"{base_url}/api/check_tap/"
+        endpoint = "/api/check_tap/"
 
         # The headers for the request
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded',
-            'X-Api-Key': api_key
         }
 
         # The data to send in the request body
@@ -265,7 +2275,7 @@ def check_tap_interface(base_url, uuid, api_key):
         }
 
         # Send the POST request
-        response = requests.post(url, headers=headers, data=data)
+        response = get_api(base_url, api_key).post(endpoint, headers=headers, data=data)
 
         # Check the response
         if response.status_code == 200:
@@ -290,12 +2300,11 @@ def stop_tap_interface(base_url, uuid, api_key):
         bool: True if the TAP interface was successfully stopped, False otherwise.
     """
     # URL of the web service
-    url = f"{base_url}/api/stop_tap/"
+    endpoint = "/api/stop_tap/"
 
     # The headers for the request
     headers = {
         'Content-Type': 'application/x-www-form-urlencoded',
-        'X-Api-Key': api_key
     }
 
     # The data to send in the request body
@@ -304,7 +2313,7 @@ def stop_tap_interface(base_url, uuid, api_key):
     }
 
     # Send the POST request
-    response = requests.post(url, headers=headers, data=data)
+    response = get_api(base_url, api_key).post(endpoint, headers=headers, data=data)
 
     # Check the response
     if response.status_code == 200:
@@ -329,12 +2338,11 @@ def start_tap_interface(base_url, uuid, api_key):
     """
 
     # URL of the web service
-    url = f"{base_url}/api/start_tap/"
+    endpoint = "/api/start_tap/"
 
     # The headers for the request
     headers = {
         'Content-Type': 'application/x-www-form-urlencoded',
-        'X-Api-Key': api_key
     }
 
     # The data to send in the request body
@@ -343,7 +2351,7 @@ def start_tap_interface(base_url, uuid, api_key):
     }
 
     # Send the POST request
-    response = requests.post(url, headers=headers, data=data)
+    response = get_api(base_url, api_key).post(endpoint, headers=headers, data=data)
 
     # Check the response
     if response.status_code == 200:
@@ -372,15 +2380,18 @@ def get_available_memory(api_key, site_url):
         Available Memory: 256.0 MB
         256.0
     """
-    headers = {
-        'X-API-Key': api_key,
-    }
-    endpoint = f"{site_url}/api/get-available-memory/"
-    response = requests.get(endpoint, headers=headers)
+    endpoint = "/api/get-available-memory/"
+    api = get_api(site_url, api_key)
+    available_memory = api.cache.get(endpoint)
+    if available_memory is not CACHE_MISS:
+        return(available_memory)
+
+    response = api.get(endpoint)
 
     if response.status_code == 200:
         available_memory = int(response.json().get('available_memory'))/1024
         print(f"Available Memory: {available_memory} MB")
+        api.cache.put(endpoint, None, available_memory)
         return(available_memory)
     else:
         print(f"Error: {response.text}")
@@ -407,14 +2418,13 @@ def change_memory_size(api_key, site_url, uuid, memory_size):
         >>> change_memory_size('your_api_key', 'https://example.com', 'resource_uuid', 512)
         Memory size updated successfully
     """
-    headers = {
-        'X-API-Key': api_key,
-    }
-    endpoint = f"{site_url}/api/change-memory-size/{uuid}/"
+    endpoint = f"/api/change-memory-size/{uuid}/"
     payload = {
         'memory_size': int(memory_size),
     }
-    response = requests.post(endpoint, headers=headers, data=payload)
+    api = get_api(site_url, api_key)
+    response = api.post(endpoint, data=payload)
+    api.cache.invalidate("/api/get-available-memory/")
 
     if response.status_code == 200:
         print("Memory size updated successfully")
@@ -440,11 +2450,10 @@ def get_memory_size(api_key, site_url, uuid):
         >>> get_memory_size('your_api_key', 'https://example.com', 'resource_uuid')
         1024
     """
-    headers = {'X-API-KEY': api_key}
-    url = f"{site_url}/api/get-memory-size/{uuid}/"
+    endpoint = f"/api/get-memory-size/{uuid}/"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = get_api(site_url, api_key).get(endpoint)
         if response.status_code == 200:
             data = response.json()
             memory_size = data['memory_size']
@@ -474,12 +2483,11 @@ def delete_snapshot(api_key, site_url, uuid, snapshot_name):
         >>> delete_snapshot('your_api_key', 'https://example.com', 'resource_uuid', 'snapshot_1')
         'Snapshot snapshot_1 deleted successfully'
     """
-    url = f"{site_url}/api/delete-snapshot/{uuid}/"
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/delete-snapshot/{uuid}/"
     data = {'snapshot_name': snapshot_name}
 
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = get_api(site_url, api_key).post(endpoint, data=data, timeout=API_LONG_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             message = data.get('message')
@@ -488,6 +2496,9 @@ def delete_snapshot(api_key, site_url, uuid, snapshot_name):
             print(f"Error: {response.status_code} - {response.text}")
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
+    finally:
+        # The snapshot list of this VM is stale, whatever the outcome
+        get_api(site_url, api_key).cache.invalidate(f"/api/snapshots-list/{uuid}/", uuid)
 
     return None
     
@@ -511,12 +2522,11 @@ def rollback_snapshot(api_key, site_url, uuid, snapshot_name):
         >>> rollback_snapshot('your_api_key', 'https://example.com', 'resource_uuid', 'snapshot_1')
         'Snapshot snapshot_1 rolled back successfully'
     """
-    url = f"{site_url}/api/rollback-snapshot/{uuid}/"
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/rollback-snapshot/{uuid}/"
     data = {'snapshot_name': snapshot_name}
 
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = get_api(site_url, api_key).post(endpoint, data=data, timeout=API_LONG_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             message = data.get('message')
@@ -525,6 +2535,9 @@ def rollback_snapshot(api_key, site_url, uuid, snapshot_name):
             print(f"Error: {response.status_code} - {response.text}")
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
+    finally:
+        # The snapshot list of this VM is stale, whatever the outcome
+        get_api(site_url, api_key).cache.invalidate(f"/api/snapshots-list/{uuid}/", uuid)
 
     return None
 
@@ -547,12 +2560,11 @@ def rollback_golden_snapshot(api_key, site_url, uuid):
         >>> rollback_golden_snapshot('your_api_key', 'https://example.com', 'resource_uuid')
         'Snapshot snapshot_1 rolled back successfully'
     """
-    url = f"{site_url}/api/rollback-golden-snapshot/{uuid}/"
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/rollback-golden-snapshot/{uuid}/"
     data = {}
 
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = get_api(site_url, api_key).post(endpoint, data=data, timeout=API_LONG_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             message = data.get('message')
@@ -561,6 +2573,9 @@ def rollback_golden_snapshot(api_key, site_url, uuid):
             print(f"Error: {response.status_code} - {response.text}")
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
+    finally:
+        # The snapshot list of this VM is stale, whatever the outcome
+        get_api(site_url, api_key).cache.invalidate(f"/api/snapshots-list/{uuid}/", uuid)
     return None
 
 
@@ -583,11 +2598,10 @@ def create_snapshot(api_key, uuid_path, base_url):
         >>> create_snapshot('your_api_key', 'resource_uuid_path', 'https://example.com')
         'snapshot_1'
     """
-    url = urljoin(base_url, f"api/create-snapshot/{uuid_path}/")
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/create-snapshot/{uuid_path}/"
 
     try:
-        response = requests.post(url, headers=headers)
+        response = get_api(base_url, api_key).post(endpoint, timeout=API_LONG_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             snapshot_name = data.get('snapshot_name')
@@ -596,6 +2610,9 @@ def create_snapshot(api_key, uuid_path, base_url):
             print(f"Error: {response.status_code} - {response.text}")
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
+    finally:
+        # The snapshot list of this VM is stale, whatever the outcome
+        get_api(base_url, api_key).cache.invalidate(f"/api/snapshots-list/{uuid_path}/", uuid_path)
 
     return None
     
@@ -618,14 +2635,18 @@ def get_snapshot_list(api_key, uuid_path, base_url):
         >>> get_snapshot_list('your_api_key', 'resource_uuid_path', 'https://example.com')
         ['snapshot_1', 'snapshot_2', 'snapshot_3']
     """
-    url = urljoin(base_url, f"api/snapshots-list/{uuid_path}/")
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/snapshots-list/{uuid_path}/"
+    api = get_api(base_url, api_key)
+    snapshots = api.cache.get(endpoint, uuid_path)
+    if snapshots is not CACHE_MISS:
+        return snapshots
 
     try:
-        response = requests.get(url, headers=headers)
+        response = api.get(endpoint)
         if response.status_code == 200:
             data = response.json()
             snapshots = data.get('snapshots')
+            api.cache.put(endpoint, uuid_path, snapshots)
             return snapshots
         else:
             print(f"Error: {response.status_code} - {response.text}")
@@ -657,14 +2678,12 @@ def insert_network_card(api_key, uuid_path, base_url):
     assert base_url, "Base URL is required"
     assert uuid, "UUID is required"
 
-    url = f'{base_url}/api/insert-network-card/{uuid_path}'
-    print(url)
-
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/insert-network-card/{uuid_path}"
+    print(endpoint)
 
     #data = {'uuid': uuid}
 
-    response = requests.get(url, headers=headers)
+    response = get_api(base_url, api_key).get(endpoint)
 
     if response.status_code == 200:
         print('Network card inserted successfully.')
@@ -697,13 +2716,10 @@ def insert_cdrom(api_key, base_url, uuid, filename):
     assert uuid, "UUID is required"
     assert filename, "Filename is required"
 
-    url = f"{base_url}/api/insert-cdrom/{uuid}/{filename}/"
-    headers = {
-        'X-Api-Key': api_key
-    }
+    endpoint = f"/api/insert-cdrom/{uuid}/{filename}/"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = get_api(base_url, api_key).get(endpoint)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -734,13 +2750,10 @@ def eject_cdrom(api_key, base_url, uuid):
     assert base_url, "Base URL is required"
     assert uuid, "UUID is required"
 
-    url = f"{base_url}/api/eject-cdrom/{uuid}/"
-    headers = {
-        'X-Api-Key': api_key
-    }
+    endpoint = f"/api/eject-cdrom/{uuid}/"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = get_api(base_url, api_key).get(endpoint)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -772,13 +2785,10 @@ def delete_iso(api_key, base_url, iso_filename):
     assert base_url, "Base URL is required"
     assert iso_filename, "ISO file name is required"
 
-    url = f"{base_url}/api/delete-iso/{iso_filename}/"
-    headers = {
-        'X-Api-Key': api_key
-    }
+    endpoint = f"/api/delete-iso/{iso_filename}/"
 
     try:
-        response = requests.post(url, headers=headers)
+        response = get_api(base_url, api_key).post(endpoint)
         response.raise_for_status()
 
         if response.status_code == requests.codes.ok:
@@ -791,11 +2801,309 @@ def delete_iso(api_key, base_url, iso_filename):
     except requests.exceptions.RequestException as e:
         print('Error:', e)
         return False
+    finally:
+        # The ISO list is stale, whatever the outcome
+        get_api(base_url, api_key).cache.invalidate("/api/list-iso-files/")
+
+def _read_json_file(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json_file(path, data):
+    temp_file = path + '.tmp'
+    with open(temp_file, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_file, path)
+
+
+def hash_iso_file(iso_file_path, progress=None):
+    """
+    Returns the SHA-256 of an ISO file, reusing the local hash cache when the file did not change.
+
+    The cache (ISO_HASH_CACHE_FILE) is keyed on the absolute path, the size and the modification
+    time, so a tool ISO is only read once however many times it is uploaded.
+
+    Args:
+        iso_file_path (str): The file path of the ISO file.
+        progress (callable): Optional progress(bytes_hashed, total_size) callback. Returning False cancels.
+
+    Returns:
+        str: The hex SHA-256 digest.
+
+    Raises:
+        TransferCancelled: If the progress callback cancelled the hashing.
+
+    Example:
+        >>> hash_iso_file('/path/to/iso_file.iso')
+        'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+    """
+    stat = os.stat(iso_file_path)
+    cache_key = f"{os.path.abspath(iso_file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    cache = _read_json_file(ISO_HASH_CACHE_FILE)
+    if cache_key in cache:
+        return cache[cache_key]
+
+    sha256 = hashlib.sha256()
+    bytes_hashed = 0
+    with open(iso_file_path, 'rb') as f:
+        for data in iter(lambda: f.read(HASH_READ_SIZE), b''):
+            sha256.update(data)
+            bytes_hashed += len(data)
+            if progress and progress(bytes_hashed, stat.st_size) is False:
+                raise TransferCancelled()
+
+    digest = sha256.hexdigest()
+    # Re-read the cache, another upload may have added entries meanwhile
+    cache = _read_json_file(ISO_HASH_CACHE_FILE)
+    cache[cache_key] = digest
+    _write_json_file(ISO_HASH_CACHE_FILE, cache)
+    return digest
+
+
+def register_iso_digest(base_url, digest, iso_filename, size):
+    """
+    Remembers the name and size an ISO with this digest was uploaded under, for servers that do not list digests.
+    """
+    registry = _read_json_file(ISO_DIGEST_REGISTRY_FILE)
+    registry.setdefault(base_url.rstrip('/'), {})[digest] = {'file': iso_filename, 'size': size}
+    _write_json_file(ISO_DIGEST_REGISTRY_FILE, registry)
+
+
+def find_iso_on_server(api_key, base_url, digest):
+    """
+    Looks for an ISO with the given SHA-256 among the ISO files already on the server.
+
+    The digests come from the 'iso_digests' mapping (file name to SHA-256) of the list_iso_files() response
+    when the server provides it. Otherwise the local registry of uploaded ISOs is only a hint: a file of the
+    same name may have been deleted and replaced by another ISO, so it is only matched when the 'iso_sizes'
+    mapping of the response reports the size it was uploaded with. A server listing neither gets the upload.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        digest (str): The hex SHA-256 digest of the ISO.
+
+    Returns:
+        str: The name of the matching ISO file on the server, or None.
+
+    Example:
+        >>> find_iso_on_server('your_api_key', 'https://example.com', 'e3b0c442...')
+        'kali-linux.iso'
+    """
+    iso_files = list_iso_files(api_key, base_url)
+    if not iso_files:
+        return None
+
+    server_digests = iso_files.get('iso_digests')
+    if server_digests:
+        for iso_filename, iso_digest in server_digests.items():
+            if iso_digest.lower() == digest.lower():
+                return iso_filename
+        return None
+
+    registered = _read_json_file(ISO_DIGEST_REGISTRY_FILE).get(base_url.rstrip('/'), {}).get(digest)
+    if not isinstance(registered, dict) or registered.get('file') not in iso_files.get('iso_files', []):
+        return None
+    server_size = (iso_files.get('iso_sizes') or {}).get(registered['file'])
+    if server_size is None or server_size != registered.get('size'):
+        return None
+    return registered['file']
+
+
+def _load_upload_state():
+    return _read_json_file(UPLOAD_STATE_FILE)
+
+
+def _save_upload_state(key, upload_id):
+    state = _load_upload_state()
+    if upload_id:
+        state[key] = upload_id
+    else:
+        state.pop(key, None)
+    _write_json_file(UPLOAD_STATE_FILE, state)
+
+
+def upload_iso_chunked(api_key, base_url, iso_file_path, progress=None, chunk_size=UPLOAD_CHUNK_SIZE,
+                       parallel=UPLOAD_PARALLEL_CHUNKS, max_retries=UPLOAD_MAX_RETRIES, sha256=None):
+    """
+    Uploads an ISO file in fixed-size chunks that can be resumed, in the style of the tus protocol.
+
+    The upload is created with POST /api/upload-iso/chunks/ and its id is remembered in UPLOAD_STATE_FILE,
+    keyed by server, path, size and modification time. A later call for the same file asks the server
+    which chunks it already holds (GET /api/upload-iso/chunks/<id>/) and only sends the missing ones.
+    Each chunk is sent with PATCH, an Upload-Offset header and an Upload-Checksum header carrying its
+    SHA-256, and up to `parallel` chunks are in flight at once on the pooled session. Failed chunks,
+    including checksum mismatches (status 460), are retried with an exponential backoff. Once every
+    chunk is stored, POST /api/upload-iso/chunks/<id>/complete/ makes the server reassemble the ISO.
+    chunked_upload_server.py implements the server side.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        iso_file_path (str): The file path of the ISO file to upload.
+        progress (callable): Optional progress(bytes_uploaded, total_size) callback, called on this thread.
+                             Returning False cancels the upload.
+        chunk_size (int): The size of a chunk in bytes, used for new uploads.
+        parallel (int): The maximum number of chunks uploaded at the same time.
+        max_retries (int): The number of retries of a chunk before giving up.
+        sha256 (str): Optional hex SHA-256 of the whole file, sent when the upload is created.
+
+    Returns:
+        bool: True if the ISO file was uploaded, None if the server does not support chunked uploads.
+
+    Raises:
+        TransferCancelled: If the progress callback cancelled the upload. The upload can be resumed.
+        requests.exceptions.RequestException: If the server rejected the upload or a chunk kept failing.
+
+    Example:
+        >>> upload_iso_chunked('your_api_key', 'https://example.com', '/path/to/iso_file.iso')
+        True
+    """
+    api = get_api(base_url, api_key)
+    endpoint = "/api/upload-iso/chunks/"
+    size = os.path.getsize(iso_file_path)
+    state_key = f"{api.base_url}|{os.path.abspath(iso_file_path)}|{size}|{int(os.path.getmtime(iso_file_path))}"
+
+    status = None
+    upload_id = _load_upload_state().get(state_key)
+    if upload_id:
+        response = api.get(f"{endpoint}{upload_id}/")
+        if response.status_code == 200:
+            status = response.json()
+            print(f"Resuming upload of {iso_file_path}: {len(status['received'])} chunks already on the server")
+
+    if status is None:
+        response = api.post(endpoint, json={
+            'filename': os.path.basename(iso_file_path),
+            'size': size,
+            'chunk_size': chunk_size,
+            'sha256': sha256,
+        })
+        if response.status_code in (404, 405):
+            return None
+        response.raise_for_status()
+        status = response.json()
+        upload_id = status['upload_id']
+        _save_upload_state(state_key, upload_id)
+
+    chunk_size = status['chunk_size']
+    chunk_endpoint = f"{endpoint}{upload_id}/"
+    chunk_count = (size + chunk_size - 1) // chunk_size
+    received = set(status['received'])
+    pending = [index for index in range(chunk_count) if index not in received]
+    uploaded = [sum(min(chunk_size, size - index * chunk_size) for index in received)]
+    lock = threading.Lock()
+    cancel = threading.Event()
+
+    def send_chunk(index):
+        offset = index * chunk_size
+        with open(iso_file_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(min(chunk_size, size - offset))
+        headers = {
+            'Content-Type': 'application/offset+octet-stream',
+            'Upload-Offset': str(offset),
+            'Upload-Checksum': "sha256 " + base64.b64encode(hashlib.sha256(data).digest()).decode(),
+        }
+
+        for attempt in range(max_retries + 1):
+            if cancel.is_set():
+                raise TransferCancelled()
+            if attempt:
+                time.sleep(UPLOAD_RETRY_BACKOFF * (2 ** (attempt - 1)))
+            try:
+                response = api.patch(chunk_endpoint, data=data, headers=headers, timeout=API_LONG_TIMEOUT)
+                if response.status_code in (200, 204):
+                    with lock:
+                        uploaded[0] += len(data)
+                    return
+                if response.status_code != UPLOAD_CHECKSUM_MISMATCH and response.status_code < 500:
+                    response.raise_for_status()
+                error = f"HTTP {response.status_code}"
+            except RETRYABLE_TRANSFER_ERRORS as e:
+                error = str(e)
+            print(f"Chunk {index} of {iso_file_path} failed ({error}), retrying")
+        raise requests.exceptions.RetryError(f"Chunk {index} failed {max_retries + 1} times: {error}")
+
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="ChunkedUpload") as executor:
+        futures = [executor.submit(send_chunk, index) for index in pending]
+        try:
+            not_done = futures
+            while not_done:
+                done, not_done = wait(not_done, timeout=DOWNLOAD_PROGRESS_INTERVAL)
+                for future in done:
+                    # Raises the error of a failed chunk
+                    future.result()
+                if progress and progress(uploaded[0], size) is False:
+                    raise TransferCancelled()
+        except BaseException:
+            cancel.set()
+            for future in futures:
+                future.cancel()
+            raise
+
+    response = api.post(f"{chunk_endpoint}complete/", timeout=API_LONG_TIMEOUT)
+    response.raise_for_status()
+    _save_upload_state(state_key, None)
+    if progress:
+        progress(size, size)
+    return True
+
+
+def upload_iso_stream(api_key, base_url, iso_file_path, progress=None):
+    """
+    Uploads an ISO file in a single streaming multipart POST to /api/upload-iso/.
+
+    The multipart body is streamed from disk by a MultipartEncoder, so memory use does not depend on
+    the size of the ISO. The MultipartEncoderMonitor callback reports the bytes actually sent, and a
+    cancel raises TransferCancelled from it, which aborts the request and closes its socket.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        iso_file_path (str): The file path of the ISO file to upload.
+        progress (callable): Optional progress(bytes_uploaded, total_size) callback. Returning False cancels.
+
+    Returns:
+        bool: True if the ISO file was uploaded.
+
+    Raises:
+        TransferCancelled: If the progress callback cancelled the upload.
+        requests.exceptions.RequestException: If an error occurs during the request.
+    """
+    endpoint = "/api/upload-iso/"
+    with open(iso_file_path, 'rb') as iso_file:
+        encoder = MultipartEncoder(fields={
+            'iso_file': (os.path.basename(iso_file_path), iso_file, 'application/octet-stream')
+        })
+
+        def monitor_callback(monitor):
+            # Called for every block read by the socket, the reporter keeps the redraws rate-limited
+            if progress and progress(monitor.bytes_read, monitor.len) is False:
+                raise TransferCancelled()
+
+        monitor = MultipartEncoderMonitor(encoder, monitor_callback)
+        response = get_api(base_url, api_key).post(endpoint, data=monitor, timeout=API_LONG_TIMEOUT,
+                                                   headers={'Content-Type': monitor.content_type})
+        response.raise_for_status()
+    return True
+
 
 def upload_iso(api_key, base_url, iso_file_path):
     """
     Uploads an ISO file to the specified base URL using the API endpoint.
 
+    The ISO is hashed first (hash_iso_file() caches the digest) and the transfer is skipped entirely
+    when find_iso_on_server() shows the same content is already on the server.
+
+    The chunked, resumable protocol of upload_iso_chunked() is used when the server supports it. An
+    interrupted or cancelled upload resumes from the chunks already on the server the next time the same
+    file is uploaded. Servers without chunked uploads get a single streaming upload_iso_stream() instead.
+
     Args:
         api_key (str): The API key required for authentication.
         base_url (str): The base URL of the API.
@@ -806,7 +3114,6 @@ def upload_iso(api_key, base_url, iso_file_path):
 
     Raises:
         AssertionError: If any of the required arguments (`api_key`, `base_url`, `iso_file_path`) is missing.
-        requests.exceptions.RequestException: If an error occurs during the request.
 
     Example:
         >>> upload_iso('your_api_key', 'https://example.com', '/path/to/iso_file.iso')
@@ -816,44 +3123,38 @@ def upload_iso(api_key, base_url, iso_file_path):
     assert base_url, "Base URL is required"
     assert iso_file_path, "ISO file path is required"
 
-    url = f"{base_url}/api/upload-iso/"
-    headers = {
-        'X-Api-Key': api_key
-    }
-    files = {
-        'iso_file': open(iso_file_path, 'rb')
-    }
-
+    progress = ProgressReporter("Uploading ISO file", verb="Uploaded")
     try:
-        response = requests.post(url, headers=headers, files=files, stream=True)
-        response.raise_for_status()
-        total_size = int(response.headers.get('Content-Length', 0))
-        bytes_uploaded = 0
-
-        progress_bar = None
-
-        for chunk in response.iter_content(chunk_size=1024):
-            if chunk:
-                bytes_uploaded += len(chunk)
-                progress_bar = sg.one_line_progress_meter(
-                    "Uploading ISO file",
-                    bytes_uploaded,
-                    total_size,
-                    "key",
-                    f"Uploaded {bytes_uploaded / 1048576:.2f} / {total_size / 1048576:.2f} MB"
-                )
-                if not progress_bar:
-                    break
+        hashing = ProgressReporter("Hashing ISO file", verb="Hashed")
+        try:
+            digest = hash_iso_file(iso_file_path, progress=hashing)
+        finally:
+            hashing.close()
 
-        if progress_bar:
+        existing_iso = find_iso_on_server(api_key, base_url, digest)
+        if existing_iso:
+            print(f"{iso_file_path} (SHA-256 {digest}) is already on the server as {existing_iso}, upload skipped")
             return True
-        else:
-            sg.popup_error("Upload canceled by user")
-            return False
 
+        uploaded = upload_iso_chunked(api_key, base_url, iso_file_path, progress=progress, sha256=digest)
+        if uploaded is None:
+            print("The server does not support chunked uploads, streaming the ISO in one request")
+            uploaded = upload_iso_stream(api_key, base_url, iso_file_path, progress=progress)
+        if uploaded:
+            register_iso_digest(base_url, digest, os.path.basename(iso_file_path), os.path.getsize(iso_file_path))
+        return uploaded
+
+    except TransferCancelled:
+        print(f"Upload of {iso_file_path} canceled at {progress.bytes_done} of {progress.total_size} bytes")
+        sg.popup_error("Upload canceled by user")
+        return False
     except requests.exceptions.RequestException as e:
         print('Error:', e)
         return False
+    finally:
+        progress.close()
+        # The ISO list is stale, whatever the outcome
+        get_api(base_url, api_key).cache.invalidate("/api/list-iso-files/")
 
 
 
@@ -884,12 +3185,11 @@ def run_plugin(api_key, base_url, plugin_directory, image_uuid):
     assert plugin_directory, "Plugin directory is required"
     assert image_uuid, "Image UUID is required"
 
-    url = f"{base_url}/api/run-plugin/"
-    headers = {"X-Api-Key": api_key}
+    endpoint = "/api/run-plugin/"
     params = {"plugin_directory": plugin_directory, "image_uuid": image_uuid}
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = get_api(base_url, api_key).get(endpoint, params=params, timeout=API_LONG_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         return data
@@ -919,13 +3219,17 @@ def list_plugins(api_key, base_url):
     assert api_key, "API key is required"
     assert base_url, "Base URL is required"
 
-    url = f"{base_url}/api/list-plugins/"
-    headers = {"X-Api-Key": api_key}
+    endpoint = "/api/list-plugins/"
+    api = get_api(base_url, api_key)
+    plugins = api.cache.get(endpoint)
+    if plugins is not CACHE_MISS:
+        return plugins
 
     try:
-        response = requests.get(url, headers=headers)
+        response = api.get(endpoint)
         response.raise_for_status()
         data = response.json()
+        api.cache.put(endpoint, None, data.get('plugins', []))
         return data.get('plugins', [])
     except requests.exceptions.RequestException as e:
         print('Error:', e)
@@ -953,13 +3257,17 @@ def list_iso_files(api_key, base_url):
     assert api_key, "API key is required"
     assert base_url, "Base URL is required"
 
-    url = f"{base_url}/api/list-iso-files/"
-    headers = {"X-Api-Key": api_key}
+    endpoint = "/api/list-iso-files/"
+    api = get_api(base_url, api_key)
+    data = api.cache.get(endpoint)
+    if data is not CACHE_MISS:
+        return data
 
     try:
-        response = requests.get(url, headers=headers)
+        response = api.get(endpoint)
         response.raise_for_status()
         data = response.json()
+        api.cache.put(endpoint, None, data)
         return data
     except requests.exceptions.RequestException as e:
         print('Error:', e)
@@ -991,15 +3299,14 @@ def recreate_folders(api_key, base_url, uuid_path, folders):
     assert uuid_path, "UUID path is required"
     assert folders, "Folders list is required"
 
-    url = f"{base_url}/api/recreate-folders/"
-    headers = {"X-Api-Key": api_key}
+    endpoint = "/api/recreate-folders/"
     data = {
         "uuid_path": uuid_path,
         "folders": folders
     }
 
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = get_api(base_url, api_key).post(endpoint, data=data, timeout=API_LONG_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         return data
@@ -1035,15 +3342,14 @@ def create_folders_in_qcow2(api_key, base_url, uuid_path, folders):
     assert uuid_path, "VMDK path is required"
     assert folders, "Folders are required"
 
-    url = f"{base_url}/api/create-folders/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = "/api/create-folders/"
     data = {
         "uuid_path": uuid_path,
         "folders": folders,
     }
 
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = get_api(base_url, api_key).post(endpoint, data=data, timeout=API_LONG_TIMEOUT)
         response.raise_for_status()
 
         print(f"Response: {response.json()}")
@@ -1150,10 +3456,337 @@ def read_case_config(json_filepath):
 
 
 
+# Hosted sparse extent (monolithicSparse VMDK) layout, in little endian
+VMDK_SPARSE_MAGIC = b'KDMV'
+VMDK_HEADER = struct.Struct('<4sIIQQQQIQQQB4sH433x')
+VMDK_SECTOR_SIZE = 512
+VMDK_FLAG_COMPRESSED = 0x10000      # streamOptimized extents, their grains are not at fixed offsets
+VMDK_GD_AT_END = 0xFFFFFFFFFFFFFFFF
+VMDK_RANGE_GAP = 65536              # bytes between two grains fetched along rather than in a separate request
+VMDK_RANGE_LIMIT = 16 * 1048576     # bytes fetched by one Range request at most
+VMDK_FETCH_WORKERS = 4              # Range requests in flight
+
+
+def coalesce_ranges(ranges, gap=VMDK_RANGE_GAP, limit=VMDK_RANGE_LIMIT):
+    """
+    Merges (offset, length) ranges that overlap or are less than gap bytes apart, up to limit bytes each.
+
+    Example:
+        >>> coalesce_ranges([(0, 512), (512, 512), (1048576, 512)])
+        [(0, 1024), (1048576, 512)]
+    """
+    merged = []
+    for offset, length in sorted(ranges):
+        if merged:
+            last_offset, last_length = merged[-1]
+            end = max(last_offset + last_length, offset + length)
+            if offset <= last_offset + last_length + gap and end - last_offset <= limit:
+                merged[-1] = (last_offset, end - last_offset)
+                continue
+        merged.append((offset, length))
+    return merged
+
+
+def parse_vmdk_layout(read):
+    """
+    Parses the header, grain directory and grain tables of a monolithicSparse VMDK.
+
+    Args:
+        read (callable): read(offset, length) returning bytes of the VMDK file.
+
+    Returns:
+        dict: 'header' (the header fields), 'metadata' (the (offset, length) range holding the header,
+              descriptor, grain directories and grain tables) and 'grains' (the (offset, length) range of
+              every allocated grain, in file order).
+
+    Raises:
+        ValueError: If the file is not a monolithicSparse VMDK with its grain directory at a fixed offset.
+    """
+    fields = VMDK_HEADER.unpack(read(0, VMDK_HEADER.size))
+    header = dict(zip(('magic', 'version', 'flags', 'capacity', 'grain_size', 'descriptor_offset',
+                       'descriptor_size', 'gtes_per_gt', 'rgd_offset', 'gd_offset', 'overhead'), fields))
+    if header['magic'] != VMDK_SPARSE_MAGIC:
+        raise ValueError("Not a sparse VMDK extent")
+    if header['flags'] & VMDK_FLAG_COMPRESSED or header['gd_offset'] == VMDK_GD_AT_END:
+        raise ValueError("streamOptimized VMDK extents are not supported")
+    if not header['grain_size'] or not header['gtes_per_gt']:
+        raise ValueError("Invalid sparse VMDK header")
+
+    grain_bytes = header['grain_size'] * VMDK_SECTOR_SIZE
+    grain_count = (header['capacity'] + header['grain_size'] - 1) // header['grain_size']
+    table_count = (grain_count + header['gtes_per_gt'] - 1) // header['gtes_per_gt']
+    directory = struct.unpack(f'<{table_count}I', read(header['gd_offset'] * VMDK_SECTOR_SIZE, table_count * 4))
+
+    metadata_end = header['overhead'] * VMDK_SECTOR_SIZE
+    grains = []
+    for table_sector in directory:
+        if not table_sector:
+            continue
+        table_offset = table_sector * VMDK_SECTOR_SIZE
+        metadata_end = max(metadata_end, table_offset + header['gtes_per_gt'] * 4)
+        table = struct.unpack(f"<{header['gtes_per_gt']}I", read(table_offset, header['gtes_per_gt'] * 4))
+        # 0 is an unallocated grain and 1 a grain that reads as zeros, neither has data in the file
+        grains.extend((grain_sector * VMDK_SECTOR_SIZE, grain_bytes) for grain_sector in table if grain_sector > 1)
+    grains.sort()
+    return {'header': header, 'metadata': (0, metadata_end), 'grains': grains}
+
+
+class SparseVmdkDownload:
+    """
+    Downloads a monolithicSparse VMDK by fetching only its metadata and its allocated grains.
+
+    The header is fetched first, then the metadata region with the descriptor, grain directories and
+    grain tables. The grain tables give the file offset of every allocated grain. The grains are fetched
+    with Range requests, adjacent ones merged by coalesce_ranges(), on a few pooled connections. Each range
+    is written at its own offset of a sparse file of the remote size, so the local file is a valid VMDK
+    with the same layout. Only the bytes no grain table points at are never fetched, and read as zeros.
+    The completed ranges are recorded in the sidecar manifest of the .part file, so a cancelled or failed
+    download resumes with the ranges still missing.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        endpoint (str): The endpoint path of the VMDK.
+        output_file (str): The path of the downloaded file.
+        workers (int): The number of Range requests in flight.
+        hasher (StreamHasher): Optional hasher, fed from the reconstructed file once it is complete.
+
+    Example:
+        >>> download = SparseVmdkDownload('your_api_key', 'https://example.com', '/api/download-evidence/vm_uuid/', 'evidence.vmdk')
+        >>> download.probe() and download.run()
+        True
+    """
+
+    def __init__(self, api_key, base_url, endpoint, output_file, workers=VMDK_FETCH_WORKERS,
+                 max_retries=DOWNLOAD_MAX_RETRIES, hasher=None):
+        self.api = get_api(base_url, api_key)
+        self.endpoint = endpoint
+        self.url = self.api.url(endpoint)
+        self.output_file = output_file
+        self.part_file = output_file + '.part'
+        self.manifest_file = self.part_file + '.json'
+        self.workers = workers
+        self.max_retries = max_retries
+        self.hasher = hasher
+        self.total_size = 0
+        self.validator = None
+        self.manifest = {}
+        self.layout = None
+        self.ranges = []
+        self.bytes_fetched = 0
+        self._metadata = b''
+        self._lock = threading.Lock()
+
+    def _fetch(self, offset, length):
+        headers = {'Range': f"bytes={offset}-{offset + length - 1}"}
+        if self.validator:
+            headers['If-Range'] = self.validator
+        retries = 0
+        while True:
+            try:
+                response = self.api.get(self.endpoint, headers=headers, stream=True, timeout=API_LONG_TIMEOUT)
+                with response:
+                    response.raise_for_status()
+                    # Checked before the body is read, a server ignoring Range would send the whole file
+                    content_range = re.match(r'bytes (\d+)-\d+/(\d+)', response.headers.get('Content-Range', ''))
+                    if response.status_code != 206 or not content_range or int(content_range.group(1)) != offset:
+                        raise ValueError(f"{self.url} does not honour Range requests or changed on the server")
+                    self.total_size = int(content_range.group(2))
+                    expected = min(length, self.total_size - offset)
+                    data = bytearray()
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        data += chunk[:expected - len(data)]
+                        if len(data) >= expected:
+                            break
+                if len(data) != expected:
+                    raise requests.exceptions.ChunkedEncodingError(f"Range at {offset} closed at {len(data)} bytes")
+                if not self.manifest:
+                    self.validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                    self.manifest = {
+                        'url': self.url,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'total_size': self.total_size,
+                        # The file has holes, a sequential or segmented download cannot resume it
+                        'bytes_downloaded': 0,
+                        'ranges_done': [],
+                    }
+                with self._lock:
+                    self.bytes_fetched += len(data)
+                return bytes(data)
+            except RETRYABLE_TRANSFER_ERRORS as e:
+                retries += 1
+                if retries > self.max_retries:
+                    raise
+                print(f"Range at {offset} of {self.url} failed ({str(e)}), retrying")
+                time.sleep(DOWNLOAD_RETRY_BACKOFF * (2 ** (retries - 1)))
+
+    def _read(self, offset, length):
+        # Metadata reads are served from the metadata region once it is fetched
+        if offset + length <= len(self._metadata):
+            return self._metadata[offset:offset + length]
+        return self._fetch(offset, length)
+
+    def probe(self):
+        """
+        Fetches and parses the metadata.
+
+        Returns:
+            bool: True if the file is a sparse VMDK whose grains can be fetched one by one.
+        """
+        try:
+            header = VMDK_HEADER.unpack(self._fetch(0, VMDK_HEADER.size))
+            overhead = header[10] * VMDK_SECTOR_SIZE
+            if header[0] != VMDK_SPARSE_MAGIC or not 0 < overhead <= self.total_size:
+                return False
+            self._metadata = self._fetch(0, overhead)
+            self.layout = parse_vmdk_layout(self._read)
+        except (ValueError, struct.error, requests.exceptions.HTTPError) as e:
+            print(f"{self.url} cannot be fetched by grains ({str(e)})")
+            return False
+        self.ranges = coalesce_ranges([self.layout['metadata']] + self.layout['grains'])
+        return True
+
+    def _load_progress(self):
+        previous = _read_download_manifest(self.manifest_file)
+        if (previous.get('url') != self.url or previous.get('total_size') != self.total_size
+                or not os.path.exists(self.part_file)
+                or (self.validator and self.validator not in (previous.get('etag'), previous.get('last_modified')))):
+            return set()
+        return {offset for offset, _ in self.ranges}.intersection(previous.get('ranges_done', []))
+
+    def _save_progress(self, f, done):
+        # The ranges recorded as done must be on disk, not in the buffer of f
+        with self._lock:
+            f.flush()
+        self.manifest['ranges_done'] = sorted(done)
+        _write_download_manifest(self.manifest_file, self.manifest)
+
+    def run(self, progress=None):
+        """
+        Fetches the missing metadata and grain ranges into a sparse file and renames it to the output file.
+
+        Args:
+            progress (callable): Optional progress(bytes_fetched, bytes_to_fetch) callback, called on this
+                                 thread. Returning False cancels the download.
+
+        Returns:
+            bool: True if the download completed, False if it was cancelled.
+
+        Raises:
+            Exception: The error of a range that could not be fetched, once the other ranges are recorded.
+        """
+        writer = SparseWriter()
+        total = sum(length for _, length in self.ranges)
+        done = self._load_progress()
+        fetched = sum(length for offset, length in self.ranges if offset in done)
+        if done:
+            print(f"Resuming download of {self.url} with {len(self.ranges) - len(done)} of {len(self.ranges)} "
+                  f"ranges missing")
+        cancel = threading.Event()
+        error = None
+
+        def fetch(offset, length):
+            if cancel.is_set():
+                return 0
+            if offset + length <= len(self._metadata):
+                data = self._metadata[offset:offset + length]
+            else:
+                data = self._fetch(offset, length)
+            with self._lock:
+                writer.write(f, data, offset)
+            return len(data)
+
+        # A .part file that is not resumed is rewritten from empty, the writer skips zero blocks
+        with open(self.part_file, 'r+b' if done else 'wb') as f:
+            mark_sparse(f.fileno())
+            f.truncate(self.total_size)
+            try:
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="SparseVmdkDownload") as executor:
+                    futures = {executor.submit(fetch, offset, length): offset
+                               for offset, length in self.ranges if offset not in done}
+                    try:
+                        last_save = time.monotonic()
+                        for future in as_completed(futures):
+                            try:
+                                length = future.result()
+                            except Exception as e:
+                                # Keep collecting the ranges in flight, they are recorded before the error is raised
+                                error = error or e
+                                cancel.set()
+                                continue
+                            if not length:
+                                continue
+                            done.add(futures[future])
+                            fetched += length
+                            if progress and progress(fetched, total) is False:
+                                cancel.set()
+                            if time.monotonic() - last_save >= DOWNLOAD_ADAPT_INTERVAL:
+                                self._save_progress(f, done)
+                                last_save = time.monotonic()
+                    finally:
+                        cancel.set()
+            finally:
+                self._save_progress(f, done)
+            writer.extend(f, self.total_size)
+
+        if error:
+            raise error
+        if len(done) < len(self.ranges):
+            print(f"Download of {self.url} cancelled")
+            return False
+
+        print(f"{self.url}: {len(self.layout['grains'])} allocated grains, {self.bytes_fetched} of "
+              f"{self.total_size} bytes fetched in {len(self.ranges)} ranges")
+        if self.hasher is not None:
+            self.hasher.path = self.part_file
+            self.hasher.reset()
+            self.hasher.finish(self.total_size)
+        os.replace(self.part_file, self.output_file)
+        try:
+            os.remove(self.manifest_file)
+        except OSError:
+            pass
+        return True
+
+
+def download_sparse_vmdk(api_key, base_url, endpoint, output_file, progress=None, hasher=None, **kwargs):
+    """
+    Downloads a VMDK with SparseVmdkDownload, falling back to download_segmented() for the whole file.
+
+    The fallback is used when the file is not a monolithicSparse VMDK (a streamOptimized or flat
+    extent, or any other file), or when the server does not honour Range requests.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        endpoint (str): The endpoint path to download.
+        output_file (str): The path of the downloaded file.
+        progress (callable): Optional progress(bytes_downloaded, total_size) callback. Returning False cancels.
+        hasher (StreamHasher): Optional hasher of the downloaded file.
+        **kwargs: Extra arguments passed to download_segmented() by the fallback.
+
+    Returns:
+        bool: True if the download completed, False if it was cancelled.
+
+    Example:
+        >>> download_sparse_vmdk('your_api_key', 'https://example.com', '/api/download-evidence/vm_uuid/', 'evidence.vmdk')
+        True
+    """
+    download = SparseVmdkDownload(api_key, base_url, endpoint, output_file, hasher=hasher)
+    if download.probe():
+        return download.run(progress)
+    print(f"Downloading all of {download.url}")
+    return download_segmented(api_key, base_url, endpoint, output_file, progress=progress, hasher=hasher, **kwargs)
+
+
 def download_evidence(api_key, uuid, base_url, output_file):
     """
     Downloads evidence vmdk identified by UUID using the API endpoint and saves it to a local file.
 
+    The evidence disk is mostly empty, so only its metadata and allocated grains are fetched by
+    download_sparse_vmdk(), which falls back to downloading the whole file.
+
     Args:
         api_key (str): The API key required for authentication.
         uuid (str): The UUID of the evidence to download.
@@ -1178,64 +3811,454 @@ def download_evidence(api_key, uuid, base_url, output_file):
     assert base_url, "Base URL is required"
     assert output_file, "Output file is required"
 
-    chunk_size = 1048576  # 1 MB
+    chunk_size = 1048576  # 1 MB
+
+    endpoint = f"/api/download-evidence/{uuid}/"
+
+    progress = ProgressReporter("Downloading Evidence")
+    try:
+        hasher = StreamHasher()
+        if download_sparse_vmdk(api_key, base_url, endpoint, output_file, progress=progress,
+                                chunk_size=chunk_size, hasher=hasher):
+            digests = record_download_hashes(api_key, base_url, uuid, output_file, hasher, "Evidence disk")
+            sg.popup(f"Evidence downloaded to {output_file}. Opening path in explorer. \nPlease import this image into" \
+                      f" Autopsy Case\nSHA-256: {digests['sha256']}")
+            return True
+        else:
+            sg.popup_error("Download canceled by user. Save to the same file again to resume it")
+            return False
+
+    except requests.exceptions.HTTPError as e:
+        print(f"Error: {e.response.status_code}")
+        print(e.response.text)
+        return False
+    except Exception as e:
+        print(f"An unexpected error occurred: {str(e)}")
+        return False
+    finally:
+        progress.close()
+
+
+# Compressed storage of memory dumps: independently decompressible frames followed by an offset index
+DUMP_COMPRESSED_EXTENSION = '.fvmz'
+DUMP_FRAME_SIZE = 4194304           # raw bytes per frame, the unit of random access
+DUMP_COMPRESS_WORKERS = 4           # frames compressed at the same time
+DUMP_ZLIB_LEVEL = 1                 # zlib level used when zstandard is not installed
+DUMP_ZSTD_LEVEL = 3
+DUMP_CODECS = ('zlib', 'zstd')      # codec names, by their number in the header
+DUMP_HEADER = struct.Struct('<4sBBHI4x')    # magic, version, codec, reserved, frame size
+DUMP_INDEX_ENTRY = struct.Struct('<QIII')   # file offset, compressed size, raw size, CRC-32 of the raw bytes
+DUMP_TRAILER = struct.Struct('<QQI4s')      # index offset, raw size, frame count, magic
+DUMP_MAGIC = b'FVMZ'
+DUMP_INDEX_MAGIC = b'FVMI'
+
+
+def _compress_frame(codec, data):
+    if data == bytes(len(data)):
+        # All-zero frames take no space, they are recognised by their empty compressed size
+        return b''
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=DUMP_ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, DUMP_ZLIB_LEVEL)
+
+
+def _decompress_frame(codec, data, raw_size):
+    if not data:
+        return bytes(raw_size)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("This dump is compressed with zstd, install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=raw_size)
+    return zlib.decompress(data)
+
+
+class CompressedDumpWriter:
+    """
+    Writes a memory dump as independently decompressible frames, followed by an index of their offsets.
+
+    The raw bytes are cut in frames of frame_size bytes. The frames are compressed on a thread pool,
+    with zstd when the zstandard package is installed and zlib otherwise, and written in order as they
+    complete. All-zero frames are not stored at all. close() appends the index, one entry per frame
+    with its file offset, sizes and the CRC-32 of its raw bytes, and a trailer pointing at the index,
+    so CompressedDump can read any range of the dump by decompressing only the frames it covers.
+
+    Args:
+        path (str): The compressed file to create.
+        frame_size (int): The number of raw bytes per frame.
+        codec (str): 'zstd' or 'zlib'. Defaults to zstd when available.
+        workers (int): The number of frames compressed at the same time.
+
+    Example:
+        >>> with CompressedDumpWriter('memory.dump.fvmz') as writer:
+        ...     writer.write(data)
+    """
+
+    def __init__(self, path, frame_size=DUMP_FRAME_SIZE, codec=None, workers=DUMP_COMPRESS_WORKERS):
+        self.codec = codec or ('zstd' if zstandard is not None else 'zlib')
+        if self.codec not in DUMP_CODECS or (self.codec == 'zstd' and zstandard is None):
+            raise ValueError(f"Codec {self.codec} is not available")
+        self.path = path
+        self.frame_size = frame_size
+        self.raw_size = 0
+        self._index = []
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._max_pending = workers * 2
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="CompressedDump")
+        self._file = open(path, 'wb')
+        self._file.write(DUMP_HEADER.pack(DUMP_MAGIC, 1, DUMP_CODECS.index(self.codec), 0, frame_size))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _submit(self, frame):
+        self._pending.append((len(frame), zlib.crc32(frame),
+                              self._executor.submit(_compress_frame, self.codec, frame)))
+        while len(self._pending) > self._max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        raw_size, crc, future = self._pending.popleft()
+        data = future.result()
+        offset = self._file.tell() if data else 0
+        self._file.write(data)
+        self._index.append((offset, len(data), raw_size, crc))
+
+    def write(self, data):
+        """
+        Appends raw bytes to the dump.
+        """
+        self.raw_size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.frame_size:
+            frame = bytes(self._buffer[:self.frame_size])
+            del self._buffer[:self.frame_size]
+            self._submit(frame)
+
+    def close(self):
+        """
+        Writes the last frame, the index and the trailer.
+
+        Returns:
+            int: The size of the compressed file.
+        """
+        if self._file.closed:
+            return os.path.getsize(self.path)
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+            while self._pending:
+                self._write_next()
+            index_offset = self._file.tell()
+            for entry in self._index:
+                self._file.write(DUMP_INDEX_ENTRY.pack(*entry))
+            self._file.write(DUMP_TRAILER.pack(index_offset, self.raw_size, len(self._index), DUMP_INDEX_MAGIC))
+            return self._file.tell()
+        finally:
+            self._executor.shutdown()
+            self._file.close()
+
+
+class CompressedDump:
+    """
+    Random access reader of a dump written by CompressedDumpWriter.
+
+    Only the frames covering the requested range are read and decompressed. The CRC-32 of each frame
+    is checked, and the last frame read is kept, so sequential reads of small ranges decompress every
+    frame once. Thread-safe.
+
+    Args:
+        path (str): The compressed dump.
+
+    Raises:
+        ValueError: If the file is not a compressed dump, or is truncated.
+
+    Example:
+        >>> with CompressedDump('memory.dump.fvmz') as dump:
+        ...     page = dump.read(0x7c00, 4096)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+        self._cached = (None, None)
+        try:
+            magic, version, codec, _, self.frame_size = DUMP_HEADER.unpack(self._file.read(DUMP_HEADER.size))
+            self._file.seek(-DUMP_TRAILER.size, os.SEEK_END)
+            index_offset, self.size, frame_count, index_magic = DUMP_TRAILER.unpack(self._file.read(DUMP_TRAILER.size))
+            if magic != DUMP_MAGIC or version != 1 or index_magic != DUMP_INDEX_MAGIC:
+                raise ValueError(f"{path} is not a compressed memory dump")
+            self.codec = DUMP_CODECS[codec]
+            self._file.seek(index_offset)
+            index = self._file.read(frame_count * DUMP_INDEX_ENTRY.size)
+            self.index = [DUMP_INDEX_ENTRY.unpack_from(index, position)
+                          for position in range(0, len(index), DUMP_INDEX_ENTRY.size)]
+            if len(self.index) != frame_count:
+                raise ValueError(f"The index of {path} is truncated")
+        except (struct.error, OSError, IndexError):
+            self._file.close()
+            raise ValueError(f"{path} is not a compressed memory dump")
+        except ValueError:
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def frame(self, number):
+        """
+        Returns the raw bytes of a frame.
+
+        Raises:
+            IOError: If the frame does not match its CRC-32.
+        """
+        with self._lock:
+            if self._cached[0] == number:
+                return self._cached[1]
+            offset, compressed_size, raw_size, crc = self.index[number]
+            self._file.seek(offset)
+            data = _decompress_frame(self.codec, self._file.read(compressed_size), raw_size)
+            if len(data) != raw_size or zlib.crc32(data) != crc:
+                raise IOError(f"Frame {number} of {self.path} is corrupted")
+            self._cached = (number, data)
+            return data
+
+    def read(self, offset, length):
+        """
+        Returns length bytes of the raw dump from offset, fewer at the end of the dump.
+        """
+        end = min(offset + length, self.size)
+        chunks = []
+        while offset < end:
+            number, start = divmod(offset, self.frame_size)
+            data = self.frame(number)[start:start + end - offset]
+            chunks.append(data)
+            offset += len(data)
+        return b''.join(chunks)
+
+
+def compress_dump(raw_path, output_path=None, frame_size=DUMP_FRAME_SIZE, codec=None):
+    """
+    Converts a raw memory dump into the compressed storage format.
+
+    Args:
+        raw_path (str): The raw dump.
+        output_path (str): The compressed dump. Defaults to raw_path + DUMP_COMPRESSED_EXTENSION.
+        frame_size (int): The number of raw bytes per frame.
+        codec (str): 'zstd' or 'zlib'. Defaults to zstd when available.
+
+    Returns:
+        tuple: (output_path, raw size, compressed size)
+
+    Example:
+        >>> compress_dump('memory.dump')
+        ('memory.dump.fvmz', 4294967296, 612368384)
+    """
+    output_path = output_path or raw_path + DUMP_COMPRESSED_EXTENSION
+    with open(raw_path, 'rb') as f, CompressedDumpWriter(output_path, frame_size, codec) as writer:
+        for data in iter(lambda: f.read(frame_size), b''):
+            writer.write(data)
+    return output_path, writer.raw_size, os.path.getsize(output_path)
+
+
+def expand_dump(path, output_path, progress=None):
+    """
+    Expands a compressed dump back to the raw file the analysis tools expect.
+
+    The raw file is written with a SparseWriter, so its zero pages stay holes.
+
+    Args:
+        path (str): The compressed dump.
+        output_path (str): The raw dump to write.
+        progress (callable): Optional progress(bytes_done, total_size) callback. Returning False cancels.
+
+    Returns:
+        bool: True if the dump was expanded, False if it was cancelled.
+
+    Example:
+        >>> expand_dump('memory.dump.fvmz', 'memory.dump')
+        True
+    """
+    writer = SparseWriter()
+    with CompressedDump(path) as dump, open(output_path, 'wb') as f:
+        mark_sparse(f.fileno())
+        for number in range(len(dump.index)):
+            offset = number * dump.frame_size
+            writer.write(f, dump.frame(number), offset)
+            if progress and progress(min(offset + dump.frame_size, dump.size), dump.size) is False:
+                return False
+        writer.extend(f, dump.size)
+    return True
+
+
+def download_compressed_dump(api_key, base_url, endpoint, output_path, progress=None, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                             max_retries=DOWNLOAD_MAX_RETRIES, hasher=None, frame_size=DUMP_FRAME_SIZE, codec=None):
+    """
+    Downloads a memory dump straight into the compressed storage format, the raw dump never touches the disk.
+
+    The frames must be written in order, so the dump is fetched in one stream and each chunk is passed to a
+    CompressedDumpWriter writing output_path + '.part', renamed to output_path once complete. Dropped
+    connections, timeouts and 5xx errors are retried with an exponential backoff, continuing with a Range
+    request guarded by If-Range. When the server ignores the range or the file changed, the download
+    restarts from zero. A cancelled download is removed: the compressed frames cannot be resumed later.
+
+    Args:
+        api_key (str): The API key required for authentication.
+        base_url (str): The base URL of the API.
+        endpoint (str): The endpoint path to download.
+        output_path (str): The compressed dump to create.
+        progress (callable): Optional progress(bytes_downloaded, total_size) callback. Returning False cancels.
+        chunk_size (int): The number of bytes read at a time.
+        max_retries (int): The number of retries in a row without progress before giving up.
+        hasher (StreamHasher): Optional hasher fed with the raw bytes.
+        frame_size (int): The number of raw bytes per frame.
+        codec (str): 'zstd' or 'zlib'. Defaults to zstd when available.
+
+    Returns:
+        tuple: (raw size, compressed size), or None if the download was cancelled.
 
-    url = f"{base_url}/api/download-evidence/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    Raises:
+        requests.exceptions.HTTPError: If the server answers with a non retryable error.
+        Exception: The last error, when the retries are exhausted.
 
+    Example:
+        >>> download_compressed_dump('your_api_key', 'https://example.com', '/api/download-memory-dump/vm_uuid/',
+        ...                          'memory.dump.fvmz')
+        (4294967296, 612368384)
+    """
+    api = get_api(base_url, api_key)
+    url = api.url(endpoint)
+    part_file = output_path + '.part'
+    writer = None
+    validator = None
+    total_size = 0
+    retries = 0
+    completed = False
     try:
-        response = requests.get(url, headers=headers, stream=True)
-        response.raise_for_status()
-
-        total_size = int(response.headers.get('Content-Length', 0))
-        bytes_downloaded = 0
-
-        with open(output_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=chunk_size):
-                if chunk:
-                    f.write(chunk)
-                    bytes_downloaded += len(chunk)
-
-                    progress_bar = sg.one_line_progress_meter(
-                        "Downloading Evidence",
-                        bytes_downloaded,
-                        total_size,
-                        "key",
-                        f"Downloaded {bytes_downloaded / 1048576:.2f} / {total_size / 1048576:.2f} MB",
-                    )
-                    # If the user clicked the cancel button, break the loop
-                    if not progress_bar:
-                        break
-        if progress_bar:
-            sg.popup(f"Evidence downloaded to {output_file}. Opening path in explorer. \nPlease import this image into" \
-                      " Autopsy Case")
-            return True
-        else:
-            sg.popup_error("Download canceled by user")
-            os.remove(output_file)
-            return False
+        while True:
+            offset = writer.raw_size if writer is not None else 0
+            headers = {}
+            if offset:
+                headers['Range'] = f"bytes={offset}-"
+                if validator:
+                    headers['If-Range'] = validator
+
+            progress_made = False
+            try:
+                response = api.get(endpoint, headers=headers, stream=True, timeout=API_LONG_TIMEOUT)
+                with response:
+                    response.raise_for_status()
+                    content_range = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+                    if not offset or response.status_code != 206 or not content_range \
+                            or int(content_range.group(1)) != offset:
+                        # Full response: the first request, or the server ignored the range or the file changed
+                        if offset:
+                            print(f"Server did not honour the resume range of {url}, restarting the download")
+                        if writer is not None:
+                            writer.close()
+                        writer = CompressedDumpWriter(part_file, frame_size, codec)
+                        if hasher is not None:
+                            hasher.reset()
+                        validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                        total_size = int(response.headers.get('Content-Length', 0))
+                    else:
+                        print(f"Resuming download of {url} at {offset} bytes")
+
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        writer.write(chunk)
+                        if hasher is not None:
+                            hasher.update(chunk)
+                        progress_made = True
+                        if progress and progress(writer.raw_size, total_size) is False:
+                            print(f"Download of {url} cancelled at {writer.raw_size} bytes")
+                            return None
+
+                if total_size and writer.raw_size < total_size:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Connection closed at {writer.raw_size} of {total_size} bytes")
+                break
+
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else 0
+                if status_code < 500:
+                    raise
+                error = e
+            except RETRYABLE_TRANSFER_ERRORS as e:
+                error = e
+
+            retries = 0 if progress_made else retries + 1
+            if retries > max_retries:
+                raise error
+            delay = DOWNLOAD_RETRY_BACKOFF * (2 ** max(retries - 1, 0))
+            print(f"Download of {url} interrupted ({str(error)}), retrying in {delay} s")
+            time.sleep(delay)
+
+        compressed_size = writer.close()
+        os.replace(part_file, output_path)
+        completed = True
+        return writer.raw_size, compressed_size
+    finally:
+        if not completed:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(part_file):
+                os.remove(part_file)
+
+
+def dump_command_line(argv):
+    """
+    Handles the --compress-dump RAW [OUTPUT] and --expand-dump COMPRESSED OUTPUT command line options.
 
-    except requests.exceptions.HTTPError as e:
-        print(f"Error: {response.status_code}")
-        print(response.text)
-        return False
-    except Exception as e:
-        print(f"An unexpected error occurred: {str(e)}")
+    Returns:
+        bool: True if argv held a dump option and it was handled, False otherwise.
+    """
+    if not argv or argv[0] not in ('--compress-dump', '--expand-dump'):
         return False
+    parser = argparse.ArgumentParser(prog="forensicVmClient", description="ForensicVM memory dump storage")
+    parser.add_argument("--compress-dump", nargs="+", metavar=("RAW", "OUTPUT"))
+    parser.add_argument("--expand-dump", nargs=2, metavar=("COMPRESSED", "OUTPUT"))
+    args = parser.parse_args(argv)
+
+    if args.compress_dump:
+        output_path, raw_size, compressed_size = compress_dump(*args.compress_dump[:2])
+        print(f"{output_path}: {raw_size} bytes stored in {compressed_size} bytes")
+    if args.expand_dump:
+        expand_dump(*args.expand_dump)
+        print(f"{args.expand_dump[0]} expanded to {args.expand_dump[1]}")
+    return True
 
 
-def download_memory_dump(api_key, uuid, base_url, output_file):
+def download_memory_dump(api_key, uuid, base_url, output_file, compress=False):
     """
     Downloads a memory dump identified by UUID using the API endpoint and saves it to a local file.
 
+    With compress, the dump is compressed by download_compressed_dump() as it arrives and stored as
+    output_file + DUMP_COMPRESSED_EXTENSION, the raw dump is never written. The hash record is written for the compressed file, with the digests of the raw dump that
+    expand_dump() restores byte for byte. Autopsy only reads the raw dump.
+
     Args:
         api_key (str): The API key required for authentication.
         uuid (str): The UUID of the memory dump to download.
         base_url (str): The base URL of the API.
         output_file (str): The path of the output file to save the downloaded memory dump.
+        compress (bool): Store the dump in the seekable compressed format.
 
     Returns:
-        bool: True if the memory dump was downloaded successfully, False otherwise.
+        str: The path of the stored dump, output_file or the compressed file, or None if the download
+             failed or was cancelled.
 
     Raises:
         AssertionError: If any of the required arguments (`api_key`, `uuid`, `base_url`, `output_file`) is missing.
@@ -1245,7 +4268,7 @@ def download_memory_dump(api_key, uuid, base_url, output_file):
     Example:
         >>> download_memory_dump('your_api_key', 'memory_dump_uuid', 'https://example.com', 'output_file.bin')
         Memory dump downloaded to output_file.bin
-        True
+        'output_file.bin'
     """
     assert api_key, "API key is required"
     assert uuid, "UUID is required"
@@ -1254,47 +4277,47 @@ def download_memory_dump(api_key, uuid, base_url, output_file):
 
     chunk_size = 1048576  # 1 MB
 
-    url = f"{base_url}/api/download-memory-dump/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/download-memory-dump/{uuid}/"
 
+    progress = ProgressReporter("Downloading Memory Dump")
     try:
-        response = requests.get(url, headers=headers, stream=True)
-        response.raise_for_status()
-
-        total_size = int(response.headers.get('Content-Length', 0))
-        bytes_downloaded = 0
-
-        with open(output_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=chunk_size):
-                if chunk:
-                    f.write(chunk)
-                    bytes_downloaded += len(chunk)
-
-                    progress_bar = sg.one_line_progress_meter(
-                        "Downloading Memory Dump",
-                        bytes_downloaded,
-                        total_size,
-                        "key",
-                        f"Downloaded {bytes_downloaded / 1048576:.2f} / {total_size / 1048576:.2f} MB",
-                    )
-                    # If the user clicked the cancel button, break the loop
-                    if not progress_bar:
-                        break
-        if progress_bar:
-            sg.popup(f"Memory dump downloaded to {output_file}")
-            return True
+        hasher = StreamHasher()
+        if compress:
+            started = time.perf_counter()
+            compressed_file = output_file + DUMP_COMPRESSED_EXTENSION
+            sizes = download_compressed_dump(api_key, base_url, endpoint, compressed_file, progress=progress,
+                                             chunk_size=chunk_size, hasher=hasher)
+            if sizes is None:
+                sg.popup_error("Download canceled by user")
+                return None
+            raw_size, compressed_size = sizes
+            print(f"Memory dump of {raw_size} bytes stored in {compressed_size} bytes "
+                  f"in {format_duration(time.perf_counter() - started)}")
+            output_file = compressed_file
         else:
-            sg.popup_error("Download canceled by user")
-            os.remove(output_file)
-            return False
+            # Guest RAM is mostly zero pages, they are left as holes in a sparse file
+            writer = SparseWriter()
+            if not download_segmented(api_key, base_url, endpoint, output_file, progress=progress,
+                                      chunk_size=chunk_size, hasher=hasher, writer=writer):
+                sg.popup_error("Download canceled by user. Save to the same file again to resume it")
+                return None
+            print(writer.report(output_file))
+            raw_size = None
+        digests = record_download_hashes(api_key, base_url, uuid, output_file, hasher, "Memory dump",
+                                         raw_size=raw_size)
+        sg.popup(f"Memory dump downloaded to {output_file}\nSHA-256: {digests['sha256']}")
+        return output_file
 
     except requests.exceptions.HTTPError as e:
-        print(f"Error: {response.status_code}")
-        print(response.text)
-        return False
+        print(f"Error: {e.response.status_code}")
+        print(e.response.text)
+        return None
     except Exception as e:
         print(f"An unexpected error occurred: {str(e)}")
-        return False
+        return None
+    finally:
+        progress.close()
+
 
 def download_screenshots(api_key, uuid, base_url, output_file):
     """
@@ -1324,40 +4347,29 @@ def download_screenshots(api_key, uuid, base_url, output_file):
     assert base_url, "Base URL is required"
     assert output_file, "Output file is required"
 
-    url = f"{base_url}/api/download-screenshots/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/download-screenshots/{uuid}/"
 
+    progress = ProgressReporter("Downloading Screenshots")
     try:
-        response = requests.get(url, headers=headers, stream=True)
-        response.raise_for_status()
-
-        total_size = int(response.headers.get('Content-Length', 0))
-        bytes_downloaded = 0
-
-        with open(output_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    bytes_downloaded += len(chunk)
-
-                    # Update the progress bar
-                    sg.one_line_progress_meter(
-                        "Downloading Screenshots",
-                        bytes_downloaded,
-                        total_size,
-                        "key",
-                        f"Downloaded {bytes_downloaded} / {total_size} bytes",
-                    )
-        print(f"Screenshots downloaded to {output_file}")
-        return True
+        hasher = StreamHasher()
+        if download_resumable(api_key, base_url, endpoint, output_file, progress=progress, hasher=hasher):
+            print(f"Screenshots downloaded to {output_file}")
+            record_download_hashes(api_key, base_url, uuid, output_file, hasher, "Screenshots")
+            return True
+        else:
+            print("Screenshots download canceled by user, the partial download is kept")
+            return False
 
     except requests.exceptions.HTTPError as e:
-        print(f"Error: {response.status_code}")
-        print(response.text)
+        print(f"Error: {e.response.status_code}")
+        print(e.response.text)
         return False
     except Exception as e:
         print(f"An unexpected error occurred: {str(e)}")
         return False
+    finally:
+        progress.close()
+
 
 def screenshot_vm(api_key, uuid, base_url):
     """
@@ -1385,11 +4397,10 @@ def screenshot_vm(api_key, uuid, base_url):
     assert uuid, "UUID is required"
     assert base_url, "Base URL is required"
 
-    url = f"{base_url}/api/screenshot-vm/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/screenshot-vm/{uuid}/"
 
     try:
-        response = requests.post(url, headers=headers)
+        response = get_api(base_url, api_key).post(endpoint)
         response.raise_for_status()
 
         result = response.json()
@@ -1434,11 +4445,13 @@ def shutdown_vm(api_key, uuid, base_url):
     assert uuid, "UUID is required"
     assert base_url, "Base URL is required"
 
-    url = f"{base_url}/api/shutdown-vm/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/shutdown-vm/{uuid}/"
 
     try:
-        response = requests.post(url, headers=headers)
+        api = get_api(base_url, api_key)
+        response = api.post(endpoint)
+        # The VM gives its memory back to the server
+        api.cache.invalidate("/api/get-available-memory/")
         response.raise_for_status()
 
         result = response.json()
@@ -1483,11 +4496,10 @@ def reset_vm(api_key, uuid, base_url):
     assert uuid, "UUID is required"
     assert base_url, "Base URL is required"
 
-    url = f"{base_url}/api/reset-vm/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/reset-vm/{uuid}/"
 
     try:
-        response = requests.post(url, headers=headers)
+        response = get_api(base_url, api_key).post(endpoint)
         response.raise_for_status()
 
         result = response.json()
@@ -1534,12 +4546,11 @@ def mount_folder(api_key, uuid, base_url, folder):
     assert base_url, "Base URL is required"
     assert folder, "Folder path is required"
 
-    url = f"{base_url}/api/mount-folder/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/mount-folder/{uuid}/"
     data = {"folder": folder}
 
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = get_api(base_url, api_key).post(endpoint, json=data)
         response.raise_for_status()
 
         result = response.json()
@@ -1621,10 +4632,13 @@ def delete_vm(api_key, uuid, base_url):
         sg.Popup("VM deletion canceled.")
         return False
 
-    url = f"{base_url}/api/delete-vm/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/delete-vm/{uuid}/"
 
-    response = requests.post(url, headers=headers)
+    api = get_api(base_url, api_key)
+    response = api.post(endpoint, timeout=API_LONG_TIMEOUT)
+    # Drop every cached response of the deleted VM, and the free memory it may have returned
+    api.cache.invalidate(uuid=uuid)
+    api.cache.invalidate("/api/get-available-memory/")
 
     if response.status_code == 200:
         result = response.json()
@@ -1663,10 +4677,9 @@ def check_vm_exists(api_key, uuid, baseurl):
         True
     """
     try:
-        url = f"{baseurl}/api/check-vm-exists/{uuid}/"
-        headers = {"X-API-KEY": api_key}
+        endpoint = f"/api/check-vm-exists/{uuid}/"
 
-        response = requests.get(url, headers=headers)
+        response = get_api(baseurl, api_key).get(endpoint)
 
         if response.status_code == 200:
             result = response.json()
@@ -1697,10 +4710,12 @@ def start_vm(api_key, uuid, baseurl):
         >>> start_vm('your_api_key', 'vm_uuid', 'https://example.com')
         {'vm_started': True, 'message': 'VM started successfully.'}
     """
-    url = f"{baseurl}/api/start-vm/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/start-vm/{uuid}/"
 
-    response = requests.post(url, headers=headers)
+    api = get_api(baseurl, api_key)
+    response = api.post(endpoint)
+    # The running VM takes memory from the server
+    api.cache.invalidate("/api/get-available-memory/")
 
     if response.status_code == 200:
         result = response.json()
@@ -1727,10 +4742,12 @@ def stop_vm(api_key, uuid, baseurl):
         >>> stop_vm('your_api_key', 'vm_uuid', 'https://example.com')
         {'vm_stopped': True, 'message': 'VM stopped successfully.'}
     """
-    url = f"{baseurl}/api/stop-vm/{uuid}/"
-    headers = {"X-API-KEY": api_key}
+    endpoint = f"/api/stop-vm/{uuid}/"
 
-    response = requests.post(url, headers=headers)
+    api = get_api(baseurl, api_key)
+    response = api.post(endpoint)
+    # The stopped VM gives its memory back to the server
+    api.cache.invalidate("/api/get-available-memory/")
 
     if response.status_code == 200:
         result = response.json()
@@ -1766,12 +4783,10 @@ def get_forensic_image_info(api_key, uuid, baseurl):
         Exception: If an unexpected error occurs.
 
     """
-    url = f'{baseurl}/api/forensic-image-vm-status/{uuid}/'
-
-    headers = {'X-API-KEY': api_key}
+    endpoint = f"/api/forensic-image-vm-status/{uuid}/"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = get_api(baseurl, api_key).get(endpoint)
 
         if response.status_code == 200:
             return 0, response.json()
@@ -1803,10 +4818,9 @@ def test_api_key(api_key, baseurl):
         Exception: If an unexpected error occurs during the test.
 
     """
-    url = baseurl + '/api/test/'
-    headers = {'X-Api-Key': api_key}
+    endpoint = "/api/test/"
     try:
-        response = requests.get(url, headers=headers)
+        response = get_api(baseurl, api_key).get(endpoint)
         if response.status_code == 200:
             return 0, 'Access granted'
         else:
@@ -1814,6 +4828,319 @@ def test_api_key(api_key, baseurl):
     except Exception as e:
         return 1, str(e)
 
+
+# Event posted by the status poller with a new VM state snapshot
+VM_STATE_EVENT = '-VM-STATE-'
+STATUS_POLL_INTERVAL = 1.0  # seconds between two status polls
+
+
+def fetch_vm_state(base_url, api_key, uuid_folder):
+    """
+    Fetches the consolidated state of the server and of the VM in one pass.
+
+    Args:
+        base_url (str): The base URL of the API.
+        api_key (str): The API key for authentication.
+        uuid_folder (str): The UUID of the virtual machine.
+
+    Returns:
+        dict: A snapshot with the keys 'server_ok' (0 when the API key is accepted), 'vm_exists',
+              'vm_status' (the forensic image information, empty when unknown), 'tap_status' and 'uuid'.
+
+    Example:
+        >>> fetch_vm_state('https://example.com', 'your_api_key', 'vm_uuid')
+        {'server_ok': 0, 'vm_exists': True, 'vm_status': {'vm_status': 'running', ...}, 'tap_status': False, 'uuid': 'vm_uuid'}
+    """
+    state = {
+        'server_ok': 1,
+        'vm_exists': False,
+        'vm_status': {},
+        'tap_status': False,
+        'uuid': str(uuid_folder),
+    }
+
+    state['server_ok'], _ = test_api_key(api_key, base_url)
+    if state['server_ok'] != 0:
+        return state
+
+    state['vm_exists'] = bool(check_vm_exists(api_key, uuid_folder, base_url))
+    if state['vm_exists']:
+        return_code, vm_status = get_forensic_image_info(api_key, uuid_folder, base_url)
+        if return_code == 0 and isinstance(vm_status, dict):
+            state['vm_status'] = vm_status
+        state['tap_status'] = check_tap_interface(base_url, uuid_folder, api_key)
+    return state
+
+
+class VMStatusPoller(threading.Thread):
+    """
+    Background thread that polls the server and VM state and posts it to the GUI.
+
+    The network calls run on this thread on their own schedule. Every snapshot returned by
+    fetch_vm_state() is sent to the window with window.write_event_value(VM_STATE_EVENT, snapshot),
+    so the event loop only has to redraw from it and never blocks on the network.
+
+    Args:
+        window (sg.Window): The window that receives the VM_STATE_EVENT events.
+        interval (float): The number of seconds between two polls.
+
+    Example:
+        >>> poller = VMStatusPoller(window)
+        >>> poller.set_target('https://example.com', 'your_api_key', 'vm_uuid')
+        >>> poller.start()
+    """
+
+    def __init__(self, window, interval=STATUS_POLL_INTERVAL):
+        super().__init__(name="VMStatusPoller", daemon=True)
+        self.window = window
+        self.interval = interval
+        self._poll_target = None
+        self._target_lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    def set_target(self, base_url, api_key, uuid_folder):
+        """
+        Sets the server, API key and VM to poll. Called from the event loop, it does no I/O.
+        """
+        with self._target_lock:
+            self._poll_target = (base_url, api_key, str(uuid_folder))
+
+    def poll_now(self):
+        """
+        Wakes the poller up so the next snapshot is fetched immediately.
+        """
+        self._wake_event.set()
+
+    def stop(self):
+        """
+        Stops the poller. A poll already in progress finishes but is not posted.
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            with self._target_lock:
+                poll_target = self._poll_target
+
+            if poll_target and all(poll_target):
+                try:
+                    state = fetch_vm_state(*poll_target)
+                    if not self._stop_event.is_set():
+                        self.window.write_event_value(VM_STATE_EVENT, state)
+                except Exception as e:
+                    print(f"Status poller error: {str(e)}")
+
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+# Declarative widget table of the VM control buttons. Each row maps a widget key to the
+# keyword arguments of its update() call; widgets missing from a row keep their current state.
+VM_WIDGET_TABLE = {
+    'server_offline': {
+        'convert_to_vm_button': {'disabled': True},
+        'link_to_vm_button': {'disabled': True},
+        'alert_server_off': {'visible': True},
+        'start_vm_button': {'disabled': True},
+        'stop_vm_button': {'disabled': True},
+        'screenshot_vm_button': {'disabled': True},
+        'download_memory_button': {'disabled': True},
+        'save_screenshots_vm_button': {'disabled': True},
+        'delete_vm_button': {'disabled': True},
+        'reset_vm_button': {'disabled': True},
+        'import_evidence_button': {'disabled': True},
+        'open_forensic_vm_button': {'disabled': True},
+        'open_forensic_shell_button': {'disabled': True},
+        'open_forensic_netdata_button': {'disabled': True},
+        '-RUN PLUGIN-': {'disabled': True},
+    },
+    'server_online': {
+        'alert_server_off': {'visible': False},
+    },
+    'vm_missing': {
+        'convert_to_vm_button': {'disabled': False},
+        'link_to_vm_button': {'disabled': False},
+        'delete_vm_button': {'disabled': True},
+        'open_forensic_vm_button': {'disabled': True},
+        'open_forensic_shell_button': {'disabled': False},
+        'open_forensic_netdata_button': {'disabled': False},
+        'save_screenshots_vm_button': {'disabled': True},
+        'start_vm_button': {'disabled': True},
+    },
+    'vm_exists': {
+        'convert_to_vm_button': {'disabled': True},
+        'link_to_vm_button': {'disabled': True},
+        'delete_vm_button': {'disabled': False},
+        'open_forensic_vm_button': {'disabled': True},
+        'open_forensic_shell_button': {'disabled': False},
+        'open_forensic_netdata_button': {'disabled': False},
+        'save_screenshots_vm_button': {'disabled': False},
+    },
+    'tap_up': {
+        'insert_network_button': {'disabled': True},
+        'remove_network_button': {'disabled': False},
+    },
+    'tap_down': {
+        'insert_network_button': {'disabled': False},
+        'remove_network_button': {'disabled': True},
+    },
+    'vm_running': {
+        'delete_vm_button': {'disabled': True},
+        'start_vm_button': {'disabled': True},
+        'screenshot_vm_button': {'disabled': False},
+        'download_memory_button': {'disabled': False},
+        'shutdown_vm_button': {'disabled': False},
+        'stop_vm_button': {'disabled': False},
+        'reset_vm_button': {'disabled': False},
+        'import_evidence_button': {'disabled': True},
+        'open_forensic_vm_button': {'disabled': False},
+        'save_screenshots_vm_button': {'disabled': False},
+        'recreate_evidence_disk_button': {'disabled': True},
+        '-RUN PLUGIN-': {'disabled': True},
+    },
+    'vm_stopped': {
+        'delete_vm_button': {'disabled': False, 'visible': True},
+        'start_vm_button': {'disabled': False},
+        'screenshot_vm_button': {'disabled': True},
+        'download_memory_button': {'disabled': True},
+        'shutdown_vm_button': {'disabled': True},
+        'stop_vm_button': {'disabled': True},
+        'reset_vm_button': {'disabled': True},
+        'import_evidence_button': {'disabled': False},
+        'recreate_evidence_disk_button': {'disabled': False},
+        'save_screenshots_vm_button': {'disabled': False},
+        '-RUN PLUGIN-': {'disabled': False},
+    },
+    # Applied by the convert and link handlers once a new VM is ready
+    'vm_converted': {
+        'convert_to_vm_button': {'disabled': True},
+        'link_to_vm_button': {'disabled': True},
+        'import_evidence_button': {'disabled': False},
+        'open_forensic_vm_button': {'disabled': False},
+        'stop_vm_button': {'disabled': False},
+        'reset_vm_button': {'disabled': False},
+        'open_forensic_shell_button': {'disabled': False},
+        'open_forensic_netdata_button': {'disabled': False},
+    },
+}
+
+
+def vm_state_rows(vm_state):
+    """
+    Maps a VM state snapshot to the rows of VM_WIDGET_TABLE that describe it.
+
+    Args:
+        vm_state (dict): A snapshot returned by fetch_vm_state().
+
+    Returns:
+        list: The row names, in the order they must be applied.
+
+    Example:
+        >>> vm_state_rows({'server_ok': 0, 'vm_exists': True, 'vm_status': {'vm_status': 'running'}, 'tap_status': True})
+        ['server_online', 'vm_exists', 'tap_up', 'vm_running']
+    """
+    if vm_state.get('server_ok') != 0:
+        return ['server_offline']
+
+    if not vm_state.get('vm_exists'):
+        return ['server_online', 'vm_missing']
+
+    rows = ['server_online', 'vm_exists', 'tap_up' if vm_state.get('tap_status') else 'tap_down']
+    status = vm_state.get('vm_status', {}).get('vm_status', '')
+    if status == 'running':
+        rows.append('vm_running')
+    elif status == 'stopped':
+        rows.append('vm_stopped')
+    return rows
+
+
+def compute_widget_states(*rows):
+    """
+    Merges rows of VM_WIDGET_TABLE into the desired state of each widget. Later rows win.
+
+    Args:
+        *rows (str): The row names to merge.
+
+    Returns:
+        dict: A dictionary mapping each widget key to the keyword arguments of its update() call.
+
+    Example:
+        >>> compute_widget_states('vm_exists', 'tap_down')['insert_network_button']
+        {'disabled': False}
+    """
+    states = {}
+    for row in rows:
+        for key, properties in VM_WIDGET_TABLE[row].items():
+            states.setdefault(key, {}).update(properties)
+    return states
+
+
+class WidgetStateModel:
+    """
+    Applies desired widget states to a window, touching only the widgets whose state changed.
+
+    The last state applied to every widget property is remembered, so repeating the same state on
+    each poll costs a dictionary lookup instead of a Tk update. The number of updates applied and
+    skipped is counted.
+
+    Args:
+        window (sg.Window): The window that holds the widgets.
+
+    Example:
+        >>> widget_state = WidgetStateModel(window)
+        >>> widget_state.apply(compute_widget_states('server_offline'))
+        >>> widget_state.stats()
+        {'applied': 15, 'skipped': 0}
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._current = {}
+        self.applied = 0
+        self.skipped = 0
+
+    def apply(self, widget_states):
+        """
+        Updates the widgets whose desired state differs from the one last applied.
+
+        Args:
+            widget_states (dict): A dictionary mapping widget keys to update() keyword arguments.
+
+        Returns:
+            int: The number of widgets that were updated.
+        """
+        updated = 0
+        for key, properties in widget_states.items():
+            changed = {name: value for name, value in properties.items()
+                       if self._current.get((key, name)) != value}
+            self.skipped += len(properties) - len(changed)
+            if not changed:
+                continue
+            try:
+                self.window[key].update(**changed)
+            except Exception as e:
+                print(f"Could not update {key}: {str(e)}")
+                continue
+            for name, value in changed.items():
+                self._current[(key, name)] = value
+            self.applied += len(changed)
+            updated += 1
+        return updated
+
+    def apply_rows(self, *rows):
+        """
+        Applies the merged state of one or more rows of VM_WIDGET_TABLE.
+        """
+        return self.apply(compute_widget_states(*rows))
+
+    def stats(self):
+        """
+        Returns the number of widget property updates applied and skipped.
+        """
+        return {'applied': self.applied, 'skipped': self.skipped}
+
+
 def generate_and_send_public_key(baseurl, api_key, ssh_dir):
     """
     Generates an SSH key pair and sends the public key to the server.
@@ -1857,16 +5184,13 @@ def generate_and_send_public_key(baseurl, api_key, ssh_dir):
         public_key = f.read().strip()
 
     # Send public key to server
-    url = baseurl + '/api/create-ssh-keys/'
-    headers = {
-        'X-Api-Key': api_key
-    }
+    endpoint = "/api/create-ssh-keys/"
 
     data = {
         'public_key': public_key
     }
 
-    response = requests.post(url, headers=headers, data=data)
+    response = get_api(baseurl, api_key).post(endpoint, data=data)
 
     # if response.status_code == 200:
     #     return 'Public key added to authorized keys'
@@ -1990,72 +5314,703 @@ def load_config(filename):
         >>> print(config)
         {'username': 'myuser', 'password': 'mypassword', 'server': 'example.com'}
 
-    Raises:
-        None
+    Raises:
+        None
+
+    """
+    # Load the configuration from the JSON file if it exists
+    if os.path.isfile(filename):
+        with open(filename, "r") as f:
+            return json.load(f)
+    else:
+        return {}
+
+# Check if there are enough command line arguments
+try:
+    image_path_arg = ""
+    case_directory_arg = ""
+    case_name_arg = ""
+    case_number_arg = ""
+    case_examiner_arg = ""
+    if len(sys.argv) >= 4 and not sys.argv[1].startswith("--"):
+        image_path_arg = sys.argv[1]
+        case_directory_arg = sys.argv[2]
+        case_name_arg = sys.argv[3]
+        try:
+            case_number_arg = sys.argv[4]
+        except Exception as e:
+            case_number_arg = "-"
+
+        try:
+            case_examiner_arg = sys.argv[5]
+        except Exception as e:
+            case_examiner_arg = "-"
+
+        # Save the values as a JSON file
+        values = {
+            "image_path_arg": image_path_arg,
+            "case_directory_arg": case_directory_arg,
+            "case_name_arg": case_name_arg,
+            "case_number_arg": case_number_arg,
+            "case_examiner_arg": case_examiner_arg
+        }
+        uuid_folder = str(string_to_uuid(image_path_arg + case_name_arg))
+        case_image_folder = case_directory_arg + "\\" + uuid_folder
+        os.makedirs(case_image_folder, exist_ok=True)
+
+        save_config(values, executable_path("case-config.json"))
+    else:
+        # Load the configuration from the JSON file
+        config = load_config(executable_path("case-config.json"))
+        image_path_arg = config.get("image_path_arg", "")
+        case_directory_arg = config.get("case_directory_arg", "")
+        case_name_arg = config.get("case_name_arg", "")
+        case_number_arg = config.get("case_number_arg", "")
+        case_examiner_arg = config.get("case_examiner_arg", "")
+        uuid_folder = str(string_to_uuid(image_path_arg + case_name_arg))
+        case_image_folder = case_directory_arg + "\\" + uuid_folder
+except Exception as e:
+    sg.popup(e)
+
+# Rest of the code using the values
+
+# SSH settings for the ForensicVM server
+SSH_USERNAME = 'forensicinvestigator'
+SSH_CONNECT_TIMEOUT = 15            # seconds to connect, exchange keys and authenticate
+SSH_KEEPALIVE_INTERVAL = 30         # seconds between keep-alive packets on an idle transport
+TUNNEL_BUFFER_SIZE = 262144         # bytes read per wake-up of a tunnel connection, also its socket buffer size
+TUNNEL_WINDOW_SIZE = 4194304        # SSH flow control window of the forwarded channels
+TUNNEL_SELECT_TIMEOUT = 1.0         # seconds a tunnel connection waits for data before checking for stop
+TUNNEL_RATE_INTERVAL = 1.0          # seconds over which the tunnel throughput is measured
+TUNNEL_LATENCY_SMOOTHING = 0.2      # weight of the newest sample in the smoothed tunnel latency
+SMB_PORT = 445
+COMMAND_READ_SIZE = 65536           # bytes read from a remote command per wake-up
+COMMAND_OUTPUT_CAPACITY = 1048576   # characters of each stream of a remote command kept in memory
+COMMAND_REFRESH_RATE = 4            # maximum console redraws per second while a remote command runs
+CONVERSION_CHART_POINTS = 120       # throughput samples shown in the conversion chart
+CONVERSION_CHART_SIZE = (480, 120)  # pixels of the conversion throughput chart
+CONVERSION_SAMPLE_INTERVAL = 1.0    # seconds between two samples of the conversion chart
+CONVERSION_QEMU_PROGRESS = re.compile(r'\((\d+(?:\.\d+)?)/100%\)')
+CONVERSION_DD_PROGRESS = re.compile(r'^(\d+) bytes .*copied')
+CONVERSION_RSYNC_PROGRESS = re.compile(r'^\s*([\d,]+)\s+(\d+)%\s')
+# Phase timings of the conversions, keyed by VM UUID
+CONVERSION_LOG_FILE = os.path.join(tempfile.gettempdir(), 'forensicvm_conversions.json')
+SFTP_BENCHMARK_STREAMS = 4          # parallel SFTP streams of the upload benchmark
+SFTP_BENCHMARK_DURATION = 5         # seconds the upload benchmark writes for
+SFTP_BENCHMARK_PAYLOAD = 1048576    # bytes of pseudo-random data written repeatedly by each stream
+SFTP_BENCHMARK_LIMIT = 2147483648   # bytes after which the benchmark stops early on fast links
+SFTP_BENCHMARK_CACHE_TTL = 3600     # seconds a benchmark result is reused for the same server
+SFTP_PUSH_STREAMS = 4               # segments of a split image pushed at the same time
+SFTP_PUSH_BLOCK_SIZE = 1048576      # bytes read from the image per pipelined SFTP write
+SFTP_PUSH_REMOTE_DIR = '/forensicVM/mnt/tmp'   # images are pushed to a folder named after the VM UUID in here
+TRANSFER_MODE_SAMBA = "Samba share over SSH tunnel"
+TRANSFER_MODE_SFTP = "SFTP push"
+SSH_TUNING_DURATION = 3            # seconds each cipher and compression combination is benchmarked for
+SSH_TUNING_PAYLOAD = 1048576        # bytes of sample data written repeatedly while benchmarking
+SSH_TUNING_CONFIG_KEY = 'ssh_tuning'   # config.json entry with the calibrated algorithms of each server
+# Cipher, MAC and compression combinations tried by calibrate_ssh(). paramiko has no ChaCha20-Poly1305,
+# AES-GCM is its AEAD choice from paramiko 3.3 on. The GCM ciphers carry their own MAC. Combinations
+# the installed paramiko does not know are skipped, see ssh_tuning_supported()
+SSH_TUNING_CANDIDATES = (
+    {'cipher': 'aes128-gcm@openssh.com', 'mac': None, 'compress': False},
+    {'cipher': 'aes256-gcm@openssh.com', 'mac': None, 'compress': False},
+    {'cipher': 'aes128-ctr', 'mac': 'hmac-sha2-256-etm@openssh.com', 'compress': False},
+    {'cipher': 'aes256-ctr', 'mac': 'hmac-sha2-256', 'compress': False},
+    {'cipher': 'aes128-gcm@openssh.com', 'mac': None, 'compress': True},
+    {'cipher': 'aes128-ctr', 'mac': 'hmac-sha2-256-etm@openssh.com', 'compress': True},
+)
+# Upload benchmark results of each server
+SFTP_BENCHMARK_CACHE_FILE = os.path.join(tempfile.gettempdir(), 'forensicvm_sftp_benchmark.json')
+
+
+def ssh_tuning_supported(tuning):
+    """
+    Tells whether the installed paramiko knows the cipher and MAC of a tuning.
+
+    Example:
+        >>> ssh_tuning_supported({'cipher': 'aes128-ctr', 'mac': 'hmac-sha2-256', 'compress': False})
+        True
+    """
+    return tuning['cipher'] in paramiko.Transport._preferred_ciphers and \
+        (not tuning.get('mac') or tuning['mac'] in paramiko.Transport._preferred_macs)
+
+
+def ssh_tuning_options(tuning):
+    """
+    Returns the SSHClient.connect() arguments that make paramiko negotiate the tuned algorithms.
+
+    Args:
+        tuning (dict): The cipher, MAC (None for the AEAD ciphers) and compression flag, or None.
+
+    Returns:
+        dict: The disabled_algorithms and compress arguments, empty when tuning is None.
+
+    Example:
+        >>> ssh_tuning_options({'cipher': 'aes128-ctr', 'mac': 'hmac-sha2-256', 'compress': False})['compress']
+        False
+    """
+    if not tuning:
+        return {}
+    # paramiko can only be told which algorithms not to offer, so every other known one is disabled
+    disabled = {'ciphers': [cipher for cipher in paramiko.Transport._preferred_ciphers if cipher != tuning['cipher']]}
+    if tuning.get('mac'):
+        disabled['macs'] = [mac for mac in paramiko.Transport._preferred_macs if mac != tuning['mac']]
+    return {'disabled_algorithms': disabled, 'compress': bool(tuning.get('compress'))}
+
+
+def load_ssh_tuning(address, port, config_file=None):
+    """
+    Returns the tuning stored for a server by calibrate_ssh(), or None when there is none.
+
+    Args:
+        address (str): The IP address or hostname of the server.
+        port (int): The SSH port of the server.
+        config_file (str): The configuration file. Defaults to config.json next to the executable.
+
+    Returns:
+        dict: The cipher, MAC and compression flag, or None.
+    """
+    config = load_config(config_file or executable_path("config.json"))
+    tuning = config.get(SSH_TUNING_CONFIG_KEY, {}).get(f"{address}:{port}")
+    # A tuning saved by another paramiko version may name a cipher this one does not have
+    if tuning and tuning.get('cipher') and ssh_tuning_supported(tuning):
+        return tuning
+    return None
+
+
+def save_ssh_tuning(address, port, tuning, config_file=None):
+    """
+    Stores the tuning of a server in the configuration file, keeping the other settings.
+    """
+    config_file = config_file or executable_path("config.json")
+    config = load_config(config_file)
+    config.setdefault(SSH_TUNING_CONFIG_KEY, {})[f"{address}:{port}"] = tuning
+    save_config(config, config_file)
+
+
+class SSHTransportManager:
+    """
+    Long-lived, keep-alive SSH connection to a ForensicVM server that operations multiplex channels over.
+
+    The first call pays the key exchange and the authentication with the private key, later calls open
+    their sessions, SFTP clients and port forwards on the same transport. A transport that was dropped
+    is reconnected on the next call, with its reverse port forwards requested again. The time of every
+    handshake is recorded, so the time saved by reusing the transport can be reported. A tuning from
+    calibrate_ssh() restricts the cipher, MAC and compression negotiated by the transport.
+
+    Args:
+        address (str): The IP address or hostname of the server.
+        port (int): The SSH port of the server.
+        key_filename (str): The path of the private key.
+        username (str): The user to authenticate as.
+        keepalive (int): The number of seconds between keep-alive packets, 0 to disable them.
+        timeout (float): The number of seconds to connect and authenticate.
+        tuning (dict): Optional cipher, MAC and compression flag to negotiate, see ssh_tuning_options().
+
+    Example:
+        >>> ssh = SSHTransportManager('192.168.0.100', 22, 'mykey')
+        >>> stdin, stdout, stderr = ssh.exec_command('ls -al')
+        >>> ssh.free_remote_port()
+        40123
+    """
+
+    def __init__(self, address, port, key_filename, username=SSH_USERNAME,
+                 keepalive=SSH_KEEPALIVE_INTERVAL, timeout=SSH_CONNECT_TIMEOUT, tuning=None):
+        self.address = address
+        self.port = int(port)
+        self.key_filename = key_filename
+        self.username = username
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.tuning = tuning
+        self.handshakes = 0
+        self.handshake_time = 0.0
+        self.reuses = 0
+        self._client = None
+        self._forwards = {}
+        self._lock = threading.Lock()
+
+    def _is_active(self):
+        transport = self._client and self._client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _connect(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        start_time = time.monotonic()
+        try:
+            client = self._open_client(self.tuning)
+        except paramiko.ssh_exception.IncompatiblePeer as e:
+            if not self.tuning:
+                raise
+            print(f"SSH {self.address}:{self.port}: tuned algorithms rejected ({e}), using the defaults")
+            self.tuning = None
+            client = self._open_client(None)
+        elapsed = time.monotonic() - start_time
+        self.handshakes += 1
+        self.handshake_time += elapsed
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        compression = 'on' if self.tuning and self.tuning.get('compress') else 'off'
+        print(f"SSH {self.address}:{self.port}: connected in {elapsed:.2f} s "
+              f"({client.get_transport().local_cipher}, compression {compression})")
+        self._client = client
+
+    def _forward_again(self, client, remote_ports):
+        # The reverse forwards died with the previous transport, ask for the same ports again. Runs without
+        # the lock, the transport thread takes it in _dispatch() while the requests wait for their replies.
+        for remote_port in remote_ports:
+            try:
+                client.get_transport().request_port_forward("", remote_port, handler=self._dispatch)
+            except paramiko.SSHException as e:
+                print(f"SSH {self.address}:{self.port}: could not forward port {remote_port} again: {e}")
+                with self._lock:
+                    self._forwards.pop(remote_port, None)
+
+    def _open_client(self, tuning):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(self.address, port=self.port, username=self.username,
+                           key_filename=self.key_filename, timeout=self.timeout,
+                           banner_timeout=self.timeout, auth_timeout=self.timeout,
+                           allow_agent=False, look_for_keys=False, **ssh_tuning_options(tuning))
+        except Exception:
+            client.close()
+            raise
+        return client
+
+    def set_tuning(self, tuning):
+        """
+        Sets the algorithms of the next transports. An idle transport is closed so the next call uses them.
+        """
+        with self._lock:
+            self.tuning = tuning
+            if self._client is not None and not self._forwards:
+                self._client.close()
+                self._client = None
+
+    def _dispatch(self, channel, origin, server):
+        # paramiko keeps a single forward handler per transport, route the channels by server port
+        with self._lock:
+            handler = self._forwards.get(server[1])
+        if handler is None:
+            channel.close()
+        else:
+            handler(channel, origin, server)
+
+    def client(self):
+        """
+        Returns the connected SSH client, connecting or reconnecting when the transport is not active.
+
+        Returns:
+            paramiko.SSHClient: The connected client.
+        """
+        with self._lock:
+            if self._is_active():
+                self.reuses += 1
+                return self._client
+            self._connect()
+            client = self._client
+            remote_ports = list(self._forwards)
+        self._forward_again(client, remote_ports)
+        return client
+
+    def transport(self):
+        """
+        Returns the active transport, connecting when needed.
+
+        Returns:
+            paramiko.Transport: The transport channels are opened on.
+        """
+        return self.client().get_transport()
+
+    def _retry(self, operation):
+        # A transport dropped between the check and the call fails with SSHException, reconnect once
+        try:
+            return operation(self.client())
+        except (paramiko.SSHException, EOFError, OSError):
+            if self._is_active():
+                raise
+            return operation(self.client())
+
+    def exec_command(self, command, **kwargs):
+        """
+        Runs a command on a new session channel of the shared transport.
+
+        Args:
+            command (str): The command to run.
+            **kwargs: Extra arguments passed to paramiko.SSHClient.exec_command.
+
+        Returns:
+            tuple: The stdin, stdout and stderr files of the command.
+        """
+        return self._retry(lambda client: client.exec_command(command, **kwargs))
+
+    def open_sftp(self):
+        """
+        Opens an SFTP client on the shared transport.
+
+        Returns:
+            paramiko.SFTPClient: The SFTP client. Close it when done, the transport stays open.
+        """
+        return self._retry(lambda client: client.open_sftp())
+
+    def forward_remote_port(self, handler, remote_port=0):
+        """
+        Asks the server to listen on a port and hand every connection to it over to the handler.
+
+        Args:
+            handler (callable): Called as handler(channel, origin, server) on the transport thread for
+                                each forwarded connection.
+            remote_port (int): The port to listen on, 0 for any free port.
+
+        Returns:
+            int: The port the server listens on.
+        """
+        def request(client):
+            remote_port_bound = client.get_transport().request_port_forward("", remote_port,
+                                                                            handler=self._dispatch)
+            with self._lock:
+                self._forwards[remote_port_bound] = handler
+            return remote_port_bound
+        return self._retry(request)
+
+    def cancel_remote_port(self, remote_port):
+        """
+        Stops a reverse forward started by forward_remote_port().
+        """
+        with self._lock:
+            self._forwards.pop(remote_port, None)
+            if not self._is_active():
+                return
+            transport = self._client.get_transport()
+        # Transport.cancel_port_forward() would also drop the handler of the other forwards
+        transport.global_request("cancel-tcpip-forward", ("", remote_port), wait=True)
+
+    def free_remote_port(self):
+        """
+        Asks the server for a free port by requesting a reverse forward on port 0 and cancelling it.
+
+        Returns:
+            int: A port that is free on the server.
+        """
+        remote_port = self.forward_remote_port(lambda channel, origin, server: channel.close())
+        self.cancel_remote_port(remote_port)
+        return remote_port
+
+    def stats(self):
+        """
+        Returns the handshake statistics of the manager.
+
+        Returns:
+            dict: The number of handshakes, the seconds spent in them, the number of operations that
+                  reused the open transport and the estimated seconds of handshakes they saved.
+        """
+        with self._lock:
+            average = self.handshake_time / self.handshakes if self.handshakes else 0.0
+            return {
+                'handshakes': self.handshakes,
+                'handshake_time': self.handshake_time,
+                'reuses': self.reuses,
+                'handshake_time_saved': average * self.reuses,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_ssh_managers = {}
+_ssh_managers_lock = threading.Lock()
+
+
+def get_ssh(address, port, key_filename=None):
+    """
+    Returns the shared SSHTransportManager for a server, creating it on first use.
+
+    Args:
+        address (str): The IP address or hostname of the server.
+        port (int): The SSH port of the server.
+        key_filename (str): The path of the private key. Defaults to the mykey file next to the executable.
+
+    Returns:
+        SSHTransportManager: The shared manager.
+
+    Example:
+        >>> get_ssh('192.168.0.100', 22) is get_ssh('192.168.0.100', '22')
+        True
+    """
+    if key_filename is None:
+        key_filename = os.path.expanduser(executable_path("mykey"))
+    key = (str(address), int(port), key_filename)
+    with _ssh_managers_lock:
+        manager = _ssh_managers.get(key)
+        if manager is None:
+            manager = SSHTransportManager(address, port, key_filename, tuning=load_ssh_tuning(address, port))
+            _ssh_managers[key] = manager
+        return manager
+
+
+def report_ssh_stats():
+    """
+    Prints the handshake statistics of every SSH manager and returns them.
+
+    Returns:
+        dict: The statistics of each manager keyed by "address:port".
+    """
+    report = {}
+    with _ssh_managers_lock:
+        managers = list(_ssh_managers.values())
+    for manager in managers:
+        stats = manager.stats()
+        report[f"{manager.address}:{manager.port}"] = stats
+        print(f"SSH {manager.address}:{manager.port}: {stats['handshakes']} handshakes "
+              f"in {stats['handshake_time']:.2f} s, {stats['reuses']} reused, "
+              f"{stats['handshake_time_saved']:.2f} s of handshakes saved")
+    return report
+
+
+def close_ssh_managers():
+    """
+    Closes the transport of every SSH manager.
+    """
+    with _ssh_managers_lock:
+        managers = list(_ssh_managers.values())
+    for manager in managers:
+        manager.close()
+
+
+class ReverseTunnel:
+    """
+    In-process reverse tunnel that exposes a local TCP endpoint, such as the Samba share, on a port of the server.
+
+    The server listens on the port over the shared SSH transport and each connection it accepts is pumped
+    to the local endpoint by a worker thread, with select() driven I/O and large buffers. The tunnel counts
+    the bytes in each direction and measures the latency of the local endpoint, from the moment a request
+    is forwarded to it until the first byte of its answer.
+
+    Args:
+        ssh (SSHTransportManager): The manager of the server connection.
+        target_host (str): The host of the local endpoint.
+        target_port (int): The port of the local endpoint.
+        remote_port (int): The port to listen on in the server, 0 for any free port.
+        buffer_size (int): The number of bytes read at a time and the size of the socket buffers.
+
+    Example:
+        >>> tunnel = ReverseTunnel(get_ssh('192.168.0.100', 22), '127.0.0.1', SMB_PORT)
+        >>> remote_port = tunnel.start()
+        >>> tunnel.stats()['rate_to_remote']
+        0.0
+        >>> tunnel.stop()
+    """
+
+    def __init__(self, ssh, target_host, target_port=SMB_PORT, remote_port=0, buffer_size=TUNNEL_BUFFER_SIZE):
+        self.ssh = ssh
+        self.target_host = target_host
+        self.target_port = int(target_port)
+        self.requested_port = int(remote_port)
+        self.buffer_size = buffer_size
+        self.remote_port = None
+        self.bytes_to_local = 0
+        self.bytes_to_remote = 0
+        self.connections = 0
+        self.active = 0
+        self.latency = None
+        self._rates = (0.0, 0.0)
+        self._rate_mark = (time.monotonic(), 0, 0)
+        self._channels = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """
+        Starts listening on the server.
+
+        Returns:
+            int: The port the server listens on.
+        """
+        transport = self.ssh.transport()
+        transport.default_window_size = max(transport.default_window_size, TUNNEL_WINDOW_SIZE)
+        self._stop_event.clear()
+        self.remote_port = self.ssh.forward_remote_port(self._accept, self.requested_port)
+        with _reverse_tunnels_lock:
+            _reverse_tunnels.append(self)
+        print(f"Tunnel {self.ssh.address}:{self.remote_port} -> {self.target_host}:{self.target_port} started")
+        return self.remote_port
+
+    def _accept(self, channel, origin, server):
+        # Called on the transport thread, which must not block
+        threading.Thread(target=self._pump, args=(channel,), name=f"ReverseTunnel-{self.remote_port}",
+                         daemon=True).start()
+
+    def _pump(self, channel):
+        try:
+            sock = socket.create_connection((self.target_host, self.target_port), timeout=SSH_CONNECT_TIMEOUT)
+        except OSError as e:
+            print(f"Tunnel: cannot connect to {self.target_host}:{self.target_port}: {e}")
+            channel.close()
+            return
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.buffer_size)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer_size)
+        with self._lock:
+            self.connections += 1
+            self.active += 1
+            self._channels.add(channel)
+
+        request_time = None
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([channel, sock], [], [], TUNNEL_SELECT_TIMEOUT)
+                if channel in readable:
+                    data = channel.recv(self.buffer_size)
+                    if not data:
+                        break
+                    sock.sendall(data)
+                    if request_time is None:
+                        request_time = time.monotonic()
+                    with self._lock:
+                        self.bytes_to_local += len(data)
+                if sock in readable:
+                    data = sock.recv(self.buffer_size)
+                    if not data:
+                        break
+                    channel.sendall(data)
+                    with self._lock:
+                        self.bytes_to_remote += len(data)
+                        if request_time is not None:
+                            sample = time.monotonic() - request_time
+                            self.latency = sample if self.latency is None else \
+                                TUNNEL_LATENCY_SMOOTHING * sample + (1 - TUNNEL_LATENCY_SMOOTHING) * self.latency
+                    request_time = None
+        except (OSError, EOFError, paramiko.SSHException) as e:
+            print(f"Tunnel {self.remote_port}: {e}")
+        finally:
+            sock.close()
+            channel.close()
+            with self._lock:
+                self.active -= 1
+                self._channels.discard(channel)
+
+    def stats(self):
+        """
+        Returns the live counters of the tunnel.
+
+        Returns:
+            dict: The bytes sent to the local endpoint and back to the server, the throughput of each
+                  direction in bytes per second, the smoothed latency of the local endpoint in seconds
+                  (None before the first answer) and the number of connections, total and open.
+        """
+        now = time.monotonic()
+        with self._lock:
+            mark_time, mark_to_local, mark_to_remote = self._rate_mark
+            if now - mark_time >= TUNNEL_RATE_INTERVAL:
+                self._rates = ((self.bytes_to_local - mark_to_local) / (now - mark_time),
+                               (self.bytes_to_remote - mark_to_remote) / (now - mark_time))
+                self._rate_mark = (now, self.bytes_to_local, self.bytes_to_remote)
+            return {
+                'remote_port': self.remote_port,
+                'bytes_to_local': self.bytes_to_local,
+                'bytes_to_remote': self.bytes_to_remote,
+                'rate_to_local': self._rates[0],
+                'rate_to_remote': self._rates[1],
+                'latency': self.latency,
+                'connections': self.connections,
+                'active': self.active,
+            }
+
+    def stop(self):
+        """
+        Stops listening on the server and closes the open connections.
+        """
+        self._stop_event.set()
+        with _reverse_tunnels_lock:
+            if self in _reverse_tunnels:
+                _reverse_tunnels.remove(self)
+        if self.remote_port is not None:
+            try:
+                self.ssh.cancel_remote_port(self.remote_port)
+            except (OSError, EOFError, paramiko.SSHException) as e:
+                print(f"Tunnel {self.remote_port}: {e}")
+        with self._lock:
+            channels = list(self._channels)
+        for channel in channels:
+            channel.close()
+        print(f"Tunnel {self.ssh.address}:{self.remote_port} stopped, "
+              f"{self.bytes_to_local} bytes sent, {self.bytes_to_remote} bytes received")
+
+
+_reverse_tunnels = []
+_reverse_tunnels_lock = threading.Lock()
+
+
+def tunnel_stats_text():
+    """
+    Returns a status line with the live counters of every running reverse tunnel.
+
+    Returns:
+        str: One line per tunnel, or an empty string when no tunnel is running.
+    """
+    with _reverse_tunnels_lock:
+        tunnels = list(_reverse_tunnels)
+    lines = []
+    for tunnel in tunnels:
+        stats = tunnel.stats()
+        latency = "-" if stats['latency'] is None else f"{stats['latency'] * 1000:.1f} ms"
+        lines.append(f"Share tunnel {tunnel.ssh.address}:{stats['remote_port']} -> "
+                     f"{tunnel.target_host}:{tunnel.target_port}: "
+                     f"{stats['rate_to_remote'] / 1048576:.2f} MB/s read, "
+                     f"{stats['rate_to_local'] / 1048576:.2f} MB/s written, "
+                     f"latency {latency}, {stats['active']} connections")
+    return "\n".join(lines)
+
 
+def update_tunnel_stats(window):
     """
-    # Load the configuration from the JSON file if it exists
-    if os.path.isfile(filename):
-        with open(filename, "r") as f:
-            return json.load(f)
-    else:
-        return {}
+    Shows the tunnel counters in the tunnel_stats element of the window, hiding it when no tunnel runs.
+    """
+    text = tunnel_stats_text()
+    window['tunnel_stats'].update(text, visible=bool(text))
 
-# Check if there are enough command line arguments
-try:
-    image_path_arg = ""
-    case_directory_arg = ""
-    case_name_arg = ""
-    case_number_arg = ""
-    case_examiner_arg = ""
-    if len(sys.argv) >= 4:
-        image_path_arg = sys.argv[1]
-        case_directory_arg = sys.argv[2]
-        case_name_arg = sys.argv[3]
-        try:
-            case_number_arg = sys.argv[4]
-        except Exception as e:
-            case_number_arg = "-"
 
-        try:
-            case_examiner_arg = sys.argv[5]
-        except Exception as e:
-            case_examiner_arg = "-"
+def stop_reverse_tunnels():
+    """
+    Stops every running reverse tunnel.
+    """
+    with _reverse_tunnels_lock:
+        tunnels = list(_reverse_tunnels)
+    for tunnel in tunnels:
+        tunnel.stop()
 
-        # Save the values as a JSON file
-        values = {
-            "image_path_arg": image_path_arg,
-            "case_directory_arg": case_directory_arg,
-            "case_name_arg": case_name_arg,
-            "case_number_arg": case_number_arg,
-            "case_examiner_arg": case_examiner_arg
-        }
-        uuid_folder = str(string_to_uuid(image_path_arg + case_name_arg))
-        case_image_folder = case_directory_arg + "\\" + uuid_folder
-        os.makedirs(case_image_folder, exist_ok=True)
 
-        save_config(values, executable_path("case-config.json"))
-    else:
-        # Load the configuration from the JSON file
-        config = load_config(executable_path("case-config.json"))
-        image_path_arg = config.get("image_path_arg", "")
-        case_directory_arg = config.get("case_directory_arg", "")
-        case_name_arg = config.get("case_name_arg", "")
-        case_number_arg = config.get("case_number_arg", "")
-        case_examiner_arg = config.get("case_examiner_arg", "")
-        uuid_folder = str(string_to_uuid(image_path_arg + case_name_arg))
-        case_image_folder = case_directory_arg + "\\" + uuid_folder
-except Exception as e:
-    sg.popup(e)
+def run_remote_command(ssh, command, window=None):
+    """
+    Runs a command on the server over the shared SSH transport and shows its output as it arrives.
+
+    Args:
+        ssh (SSHTransportManager): The manager of the server connection.
+        command (str): The command to run. It gets a terminal, like ssh -t.
+        window (sg.Window): The window whose output console shows the output, also kept refreshed so the
+                            tunnel counters stay live. None prints the output, for use outside the GUI thread.
+
+    Returns:
+        int: The exit status of the command.
+    """
+    return run_command_ssh(ssh, window, command, get_pty=True,
+                           refresh=update_tunnel_stats if window is not None else None).exit_status
 
-# Rest of the code using the values
 
 def run_snap(server_address, server_port, windows_share,
             share_login, share_password, replacement_share,
             forensic_image_path, uuid_folder, copy):
     """
-    Runs the OpenSSH command to connect to a remote server and execute a command
-    that runs the local forensic image by accessing it by samba over reverse ssh.
+    Connects to a remote server and executes, in the background, a command that runs the local
+    forensic image by accessing it by samba over an in-process reverse tunnel.
 
     Args:
         server_address (str): The IP address or hostname of the remote server.
@@ -2092,16 +6047,7 @@ def run_snap(server_address, server_port, windows_share,
 
 
         private_key_path = os.path.expanduser(executable_path("mykey"))
-
-        # Connect to remote host using SSH key authentication
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(server_address, username='forensicinvestigator', key_filename=private_key_path, port=server_port)
-        # Get an available remote port
-        transport = ssh.get_transport()
-        remote_port = transport.request_port_forward("", 0)
-        # Close the connection
-        ssh.close()
+        ssh = get_ssh(server_address, server_port, private_key_path)
 
         # Replacing the common path with an empty string and replacing backslashes with forward slashes
         new_path = forensic_image_path.replace(replacement_share, "").replace("\\", "/")
@@ -2113,9 +6059,9 @@ def run_snap(server_address, server_port, windows_share,
         print(temp)
         samba_host, samba_share = temp.split("\\")
 
-        # Creating the port forwarding string and assigning it to result
-        reverse_ssh_foward = f"-R {remote_port}:{samba_host}:445"
-        print(reverse_ssh_foward)
+        # Forward a free remote port to the local samba port, in process over the shared SSH transport
+        tunnel = ReverseTunnel(ssh, samba_host, SMB_PORT)
+        remote_port = tunnel.start()
 
 
         # Prepare the command to run the convertor
@@ -2128,72 +6074,235 @@ def run_snap(server_address, server_port, windows_share,
                   f'--copy {copy} ' \
                   f'--share-port {remote_port}'
 
-        ssh_command ="start cmd /c " + resource_path("ssh.exe") +  " -t -i " \
-                     + executable_path("mykey") + \
-                     " -oStrictHostKeyChecking=no forensicinvestigator@" \
-                     + str(server_address) \
-                     + " -p " + str(server_port)\
-                     + " " + reverse_ssh_foward + " " + command
-        
-        #ssh_command ="start cmd /c " + os.path.dirname(os.path.abspath(__file__))+ "\\ssh.exe -t -i " \
-        #             + os.path.dirname(os.path.abspath(__file__))+ \
-        #             "\\mykey -oStrictHostKeyChecking=no forensicinvestigator@" \
-        #             + str(server_address)\
-        #             + " -p " + str(server_port)\
-        #             + " " + reverse_ssh_foward + " " + command
+        # The VM reads the image through the tunnel for as long as the command runs, so run it
+        # in the background and close the tunnel when it exits
+        def run_and_stop():
+            try:
+                print(f"run_snap exited with status {run_remote_command(ssh, command)}")
+            except Exception as e:
+                print(e)
+            finally:
+                tunnel.stop()
 
-        print(ssh_command)
-        # Run the command redirecting local samba port to a free open port remote\ly
-        os.system(ssh_command)
+        threading.Thread(target=run_and_stop, name="run_snap", daemon=True).start()
 
     except Exception as e:
         print(e)
 
 
 
+def _sftp_benchmark_stream(ssh, remote_file, payload, deadline, max_bytes, start_barrier):
+    # One stream: pipelined writes of the payload until the deadline, closing waits for the last acks
+    sftp = ssh.open_sftp()
+    try:
+        written = 0
+        with sftp.open(remote_file, 'wb') as f:
+            f.set_pipelined(True)
+            start_barrier.wait()
+            while written < max_bytes and time.monotonic() < deadline[0]:
+                f.write(payload)
+                written += len(payload)
+        sftp.remove(remote_file)
+        return written
+    finally:
+        sftp.close()
+
+
+def measure_sftp_upload(ssh, remote_path, payload, streams=SFTP_BENCHMARK_STREAMS, duration=SFTP_BENCHMARK_DURATION):
+    """
+    Writes a payload repeatedly to the server over parallel pipelined SFTP streams for a duration.
+
+    Args:
+        ssh (SSHTransportManager): The manager of the server connection.
+        remote_path (str): The remote folder the test files are written to. They are removed afterwards.
+        payload (bytes): The data each stream writes repeatedly.
+        streams (int): The number of parallel SFTP streams.
+        duration (float): The number of seconds the streams write for.
+
+    Returns:
+        tuple: The number of bytes written and the number of seconds it took, including the last acks.
+    """
+    max_bytes = SFTP_BENCHMARK_LIMIT // streams
+    start_barrier = threading.Barrier(streams + 1)
+    # The deadline is only known once every stream has its file open
+    deadline = [float('inf')]
+    run_id = uuid.uuid4().hex
+    with ThreadPoolExecutor(max_workers=streams) as executor:
+        futures = [executor.submit(_sftp_benchmark_stream, ssh,
+                                   f"{remote_path.rstrip('/')}/speedtest-{run_id}-{index}.bin",
+                                   payload, deadline, max_bytes, start_barrier)
+                   for index in range(streams)]
+        try:
+            start_barrier.wait(timeout=SSH_CONNECT_TIMEOUT)
+        except threading.BrokenBarrierError:
+            # A stream failed to open its file, its future raises the error below
+            start_barrier.abort()
+        start_time = time.monotonic()
+        deadline[0] = start_time + duration
+        total_bytes = sum(future.result() for future in futures)
+    return total_bytes, time.monotonic() - start_time
+
+
 def sftp_upload_speed_test(server_address, server_port, private_key_path,
-                           remote_path="/remote/dir/", file_size_mb = 10):
-    # Create a test file of a specific size (e.g., 10MB)
+                           remote_path="/forensicVM/mnt/tmp/", streams=SFTP_BENCHMARK_STREAMS,
+                           duration=SFTP_BENCHMARK_DURATION, cache_ttl=SFTP_BENCHMARK_CACHE_TTL):
+    """
+    Measures the SFTP upload throughput to the server, reusing a recent result for the same server.
 
-    file_path = os.path.join(tempfile.gettempdir(), "test_file.txt")
-    # alert remote path
-    try:
-        with open(file_path, "wb") as f:
-            f.write(b"\0" * file_size_mb * 1024 * 1024)
+    Each stream writes an in-memory pseudo-random payload with pipelined SFTP writes to its own file
+    in remote_path, until the duration is over, then removes the file. The streams run in parallel
+    over the shared SSH transport and the time includes waiting for the last write to be acknowledged.
+    The results are kept in SFTP_BENCHMARK_CACHE_FILE for cache_ttl seconds.
 
-        # Establish the SFTP connection
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(server_address, username='forensicinvestigator', key_filename=private_key_path, port=server_port)
+    Args:
+        server_address (str): The IP address or hostname of the remote server.
+        server_port (int): The port number to connect to on the remote server.
+        private_key_path (str): The path of the private key.
+        remote_path (str): The remote folder the test files are written to.
+        streams (int): The number of parallel SFTP streams.
+        duration (float): The number of seconds the streams write for.
+        cache_ttl (float): The number of seconds a cached result is reused, 0 to always measure.
 
-        sftp = ssh.open_sftp()
+    Returns:
+        float: The upload throughput in Mbps, or None if the benchmark failed.
 
-        # Start timing the upload
-        start_time = time.time()
-        #sftp.put(file_path, remote_path + os.path.basename(file_path))
-        upload_duration = time.time() - start_time
-        if upload_duration == 0:
-            upload_duration = 1
+    Example:
+        >>> sftp_upload_speed_test('192.168.0.100', 22, 'mykey', streams=4, duration=5)
+        412.5
+    """
+    cache_key = f"{server_address}:{server_port}"
+    cache = _read_json_file(SFTP_BENCHMARK_CACHE_FILE)
+    cached = cache.get(cache_key)
+    if cached and time.time() - cached['time'] < cache_ttl:
+        print(f"SFTP benchmark {cache_key}: {cached['mbps']:.1f} Mbps (measured "
+              f"{format_duration(time.time() - cached['time'])} ago)")
+        return cached['mbps']
 
-        # Close the SFTP connection
-        sftp.close()
-        ssh.close()
+    try:
+        ssh = get_ssh(server_address, server_port, private_key_path)
+        total_bytes, elapsed = measure_sftp_upload(ssh, remote_path, os.urandom(SFTP_BENCHMARK_PAYLOAD),
+                                                   streams, duration)
     except Exception as e:
         print("ERROR IN sftp_upload_speed_test")
         print(str(e))
+        return None
 
+    upload_speed_mbps = total_bytes * 8 / elapsed / 1000000
+    print(f"SFTP benchmark {cache_key}: {total_bytes / 1048576:.1f} MB in {elapsed:.2f} s "
+          f"over {streams} streams, {upload_speed_mbps:.1f} Mbps")
+    cache = _read_json_file(SFTP_BENCHMARK_CACHE_FILE)
+    cache[cache_key] = {'mbps': upload_speed_mbps, 'time': time.time(), 'streams': streams,
+                        'bytes': total_bytes, 'seconds': elapsed}
+    _write_json_file(SFTP_BENCHMARK_CACHE_FILE, cache)
+    return upload_speed_mbps
 
 
-    # Calculate the upload speed
-    upload_speed_mbps = (file_size_mb * 8) / upload_duration  # in Mbps
-    return upload_speed_mbps
+def ssh_tuning_payload(sample_file=None, size=SSH_TUNING_PAYLOAD):
+    """
+    Returns the data written while calibrating, so compression is judged on realistic content.
+
+    A block from the middle of the sample file, usually the forensic image, is used when it can be read.
+    Otherwise the payload is half pseudo-random and half repetitive data.
+    """
+    try:
+        with open(sample_file, 'rb') as f:
+            f.seek(max(os.path.getsize(sample_file) // 2 - size // 2, 0))
+            data = f.read(size)
+        if len(data) == size:
+            return data
+    except (OSError, TypeError):
+        pass
+    return os.urandom(size // 2) + b"forensicvm " * ((size - size // 2) // 11 + 1)
+
+
+def calibrate_ssh(server_address, server_port, private_key_path, remote_path="/forensicVM/mnt/tmp/",
+                  candidates=SSH_TUNING_CANDIDATES, duration=SSH_TUNING_DURATION, sample_file=None,
+                  progress=None, config_file=None):
+    """
+    Benchmarks the cipher, MAC and compression combinations against a server and keeps the fastest.
+
+    Each candidate gets its own transport and writes the payload over one pipelined SFTP stream for
+    `duration` seconds, since encryption and compression run on the transport thread. The winner is
+    stored per server in the configuration file and applied to the shared transport of the server,
+    so every later connection negotiates it.
+
+    Args:
+        server_address (str): The IP address or hostname of the remote server.
+        server_port (int): The port number to connect to on the remote server.
+        private_key_path (str): The path of the private key.
+        remote_path (str): The remote folder the test files are written to.
+        candidates (tuple): The combinations to try, see SSH_TUNING_CANDIDATES.
+        duration (float): The number of seconds each combination is benchmarked for.
+        sample_file (str): Optional file the payload is taken from, usually the forensic image.
+        progress (callable): Optional progress(candidates_done, candidate_count) callback.
+                             Returning False cancels the calibration.
+        config_file (str): The configuration file. Defaults to config.json next to the executable.
+
+    Returns:
+        tuple: The winning combination, or None if every one failed, and the list of every supported
+               combination with its throughput in Mbps ('mbps' is None when it failed).
+
+    Raises:
+        TransferCancelled: If the progress callback cancelled the calibration.
+
+    Example:
+        >>> best, results = calibrate_ssh('192.168.0.100', 22, 'mykey')
+        >>> best
+        {'cipher': 'aes128-gcm@openssh.com', 'mac': None, 'compress': False, 'mbps': 612.4}
+    """
+    unsupported = [candidate for candidate in candidates if not ssh_tuning_supported(candidate)]
+    for candidate in unsupported:
+        print(f"SSH tuning {candidate['cipher']} {candidate['mac'] or ''}: not supported by paramiko "
+              f"{paramiko.__version__}, skipped")
+    candidates = [candidate for candidate in candidates if candidate not in unsupported]
+
+    payload = ssh_tuning_payload(sample_file)
+    results = []
+    for index, candidate in enumerate(candidates):
+        if progress and progress(index, len(candidates)) is False:
+            raise TransferCancelled()
+        manager = SSHTransportManager(server_address, server_port, private_key_path, tuning=candidate)
+        try:
+            total_bytes, elapsed = measure_sftp_upload(manager, remote_path, payload, 1, duration)
+            mbps = total_bytes * 8 / elapsed / 1000000
+        except Exception as e:
+            print(f"SSH tuning {candidate}: {e}")
+            mbps = None
+        finally:
+            manager.close()
+        results.append(dict(candidate, mbps=mbps))
+        print(f"SSH tuning {candidate['cipher']} {candidate['mac'] or ''} "
+              f"compress={candidate['compress']}: {mbps if mbps is None else f'{mbps:.1f} Mbps'}")
+    if progress:
+        progress(len(candidates), len(candidates))
+
+    measured = [result for result in results if result['mbps'] is not None]
+    if not measured:
+        return None, results
+    best = max(measured, key=lambda result: result['mbps'])
+    save_ssh_tuning(server_address, server_port, best, config_file)
+    get_ssh(server_address, server_port, private_key_path).set_tuning(best)
+    return best, results
+
+
+def format_ssh_tuning(results):
+    """
+    Formats the results of calibrate_ssh() as a table, one combination per line.
+    """
+    lines = []
+    for result in sorted(results, key=lambda result: -(result['mbps'] or 0)):
+        speed = "failed" if result['mbps'] is None else f"{result['mbps']:.1f} Mbps"
+        compression = "zlib" if result['compress'] else "none"
+        lines.append(f"{result['cipher']:<24} {result['mac'] or 'implicit':<32} {compression:<5} {speed}")
+    return "\n".join(lines)
+
 
 def run_openssh(server_address, server_port, windows_share,
             share_login, share_password, replacement_share,
-            forensic_image_path, uuid_folder, copy):
+            forensic_image_path, uuid_folder, copy, window=None):
     """
-    Runs the OpenSSH command to connect to a remote server and execute a command
-    that converts the local forensic image by accessing it by samba over reverse ssh.
+    Connects to a remote server and executes a command that converts the local forensic image
+    by accessing it by samba over an in-process reverse tunnel. Waits until the command finishes.
 
     Args:
         server_address (str): The IP address or hostname of the remote server.
@@ -2205,9 +6314,11 @@ def run_openssh(server_address, server_port, windows_share,
         forensic_image_path (str): The path of the forensic image on the remote server.
         uuid_folder (str): The UUID folder name for the conversion process.
         copy (bool): Flag indicating whether to copy the forensic image.
+        window (sg.Window): The window kept refreshed while the command runs, so its output, the
+                            tunnel counters and a conversion progress window are shown live. Defaults to None.
 
     Returns:
-        None
+        bool: True if the conversion command succeeded, False otherwise.
 
     Example:
         >>> run_openssh(
@@ -2232,18 +6343,10 @@ def run_openssh(server_address, server_port, windows_share,
         private_key_path = os.path.expanduser(executable_path("mykey"))
 
         upload_speed = sftp_upload_speed_test(server_address, server_port, private_key_path,
-                                              remote_path="/forensicVM/mnt/tmp/", file_size_mb = 100)
+                                              remote_path="/forensicVM/mnt/tmp/")
         print(f"Upload Speed: {upload_speed} Mbps")
 
-        # Connect to remote host using SSH key authentication
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(server_address, username='forensicinvestigator', key_filename=private_key_path, port=server_port)
-        # Get an available remote port
-        transport = ssh.get_transport()
-        remote_port = transport.request_port_forward("", 0)
-        # Close the connection
-        ssh.close()
+        ssh = get_ssh(server_address, server_port, private_key_path)
 
         # Replacing the common path with an empty string and replacing backslashes with forward slashes
         new_path = forensic_image_path.replace(replacement_share, "").replace("\\", "/")
@@ -2255,9 +6358,9 @@ def run_openssh(server_address, server_port, windows_share,
         print(temp)
         samba_host, samba_share = temp.split("\\")
 
-        # Creating the port forwarding string and assigning it to result
-        reverse_ssh_foward = f"-R {remote_port}:{samba_host}:445"
-        print(reverse_ssh_foward)
+        # Forward a free remote port to the local samba port, in process over the shared SSH transport
+        tunnel = ReverseTunnel(ssh, samba_host, SMB_PORT)
+        remote_port = tunnel.start()
 
 
         # Prepare the command to run the convertor
@@ -2270,25 +6373,209 @@ def run_openssh(server_address, server_port, windows_share,
                   f'--copy {copy} ' \
                   f'--share-port {remote_port}'
 
-        ssh_command ="start /wait cmd /c " + resource_path("ssh.exe") + " -t -i " + executable_path("mykey")\
-                     + " -oStrictHostKeyChecking=no forensicinvestigator@" \
-                     + str(server_address)\
-                     + " -p " + str(server_port)\
-                     + " " + reverse_ssh_foward + " " + command
-        
-        #ssh_command ="start /wait cmd /c " + os.path.dirname(os.path.abspath(__file__))+ "\\ssh.exe -t -i " \
-        #             + os.path.dirname(os.path.abspath(__file__))+ \
-        #             "\\mykey -oStrictHostKeyChecking=no forensicinvestigator@" \
-        #             + str(server_address)\
-        #             + " -p " + str(server_port)\
-        #             + " " + reverse_ssh_foward + " " + command
+        try:
+            total_size = sum(os.path.getsize(path) for path in image_segments(forensic_image_path))
+        except OSError:
+            total_size = None
 
-        print(ssh_command)
-        # Run the command redirecting local samba port to a free open port remote\ly
-        os.system(ssh_command)
+        # Run the convertor, the tunnel is only needed until it finishes
+        try:
+            exit_status = run_conversion(ssh, command, uuid_folder, window, total_size)
+            print(f"run-or-convert.sh exited with status {exit_status}")
+        finally:
+            tunnel.stop()
+        return exit_status == 0
+
+    except Exception as e:
+        print(e)
+        return False
+
+def image_segments(image_path):
+    """
+    Returns the files of a forensic image, with every segment of a split image in order.
+
+    EnCase style segments (image.E01, image.E02, ... image.EAA) and raw split segments (image.001,
+    image.002, ...) are found next to the first one. Any other image is a single file.
+
+    Args:
+        image_path (str): The path of the image, or of its first segment.
+
+    Returns:
+        list: The paths of the segments.
+
+    Example:
+        >>> image_segments('C:\\\\images\\\\disk.E01')
+        ['C:\\\\images\\\\disk.E01', 'C:\\\\images\\\\disk.E02']
+    """
+    folder, name = os.path.split(image_path)
+    stem, ext = os.path.splitext(name)
+    ewf = re.fullmatch(r'\.([EeLlSs]x?)\d\d', ext)
+    if ewf:
+        pattern = re.compile(re.escape(stem) + r'\.' + re.escape(ewf.group(1)) + r'[0-9A-Za-z]{2}', re.IGNORECASE)
+    elif re.fullmatch(r'\.\d{3}', ext):
+        pattern = re.compile(re.escape(stem) + r'\.\d{3}')
+    else:
+        return [image_path]
+    names = [entry for entry in os.listdir(folder or '.') if pattern.fullmatch(entry)]
+    # E01..E99 come before EAA..EZZ
+    names.sort(key=lambda entry: (not entry[-2:].isdigit(), entry.upper()))
+    return [os.path.join(folder, entry) for entry in names]
+
+
+def _sftp_makedirs(sftp, remote_dir):
+    path = ''
+    for part in remote_dir.strip('/').split('/'):
+        path += '/' + part
+        try:
+            sftp.stat(path)
+        except IOError:
+            sftp.mkdir(path)
+
+
+def sftp_push_image(ssh, image_files, remote_dir, progress=None, streams=SFTP_PUSH_STREAMS,
+                    block_size=SFTP_PUSH_BLOCK_SIZE):
+    """
+    Pushes the files of a forensic image to a folder of the server over SFTP.
+
+    The files are written with pipelined SFTP writes, so the throughput is not bound by the round trip,
+    and up to `streams` files are pushed at once, each on its own SFTP channel of the shared SSH transport.
+    A file already on the server with the same size is skipped and a shorter one is resumed from its end.
+
+    Args:
+        ssh (SSHTransportManager): The manager of the server connection.
+        image_files (list): The local paths of the files, usually from image_segments().
+        remote_dir (str): The remote folder, created when missing.
+        progress (callable): Optional progress(bytes_pushed, total_size) callback, called on this thread.
+                             Returning False cancels the push.
+        streams (int): The maximum number of files pushed at the same time.
+        block_size (int): The number of bytes read from the local file at a time.
+
+    Returns:
+        list: The remote paths of the files, in the order of image_files.
+
+    Raises:
+        TransferCancelled: If the progress callback cancelled the push. It can be resumed.
+
+    Example:
+        >>> sftp_push_image(get_ssh('192.168.0.100', 22), ['disk.E01', 'disk.E02'], '/forensicVM/mnt/tmp/uuid')
+        ['/forensicVM/mnt/tmp/uuid/disk.E01', '/forensicVM/mnt/tmp/uuid/disk.E02']
+    """
+    remote_dir = remote_dir.rstrip('/')
+    remote_files = [f"{remote_dir}/{os.path.basename(path)}" for path in image_files]
+    sizes = [os.path.getsize(path) for path in image_files]
+    total_size = sum(sizes)
+    pushed = [0]
+    lock = threading.Lock()
+    cancel = threading.Event()
+
+    sftp = ssh.open_sftp()
+    try:
+        _sftp_makedirs(sftp, remote_dir)
+        offsets = []
+        for remote_file, size in zip(remote_files, sizes):
+            try:
+                remote_size = sftp.stat(remote_file).st_size
+            except IOError:
+                remote_size = 0
+            offsets.append(remote_size if remote_size <= size else 0)
+    finally:
+        sftp.close()
+    pushed[0] = sum(offsets)
+
+    def push_file(local_file, remote_file, offset, size):
+        if offset == size:
+            return
+        channel_sftp = ssh.open_sftp()
+        try:
+            with open(local_file, 'rb') as source, channel_sftp.open(remote_file, 'r+b' if offset else 'wb') as target:
+                target.set_pipelined(True)
+                source.seek(offset)
+                target.seek(offset)
+                while True:
+                    if cancel.is_set():
+                        raise TransferCancelled()
+                    data = source.read(block_size)
+                    if not data:
+                        break
+                    target.write(data)
+                    with lock:
+                        pushed[0] += len(data)
+        finally:
+            channel_sftp.close()
+
+    with ThreadPoolExecutor(max_workers=streams, thread_name_prefix="SftpPush") as executor:
+        futures = [executor.submit(push_file, *job) for job in zip(image_files, remote_files, offsets, sizes)]
+        try:
+            not_done = futures
+            while not_done:
+                done, not_done = wait(not_done, timeout=DOWNLOAD_PROGRESS_INTERVAL)
+                for future in done:
+                    # Raises the error of a failed file
+                    future.result()
+                if progress and progress(pushed[0], total_size) is False:
+                    raise TransferCancelled()
+        except BaseException:
+            cancel.set()
+            for future in futures:
+                future.cancel()
+            raise
+
+    if progress:
+        progress(total_size, total_size)
+    return remote_files
+
+
+def run_sftp_push(server_address, server_port, forensic_image_path, uuid_folder, copy, window=None):
+    """
+    Pushes the forensic image to the server over SFTP, then converts the copy that is now local to the server.
+
+    The image is written to SFTP_PUSH_REMOTE_DIR/<uuid_folder>/ and run-or-convert.sh is called with
+    --local-image-path instead of the windows share arguments, so no Samba share or tunnel is needed.
+
+    Args:
+        server_address (str): The IP address or hostname of the remote server.
+        server_port (int): The port number to connect to on the remote server.
+        forensic_image_path (str): The local path of the forensic image, or of its first segment.
+        uuid_folder (str): The UUID folder name for the conversion process.
+        copy (str): The conversion mode passed to run-or-convert.sh.
+        window (sg.Window): The window kept refreshed while the conversion runs. Defaults to None.
+
+    Returns:
+        bool: True if the image was pushed and the conversion command succeeded, False otherwise.
+
+    Example:
+        >>> run_sftp_push('192.168.0.100', 22, 'C:\\\\images\\\\disk.E01', '12345678', 'copy', window)
+        True
+    """
+    try:
+        private_key_path = os.path.expanduser(executable_path("mykey"))
+        ssh = get_ssh(server_address, server_port, private_key_path)
+
+        image_files = image_segments(forensic_image_path)
+        print(f"Pushing {len(image_files)} file(s) of {forensic_image_path} over SFTP")
+        start_time = time.monotonic()
+        progress = ProgressReporter("Pushing forensic image", verb="Uploaded")
+        try:
+            remote_files = sftp_push_image(ssh, image_files, f"{SFTP_PUSH_REMOTE_DIR}/{uuid_folder}", progress)
+        finally:
+            progress.close()
+        print(f"Image pushed in {format_duration(time.monotonic() - start_time)}")
 
+        command = f'sudo /forensicVM/bin/run-or-convert.sh ' \
+                  f'--local-image-path {remote_files[0]} ' \
+                  f'--folder-uuid {uuid_folder} ' \
+                  f'--copy {copy}'
+        total_size = sum(os.path.getsize(path) for path in image_files)
+        exit_status = run_conversion(ssh, command, uuid_folder, window, total_size)
+        print(f"run-or-convert.sh exited with status {exit_status}")
+        return exit_status == 0
+    except TransferCancelled:
+        print("Image push cancelled, it will resume on the next conversion")
+        return False
     except Exception as e:
         print(e)
+        return False
+
 
 def start_server_remotessh(server_address, server_port):
     """
@@ -2380,7 +6667,8 @@ def debug_remotessh(server_address, server_port, uuid_folder):
 
 def ssh_background_session(server_address, server_port, windows_share):
     """
-    Starts a background SSH session with port forwarding to access a Windows share.
+    Starts a background SSH session with an in-process reverse tunnel to access a Windows share.
+    The tunnel stays open until the session command exits or the client closes.
 
     Args:
         server_address (str): The IP address or hostname of the remote server.
@@ -2405,15 +6693,7 @@ def ssh_background_session(server_address, server_port, windows_share):
     try:
         private_key_path = os.path.expanduser(executable_path("mykey"))
 
-        # Connect to remote host using SSH key authentication
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(server_address, username='forensicinvestigator', key_filename=private_key_path, port=server_port)
-        # Get an available remote port
-        transport = ssh.get_transport()
-        remote_port = transport.request_port_forward("", 0)
-        # Close the connection
-        ssh.close()
+        ssh = get_ssh(server_address, server_port, private_key_path)
 
 
 
@@ -2423,16 +6703,19 @@ def ssh_background_session(server_address, server_port, windows_share):
         print(temp)
         samba_host, samba_share = temp.split("\\")
 
-        # Creating the port forwarding string and assigning it to result
-        reverse_ssh_foward = f"-R {remote_port}:{samba_host}:445"
+        # Forward a free remote port to the local samba port, in process over the shared SSH transport
+        tunnel = ReverseTunnel(ssh, samba_host, SMB_PORT)
+        remote_port = tunnel.start()
 
-        ssh_command ="start cmd /c " + resource_path("ssh.exe")+ " -t -i "  + executable_path("mykey") + \
-                                                                                   "-oStrictHostKeyChecking=no " \
-                                                                                   "forensicinvestigator@" \
-                     + str(server_address)\
-                     + " -p " + str(server_port)\
-                     + " " + reverse_ssh_foward + " " + command
-        os.system(ssh_command)
+        def run_and_stop():
+            try:
+                run_remote_command(ssh, command)
+            except Exception as e:
+                print(e)
+            finally:
+                tunnel.stop()
+
+        threading.Thread(target=run_and_stop, name="ssh_background_session", daemon=True).start()
         return remote_port
     except Exception as e:
         print(e)
@@ -2467,18 +6750,10 @@ def test_ssh(address, port):
         ###with open(public_key_path, "w") as public_key_file:
         ###public_key_file.write(f"{ssh_key.get_name()} {ssh_key.get_base64()}")
 
-        # Connect to remote host using SSH key authentication
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(address, username='forensicinvestigator', key_filename=private_key_path, port=port)
-
-        # Run a command on the remote host and print the output
-        stdin, stdout, stderr = ssh.exec_command('ls -al')
+        # Run a command on the remote host over the shared SSH transport and print the output
+        stdin, stdout, stderr = get_ssh(address, port, private_key_path).exec_command('ls -al')
         for line in stdout:
             print(line.strip())
-
-        # Close the SSH connection
-        ssh.close()
         return True
     except Exception as e:
         print(e)
@@ -2489,56 +6764,400 @@ def test_ssh(address, port):
             with open(public_key_path, "w") as public_key_file:
                 public_key_file.write(f"{ssh_key.get_name()} {ssh_key.get_base64()}")
 
-        # Save public key to disk
+        # Save public key to disk
+
+        return False
+
+
+
+
+class CommandOutput:
+    """
+    Fixed-capacity ring buffer of the output of a remote command, with stdout and stderr kept apart.
+
+    Each stream keeps its last `capacity` characters, older output is dropped and counted. The text
+    written since the last call to take_pending() is queued for the console, so a redraw only appends
+    what is new instead of rewriting the whole console.
+
+    Args:
+        capacity (int): The number of characters kept per stream.
+
+    Example:
+        >>> output = CommandOutput(capacity=10)
+        >>> output.write('stdout', 'hello world')
+        >>> output.text('stdout')
+        'ello world'
+    """
+
+    STREAMS = ('stdout', 'stderr')
+
+    def __init__(self, capacity=COMMAND_OUTPUT_CAPACITY):
+        self.capacity = capacity
+        self.exit_status = None
+        self.dropped = {stream: 0 for stream in self.STREAMS}
+        self._chunks = {stream: deque() for stream in self.STREAMS}
+        self._sizes = {stream: 0 for stream in self.STREAMS}
+        self._pending = deque()
+        self._pending_size = 0
+        self._lock = threading.Lock()
+
+    def write(self, stream, text):
+        """
+        Appends text to a stream, dropping the oldest text above the capacity.
+        """
+        if not text:
+            return
+        with self._lock:
+            chunks = self._chunks[stream]
+            chunks.append(text)
+            self._sizes[stream] += len(text)
+            while self._sizes[stream] > self.capacity:
+                excess = self._sizes[stream] - self.capacity
+                if len(chunks[0]) <= excess:
+                    self._sizes[stream] -= len(chunks[0])
+                    self.dropped[stream] += len(chunks.popleft())
+                else:
+                    chunks[0] = chunks[0][excess:]
+                    self._sizes[stream] -= excess
+                    self.dropped[stream] += excess
+
+            # A console that is not redrawn for a while only gets the last capacity characters
+            self._pending.append((stream, text))
+            self._pending_size += len(text)
+            while self._pending_size - len(self._pending[0][1]) >= self.capacity:
+                self._pending_size -= len(self._pending.popleft()[1])
+
+    def text(self, stream='stdout'):
+        """
+        Returns the text kept for a stream.
+        """
+        with self._lock:
+            return ''.join(self._chunks[stream])
+
+    def take_pending(self):
+        """
+        Returns the (stream, text) pieces written since the last call, merging consecutive pieces of a stream.
+        """
+        with self._lock:
+            pending, self._pending, self._pending_size = self._pending, deque(), 0
+        merged = []
+        for stream, text in pending:
+            if merged and merged[-1][0] == stream:
+                merged[-1] = (stream, merged[-1][1] + text)
+            else:
+                merged.append((stream, text))
+        return merged
+
+
+def run_command_ssh(ssh, window2, cmd, capacity=COMMAND_OUTPUT_CAPACITY, refresh_rate=COMMAND_REFRESH_RATE,
+                    get_pty=False, refresh=None, on_output=None):
+    """
+    Executes a command on a remote host via SSH and streams its output to the console.
+
+    The channel is waited on with select(), so the loop sleeps until output arrives, and each wake-up
+    reads up to COMMAND_READ_SIZE bytes. The output is kept in a CommandOutput ring buffer and the
+    console is redrawn at most refresh_rate times per second with only the new text, stderr in red.
+
+    Args:
+        ssh (paramiko.SSHClient): The SSH client object connected to the remote host, or the SSHTransportManager of the host.
+        window2 (sg.Window): The PySimpleGUI window whose -OUTPUT- element shows the output. None prints it instead.
+        cmd (str): The command to execute on the remote host.
+        capacity (int): The number of characters of each stream kept in the ring buffer.
+        refresh_rate (float): The maximum number of console redraws per second.
+        get_pty (bool): Run the command in a terminal, like ssh -t. The terminal merges stderr into stdout.
+        refresh (callable): Optional refresh(window2) called before each redraw, to update other elements.
+        on_output (callable): Optional on_output(stream, text) called with each piece of output as it is read.
+
+    Returns:
+        CommandOutput: The last output of each stream, with the exit status of the command in exit_status.
+
+    Example:
+        >>> window = sg.Window("Output Window", layout)
+        >>> run_command_ssh(get_ssh('192.168.0.100', 22), window, "ls -al").exit_status
+        0
+
+    Raises:
+        paramiko.SSHException: If the command could not be started.
+
+    """
+    stdin, stdout, stderr = ssh.exec_command(cmd, get_pty=get_pty)
+    channel = stdout.channel
+    output = CommandOutput(capacity)
+    decoders = {stream: codecs.getincrementaldecoder("utf-8")(errors="replace") for stream in CommandOutput.STREAMS}
+    interval = 1.0 / refresh_rate
+    last_redraw = time.monotonic()
+
+    def redraw():
+        if window2 is None:
+            for stream, text in output.take_pending():
+                print(text, end="")
+            return
+        if refresh is not None:
+            refresh(window2)
+        for stream, text in output.take_pending():
+            window2['-OUTPUT-'].update(text, append=True,
+                                       text_color_for_value='red' if stream == 'stderr' else None)
+        window2.refresh()
+
+    def receive(stream, data, final=False):
+        text = decoders[stream].decode(data, final=final)
+        output.write(stream, text)
+        if on_output is not None and text:
+            on_output(stream, text)
+
+    while True:
+        if not channel.closed:
+            select.select([channel], [], [], interval)
+        while channel.recv_ready():
+            receive('stdout', channel.recv(COMMAND_READ_SIZE))
+        while channel.recv_stderr_ready():
+            receive('stderr', channel.recv_stderr(COMMAND_READ_SIZE))
+        finished = (channel.eof_received or channel.closed) \
+            and not channel.recv_ready() and not channel.recv_stderr_ready()
+        if finished or time.monotonic() - last_redraw >= interval:
+            for stream in CommandOutput.STREAMS:
+                receive(stream, b"", final=finished)
+            redraw()
+            last_redraw = time.monotonic()
+        if finished:
+            break
+
+    output.exit_status = channel.recv_exit_status()
+    return output
+
+
+class ConversionProgress:
+    """
+    Parses the output of run-or-convert.sh into progress events and phase timings.
+
+    Recognised progress lines are the ones of qemu-img convert -p ("(42.00/100%)"), dd status=progress
+    ("1073741824 bytes (1.1 GB, 1.0 GiB) copied, 3 s, 358 MB/s") and rsync --info=progress2
+    ("1,234,567  12%  1.23MB/s  0:01:02"). qemu-img progress is the "convert" phase, dd and rsync
+    progress the "copy" phase. The time before the first progress line is the "prepare" phase and the
+    output after a phase reached 100% is the "finish" phase. Output may arrive in arbitrary pieces,
+    lines are split on both newlines and the carriage returns the progress meters use.
+
+    Args:
+        total_size (int): The size of the image in bytes, to turn percentages into bytes. None if unknown.
+        smoothing (float): The weight of the newest sample in the throughput moving average.
+
+    Example:
+        >>> progress = ConversionProgress(total_size=1073741824)
+        >>> progress.feed("    (50.00/100%)\\r")
+        [{'phase': 'convert', 'percent': 50.0, 'bytes_done': 536870912}]
+    """
+
+    def __init__(self, total_size=None, smoothing=PROGRESS_SMOOTHING, now=None):
+        self.total_size = total_size
+        self.smoothing = smoothing
+        self.phase = None
+        self.percent = None
+        self.bytes_done = None
+        self.throughput = None
+        self.percent_rate = None
+        self.samples = deque(maxlen=CONVERSION_CHART_POINTS)
+        self.phase_times = OrderedDict()
+        self._phase_start = None
+        self._last = None
+        self._last_sample = None
+        self._partial = ""
+        self._enter('prepare', time.monotonic() if now is None else now)
+
+    def _enter(self, phase, now):
+        if self.phase is not None:
+            self.phase_times[self.phase] = self.phase_times.get(self.phase, 0.0) + now - self._phase_start
+        self.phase = phase
+        self._phase_start = now
+        self.percent = None
+        self.bytes_done = None
+        self.percent_rate = None
+        self._last = None
+
+    def _parse(self, line):
+        match = CONVERSION_QEMU_PROGRESS.search(line)
+        if match:
+            return 'convert', float(match.group(1)), None
+        match = CONVERSION_DD_PROGRESS.search(line)
+        if match:
+            return 'copy', None, int(match.group(1))
+        match = CONVERSION_RSYNC_PROGRESS.search(line)
+        if match:
+            return 'copy', float(match.group(2)), int(match.group(1).replace(',', ''))
+        return None
+
+    def feed(self, text, now=None):
+        """
+        Parses a piece of output.
+
+        Returns:
+            list: One {'phase', 'percent', 'bytes_done'} event per progress line in the piece.
+        """
+        now = time.monotonic() if now is None else now
+        lines = re.split(r'[\r\n]', self._partial + text)
+        self._partial = lines.pop()
+        events = []
+        for line in lines:
+            parsed = self._parse(line)
+            if parsed is None:
+                if line.strip() and self.percent is not None and self.percent >= 100 and self.phase != 'finish':
+                    self._enter('finish', now)
+                continue
+            phase, percent, bytes_done = parsed
+            if phase != self.phase:
+                self._enter(phase, now)
+            if bytes_done is None and percent is not None and self.total_size:
+                bytes_done = int(self.total_size * percent / 100)
+            if percent is None and bytes_done is not None and self.total_size:
+                percent = min(bytes_done * 100.0 / self.total_size, 100.0)
+            self._update_rates(now, percent, bytes_done)
+            self.percent = percent
+            self.bytes_done = bytes_done
+            events.append({'phase': phase, 'percent': percent, 'bytes_done': bytes_done})
+        return events
+
+    def _update_rates(self, now, percent, bytes_done):
+        if self._last is not None and now > self._last[0]:
+            elapsed = now - self._last[0]
+            if bytes_done is not None and self._last[2] is not None:
+                rate = (bytes_done - self._last[2]) / elapsed
+                self.throughput = rate if self.throughput is None else \
+                    self.smoothing * rate + (1 - self.smoothing) * self.throughput
+            if percent is not None and self._last[1] is not None:
+                rate = (percent - self._last[1]) / elapsed
+                self.percent_rate = rate if self.percent_rate is None else \
+                    self.smoothing * rate + (1 - self.smoothing) * self.percent_rate
+        self._last = (now, percent, bytes_done)
+        if self.throughput is not None and (self._last_sample is None
+                                            or now - self._last_sample >= CONVERSION_SAMPLE_INTERVAL):
+            self.samples.append(self.throughput)
+            self._last_sample = now
+
+    def eta(self):
+        """
+        Returns the estimated number of seconds left in the current phase, or None when unknown.
+        """
+        if self.percent is None or not self.percent_rate or self.percent_rate <= 0:
+            return None
+        return max(100 - self.percent, 0) / self.percent_rate
+
+    def message(self):
+        """
+        Returns the status line shown under the progress bar.
+        """
+        parts = []
+        if self.percent is not None:
+            parts.append(f"{self.percent:.1f}%")
+        if self.bytes_done is not None:
+            parts.append(f"{self.bytes_done / 1048576:.0f} MB")
+        if self.throughput:
+            parts.append(f"{self.throughput / 1048576:.1f} MB/s")
+        eta = self.eta()
+        if eta is not None:
+            parts.append(f"{format_duration(eta)} left")
+        return ", ".join(parts)
+
+    def finish(self, now=None):
+        """
+        Ends the current phase.
+
+        Returns:
+            OrderedDict: The number of seconds spent in each phase, in the order they ran.
+        """
+        self._enter(None, time.monotonic() if now is None else now)
+        return self.phase_times
+
+
+def conversion_progress_window(title):
+    """
+    Creates the window showing the phase, progress bar, ETA and throughput chart of a conversion.
+    """
+    layout = [
+        [sg.Text("Preparing", key="conversion_phase", size=(60, 1))],
+        [sg.ProgressBar(1000, orientation='h', size=(45, 20), key="conversion_bar")],
+        [sg.Text("", key="conversion_status", size=(60, 1))],
+        [sg.Graph(CONVERSION_CHART_SIZE, (0, 0), (CONVERSION_CHART_POINTS, 1), key="conversion_chart",
+                  background_color='black')],
+    ]
+    return sg.Window(title, layout, finalize=True, keep_on_top=True)
+
+
+def draw_conversion_progress(progress_window, progress):
+    """
+    Redraws a window created by conversion_progress_window() from a ConversionProgress.
+    """
+    progress_window.read(timeout=0)
+    progress_window['conversion_phase'].update(f"Phase: {progress.phase}")
+    progress_window['conversion_bar'].update(int((progress.percent or 0) * 10))
+    progress_window['conversion_status'].update(progress.message())
+
+    chart = progress_window['conversion_chart']
+    chart.erase()
+    samples = list(progress.samples)
+    peak = max(samples, default=0)
+    if peak > 0:
+        points = [(index, sample / peak * 0.9) for index, sample in enumerate(samples)]
+        for start, end in zip(points, points[1:]):
+            chart.draw_line(start, end, color='lime')
+        chart.draw_text(f"peak {peak / 1048576:.1f} MB/s", (CONVERSION_CHART_POINTS // 2, 0.95), color='white')
 
-        return False
 
+def record_conversion(uuid_folder, exit_status, progress, log_file=None):
+    """
+    Appends the phase timings of a conversion to CONVERSION_LOG_FILE, under the VM UUID.
 
+    Returns:
+        dict: The recorded entry.
+    """
+    log_file = log_file or CONVERSION_LOG_FILE
+    entry = {
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'exit_status': exit_status,
+        'phases': dict(progress.phase_times),
+        'total_size': progress.total_size,
+    }
+    log = _read_json_file(log_file)
+    log.setdefault(str(uuid_folder), []).append(entry)
+    _write_json_file(log_file, log)
+    return entry
 
 
-def run_command_ssh(ssh, window2, cmd):
+def run_conversion(ssh, command, uuid_folder, window=None, total_size=None):
     """
-    Executes a command on a remote host via SSH and prints the output.
+    Runs run-or-convert.sh over the shared SSH transport, with its progress parsed in real time.
+
+    The output goes to the output console like any remote command. It is also parsed by a
+    ConversionProgress that drives a progress window with the phase, progress bar, ETA and a throughput
+    chart. The phase timings are printed and recorded by record_conversion() when the command exits.
 
     Args:
-        ssh (paramiko.SSHClient): The SSH client object connected to the remote host.
-        window2 (sg.Window): The PySimpleGUI window object to display the output.
-        cmd (str): The command to execute on the remote host.
+        ssh (SSHTransportManager): The manager of the server connection.
+        command (str): The conversion command.
+        uuid_folder (str): The UUID of the VM, the key of the recorded timings.
+        window (sg.Window): The main window. None runs without any window, for use outside the GUI thread.
+        total_size (int): The size of the forensic image in bytes, if known.
 
     Returns:
-        None
-
-    Example:
-        >>> ssh = paramiko.SSHClient()
-        >>> # Connect to the remote host...
-        >>> window = sg.Window("Output Window", layout)
-        >>> run_command_ssh(ssh, window, "ls -al")
+        int: The exit status of the command.
+    """
+    progress = ConversionProgress(total_size)
+    progress_window = conversion_progress_window("Converting forensic image") if window is not None else None
 
-    Raises:
-        None
+    def refresh(main_window):
+        update_tunnel_stats(main_window)
+        draw_conversion_progress(progress_window, progress)
 
-    """
-    # Run a command on the remote host and print the output
-    # stdin, stdout, stderr = ssh.exec_command("sudo /forensicVM/bin/forensicv2v.sh")
-    stdin, stdout, stderr = ssh.exec_command(cmd)
-    while not stdout.channel.exit_status_ready():
-
-        # show command output in real time
-        output = ""
-        while stdout.channel.recv_ready():
-            output += stdout.channel.recv(1024).decode("utf-8")
-            print(output)
-            # window2.read()
-            current_output = window2['-OUTPUT-'].get()
-            window2['-OUTPUT-'].update(current_output+output, text_color='white')
-
-        output = ""
-        while stderr.channel.recv_stderr_ready():
-            output += stderr.channel.recv_stderr(1024).decode("utf-8")
-            print(output)
-            # window2.read()
-            current_output = window2['-OUTPUT-'].get()
-            window2['-OUTPUT-'].update(current_output+"e:"+output, text_color='white')
+    try:
+        output = run_command_ssh(ssh, window, command, get_pty=True, refresh=refresh if window is not None else None,
+                                 on_output=lambda stream, text: progress.feed(text))
+    finally:
+        if progress_window is not None:
+            progress_window.close()
+
+    phase_times = progress.finish()
+    print("Conversion phases: " + ", ".join(f"{phase} {format_duration(seconds)}"
+                                            for phase, seconds in phase_times.items()))
+    record_conversion(uuid_folder, output.exit_status, progress)
+    return output.exit_status
 
 def test_windows_share(server_address, username, password):
     """
@@ -2624,6 +7243,29 @@ def handle_file_browse(event, values, window):
     window['-UPLOAD-'].update(disabled=False)
 
 
+def format_snapshot_list(snapshots):
+    """
+    Formats the snapshots returned by get_snapshot_list() for the snapshot list of the form.
+
+    Args:
+        snapshots (list): The snapshot dictionaries with the 'tag' and 'vm_size' keys.
+
+    Returns:
+        list: A list of snapshot information.
+
+    """
+    snapshot_info_list = []
+
+    for snapshot in snapshots or []:
+        snapshot_tag = snapshot.get('tag')
+        vm_size = snapshot.get('vm_size')
+        snapshot_info = f"({snapshot_tag}) - {vm_size} MB"
+        snapshot_info_list.append(snapshot_info)
+        print(snapshot_info)
+
+    return snapshot_info_list
+
+
 def list_snapshots(forensic_api, uuid_folder, web_server_address):
     """
     List the snapshots associated with a forensic VM.
@@ -2637,19 +7279,9 @@ def list_snapshots(forensic_api, uuid_folder, web_server_address):
         list: A list of snapshot information.
 
     """
-    snapshot_info_list = []
-
     try:
         snapshots = get_snapshot_list(forensic_api, uuid_folder, web_server_address)
-
-        for snapshot in snapshots:
-            snapshot_tag = snapshot.get('tag')
-            vm_size = snapshot.get('vm_size')
-            snapshot_info = f"({snapshot_tag}) - {vm_size} MB"
-            snapshot_info_list.append(snapshot_info)
-            print(snapshot_info)
-
-        return snapshot_info_list
+        return format_snapshot_list(snapshots)
 
     except Exception as e:
         print(e)
@@ -2667,6 +7299,581 @@ def validate_date(date_str):
         return False
 
 
+# Conversion job queue shared by every client started on this computer
+JOB_QUEUE_FILE = executable_path("conversion-queue.json")
+JOB_QUEUE_EVENT = '-JOB-QUEUE-'
+JOB_OUTPUT_EVENT = '-JOB-OUTPUT-'
+CONSOLE_OUTPUT_EVENT = '-CONSOLE-OUTPUT-'   # what the other worker threads print, shown by the main thread
+JOB_QUEUE_POLL_INTERVAL = 2.0       # seconds between two looks at the queue for jobs to start
+JOB_QUEUE_LOCK_TIMEOUT = 10.0       # seconds to wait for the queue file lock
+JOB_QUEUE_STALE_LOCK = 30.0         # seconds after which a lock file left behind by a dead process is removed
+JOB_STALE_AFTER = 120.0             # seconds without a heartbeat after which a running job is queued again
+JOB_DEFAULT_CONCURRENCY = 1         # conversions run at the same time on a server unless configured otherwise
+JOB_SHARE_DELAY = 10.0              # seconds for a new windows share to become reachable
+
+
+class ConversionQueue:
+    """
+    Persistent queue of conversion jobs, stored as JSON so it survives restarts of the client.
+
+    Every change reads, modifies and writes the queue file under a lock file, so the clients started by
+    the Autopsy ingest module and the GUI can share one queue. Jobs are started by claim() in order of
+    priority (highest first), then submission time, while the number of running jobs of their server
+    is below its concurrency. Pausing the queue or a job only stops new starts, a running conversion
+    is never interrupted.
+
+    A job is a dictionary with the keys 'id', 'image_path', 'case_directory', 'case_name', 'case_number',
+    'case_examiner', 'uuid_folder', 'server' ("address:port" of the SSH server), 'copy', 'priority',
+    'status' (queued, running, paused, done or failed), 'error', 'owner', 'heartbeat', 'created',
+    'started' and 'finished'.
+
+    Args:
+        path (str): The queue file. Defaults to JOB_QUEUE_FILE, next to the executable.
+        lock_timeout (float): The number of seconds to wait for the lock before raising TimeoutError.
+
+    Example:
+        >>> queue = ConversionQueue()
+        >>> job = queue.enqueue('C:\\\\images\\\\disk.E01', 'C:\\\\cases\\\\case1', 'case1', server='192.168.0.100:22')
+        >>> queue.claim('runner-1')['id'] == job['id']
+        True
+    """
+
+    def __init__(self, path=JOB_QUEUE_FILE, lock_timeout=JOB_QUEUE_LOCK_TIMEOUT):
+        self.path = path
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        lock_file = self.path + '.lock'
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return lock_file
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_file) > JOB_QUEUE_STALE_LOCK:
+                        os.remove(lock_file)
+                        continue
+                except OSError:
+                    continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"The conversion queue {self.path} is locked")
+            time.sleep(0.05)
+
+    @contextlib.contextmanager
+    def _state(self, write=True):
+        with self._lock:
+            lock_file = self._acquire()
+            try:
+                state = _read_json_file(self.path)
+                state.setdefault('jobs', [])
+                state.setdefault('paused', False)
+                state.setdefault('concurrency', {})
+                yield state
+                if write:
+                    _write_json_file(self.path, state)
+            finally:
+                os.remove(lock_file)
+
+    @staticmethod
+    def _find(state, job_id):
+        for job in state['jobs']:
+            if job['id'] == job_id:
+                return job
+        raise KeyError(f"No conversion job {job_id}")
+
+    @staticmethod
+    def _new_job(image_path, case_directory, case_name, case_number="-", case_examiner="-", server="",
+                 priority=0, copy="copy"):
+        return {
+            'id': uuid.uuid4().hex[:12],
+            'image_path': image_path,
+            'case_directory': case_directory,
+            'case_name': case_name,
+            'case_number': case_number,
+            'case_examiner': case_examiner,
+            'uuid_folder': str(string_to_uuid(image_path + case_name)),
+            'server': server,
+            'copy': copy,
+            'priority': int(priority),
+            'status': 'queued',
+            'error': "",
+            'owner': None,
+            'heartbeat': None,
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+        }
+
+    def enqueue_many(self, jobs):
+        """
+        Adds several jobs in one update of the queue file.
+
+        An image already queued, paused or running for the same case is not added twice, its existing
+        job is returned instead, so a batch can be submitted again safely.
+
+        Args:
+            jobs (list): Dictionaries of keyword arguments of enqueue().
+
+        Returns:
+            list: The job of each entry, in the same order.
+        """
+        added = []
+        with self._state() as state:
+            for arguments in jobs:
+                job = self._new_job(**arguments)
+                for existing in state['jobs']:
+                    if existing['uuid_folder'] == job['uuid_folder'] and \
+                            existing['status'] in ('queued', 'paused', 'running'):
+                        job = existing
+                        break
+                else:
+                    state['jobs'].append(job)
+                added.append(dict(job))
+        return added
+
+    def enqueue(self, image_path, case_directory, case_name, case_number="-", case_examiner="-", server="",
+                priority=0, copy="copy"):
+        """
+        Adds a conversion job to the queue.
+
+        Args:
+            image_path (str): The forensic image, or its first segment.
+            case_directory (str): The Autopsy case folder.
+            case_name (str): The Autopsy case name.
+            case_number (str): The Autopsy case number.
+            case_examiner (str): The Autopsy case examiner.
+            server (str): The SSH server doing the conversion, as "address:port".
+            priority (int): Jobs with a higher priority start first.
+            copy (str): The conversion mode passed to run-or-convert.sh.
+
+        Returns:
+            dict: The job.
+        """
+        return self.enqueue_many([dict(image_path=image_path, case_directory=case_directory, case_name=case_name,
+                                       case_number=case_number, case_examiner=case_examiner, server=server,
+                                       priority=priority, copy=copy)])[0]
+
+    def snapshot(self):
+        """
+        Returns the whole queue as {'paused': bool, 'concurrency': dict, 'jobs': list}, the jobs in the
+        order they run: running first, then by priority and submission time, finished jobs last.
+        """
+        order = {'running': 0, 'queued': 1, 'paused': 1, 'failed': 2, 'done': 2}
+        with self._state(write=False) as state:
+            state['jobs'].sort(key=lambda job: (order.get(job['status'], 3), -job['priority'], job['created']))
+            return state
+
+    def set_priority(self, job_id, priority):
+        with self._state() as state:
+            self._find(state, job_id)['priority'] = int(priority)
+
+    def set_concurrency(self, server, count):
+        """
+        Sets the number of conversions run at the same time on a server.
+        """
+        with self._state() as state:
+            state['concurrency'][server] = max(int(count), 1)
+
+    def pause(self, job_id=None):
+        """
+        Pauses a queued job, or the whole queue when job_id is None. Running jobs keep running.
+        """
+        with self._state() as state:
+            if job_id is None:
+                state['paused'] = True
+            else:
+                job = self._find(state, job_id)
+                if job['status'] == 'queued':
+                    job['status'] = 'paused'
+
+    def resume(self, job_id=None):
+        """
+        Resumes a paused job, or the whole queue when job_id is None. A failed job is queued again.
+        """
+        with self._state() as state:
+            if job_id is None:
+                state['paused'] = False
+            else:
+                job = self._find(state, job_id)
+                if job['status'] in ('paused', 'failed'):
+                    job.update(status='queued', error="")
+
+    def remove(self, job_id):
+        """
+        Removes a job that is not running.
+        """
+        with self._state() as state:
+            job = self._find(state, job_id)
+            if job['status'] == 'running':
+                raise ValueError(f"Conversion job {job_id} is running")
+            state['jobs'].remove(job)
+
+    def clear_finished(self):
+        with self._state() as state:
+            state['jobs'] = [job for job in state['jobs'] if job['status'] not in ('done', 'failed')]
+
+    def claim(self, owner, default_concurrency=JOB_DEFAULT_CONCURRENCY, now=None):
+        """
+        Marks the next job that may start as running by owner and returns it.
+
+        Running jobs whose owner has not sent a heartbeat for JOB_STALE_AFTER seconds belonged to a client
+        that was closed or crashed, they are queued again first.
+
+        Args:
+            owner (str): The runner starting the job.
+            default_concurrency (int): The concurrency of the servers without a configured one.
+            now (float): The current time. Defaults to time.time().
+
+        Returns:
+            dict: The job, or None when the queue is paused or no job may start.
+        """
+        now = time.time() if now is None else now
+        with self._state() as state:
+            running = {}
+            for job in state['jobs']:
+                if job['status'] == 'running' and now - (job['heartbeat'] or 0) > JOB_STALE_AFTER:
+                    print(f"Conversion job {job['id']} of {job['owner']} stopped responding, queued again")
+                    job.update(status='queued', owner=None)
+                if job['status'] == 'running':
+                    running[job['server']] = running.get(job['server'], 0) + 1
+            if state['paused']:
+                return None
+
+            queued = sorted((job for job in state['jobs'] if job['status'] == 'queued'),
+                            key=lambda job: (-job['priority'], job['created']))
+            for job in queued:
+                if running.get(job['server'], 0) < state['concurrency'].get(job['server'], default_concurrency):
+                    job.update(status='running', owner=owner, heartbeat=now, started=now, error="")
+                    return dict(job)
+        return None
+
+    def heartbeat(self, owner, now=None):
+        """
+        Tells the other clients that the running jobs of owner are still alive.
+        """
+        now = time.time() if now is None else now
+        with self._state() as state:
+            for job in state['jobs']:
+                if job['status'] == 'running' and job['owner'] == owner:
+                    job['heartbeat'] = now
+
+    def finish(self, job_id, ok, error=""):
+        """
+        Marks a running job as done, or as failed with an error message.
+        """
+        with self._state() as state:
+            job = self._find(state, job_id)
+            job.update(status='done' if ok else 'failed', error=error, owner=None, finished=time.time())
+
+
+def run_queued_job(job, config_file=None):
+    """
+    Converts the image of a queued job without any window, the default job of ConversionQueueRunner.
+
+    The image reaches the server like with the convert buttons of the GUI, through the transfer mode
+    of config.json. Copies are pushed over SFTP in SFTP push mode. Otherwise, and always for snap jobs
+    that read the image in place, the image folder is shared by samba over a reverse tunnel, with the
+    share login saved in the image-share.json of the image, or the one of config.json. The VM metrics
+    are inserted when the ForensicVM server is configured in config.json.
+
+    Args:
+        job (dict): The job returned by ConversionQueue.claim().
+        config_file (str): The configuration file. Defaults to config.json next to the executable.
+
+    Returns:
+        bool: True if the conversion succeeded, False otherwise.
+    """
+    config = load_config(config_file or executable_path("config.json"))
+    address, _, port = job['server'].rpartition(':')
+    print(f"Conversion job {job['id']}: {job['image_path']} on {job['server']} ({job['copy']})")
+    if config.get("transfer_mode") == TRANSFER_MODE_SFTP and job['copy'] == "copy":
+        ok = run_sftp_push(address, int(port), job['image_path'], job['uuid_folder'], job['copy'])
+    else:
+        share = dict(config, **load_config(os.path.join(job['case_directory'], job['uuid_folder'],
+                                                        "image-share.json")))
+        share_login, share_password = share.get("share_login", ""), share.get("share_password", "")
+        share_folder = "\\\\127.0.0.1\\" + job['uuid_folder']
+        equivalence = os.path.dirname(os.path.realpath(job['image_path']))
+        create_login_and_share(share_login, share_password, share_folder, equivalence)
+        time.sleep(JOB_SHARE_DELAY)
+        if not test_windows_share(share_folder, share_login, share_password):
+            print(f"The windows share {share_folder} of job {job['id']} is not accessible")
+            return False
+        ok = run_openssh(address, int(port), share_folder, share_login, share_password, equivalence,
+                         job['image_path'], job['uuid_folder'], job['copy'])
+    if not ok:
+        return False
+    if config.get("server_address") and config.get("forensic_api"):
+        insert_vm_metrics(config["server_address"], job['uuid_folder'], config["forensic_api"])
+    return True
+
+
+class ThreadOutput:
+    """
+    Stand-in for sys.stdout that passes what chosen threads print to a callback.
+
+    The output console of the GUI is a Tk widget behind sys.stdout, and Tk must only be touched from the
+    main thread. A worker thread that runs inside route() has its print() calls handed to the callback,
+    which posts them to the window with write_event_value(). The other worker threads, including the
+    ones paramiko starts, are handed to the workers callback when one is given. Only the main thread
+    writes to the wrapped stream.
+
+    Args:
+        stream: The stream written to by the main thread and the threads that are not routed.
+        workers (callable): Optional workers(text) callback for what the worker threads outside route() print.
+
+    Example:
+        >>> sys.stdout = ThreadOutput(sys.stdout, lambda text: window.write_event_value(CONSOLE_OUTPUT_EVENT, text))
+        >>> with sys.stdout.route(lambda text: window.write_event_value(JOB_OUTPUT_EVENT, ('job', text))):
+        ...     print("Runs on a worker thread")
+    """
+
+    def __init__(self, stream, workers=None):
+        self.stream = stream
+        self.workers = workers
+        self._routes = {}
+        self._main = threading.main_thread().ident
+
+    @contextlib.contextmanager
+    def route(self, callback):
+        self._routes[threading.get_ident()] = callback
+        try:
+            yield self
+        finally:
+            self._routes.pop(threading.get_ident(), None)
+
+    def _callback(self):
+        ident = threading.get_ident()
+        callback = self._routes.get(ident)
+        if callback is None and ident != self._main:
+            return self.workers
+        return callback
+
+    def write(self, text):
+        callback = self._callback()
+        if callback is None:
+            return self.stream.write(text)
+        if text:
+            callback(text)
+        return len(text)
+
+    def flush(self):
+        if self._callback() is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class ConversionQueueRunner(threading.Thread):
+    """
+    Background thread that starts the jobs of a ConversionQueue and posts the queue to the GUI.
+
+    Every interval it renews the heartbeat of its running jobs, claims the jobs that may start and runs
+    each one on its own worker thread. When a window is given, the queue snapshot is sent to it with
+    window.write_event_value(JOB_QUEUE_EVENT, snapshot), and when sys.stdout is a ThreadOutput what a
+    job prints is sent as JOB_OUTPUT_EVENT (job id, text) events instead of touching the console.
+
+    Args:
+        queue (ConversionQueue): The queue to run.
+        window (sg.Window): The window that receives the JOB_QUEUE_EVENT events. Defaults to None.
+        run_job (callable): run_job(job) converts a job and returns True on success. Defaults to run_queued_job.
+        interval (float): The number of seconds between two looks at the queue.
+        default_concurrency (int): The concurrency of the servers without a configured one.
+        exit_when_idle (bool): Stop once no job of this runner is running and no job may start.
+
+    Example:
+        >>> runner = ConversionQueueRunner(ConversionQueue(), window)
+        >>> runner.start()
+    """
+
+    def __init__(self, queue, window=None, run_job=None, interval=JOB_QUEUE_POLL_INTERVAL,
+                 default_concurrency=JOB_DEFAULT_CONCURRENCY, exit_when_idle=False):
+        super().__init__(name="ConversionQueueRunner", daemon=True)
+        self.queue = queue
+        self.window = window
+        self.run_job = run_job or run_queued_job
+        self.interval = interval
+        self.default_concurrency = default_concurrency
+        self.exit_when_idle = exit_when_idle
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._workers = {}
+        self._workers_lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    def poll_now(self):
+        """
+        Wakes the runner up so the queue is looked at immediately.
+        """
+        self._wake_event.set()
+
+    def stop(self):
+        """
+        Stops starting jobs. The running conversions finish on their worker threads.
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def running_jobs(self):
+        with self._workers_lock:
+            return list(self._workers)
+
+    def _output(self, job):
+        if self.window is None or not isinstance(sys.stdout, ThreadOutput):
+            return contextlib.nullcontext()
+        return sys.stdout.route(lambda text: self.window.write_event_value(JOB_OUTPUT_EVENT, (job['id'], text)))
+
+    def _work(self, job):
+        error = ""
+        try:
+            with self._output(job):
+                ok = self.run_job(job)
+            if not ok:
+                error = "Conversion failed, see the output console"
+        except Exception as e:
+            ok, error = False, str(e)
+        try:
+            self.queue.finish(job['id'], ok, error)
+        except Exception as e:
+            print(f"Conversion queue error: {str(e)}")
+        with self._workers_lock:
+            self._workers.pop(job['id'], None)
+        self._wake_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.queue.heartbeat(self.owner)
+                job = self.queue.claim(self.owner, self.default_concurrency)
+                while job is not None:
+                    worker = threading.Thread(target=self._work, args=(job,), name=f"ConversionJob-{job['id']}",
+                                              daemon=True)
+                    with self._workers_lock:
+                        self._workers[job['id']] = worker
+                    worker.start()
+                    job = self.queue.claim(self.owner, self.default_concurrency)
+
+                snapshot = self.queue.snapshot()
+                if self.window is not None and not self._stop_event.is_set():
+                    self.window.write_event_value(JOB_QUEUE_EVENT, snapshot)
+                if self.exit_when_idle and not self.running_jobs() and \
+                        (snapshot['paused'] or not any(job['status'] == 'queued' for job in snapshot['jobs'])):
+                    break
+            except Exception as e:
+                print(f"Conversion queue error: {str(e)}")
+
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+
+def job_queue_rows(snapshot, progress=None):
+    """
+    Returns the rows of the queue table of the GUI from a ConversionQueue snapshot.
+
+    Args:
+        snapshot (dict): The snapshot returned by ConversionQueue.snapshot().
+        progress (dict): Optional ConversionProgress of the running jobs, by job id.
+    """
+    progress = progress or {}
+    rows = []
+    for job in snapshot['jobs']:
+        job_progress = progress.get(job['id']) if job['status'] == 'running' else None
+        status = f"{job_progress.phase}: {job_progress.message()}" if job_progress and job_progress.phase else ""
+        rows.append([job['id'], os.path.basename(job['image_path']), job['case_name'], job['server'],
+                     job['priority'], job['status'], status, job['error']])
+    return rows
+
+
+def queue_command_line(argv, queue=None, config_file=None):
+    """
+    Handles the conversion queue options of the command line, used by the Autopsy ingest module.
+
+    The jobs are converted on the SSH server configured in config.json. Options:
+
+        --enqueue IMAGE CASE_DIR CASE_NAME [CASE_NUMBER [CASE_EXAMINER]]   adds one image
+        --enqueue-batch FILE        adds the images of a JSON list of objects with the keyword arguments of enqueue()
+        --priority N                the priority of the added images
+        --copy {copy,snap}          convert a copy of the added images, or link them in snap mode
+        --concurrency N             the conversions run at the same time on the configured server
+        --pause-queue, --resume-queue
+        --run-queue                 converts the queued images without a window, until none is left
+        --queue-status              prints the queue
+
+    Args:
+        argv (list): The command line arguments, without the program name.
+        queue (ConversionQueue): The queue. Defaults to the shared queue file.
+        config_file (str): The configuration file. Defaults to config.json next to the executable.
+
+    Returns:
+        bool: True if argv held queue options and they were handled, False to start the GUI.
+
+    Example:
+        >>> queue_command_line(['--enqueue', 'C:\\\\images\\\\disk.E01', 'C:\\\\cases\\\\case1', 'case1'])
+        Queued conversion job 4f2a9c01b7de of disk.E01 (priority 0)
+        True
+    """
+    if not argv or not argv[0].startswith("--"):
+        return False
+
+    parser = argparse.ArgumentParser(prog="forensicVmClient", description="ForensicVM conversion queue")
+    parser.add_argument("--enqueue", nargs="+", metavar="ARG")
+    parser.add_argument("--enqueue-batch", metavar="FILE")
+    parser.add_argument("--priority", type=int, default=0)
+    parser.add_argument("--copy", choices=("copy", "snap"), default="copy")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--pause-queue", action="store_true")
+    parser.add_argument("--resume-queue", action="store_true")
+    parser.add_argument("--run-queue", action="store_true")
+    parser.add_argument("--queue-status", action="store_true")
+    args = parser.parse_args(argv)
+
+    queue = queue or ConversionQueue()
+    config = load_config(config_file or executable_path("config.json"))
+    server = f"{config.get('ssh_server_address', '')}:{config.get('ssh_server_port', 22)}"
+
+    jobs = []
+    if args.enqueue:
+        if not 3 <= len(args.enqueue) <= 5:
+            parser.error("--enqueue needs IMAGE CASE_DIR CASE_NAME [CASE_NUMBER [CASE_EXAMINER]]")
+        names = ("image_path", "case_directory", "case_name", "case_number", "case_examiner")
+        jobs.append(dict(zip(names, args.enqueue)))
+    if args.enqueue_batch:
+        with open(args.enqueue_batch, 'r') as f:
+            jobs.extend(json.load(f))
+    for job in jobs:
+        job.setdefault("server", server)
+        job.setdefault("priority", args.priority)
+        job.setdefault("copy", args.copy)
+    for job in queue.enqueue_many(jobs):
+        os.makedirs(os.path.join(job['case_directory'], job['uuid_folder']), exist_ok=True)
+        print(f"Queued conversion job {job['id']} of {os.path.basename(job['image_path'])} "
+              f"(priority {job['priority']})")
+
+    if args.concurrency:
+        queue.set_concurrency(server, args.concurrency)
+    if args.pause_queue:
+        queue.pause()
+    if args.resume_queue:
+        queue.resume()
+
+    if args.run_queue:
+        runner = ConversionQueueRunner(queue, exit_when_idle=True)
+        runner.start()
+        runner.join()
+
+    if args.queue_status or args.run_queue:
+        snapshot = queue.snapshot()
+        print(f"Conversion queue{' (paused)' if snapshot['paused'] else ''}:")
+        for row in job_queue_rows(snapshot):
+            print("  " + "  ".join(str(value) for value in row))
+    return True
+
+
 def update_and_create_share(image_path_arg, forensic_image_path, case_name_arg, values, window):
     new_equivalence = os.path.dirname(os.path.realpath(image_path_arg))
     uuid_folder = str(string_to_uuid(forensic_image_path + case_name_arg))
@@ -2684,10 +7891,46 @@ def update_and_create_share(image_path_arg, forensic_image_path, case_name_arg,
 
     create_login_and_share(username, password, sharename, folderpath)
 
-def formInit(values, window, folders_created = False, case_tags = {}):
+def run_concurrently(calls, max_workers=STARTUP_MAX_WORKERS):
+    """
+    Runs independent calls on a thread pool and yields each result as soon as it completes.
+
+    Args:
+        calls (dict): A dictionary mapping a name to a (function, args) tuple.
+        max_workers (int): The maximum number of calls running at the same time.
+
+    Yields:
+        tuple: (name, result, error, elapsed) where error is the exception raised by the call
+               or None, and elapsed is the duration of the call in seconds.
+
+    Example:
+        >>> for name, result, error, elapsed in run_concurrently({'plugins': (list_plugins, (api_key, url))}):
+        ...     print(name, elapsed)
+        plugins 0.042
+    """
+    def timed_call(function, args):
+        started = time.perf_counter()
+        try:
+            return function(*args), None, time.perf_counter() - started
+        except Exception as e:
+            return None, e, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="formInit") as executor:
+        futures = {executor.submit(timed_call, function, args): name for name, (function, args) in calls.items()}
+        for future in as_completed(futures):
+            result, error, elapsed = future.result()
+            yield futures[future], result, error, elapsed
+
+
+def formInit(values, window, folders_created = False, case_tags = {}, widget_state = None):
     """
     Initialize the form window by populating various elements with data retrieved from the forensic API.
 
+    The API key is tested first, and nothing else is queried or changed when the server does not
+    accept it. The other startup queries are independent, so they are then issued concurrently with
+    run_concurrently() and each result is applied to the form, on the calling (GUI) thread, as soon as
+    it arrives. The duration of each query is logged.
+
     It performs the following tasks:
 
     Retrieves the UUID folder based on the forensic image path and case name.
@@ -2700,6 +7943,7 @@ def formInit(values, window, folders_created = False, case_tags = {}):
     Args:
         values (dict): A dictionary containing the form values.
         window: The PySimpleGUI window object.
+        widget_state (WidgetStateModel): Optional model used to update the network buttons.
 
     """
     #sg.popup("Initializing the form. Press ok and please wait a couple of seconds...")
@@ -2707,105 +7951,105 @@ def formInit(values, window, folders_created = False, case_tags = {}):
     uuid_folder = string_to_uuid(forensic_image_path + case_name_arg)
     web_server_address = values["server_address"]
     forensic_api = values["forensic_api"]
-    server_ok, _ = test_api_key(forensic_api, web_server_address)
 
-    if server_ok==0:
+    # The other queries are only issued once the server answered the API key test
+    started = time.perf_counter()
+    try:
+        server_ok, message = test_api_key(forensic_api, web_server_address)
+    except Exception as e:
+        server_ok, message = -1, str(e)
+    print(f"formInit: test_api_key took {time.perf_counter() - started:.3f} s")
+    if server_ok != 0:
+        print(f"formInit: server not available: {message}")
         try:
-            memory = get_memory_size(forensic_api, web_server_address, uuid_folder) / 1024
-            if memory:
-                print("Forensic VM Server is running on " + str(memory) + " MB")
-
-
-                available_memory = get_available_memory(forensic_api, web_server_address)
-                window['-MB-SLIDER-'].update(range=(0, available_memory))
-                window['-MB-SLIDER-'].update(memory)
-        except Exception as e:
-            print(str(e))
+            pyi_splash.close()
+        except:
+            pass
+        return
+
+    startup_calls = {
+        'get_memory_size': (get_memory_size, (forensic_api, web_server_address, uuid_folder)),
+        'get_available_memory': (get_available_memory, (forensic_api, web_server_address)),
+        'get_snapshot_list': (get_snapshot_list, (forensic_api, uuid_folder, web_server_address)),
+        'list_iso_files': (list_iso_files, (forensic_api, web_server_address)),
+        'list_plugins': (list_plugins, (forensic_api, web_server_address)),
+        'check_tap_interface': (check_tap_interface, (web_server_address, str(uuid_folder), forensic_api)),
+        'get_forensic_image_info': (get_forensic_image_info, (forensic_api, uuid_folder, web_server_address)),
+    }
+    results = {}
 
-        try:
-            # Update snapshot list
-            snapshot_info_list = list_snapshots(forensic_api, uuid_folder, web_server_address)
-            window['-SNAPSHOT-LIST-'].update(snapshot_info_list)
-        except Exception as e:
-            print(str(e))
+    for name, result, error, elapsed in run_concurrently(startup_calls):
+        print(f"formInit: {name} took {elapsed:.3f} s")
+        if error:
+            print(f"formInit: {name} failed: {str(error)}")
+            continue
+        results[name] = result
 
-        # Update iso file list
         try:
-            iso_files = list_iso_files(forensic_api, web_server_address)
-            if iso_files:
-                window['-CDROM LIST-'].update(iso_files['iso_files'])
-        except Exception as e:
-            print(str(e))
+            if name in ('get_memory_size', 'get_available_memory'):
+                # The slider needs both the VM memory and the memory available on the server
+                if 'get_memory_size' in results and 'get_available_memory' in results:
+                    memory = (results['get_memory_size'] or 0) / 1024
+                    if memory:
+                        print("Forensic VM Server is running on " + str(memory) + " MB")
+                        window['-MB-SLIDER-'].update(range=(0, results['get_available_memory']))
+                        window['-MB-SLIDER-'].update(memory)
+
+            elif name == 'get_snapshot_list':
+                # Update snapshot list
+                window['-SNAPSHOT-LIST-'].update(format_snapshot_list(result))
+
+            elif name == 'list_iso_files':
+                # Update iso file list
+                if result:
+                    window['-CDROM LIST-'].update(result['iso_files'])
+
+            elif name == 'list_plugins':
+                # List remote plugins
+                if result:
+                    plugin_list = []
+                    for plugin in result:
+                        plugin_dir = plugin.get('plugin_dir')
+                        print(plugin_dir)
+                        plugin_name = plugin.get('plugin_name')
+                        print(plugin_name)
+                        plugin_description = plugin.get('plugin_description')
+                        print(plugin_description)
+                        plugin_list.append(f"{plugin_name} - {plugin_description} ({plugin_dir}) ")
 
-        # List remote plugins
-        try:
-            plugins = list_plugins(forensic_api, web_server_address)
-            if plugins:
-                plugin_list = []
-                for plugin in plugins:
-                    plugin_dir = plugin.get('plugin_dir')
-                    print(plugin_dir)
-                    plugin_name = plugin.get('plugin_name')
-                    print(plugin_name)
-                    plugin_description = plugin.get('plugin_description')
-                    print(plugin_description)
-                    plugin_list.append(f"{plugin_name} - {plugin_description} ({plugin_dir}) ")
-
-                window['-PLUGIN LIST-'].update(plugin_list)
-        except Exception as e:
-            print(str(e))
+                    window['-PLUGIN LIST-'].update(plugin_list)
 
-        try:
-            status=check_tap_interface(web_server_address, str(uuid_folder), forensic_api)
-            if status:
-                print(f" Network: {status}")
-                window['insert_network_button'].update(disabled=True)
-                window['remove_network_button'].update(disabled=False)
-            else:
-                print(f" Network: {status}")
-                window['insert_network_button'].update(disabled=False)
-                window['remove_network_button'].update(disabled=True)
-        except Exception as e:
-            print(str(e))
-        
-        try:
-            # Call the get_forensic_image_info() function to retrieve forensic image information
-            return_code, vm_status = get_forensic_image_info(forensic_api, uuid_folder, web_server_address)
+            elif name == 'check_tap_interface':
+                print(f" Network: {result}")
+                if widget_state is None:
+                    widget_state = WidgetStateModel(window)
+                widget_state.apply_rows('tap_up' if result else 'tap_down')
 
-            if not folders_created and vm_status.get("vm_status", "") == "stopped":
-                try:
-                    pyi_splash.update_text("Updating Autopsy folders...")
-                except:
-                    pass                
-                # Check if the evidence folders with Autopsy tags for the VM have not been created yet
-                # The folders_created variable indicates whether the folders have been created or not
+            elif name == 'get_forensic_image_info':
+                return_code, vm_status = result
 
-                # Retrieve the necessary values from the form                            
-                forensic_image_path = values["forensic_image_path"]
-                uuid_folder = string_to_uuid(forensic_image_path + case_name_arg)
-                web_server_address = values["server_address"]
-                forensic_api = values["forensic_api"]
+                if not folders_created and return_code == 0 and vm_status.get("vm_status", "") == "stopped":
+                    try:
+                        pyi_splash.update_text("Updating Autopsy folders...")
+                    except:
+                        pass
+                    # Check if the evidence folders with Autopsy tags for the VM have not been created yet
+                    # The folders_created variable indicates whether the folders have been created or not
 
-                # Create the necessary folders in the Qcow2 background                            
-                create_folders_in_qcow2_background(forensic_api, web_server_address, uuid_folder, case_tags)
-                # The create_folders_in_qcow2_background() function is called with the necessary parameters to create the folders
+                    # Create the necessary folders in the Qcow2 background
+                    create_folders_in_qcow2_background(forensic_api, web_server_address, uuid_folder, case_tags)
+                    # The create_folders_in_qcow2_background() function is called with the necessary parameters to create the folders
 
-                folders_created = True
-                try:
-                    pyi_splash.close()
-                except:
-                    pass
-            try:
-                pyi_splash.close()
-            except:
-                pass
+                    folders_created = True
         except Exception as e:
-            try:
-                pyi_splash.close()
-            except:
-                pass
             print(str(e))
 
+    print(f"formInit: {len(startup_calls) + 1} startup queries done in {time.perf_counter() - started:.3f} s")
+    try:
+        pyi_splash.close()
+    except:
+        pass
+
 
 
 # Form: All fields in the form
@@ -3067,7 +8311,8 @@ def ForensicVMForm():
                    vertical_alignment='top')],
         [sg.Text("Cannot communicate with the ForensicVM Server. Please check access configuration on the "
                  "config tab, or check if the server is running. Press the test server button to see if it is running.",
-                 key="alert_server_off", visible=False)]
+                 key="alert_server_off", visible=False)],
+        [sg.Text("", key="tunnel_stats", visible=False)]
     ]
 
 
@@ -3087,6 +8332,10 @@ def ForensicVMForm():
                    sg.Button("Start ForensicVM server", key="start_server_ssh_button", size=(25, 1), visible=True,
                      disabled=False)
                    ],
+                  [sg.Checkbox("Queue the images sent by the Autopsy ingest module and convert them without a "
+                               "window", key="queue_ingest", default=config.get("queue_ingest", False))],
+                  [sg.Checkbox(f"Store memory dumps compressed ({DUMP_COMPRESSED_EXTENSION}, expand with "
+                               f"--expand-dump)", key="compress_dumps", default=config.get("compress_dumps", False))],
 
                  ]
                  )
@@ -3099,8 +8348,12 @@ def ForensicVMForm():
                    sg.InputText(key="ssh_server_port",
                                  default_text=config.get("ssh_server_port", ""),size=(8,1)),
                    sg.Button("Copy ssh key to server", key="copy-ssh-key-to-server"),
-                   sg.Button("Test Ssh connection", key="test_ssh_connect")                   
+                   sg.Button("Test Ssh connection", key="test_ssh_connect"),
+                   sg.Button("Tune SSH speed", key="tune_ssh_button")
                    ],
+                  [sg.Text("Image transfer for copy conversions:"),
+                   sg.Combo([TRANSFER_MODE_SAMBA, TRANSFER_MODE_SFTP], key="transfer_mode", readonly=True,
+                            default_value=config.get("transfer_mode", TRANSFER_MODE_SAMBA))],
                   ]
                   )],
 
@@ -3174,6 +8427,46 @@ def ForensicVMForm():
     # Create a tab for Autopsy case
     autopsy_tab = sg.Tab("Autopsy case", autopsy_layout, key="autopsy_tab")
 
+    # Layout for the conversion queue, filled by the queue runner
+    queue_layout = [
+        [sg.Table([], headings=["Job", "Image", "Case", "Server", "Priority", "Status", "Progress", "Error"],
+                  key="job_queue_table", num_rows=12, auto_size_columns=False,
+                  col_widths=[12, 24, 14, 18, 7, 8, 30, 30], justification="left")],
+        [sg.Button("Queue this image", key="queue_add_button"),
+         sg.Text("Priority:"), sg.Spin(list(range(-10, 11)), initial_value=0, key="queue_priority", size=(4, 1)),
+         sg.Button("Set priority", key="queue_priority_button"),
+         sg.Button("Pause job", key="queue_pause_job_button"),
+         sg.Button("Resume job", key="queue_resume_job_button"),
+         sg.Button("Remove job", key="queue_remove_job_button"),
+         sg.Button("Clear finished", key="queue_clear_button")],
+        [sg.Button("Start converting", key="queue_start_button"),
+         sg.Button("Pause queue", key="queue_pause_button"),
+         sg.Button("Resume queue", key="queue_resume_button"),
+         sg.Text("Conversions at the same time on this server:"),
+         sg.Spin(list(range(1, 9)), initial_value=JOB_DEFAULT_CONCURRENCY, key="queue_concurrency", size=(3, 1)),
+         sg.Button("Set", key="queue_concurrency_button")],
+        [sg.Text("", key="queue_status_text")]
+    ]
+
+    # Create a tab for the conversion queue
+    queue_tab = sg.Tab("Conversion queue", queue_layout, key="queue_tab")
+
+    # Layout for the flows of the downloaded network captures, read from their flow indexes
+    flows_layout = [
+        [sg.Text("Filter (port, address, protocol or DNS name):"),
+         sg.Input("", key="flow_filter", size=(40, 1)),
+         sg.Button("Filter", key="flow_filter_button"),
+         sg.Button("Reload", key="flow_reload_button")],
+        [sg.Table([], headings=["Protocol", "Source", "Port", "Destination", "Port", "Packets", "Bytes",
+                                "First seen", "Last seen", "DNS names", "Capture@offset"],
+                  key="flow_table", num_rows=15, auto_size_columns=False,
+                  col_widths=[7, 15, 6, 15, 6, 8, 10, 17, 17, 24, 20], justification="left")],
+        [sg.Text("", key="flow_summary_text")]
+    ]
+
+    # Create a tab for the network flows
+    flows_tab = sg.Tab("Network flows", flows_layout, key="flows_tab")
+
 
     # Create the about tab
     about_layout = [
@@ -3204,71 +8497,83 @@ def ForensicVMForm():
     layout = [
         [sg.TabGroup([
             #[sg.TabGroup([[virtualize_tab, autopsy_tab, config_tab, about_tab]])],
-            [sg.TabGroup([[virtualize_tab, autopsy_tab, config_tab, output_tab, about_tab]])],
+            [sg.TabGroup([[virtualize_tab, autopsy_tab, queue_tab, flows_tab, config_tab, output_tab, about_tab]])],
         ])]
     ]
 
 
     # Create the main application window
-    window = sg.Window("Autopsy ForensicVM Client", layout, element_justification="center", icon=icon_path)
+    window = sg.Window("Autopsy ForensicVM Client", layout, element_justification="center", icon=icon_path,
+                       enable_close_attempted_event=True)
+
+    # Background thread that polls the VM state and posts it back as VM_STATE_EVENT
+    status_poller = VMStatusPoller(window)
+    # Background thread that starts the queued conversions and posts the queue back as JOB_QUEUE_EVENT,
+    # only started by the "Start converting" button
+    conversion_queue = ConversionQueue()
+    queue_runner = ConversionQueueRunner(conversion_queue, window)
+    queue_jobs = []
+    queue_refreshed = 0
+    job_progress = {}
+    # Set when the window was closed while queued conversions run, it closes once they finish
+    close_when_idle = False
+    # Flow indexes of the network captures of the case, loaded when the flows tab is filtered
+    flow_indexes = None
+    # Remembers the state of the VM control buttons so only the ones that change are updated
+    widget_state = WidgetStateModel(window)
 
     # Event loop
     while True:
         # Read events from the window with a timeout of 1000 milliseconds (1 second)
         event, values = window.read(timeout=1000)
+        if not isinstance(sys.stdout, ThreadOutput):
+            # sg.Output puts the console behind sys.stdout and sys.stderr when the window is first read. The
+            # worker threads print through CONSOLE_OUTPUT_EVENT, and the queued jobs through JOB_OUTPUT_EVENT
+            sys.stdout = ThreadOutput(sys.stdout, lambda text: window.write_event_value(CONSOLE_OUTPUT_EVENT, text))
+            sys.stderr = ThreadOutput(sys.stderr, lambda text: window.write_event_value(CONSOLE_OUTPUT_EVENT, text))
 
         # Check if the event is a timeout event
         if event == sg.TIMEOUT_EVENT:
 
-            # Test if the vm exists
+            # Keep the poller pointed at the server, API key and VM currently in the form
             forensic_image_path = values["forensic_image_path"]
             uuid_folder = string_to_uuid(forensic_image_path + case_name_arg)
             web_server_address = values["server_address"]
             forensic_api = values["forensic_api"]
-            server_ok = 1
-            # Check if the server is not offline
-            # The server_offline variable indicates whether the server is offline or not
-
-            # Call the test_api_key() function to test the forensic API key
-            if not server_offline:
-                server_ok, _ = test_api_key(forensic_api, web_server_address)
-                if server_ok != 0:
-                    # Check if the server is okay (the forensic API key is valid)
-                    # The server_ok variable stores the result of the test_api_key() function
-
-                    # Disable certain buttons and display an alert message
-                    window["convert_to_vm_button"].update(disabled=not False)
-                    window["link_to_vm_button"].update(disabled=not False)
-                    window["alert_server_off"].update(visible=True)
-                    window["start_vm_button"].update(disabled=not False)
-                    window["stop_vm_button"].update(disabled=not False)
-                    window["screenshot_vm_button"].update(disabled=not False)
-                    window["download_memory_button"].update(disabled=not False)
-                    window["save_screenshots_vm_button"].update(disabled=not False)
-                    window["delete_vm_button"].update(disabled=not False)
-                    window["reset_vm_button"].update(disabled=not False)
-                    window["import_evidence_button"].update(disabled=not False)
-                    window["open_forensic_vm_button"].update(disabled=not False)
-                    window["open_forensic_shell_button"].update(disabled=not False)
-                    window["open_forensic_netdata_button"].update(disabled=not False)
-                    window["-RUN PLUGIN-"].update(disabled=True)
+            status_poller.set_target(web_server_address, forensic_api, uuid_folder)
+            if not status_poller.is_alive():
+                status_poller.start()
+            if queue_runner.ident is None and time.monotonic() - queue_refreshed >= JOB_QUEUE_POLL_INTERVAL:
+                # The runner is not started, show the jobs other clients queued or run
+                queue_refreshed = time.monotonic()
+                window.write_event_value(JOB_QUEUE_EVENT, conversion_queue.snapshot())
+
+            # Show the live throughput and latency of the share tunnels
+            update_tunnel_stats(window)
+
+        elif event == VM_STATE_EVENT:
+            # A new state snapshot arrived from the poller thread. Only redraw from it, no network I/O here
+            vm_state = values[VM_STATE_EVENT]
+            server_ok = vm_state["server_ok"]
+
+            if server_ok != 0:
+                # Check if the server is okay (the forensic API key is valid)
+                if not server_offline:
                     server_offline = True
                     try:
                         pyi_splash.close()
                     except:
                         pass
 
-
-            if server_ok == 0:
-                # Check if the server is not okay (the forensic API key is invalid)
-                # The server_ok variable stores the result of the test_api_key() function
+            else:
+                server_offline = False
 
                 if first_run:
                     # Check if it is the first run of the application
                     # The first_run variable indicates whether it is the first run or not
 
                     # Perform the initial setup of the form
-                    formInit(values, window, folders_created, case_tags)
+                    formInit(values, window, folders_created, case_tags, widget_state)
                     try:
                         # Get the values from the PySimpleGUI window
                         new_equivalence = os.path.dirname(os.path.realpath(image_path_arg))
@@ -3291,119 +8596,103 @@ def ForensicVMForm():
                         print(str(e))
 
                     first_run = False
-                
-                window["alert_server_off"].update(visible=False)
-                # Hide the alert message indicating that the server is offline
-
-                vm_folder_exists = check_vm_exists(forensic_api, uuid_folder, web_server_address)
-
-                if vm_folder_exists:
-                    # Check if the VM folder exists
-                    # The vm_folder_exists variable indicates whether the VM folder exists or not
-
-                    # Disable or enable buttons based on the VM folder status
-                    window["convert_to_vm_button"].update(disabled=not False)
-                    window["link_to_vm_button"].update(disabled=not False)
-                    window["delete_vm_button"].update(disabled=False)
-                    window["open_forensic_vm_button"].update(disabled=not False)
-                    window["open_forensic_shell_button"].update(disabled=not True)
-                    window["open_forensic_netdata_button"].update(disabled=not True)
-                    window["save_screenshots_vm_button"].update(disabled=not True)
-
-                    # Call the get_forensic_image_info() function to retrieve forensic image information
-                    return_code, vm_status = get_forensic_image_info(forensic_api, uuid_folder, web_server_address)
-                    # The get_forensic_image_info() function retrieves information about the forensic image and returns the result in return_code and 
-                    # vm_status variables
-                    # The forensic_api, uuid_folder, and web_server_address are the parameters passed to the function                    
-
-                    if check_tap_interface(web_server_address, uuid_folder, forensic_api):
-                        # Check if the TAP interface exists for the VM
-                        # The check_tap_interface() function is called with the web server address, UUID folder, and forensic API as parameters
-
-                        # Update button properties based on the result of the TAP interface check
-                        window['insert_network_button'].update(disabled=True)
-                        window['remove_network_button'].update(disabled=False)
-                        # Disable the "Insert Network" button and enable the "Remove Network" button
-                    else:
-                        # If the TAP interface does not exist for the VM
-
-                        # Update button properties based on the result of the TAP interface check                        
-                        window['insert_network_button'].update(disabled=False)
-                        window['remove_network_button'].update(disabled=True)
-                        # Enable the "Insert Network" button and disable the "Remove Network" button                        
-
-                    if vm_status.get("vm_status", "") == "running":
-                        # Check if the VM status is "running"
-                        # The vm_status dictionary is checked for the "vm_status" key and its value is compared to "running"
-
-                        # Update button properties based on the VM status                        
-                        window["delete_vm_button"].update(disabled=True)
-                        window["start_vm_button"].update(disabled=not False)
-                        window["screenshot_vm_button"].update(disabled=not True)
-                        window["download_memory_button"].update(disabled=not True)
-                        window["shutdown_vm_button"].update(disabled=not True)
-                        window["stop_vm_button"].update(disabled=not True)
-                        window["reset_vm_button"].update(disabled=not True)
-                        window["import_evidence_button"].update(disabled=not False)
-                        window["open_forensic_vm_button"].update(disabled=not True)
-                        window["save_screenshots_vm_button"].update(disabled=not True)
-                        window["recreate_evidence_disk_button"].update(disabled=True)
-                        window["-RUN PLUGIN-"].update(disabled=True)
-                        vm_stopped = False
-                        # Set the vm_stopped variable to False to indicate that the VM is not stopped                        
-
-                    elif vm_status.get("vm_status", "") == "stopped":
-                        # Check if the VM status is "stopped"
-                        # The vm_status dictionary is checked for the "vm_status" key and its value is compared to "stopped"
-
-                        # Update button properties based on the VM status                        
-                        window["delete_vm_button"].update(disabled=False, visible=True)
-                        window["start_vm_button"].update(disabled=not True)
-                        window["screenshot_vm_button"].update(disabled=not False)
-                        window["download_memory_button"].update(disabled=not False)
-                        window["shutdown_vm_button"].update(disabled=not False)
-                        window["stop_vm_button"].update(disabled=not False)
-                        window["reset_vm_button"].update(disabled=not False)
-                        window["import_evidence_button"].update(disabled=not True)
-                        window["recreate_evidence_disk_button"].update(disabled=False)
-                        window["save_screenshots_vm_button"].update(disabled=not True)
-                        window["-RUN PLUGIN-"].update(disabled=False)
-                        vm_stopped = True
-                        # Set the vm_stopped variable to True to indicate that the VM is stopped
-
- 
-                else:
-                    # If the VM status is neither "running" nor "stopped"
-
-                    # Update button properties based on the VM status
-                    window["convert_to_vm_button"].update(disabled=False)
-                    window["link_to_vm_button"].update(disabled=False)
-                    window["delete_vm_button"].update(disabled=True)
-                    window["open_forensic_vm_button"].update(disabled=True)
-                    window["open_forensic_shell_button"].update(disabled=False)
-                    window["open_forensic_netdata_button"].update(disabled=False)
-                    window["save_screenshots_vm_button"].update(disabled=True)
-                    window["start_vm_button"].update(disabled=True)
-            elif not server_offline:
-                # Check if the server is not offline
-                # The server_offline variable is checked for its negation
-
-                # Update button properties based on the server status                
-                window["convert_to_vm_button"].update(disabled=not True)
-                window["link_to_vm_button"].update(disabled=not True)
-                window["delete_vm_button"].update(disabled=not False)
-                window["download_memory_button"].update(disabled=not False)
-                window["save_screenshots_vm_button"].update(disabled=not True)
-                window["open_forensic_shell_button"].update(disabled=not False)
-                window["open_forensic_netdata_button"].update(disabled=not False)
 
+                vm_status = vm_state["vm_status"]
+                if vm_status.get("vm_status", "") == "running":
+                    vm_stopped = False
+                elif vm_status.get("vm_status", "") == "stopped":
+                    vm_stopped = True
+
+            # Enable or disable the buttons from the state table. Widgets already in the
+            # computed state are skipped, so an unchanged snapshot does not touch Tk at all
+            widget_state.apply_rows(*vm_state_rows(vm_state))
+
+        elif event == JOB_QUEUE_EVENT:
+            # A new queue snapshot arrived from the queue runner
+            queue_snapshot = values[JOB_QUEUE_EVENT]
+            queue_jobs = [job['id'] for job in queue_snapshot['jobs']]
+            job_progress = {job_id: progress for job_id, progress in job_progress.items() if job_id in queue_jobs}
+            window['job_queue_table'].update(values=job_queue_rows(queue_snapshot, job_progress))
+            waiting = sum(job['status'] == 'queued' for job in queue_snapshot['jobs'])
+            running = sum(job['status'] == 'running' for job in queue_snapshot['jobs'])
+            window['queue_status_text'].update(f"{'Paused. ' if queue_snapshot['paused'] else ''}"
+                                               f"{running} running, {waiting} waiting")
+
+        elif event == JOB_OUTPUT_EVENT:
+            # Output of a queued conversion, printed here because the console is only touched on this thread
+            job_id, text = values[JOB_OUTPUT_EVENT]
+            print(text, end="")
+            job_progress.setdefault(job_id, ConversionProgress()).feed(text)
+
+        elif event == CONSOLE_OUTPUT_EVENT:
+            # Output of a worker thread, such as a snapshot command or a share tunnel
+            print(values[CONSOLE_OUTPUT_EVENT], end="")
+
+        if event == sg.WINDOW_CLOSE_ATTEMPTED_EVENT:
+            # Queued conversions run on threads of this process, closing now would kill them half way
+            running = queue_runner.running_jobs()
+            if not running:
+                event = sg.WINDOW_CLOSED
+            elif not close_when_idle and sg.popup_yes_no(
+                    f"{len(running)} queued conversion(s) are still running. No new conversion will start, "
+                    f"close the client once they finish?", title="Conversions running") == "Yes":
+                close_when_idle = True
+                queue_runner.stop()
+        if close_when_idle and not queue_runner.running_jobs():
+            event = sg.WINDOW_CLOSED
 
         if event == sg.WINDOW_CLOSED:
             # Check if the event is a window close event
             # The event variable is checked against sg.WINDOW_CLOSED            
+            status_poller.stop()
+            queue_runner.stop()
+            report_api_stats()
+            stop_reverse_tunnels()
+            report_ssh_stats()
+            close_ssh_managers()
+            print(f"Widget updates: {widget_state.applied} applied, {widget_state.skipped} skipped")
+            window.close()
             break
             # Exit the loop to stop the program execution
 
+        elif event in ("queue_start_button", "queue_add_button", "queue_priority_button", "queue_pause_job_button",
+                       "queue_resume_job_button", "queue_remove_job_button", "queue_clear_button",
+                       "queue_pause_button", "queue_resume_button", "queue_concurrency_button"):
+            # Conversion queue buttons. The queue file is changed here and the runner redraws the table
+            try:
+                server = f"{values['ssh_server_address']}:{values['ssh_server_port']}"
+                selected = [queue_jobs[row] for row in values["job_queue_table"] if row < len(queue_jobs)]
+                if event == "queue_start_button":
+                    if queue_runner.ident is None:
+                        queue_runner.start()
+                    window['queue_start_button'].update(disabled=True)
+                elif event == "queue_add_button":
+                    job = conversion_queue.enqueue(values["forensic_image_path"], case_directory_arg, case_name_arg,
+                                                   case_number_arg, case_examiner_arg, server,
+                                                   values["queue_priority"])
+                    print(f"Queued conversion job {job['id']} of {job['image_path']}")
+                elif event == "queue_pause_button":
+                    conversion_queue.pause()
+                elif event == "queue_resume_button":
+                    conversion_queue.resume()
+                elif event == "queue_concurrency_button":
+                    conversion_queue.set_concurrency(server, values["queue_concurrency"])
+                elif event == "queue_clear_button":
+                    conversion_queue.clear_finished()
+                for job_id in selected:
+                    if event == "queue_priority_button":
+                        conversion_queue.set_priority(job_id, values["queue_priority"])
+                    elif event == "queue_pause_job_button":
+                        conversion_queue.pause(job_id)
+                    elif event == "queue_resume_job_button":
+                        conversion_queue.resume(job_id)
+                    elif event == "queue_remove_job_button":
+                        conversion_queue.remove(job_id)
+                queue_runner.poll_now()
+            except Exception as e:
+                print(str(e))
+                sg.popup_error(f"Error updating the conversion queue {str(e)}")
+
 
         elif event == 'reset_date_button':
             # Check if the event is the "reset_date_button" button event
@@ -3744,29 +9033,70 @@ def ForensicVMForm():
             web_server_address = values["server_address"]
             forensic_api = values["forensic_api"]
 
-            # Prompt the user to choose the path to save the network pcap files
-            save_path = sg.popup_get_file('Choose the path to save the network pcap files',
-                                          save_as=True,
-                                          no_window=True,
-                                          default_extension=".zip",
-                                          default_path=f"{case_image_folder}/pcap.zip",
-                                          file_types=(("Zip files", "*.zip"),))
-            if save_path:
-                # If a save path is selected by the user, proceed to download the network pcap files
-
-                try:
-                    # Try to download the network pcap files using the download_pcap() function
-                    download_pcap(forensic_api, uuid_folder, web_server_address, save_path)
+            # Servers that list the capture files are synced incrementally into the case folder
+            pcap_folder = os.path.join(case_image_folder, "pcap")
+            progress = ProgressReporter("Syncing Pcap files")
+            try:
+                synced = sync_pcap(forensic_api, uuid_folder, web_server_address, pcap_folder, progress=progress)
+            except Exception as e:
+                print(f"Pcap sync failed ({str(e)}), downloading all the pcap files")
+                synced = None
+            finally:
+                progress.close()
+            if synced is not None:
+                # Only the captures that changed are indexed again
+                for name, (status, _) in synced.items():
+                    if status in ('append', 'full'):
+                        index_pcap_file(os.path.join(pcap_folder, name))
+                flow_indexes = None
+                fetched = sum(size for _, size in synced.values())
+                sg.popup(f"{len(synced)} network pcap files synced in {pcap_folder}, {fetched} new bytes. Opening path")
+                os.startfile(pcap_folder)
+            else:
+                # Prompt the user to choose the path to save the network pcap files
+                save_path = sg.popup_get_file('Choose the path to save the network pcap files',
+                                              save_as=True,
+                                              no_window=True,
+                                              default_extension=".zip",
+                                              default_path=f"{case_image_folder}/pcap.zip",
+                                              file_types=(("Zip files", "*.zip"),))
+                if save_path:
+                    # If a save path is selected by the user, proceed to download the network pcap files
 
-                    saved_path = os.path.dirname(save_path)                    
-                    sg.popup(f"Network pcap files downloaded and saved at {save_path}. Opening path")
-                    os.startfile(saved_path)
+                    try:
+                        # Try to download the network pcap files using the download_pcap() function
+                        if not download_pcap(forensic_api, uuid_folder, web_server_address, save_path):
+                            # Nothing complete to extract, the partial download is kept to be resumed
+                            sg.popup_error("Network pcap files were not downloaded. Save to the same file again "
+                                           "to resume the download")
+                        else:
+                            # Extract the captures into the case folder, indexing their flows on the way
+                            try:
+                                extract_pcaps(save_path, os.path.join(case_image_folder, "pcap"))
+                                flow_indexes = None
+                            except Exception as e:
+                                print(f"Could not index the pcap files: {str(e)}")
+
+                            saved_path = os.path.dirname(save_path)
+                            sg.popup(f"Network pcap files downloaded and saved at {save_path}. Opening path")
+                            os.startfile(saved_path)
                     
 
-                except Exception as e:
-                    # If an exception occurs during the execution of the code block, display an error popup
-                    sg.popup_error(f'Failed to download network pcap files {str(e)}')
+                    except Exception as e:
+                        # If an exception occurs during the execution of the code block, display an error popup
+                        sg.popup_error(f'Failed to download network pcap files {str(e)}')
+
 
+        elif event in ('flow_filter_button', 'flow_reload_button'):
+            # Query the flow indexes of the case captures and show the largest flows first
+            try:
+                if flow_indexes is None or event == 'flow_reload_button':
+                    flow_indexes = load_flow_indexes(os.path.join(case_image_folder, "pcap"))
+                flows = query_flows(flow_indexes, **flow_filter(values["flow_filter"]))
+                window['flow_table'].update(values=flow_rows(flows[:FLOW_TABLE_ROWS]))
+                window['flow_summary_text'].update(flow_summary(flow_indexes, flows))
+            except Exception as e:
+                print(str(e))
 
         elif event == 'insert_network_button':
             # Check if the event is the "insert_network_button" button event
@@ -3792,8 +9122,7 @@ def ForensicVMForm():
                         sg.popup("Network card inserted")
 
                         # Update the button states
-                        window['insert_network_button'].update(disabled=True)
-                        window['remove_network_button'].update(disabled=False)
+                        widget_state.apply_rows('tap_up')
                 else:
                     # If the TAP interface failed to start, display an error message
                     print("Failed to insert network card")
@@ -3828,8 +9157,7 @@ def ForensicVMForm():
                         sg.popup("Network card disabled")
 
                         # Update the button states
-                        window['insert_network_button'].update(disabled=False)
-                        window['remove_network_button'].update(disabled=True)
+                        widget_state.apply_rows('tap_down')
                 else:
                     # If disabling the TAP interface failed, display an error message
                     print("Failed to disable network card")
@@ -4201,15 +9529,23 @@ def ForensicVMForm():
                 if save_path:
                     # If a valid save path is selected, proceed with downloading the memory dump
 
-                    download_memory_dump(forensic_api, uuid_folder, web_server_address, save_path)
+                    stored_path = download_memory_dump(forensic_api, uuid_folder, web_server_address, save_path,
+                                                       compress=values["compress_dumps"])
                      # Call the download_memory_dump function to download the memory dump
 
-                    sg.popup(f"Memory dump downloaded and saved to {save_path}. Close to open path in explorer. Then import the memory dump in Autopsy Software")
-                    # Display a popup message to indicate that the memory dump has been downloaded and saved to the specified path
+                    if stored_path:
+                        if stored_path.endswith(DUMP_COMPRESSED_EXTENSION):
+                            # Autopsy only reads the raw dump, it has to be expanded first
+                            sg.popup(f"Memory dump downloaded and stored compressed to {stored_path}. Close to open "
+                                     f"path in explorer. Expand it before importing it in Autopsy Software with:\n"
+                                     f"forensicVmClient --expand-dump \"{stored_path}\" \"{save_path}\"")
+                        else:
+                            sg.popup(f"Memory dump downloaded and saved to {stored_path}. Close to open path in explorer. Then import the memory dump in Autopsy Software")
+                        # Display a popup message to indicate that the memory dump has been downloaded and saved to the specified path
 
-                    saved_path = os.path.dirname(save_path)
-                    subprocess.Popen(f'explorer {saved_path}')
-                    # Open the saved path in the file explorer
+                        saved_path = os.path.dirname(stored_path)
+                        subprocess.Popen(f'explorer {saved_path}')
+                        # Open the saved path in the file explorer
 
                 else:
                     sg.popup_error("Canceled to download memory dump")
@@ -4402,7 +9738,7 @@ def ForensicVMForm():
                             uuid_folder,
                             copy)
                     
-                    sg.popup("ForensicVM started in snap mode. Do not close the command window. Please minimize it and processed to vm control")
+                    sg.popup("ForensicVM started in snap mode. The image is shared through this client, keep it open while the VM runs")
                     # Display a popup message to indicate that the VM has been started in snap mode
 
                 else:
@@ -4424,8 +9760,9 @@ def ForensicVMForm():
             try:
                 # Try to execute the code block within the try block
 
-                # Save the configuration to the JSON file
-                save_config(values, filename)
+                # Save the configuration to the JSON file, keeping the SSH tuning that is not part of the form
+                save_config(dict(values, **{SSH_TUNING_CONFIG_KEY: load_config(filename).get(SSH_TUNING_CONFIG_KEY, {})}),
+                            filename)
 
                 # Create a dictionary containing the image-related values to be saved
                 image_values = {
@@ -4454,7 +9791,7 @@ def ForensicVMForm():
             # Check if the event is the "convert_to_vm_button" event
 
             print("Copy and convert...")
-            sg.popup("The conversion will start in command window. Please do not close it until the conversion is finished...")
+            sg.popup("The conversion will start. Its output is shown in the Output Console tab, please wait until the conversion is finished...")
 
             # Extract the necessary values from the form
             server_address = values["ssh_server_address"]
@@ -4470,42 +9807,50 @@ def ForensicVMForm():
 
             try:
                 # Try to execute the code block within the try block
-                update_and_create_share(image_path_arg, forensic_image_path, case_name_arg, values, window)
-                time.sleep(10)
-                if test_windows_share(new_share_folder, values['share_login'], values['share_password']):
-                    # Run the remote openssh command to copy and convert the forensic image        
-                    run_openssh(server_address,
-                                server_port,
-                                new_share_folder,
-                                share_login,
-                                share_password,
-                                replacement_share,
-                                forensic_image_path,
-                                uuid_folder,
-                                copy)
+                if values["transfer_mode"] == TRANSFER_MODE_SFTP:
+                    # Push the image to the server over SFTP and convert the copy there, no share needed
+                    if run_sftp_push(server_address, server_port, forensic_image_path, uuid_folder, copy,
+                                     window=window):
+                        web_server_address = values["server_address"]
+                        forensic_api = values["forensic_api"]
+                        insert_vm_metrics(web_server_address, uuid_folder, forensic_api)
+                        sg.popup("Forensic Image converted sucessfully to a ForensicVM")
+                        widget_state.apply_rows('vm_converted')
+                    else:
+                        sg.popup_error("Pushing or converting the forensic image failed. "
+                                       "See the Output Console tab for details")
+                else:
+                    # Let the server pull the image through the windows share over the SSH tunnel
+                    update_and_create_share(image_path_arg, forensic_image_path, case_name_arg, values, window)
+                    time.sleep(10)
+                    if test_windows_share(new_share_folder, values['share_login'], values['share_password']):
+                        # Run the remote openssh command to copy and convert the forensic image        
+                        run_openssh(server_address,
+                                    server_port,
+                                    new_share_folder,
+                                    share_login,
+                                    share_password,
+                                    replacement_share,
+                                    forensic_image_path,
+                                    uuid_folder,
+                                    copy,
+                                    window=window)
+
+                        uuid_folder = string_to_uuid(forensic_image_path + case_name_arg)
+                        web_server_address = values["server_address"]
+                        forensic_api = values["forensic_api"]
 
-                    uuid_folder = string_to_uuid(forensic_image_path + case_name_arg)
-                    web_server_address = values["server_address"]
-                    forensic_api = values["forensic_api"]
+                        insert_vm_metrics(web_server_address, uuid_folder, forensic_api)
 
-                    insert_vm_metrics(web_server_address, uuid_folder, forensic_api)
-
-                    print("Convert")
-                    sg.popup("Forensic Image converted sucessfully to a ForensicVM")
-                    # Display a popup message to indicate that the forensic image has been converted
-
-                    # Update the state of the buttons after the conversion is complete
-                    window["convert_to_vm_button"].update(disabled=not False)
-                    window["link_to_vm_button"].update(disabled=not False)
-                    window["import_evidence_button"].update(disabled=not True)
-                    window["open_forensic_vm_button"].update(disabled=not True)
-                    window["stop_vm_button"].update(disabled=not True)
-                    window["reset_vm_button"].update(disabled=not True)
-                    window["open_forensic_shell_button"].update(disabled=not True)
-                    window["open_forensic_netdata_button"].update(disabled=not True)
-                else:
-                    sg.popup_error("The image windows share does not exist, is not accessible or from a previous image. " \
-                                           " Please check the configuration tab")
+                        print("Convert")
+                        sg.popup("Forensic Image converted sucessfully to a ForensicVM")
+                        # Display a popup message to indicate that the forensic image has been converted
+
+                        # Update the state of the buttons after the conversion is complete
+                        widget_state.apply_rows('vm_converted')
+                    else:
+                        sg.popup_error("The image windows share does not exist, is not accessible or from a previous image. " \
+                                               " Please check the configuration tab")
 
             except Exception as e:
                 # If an exception occurs during the execution of the code block, display an error popup
@@ -4522,7 +9867,7 @@ def ForensicVMForm():
                 # Try to execute the code block within the try block
 
                 print("Link...")
-                sg.popup("The conversion will start in command window. Please do not close it until the conversion is finished...")
+                sg.popup("The conversion will start. Its output is shown in the Output Console tab, please wait until the conversion is finished...")
                 # Sucessfull message to indicate that the forensic image has been linked
 
                 # Extract the necessary values from the form
@@ -4564,7 +9909,8 @@ def ForensicVMForm():
                                         replacement_share,
                                         forensic_image_path,
                                         uuid_folder,
-                                        copy)
+                                        copy,
+                                        window=window)
 
                             uuid_folder = string_to_uuid(forensic_image_path + case_name_arg)
                             web_server_address = values["server_address"]
@@ -4576,14 +9922,7 @@ def ForensicVMForm():
                             # Display a popup message to indicate that the forensic image has been linked
 
                             # Update the state of the buttons after the linking process is complete                
-                            window["convert_to_vm_button"].update(disabled=not False)
-                            window["link_to_vm_button"].update(disabled=not False)
-                            window["import_evidence_button"].update(disabled=not True)
-                            window["stop_vm_button"].update(disabled=not True)
-                            window["reset_vm_button"].update(disabled=not True)
-                            window["open_forensic_vm_button"].update(disabled=not True)
-                            window["open_forensic_shell_button"].update(disabled=not True)
-                            window["open_forensic_netdata_button"].update(disabled=not True)
+                            widget_state.apply_rows('vm_converted')
                         else:
                             sg.popup_error("The image windows share does not exist, is not accessible or from a previous image. " \
                                            " Please check the configuration tab")
@@ -4597,14 +9936,7 @@ def ForensicVMForm():
                         sg.popup("The machine is running.\n No actions required")
 
                         # Update the state of the buttons after the linking process is complete
-                        window["convert_to_vm_button"].update(disabled=not False)
-                        window["link_to_vm_button"].update(disabled=not False)
-                        window["import_evidence_button"].update(disabled=not True)
-                        window["stop_vm_button"].update(disabled=not True)
-                        window["reset_vm_button"].update(disabled=not True)
-                        window["open_forensic_vm_button"].update(disabled=not True)
-                        window["open_forensic_shell_button"].update(disabled=not True)
-                        window["open_forensic_netdata_button"].update(disabled=not True)
+                        widget_state.apply_rows('vm_converted')
 
                     else:                        
                         continue
@@ -4731,6 +10063,33 @@ def ForensicVMForm():
 
 
 
+        elif event == "tune_ssh_button":
+            # Check if the event is the "tune_ssh_button" event
+
+            try:
+                # Benchmark the cipher and compression combinations and keep the fastest for this server
+                best, results = calibrate_ssh(values['ssh_server_address'], values['ssh_server_port'],
+                                              os.path.expanduser(executable_path("mykey")),
+                                              sample_file=values['forensic_image_path'], config_file=filename,
+                                              progress=lambda done, total: sg.one_line_progress_meter(
+                                                  "Tuning SSH", done, total, "Benchmarking ciphers and compression",
+                                                  key="tune_ssh"))
+                sg.one_line_progress_meter_cancel(key="tune_ssh")
+                if best is None:
+                    sg.popup_error("Could not benchmark any cipher on the server")
+                else:
+                    sg.popup(f"Using {best['cipher']} with compression {'on' if best['compress'] else 'off'}\n\n"
+                             + format_ssh_tuning(results), font=('Courier New', 10))
+
+            except TransferCancelled:
+                sg.one_line_progress_meter_cancel(key="tune_ssh")
+                print("SSH tuning cancelled")
+            except Exception as e:
+                # If an exception occurs during the execution of the code block, display an error popup
+
+                print(str(e))
+                sg.popup_error(f"Error tuning the SSH connection {str(e)}")
+
         elif event == "test_ssh_connect":
             # Check if the event is the "test_ssh_connect" event
 
@@ -4795,8 +10154,11 @@ def ForensicVMForm():
 
                 else:
                     # If the connection is successful, display a success popup message            
-                    sg.popup("Connected successfully!\n" + message)
+                    stats = get_api(server_address, forensic_api).stats()
+                    sg.popup("Connected successfully!\n" + message +
+                             f"\nConnections reused: {stats['connections_reused']} of {stats['requests']} requests")
                     server_offline = False
+                    status_poller.poll_now()
 
             except Exception as e:
                 # If an exception occurs during the execution of the code block, display an error popup
@@ -4892,5 +10254,7 @@ if __name__ == '__main__':
         pass
     print(executable_path("forensicVmClient.exe"))
     print(resource_path("forensicVmClient.exe"))
-    
-    ForensicVMForm()
+
+    # With queue_ingest set, the Autopsy ingest module queues its data sources and runs the queue without a window
+    if not dump_command_line(sys.argv[1:]) and not queue_command_line(sys.argv[1:]):
+        ForensicVMForm()
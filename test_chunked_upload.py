@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+import pytest
+import requests_mock
+import chunked_upload_server
+import forensicVmClient
+from forensicVmClient import TransferCancelled, upload_iso_chunked
+
+API_KEY = 'abc123'
+ISO_DATA = os.urandom(5 * 65536 + 1000)
+CHUNK_SIZE = 65536
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.setattr(forensicVmClient, 'UPLOAD_STATE_FILE', str(tmp_path / 'uploads.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_HASH_CACHE_FILE', str(tmp_path / 'iso_hashes.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_DIGEST_REGISTRY_FILE', str(tmp_path / 'iso_digests.json'))
+    monkeypatch.setattr(forensicVmClient, 'UPLOAD_RETRY_BACKOFF', 0)
+    httpd = chunked_upload_server.make_server('127.0.0.1', 0, str(tmp_path / 'isos'), API_KEY)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def iso_file(tmp_path):
+    path = tmp_path / 'tools.iso'
+    path.write_bytes(ISO_DATA)
+    return str(path)
+
+
+def url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+
+def count_writes(httpd, monkeypatch, delay=0):
+    store = httpd.RequestHandlerClass.store
+    writes = []
+    write_chunk = store.write_chunk
+
+    def counting_write_chunk(upload_id, offset, data):
+        time.sleep(delay)
+        writes.append(offset)
+        write_chunk(upload_id, offset, data)
+    monkeypatch.setattr(store, 'write_chunk', counting_write_chunk)
+    return writes
+
+
+def test_parallel_chunked_upload(server, iso_file, tmp_path):
+    assert upload_iso_chunked(API_KEY, url(server), iso_file, chunk_size=CHUNK_SIZE, parallel=3)
+
+    assert (tmp_path / 'isos' / 'tools.iso').read_bytes() == ISO_DATA
+    assert forensicVmClient.list_iso_files(API_KEY, url(server))['iso_files'] == ['tools.iso']
+
+
+def test_cancelled_upload_resumes_missing_chunks(server, iso_file, tmp_path, monkeypatch):
+    writes = count_writes(server, monkeypatch, delay=0.1)
+    with pytest.raises(TransferCancelled):
+        upload_iso_chunked(API_KEY, url(server), iso_file, chunk_size=CHUNK_SIZE, parallel=1,
+                           progress=lambda done, total: done == 0)
+    sent_before = len(writes)
+    assert 0 < sent_before < 6
+
+    assert upload_iso_chunked(API_KEY, url(server), iso_file, chunk_size=CHUNK_SIZE)
+
+    assert len(writes) == 6
+    assert (tmp_path / 'isos' / 'tools.iso').read_bytes() == ISO_DATA
+
+
+def test_checksum_mismatch_is_retried(server, iso_file, tmp_path, monkeypatch):
+    do_patch = chunked_upload_server.ChunkedUploadHandler.do_PATCH
+    corrupted = []
+
+    def corrupt_first_chunk(handler):
+        if not corrupted:
+            corrupted.append(handler.headers['Upload-Offset'])
+            handler.headers.replace_header('Upload-Checksum', 'sha256 AAAA')
+        do_patch(handler)
+    monkeypatch.setattr(chunked_upload_server.ChunkedUploadHandler, 'do_PATCH', corrupt_first_chunk)
+
+    assert upload_iso_chunked(API_KEY, url(server), iso_file, chunk_size=CHUNK_SIZE)
+
+    assert corrupted
+    assert (tmp_path / 'isos' / 'tools.iso').read_bytes() == ISO_DATA
+
+
+def test_server_without_chunked_uploads(iso_file, monkeypatch, tmp_path):
+    monkeypatch.setattr(forensicVmClient, 'UPLOAD_STATE_FILE', str(tmp_path / 'uploads.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_HASH_CACHE_FILE', str(tmp_path / 'iso_hashes.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_DIGEST_REGISTRY_FILE', str(tmp_path / 'iso_digests.json'))
+    with requests_mock.Mocker() as m:
+        m.post('http://old.example.com/api/upload-iso/chunks/', status_code=404)
+        assert upload_iso_chunked(API_KEY, 'http://old.example.com', iso_file) is None
@@ -0,0 +1,163 @@
+import hashlib
+import io
+import json
+import os
+
+import pytest
+import requests
+import requests_mock
+import forensicVmClient
+from forensicVmClient import (CompressedDump, CompressedDumpWriter, StreamHasher, compress_dump,
+                              download_compressed_dump, download_memory_dump, dump_command_line, expand_dump)
+
+FRAME = 65536
+# Compressible text, random bytes and zero pages, not a multiple of the frame size
+DATA = b'forensic ' * 20000 + os.urandom(3 * FRAME) + bytes(5 * FRAME) + b'tail' * 1000
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def raw_dump(tmp_path):
+    path = tmp_path / 'memory.dump'
+    path.write_bytes(DATA)
+    return str(path)
+
+
+def test_random_access_reads(raw_dump):
+    output_path, raw_size, compressed_size = compress_dump(raw_dump, frame_size=FRAME, codec='zlib')
+
+    assert output_path == raw_dump + '.fvmz'
+    assert raw_size == len(DATA)
+    assert compressed_size < len(DATA)
+    with CompressedDump(output_path) as dump:
+        assert dump.size == len(DATA)
+        assert dump.codec == 'zlib'
+        for offset, length in ((0, 10), (FRAME - 3, 7), (5 * FRAME + 11, 2 * FRAME), (len(DATA) - 5, 100)):
+            assert dump.read(offset, length) == DATA[offset:offset + length]
+        assert dump.read(len(DATA), 10) == b''
+
+
+def test_zero_frames_are_not_stored(tmp_path):
+    path = str(tmp_path / 'zeros.fvmz')
+    with CompressedDumpWriter(path, frame_size=FRAME, codec='zlib') as writer:
+        writer.write(bytes(8 * FRAME))
+
+    with CompressedDump(path) as dump:
+        assert all(compressed_size == 0 for _, compressed_size, _, _ in dump.index)
+        assert dump.read(3 * FRAME, 16) == bytes(16)
+
+
+def test_small_writes_make_the_same_frames(raw_dump, tmp_path):
+    path = str(tmp_path / 'small.fvmz')
+    with CompressedDumpWriter(path, frame_size=FRAME, codec='zlib') as writer:
+        for offset in range(0, len(DATA), 1000):
+            writer.write(DATA[offset:offset + 1000])
+
+    with CompressedDump(path) as dump:
+        assert dump.read(0, len(DATA)) == DATA
+
+
+def test_expand_restores_the_raw_dump(raw_dump, tmp_path):
+    output_path, _, _ = compress_dump(raw_dump, frame_size=FRAME)
+    expanded = str(tmp_path / 'expanded.dump')
+
+    assert dump_command_line(['--expand-dump', output_path, expanded])
+    assert read(expanded) == DATA
+
+
+def test_corrupted_frame_is_detected(raw_dump):
+    output_path, _, _ = compress_dump(raw_dump, frame_size=FRAME, codec='zlib')
+    with CompressedDump(output_path) as dump:
+        offset = dump.index[1][0]
+    with open(output_path, 'r+b') as f:
+        f.seek(offset + 10)
+        f.write(b'\xff\xff\xff\xff')
+
+    with CompressedDump(output_path) as dump:
+        assert dump.read(0, 16) == DATA[:16]
+        with pytest.raises(Exception):
+            dump.read(FRAME, 16)
+
+
+def test_not_a_compressed_dump(raw_dump):
+    with pytest.raises(ValueError):
+        CompressedDump(raw_dump)
+
+
+@pytest.mark.skipif(forensicVmClient.zstandard is None, reason="zstandard is not installed")
+def test_zstd_frames(raw_dump):
+    output_path, _, _ = compress_dump(raw_dump, frame_size=FRAME, codec='zstd')
+    with CompressedDump(output_path) as dump:
+        assert dump.codec == 'zstd'
+        assert dump.read(FRAME + 5, FRAME) == DATA[FRAME + 5:2 * FRAME + 5]
+
+
+class DroppedConnection(io.BytesIO):
+    """
+    Response body whose connection drops after the bytes it holds.
+    """
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if not data:
+            raise requests.exceptions.ConnectionError("Connection reset by peer")
+        return data
+
+
+def test_compressed_download_records_the_stored_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(forensicVmClient.sg, 'popup', lambda *args, **kwargs: None)
+    monkeypatch.setattr(forensicVmClient.sg, 'one_line_progress_meter', lambda *args, **kwargs: True)
+    monkeypatch.setattr(forensicVmClient.sg, 'one_line_progress_meter_cancel', lambda *args: None)
+    save_path = str(tmp_path / 'memory.dump')
+
+    with requests_mock.Mocker() as m:
+        m.get('http://example.com/api/download-memory-dump/vm_uuid/', content=DATA,
+              headers={'Content-Length': str(len(DATA))})
+        m.post('http://example.com/api/record_comment/', status_code=200)
+        stored_path = download_memory_dump('abc123', 'vm_uuid', 'http://example.com', save_path, compress=True)
+        comment = m.last_request.json()['comment']
+
+    # The dump is compressed as it arrives, the raw dump is never written
+    assert stored_path == save_path + '.fvmz'
+    assert not os.path.exists(save_path)
+    assert not os.path.exists(stored_path + '.part')
+    assert not os.path.exists(save_path + '.hashes.json')
+    manifest = json.loads(read(stored_path + '.hashes.json'))
+    assert manifest['file'] == 'memory.dump.fvmz'
+    assert manifest['size'] == os.path.getsize(stored_path)
+    assert manifest['raw_size'] == len(DATA)
+    assert manifest['hashes']['sha256'] == hashlib.sha256(DATA).hexdigest()
+    assert 'expanded content' in comment
+
+    expanded = str(tmp_path / 'expanded.dump')
+    assert expand_dump(stored_path, expanded)
+    assert read(expanded) == DATA
+
+
+def test_compressed_download_continues_after_a_dropped_connection(tmp_path, monkeypatch):
+    monkeypatch.setattr(forensicVmClient, 'DOWNLOAD_RETRY_BACKOFF', 0)
+    output_path = str(tmp_path / 'memory.dump.fvmz')
+    cut = 3 * FRAME
+    hasher = StreamHasher()
+
+    with requests_mock.Mocker() as m:
+        m.get('http://example.com/api/download-memory-dump/vm_uuid/', [
+            {'status_code': 200, 'body': DroppedConnection(DATA[:cut]),
+             'headers': {'Content-Length': str(len(DATA)), 'ETag': '"v1"'}},
+            {'status_code': 206, 'content': DATA[cut:],
+             'headers': {'Content-Range': f"bytes {cut}-{len(DATA) - 1}/{len(DATA)}", 'ETag': '"v1"'}},
+        ])
+        sizes = download_compressed_dump('abc123', 'http://example.com', '/api/download-memory-dump/vm_uuid/',
+                                         output_path, chunk_size=FRAME, hasher=hasher, frame_size=FRAME)
+        resumed = m.request_history[1].headers
+
+    assert resumed['Range'] == f"bytes={cut}-"
+    assert resumed['If-Range'] == '"v1"'
+    assert sizes == (len(DATA), os.path.getsize(output_path))
+    assert hasher.hexdigests()['sha256'] == hashlib.sha256(DATA).hexdigest()
+    with CompressedDump(output_path) as dump:
+        assert dump.read(0, len(DATA)) == DATA
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+import forensicVmClient
+from conftest import KeyServer
+from forensicVmClient import ConversionProgress, SSHTransportManager, run_conversion
+
+GB = 1073741824
+
+
+def test_qemu_progress_is_parsed_across_pieces():
+    progress = ConversionProgress(total_size=GB, now=0)
+
+    assert progress.feed("Converting image\n    (10.00/1", now=5) == []
+    assert progress.feed("00%)\r    (20.00/100%)\r", now=7) == [
+        {'phase': 'convert', 'percent': 10.0, 'bytes_done': GB // 10},
+        {'phase': 'convert', 'percent': 20.0, 'bytes_done': GB // 5},
+    ]
+    progress.feed("    (30.00/100%)\r", now=8)
+
+    assert progress.phase == 'convert'
+    assert progress.percent == 30.0
+    assert progress.throughput > 0
+    assert progress.eta() == pytest.approx(70 / progress.percent_rate)
+    assert "30.0%" in progress.message()
+
+
+def test_dd_and_rsync_progress_are_the_copy_phase():
+    progress = ConversionProgress(total_size=4096, now=0)
+
+    events = progress.feed("1024 bytes (1.0 kB, 1.0 KiB) copied, 1 s, 1.0 kB/s\r", now=1)
+    assert events == [{'phase': 'copy', 'percent': 25.0, 'bytes_done': 1024}]
+    events = progress.feed("      2,048  50%    1.00kB/s    0:00:02\r", now=2)
+    assert events == [{'phase': 'copy', 'percent': 50.0, 'bytes_done': 2048}]
+
+
+def test_phase_timings():
+    progress = ConversionProgress(total_size=GB, now=0)
+    progress.feed("mounting share\n", now=2)
+    progress.feed("536870912 bytes (537 MB, 512 MiB) copied, 4 s, 134 MB/s\r", now=3)
+    progress.feed("    (0.00/100%)\r", now=10)
+    progress.feed("    (100.00/100%)\n", now=25)
+    progress.feed("Creating VM\n", now=26)
+
+    assert progress.finish(now=30) == {'prepare': 3, 'copy': 7, 'convert': 16, 'finish': 4}
+
+
+class ConvertServer(KeyServer):
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self.convert, args=(channel,), daemon=True).start()
+        return True
+
+    def convert(self, channel):
+        time.sleep(0.1)
+        for percent in (0, 50, 100):
+            channel.sendall(f"    ({percent}.00/100%)\r".encode())
+            time.sleep(0.05)
+        channel.sendall(b"\nVM created\n")
+        channel.send_exit_status(0)
+        channel.close()
+
+
+@pytest.fixture
+def ssh_manager(ssh_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(forensicVmClient, 'CONVERSION_LOG_FILE', str(tmp_path / 'conversions.json'))
+    server = ssh_server(ConvertServer)
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file)
+    yield manager
+    manager.close()
+
+
+def test_run_conversion_records_phase_timings(ssh_manager):
+    assert run_conversion(ssh_manager, 'run-or-convert.sh', 'uuid-1', total_size=GB) == 0
+
+    log = forensicVmClient._read_json_file(forensicVmClient.CONVERSION_LOG_FILE)
+    entry = log['uuid-1'][0]
+    assert entry['exit_status'] == 0
+    assert list(entry['phases']) == ['prepare', 'convert', 'finish']
+    assert entry['phases']['convert'] > 0
+    assert entry['total_size'] == GB
@@ -0,0 +1,224 @@
+import json
+import sys
+import threading
+
+import pytest
+import forensicVmClient
+from forensicVmClient import (JOB_OUTPUT_EVENT, JOB_QUEUE_EVENT, TRANSFER_MODE_SAMBA, TRANSFER_MODE_SFTP,
+                              ConversionProgress, ConversionQueue, ConversionQueueRunner, ThreadOutput,
+                              job_queue_rows, queue_command_line, run_queued_job)
+
+SERVER = '192.168.0.100:22'
+
+
+class FakeWindow:
+    def __init__(self):
+        self.events = []
+
+    def write_event_value(self, key, value):
+        self.events.append((key, value))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return ConversionQueue(str(tmp_path / 'queue.json'))
+
+
+def enqueue(queue, name, priority=0, server=SERVER):
+    return queue.enqueue(f'C:\\images\\{name}.E01', 'C:\\cases\\case1', 'case1', server=server, priority=priority)
+
+
+def test_jobs_start_by_priority_then_submission(queue):
+    first = enqueue(queue, 'first')
+    urgent = enqueue(queue, 'urgent', priority=5)
+    second = enqueue(queue, 'second')
+    queue.set_concurrency(SERVER, 3)
+
+    claimed = [queue.claim('runner')['id'] for _ in range(3)]
+    assert claimed == [urgent['id'], first['id'], second['id']]
+    assert queue.claim('runner') is None
+
+
+def test_concurrency_is_per_server(queue):
+    enqueue(queue, 'a')
+    enqueue(queue, 'b')
+    other = enqueue(queue, 'c', server='10.0.0.1:22')
+
+    first = queue.claim('runner')
+    assert queue.claim('runner')['id'] == other['id']
+    assert queue.claim('runner') is None
+
+    queue.finish(first['id'], True)
+    assert queue.claim('runner') is not None
+
+
+def test_pause_and_resume(queue):
+    job = enqueue(queue, 'a')
+    queue.pause()
+    assert queue.claim('runner') is None
+    queue.resume()
+
+    queue.pause(job['id'])
+    assert queue.claim('runner') is None
+    queue.resume(job['id'])
+    assert queue.claim('runner')['id'] == job['id']
+
+
+def test_queue_survives_restart_and_stale_jobs_are_requeued(queue):
+    job = enqueue(queue, 'a')
+    queue.claim('crashed', now=1000.0)
+
+    reopened = ConversionQueue(queue.path)
+    assert reopened.snapshot()['jobs'][0]['status'] == 'running'
+    assert reopened.claim('runner', now=1010.0) is None
+    assert reopened.claim('runner', now=2000.0)['id'] == job['id']
+
+
+def test_same_image_is_queued_once(queue):
+    first = enqueue(queue, 'a')
+    assert enqueue(queue, 'a', priority=3)['id'] == first['id']
+    assert len(queue.snapshot()['jobs']) == 1
+
+
+def test_concurrent_claims_never_share_a_job(queue):
+    for index in range(20):
+        enqueue(queue, f'image{index}')
+    queue.set_concurrency(SERVER, 20)
+    claimed = []
+
+    def claim():
+        for _ in range(5):
+            job = ConversionQueue(queue.path).claim(threading.current_thread().name)
+            if job:
+                claimed.append(job['id'])
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == 20
+    assert len(set(claimed)) == 20
+
+
+def test_runner_converts_queued_jobs(queue):
+    ok = enqueue(queue, 'ok')
+    broken = enqueue(queue, 'broken')
+    window = FakeWindow()
+    converted = []
+
+    def run_job(job):
+        converted.append(job['id'])
+        if job['id'] == broken['id']:
+            raise IOError("Connection lost")
+        return True
+
+    runner = ConversionQueueRunner(queue, window, run_job=run_job, interval=0.01, exit_when_idle=True)
+    runner.start()
+    runner.join(10)
+
+    assert not runner.is_alive()
+    assert converted == [ok['id'], broken['id']]
+    statuses = {job['id']: (job['status'], job['error']) for job in queue.snapshot()['jobs']}
+    assert statuses == {ok['id']: ('done', ''), broken['id']: ('failed', 'Connection lost')}
+    assert window.events[-1][0] == JOB_QUEUE_EVENT
+
+
+def test_command_line_batch_submission(queue, tmp_path, capsys):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'ssh_server_address': '192.168.0.100', 'ssh_server_port': '22'}))
+    batch_file = tmp_path / 'batch.json'
+    batch_file.write_text(json.dumps([
+        {'image_path': 'disk1.E01', 'case_directory': str(tmp_path), 'case_name': 'case1'},
+        {'image_path': 'disk2.E01', 'case_directory': str(tmp_path), 'case_name': 'case1', 'priority': 9},
+    ]))
+
+    assert queue_command_line(['--enqueue-batch', str(batch_file), '--priority', '2', '--concurrency', '2'],
+                              queue, str(config_file))
+    assert not queue_command_line([], queue, str(config_file))
+
+    snapshot = queue.snapshot()
+    assert [(job['image_path'], job['priority'], job['server']) for job in snapshot['jobs']] == \
+           [('disk2.E01', 9, SERVER), ('disk1.E01', 2, SERVER)]
+    assert snapshot['concurrency'] == {SERVER: 2}
+    assert capsys.readouterr().out.count('Queued conversion job') == 2
+
+
+@pytest.fixture
+def transfers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(forensicVmClient, 'JOB_SHARE_DELAY', 0)
+    monkeypatch.setattr(forensicVmClient, 'run_sftp_push', lambda *args, **kwargs: calls.append(('sftp',) + args) or True)
+    monkeypatch.setattr(forensicVmClient, 'run_openssh', lambda *args, **kwargs: calls.append(('samba',) + args) or True)
+    monkeypatch.setattr(forensicVmClient, 'create_login_and_share', lambda *args: None)
+    monkeypatch.setattr(forensicVmClient, 'test_windows_share', lambda *args: True)
+    return calls
+
+
+@pytest.mark.parametrize('transfer_mode, copy, expected', [
+    (TRANSFER_MODE_SFTP, 'copy', 'sftp'),
+    (TRANSFER_MODE_SAMBA, 'copy', 'samba'),
+    (TRANSFER_MODE_SFTP, 'snap', 'samba'),
+])
+def test_queued_jobs_use_the_configured_transfer_mode(queue, transfers, tmp_path, transfer_mode, copy, expected):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'transfer_mode': transfer_mode, 'share_login': 'forensic',
+                                       'share_password': 'secret'}))
+    job = queue.enqueue(str(tmp_path / 'disk.E01'), str(tmp_path), 'case1', server=SERVER, copy=copy)
+
+    assert run_queued_job(job, str(config_file))
+    assert transfers[0][0] == expected
+    if expected == 'samba':
+        assert transfers[0][1:] == ('192.168.0.100', 22, '\\\\127.0.0.1\\' + job['uuid_folder'], 'forensic', 'secret',
+                                    str(tmp_path), job['image_path'], job['uuid_folder'], copy)
+
+
+def test_command_line_snap_jobs(queue, tmp_path):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'ssh_server_address': '192.168.0.100', 'ssh_server_port': '22'}))
+
+    assert queue_command_line(['--enqueue', 'disk.E01', str(tmp_path), 'case1', '--copy', 'snap'],
+                              queue, str(config_file))
+    assert queue.snapshot()['jobs'][0]['copy'] == 'snap'
+
+
+def test_job_output_is_posted_to_the_window(queue, monkeypatch, capsys):
+    job = enqueue(queue, 'a')
+    window = FakeWindow()
+    monkeypatch.setattr(sys, 'stdout', ThreadOutput(sys.stdout))
+
+    def run_job(job):
+        print("(42.00/100%)")
+        return True
+
+    runner = ConversionQueueRunner(queue, window, run_job=run_job, interval=0.01)
+    runner.start()
+    try:
+        while not any(key == JOB_OUTPUT_EVENT for key, _ in window.events):
+            runner.join(0.01)
+    finally:
+        runner.stop()
+        runner.join(10)
+    print("main thread")
+
+    assert (JOB_OUTPUT_EVENT, (job['id'], "(42.00/100%)")) in window.events
+    assert capsys.readouterr().out == "main thread\n"
+
+    progress = ConversionProgress()
+    progress.feed("(42.00/100%)\n")
+    running = dict(job, status='running')
+    assert job_queue_rows({'jobs': [running]}, {job['id']: progress})[0][6] == "convert: 42.0%"
+
+
+def test_worker_thread_output_is_handed_to_the_callback(monkeypatch, capsys):
+    posted = []
+    monkeypatch.setattr(sys, 'stdout', ThreadOutput(sys.stdout, posted.append))
+
+    thread = threading.Thread(target=print, args=("tunnel stopped",))
+    thread.start()
+    thread.join()
+    print("main thread")
+
+    assert ''.join(posted) == "tunnel stopped\n"
+    assert capsys.readouterr().out == "main thread\n"
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import forensicVmClient
+from forensicVmClient import SegmentedDownload, StreamHasher, download_resumable, download_segmented
+
+DATA = os.urandom(3 * 65536 + 123)
+DATA_SHA256 = hashlib.sha256(DATA).hexdigest()
+API_KEY = 'abc123'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    honour_ranges = True
+    drop_first_at = None
+    requests_seen = []
+
+    def do_GET(self):
+        range_header = self.headers.get('Range')
+        self.requests_seen.append(range_header)
+        start, end = 0, len(DATA) - 1
+        if range_header and self.honour_ranges:
+            first, last = range_header.split('=')[1].split('-')
+            start, end = int(first), int(last or end)
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+
+        body = DATA[start:end + 1]
+        if self.drop_first_at and len(self.requests_seen) == 1:
+            self.wfile.write(body[:self.drop_first_at])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(forensicVmClient, 'DOWNLOAD_RETRY_BACKOFF', 0)
+    RangeHandler.requests_seen = []
+    RangeHandler.honour_ranges = True
+    RangeHandler.drop_first_at = None
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_dropped_connection_resumes_with_range(server, tmp_path):
+    RangeHandler.drop_first_at = 65536
+    output_file = str(tmp_path / 'memory.bin')
+    hasher = StreamHasher()
+
+    assert download_resumable(API_KEY, server, '/api/download-memory-dump/1/', output_file, chunk_size=4096,
+                              hasher=hasher)
+    assert hasher.hexdigests()['md5'] == hashlib.md5(DATA).hexdigest()
+    assert hasher.bytes_reread == 0
+
+    assert read(output_file) == DATA
+    assert RangeHandler.requests_seen == [None, 'bytes=65536-']
+    assert not os.path.exists(output_file + '.part')
+    assert not os.path.exists(output_file + '.part.json')
+
+
+def test_cancel_keeps_partial_download(server, tmp_path):
+    output_file = str(tmp_path / 'evidence.vmdk')
+
+    assert not download_resumable(API_KEY, server, '/api/download-evidence/1/', output_file,
+                                  progress=lambda done, total: False, chunk_size=4096)
+    assert os.path.getsize(output_file + '.part') == 4096
+
+    hasher = StreamHasher()
+    assert download_resumable(API_KEY, server, '/api/download-evidence/1/', output_file, chunk_size=4096,
+                              hasher=hasher)
+    assert read(output_file) == DATA
+    assert RangeHandler.requests_seen[-1] == 'bytes=4096-'
+    assert hasher.hexdigests()['sha256'] == DATA_SHA256
+    assert hasher.bytes_reread == 4096
+
+
+def test_server_ignoring_range_restarts(server, tmp_path):
+    RangeHandler.honour_ranges = False
+    output_file = str(tmp_path / 'pcap.zip')
+
+    download_resumable(API_KEY, server, '/api/download_pcap/1/', output_file,
+                       progress=lambda done, total: False, chunk_size=4096)
+    assert download_resumable(API_KEY, server, '/api/download_pcap/1/', output_file, chunk_size=4096)
+
+    assert read(output_file) == DATA
+
+
+def test_segmented_download(server, tmp_path):
+    output_file = str(tmp_path / 'memory.bin')
+    hasher = StreamHasher()
+
+    assert download_segmented(API_KEY, server, '/api/download-memory-dump/1/', output_file,
+                              segment_size=16384, min_workers=3, chunk_size=4096, hasher=hasher)
+    assert hasher.hexdigests()['sha1'] == hashlib.sha1(DATA).hexdigest()
+
+    assert read(output_file) == DATA
+    assert 'bytes=16384-32767' in RangeHandler.requests_seen
+    assert not os.path.exists(output_file + '.part.json')
+
+
+def test_segmented_download_resumes_missing_segments(server, tmp_path):
+    output_file = str(tmp_path / 'evidence.vmdk')
+    with open(output_file + '.part', 'wb') as f:
+        f.write(DATA[:32768] + bytes(len(DATA) - 32768))
+    with open(output_file + '.part.json', 'w') as f:
+        json.dump({'url': f"{server}/api/download-evidence/1/", 'etag': '"v1"', 'last_modified': None,
+                   'total_size': len(DATA), 'bytes_downloaded': 0, 'segment_size': 16384,
+                   'segments_done': [0, 1]}, f)
+
+    hasher = StreamHasher()
+    assert download_segmented(API_KEY, server, '/api/download-evidence/1/', output_file,
+                              segment_size=16384, chunk_size=4096, hasher=hasher)
+    assert hasher.hexdigests()['sha256'] == DATA_SHA256
+
+    assert read(output_file) == DATA
+    assert 'bytes=0-16383' not in RangeHandler.requests_seen
+    assert 'bytes=16384-32767' not in RangeHandler.requests_seen
+
+
+def test_segmented_download_falls_back_without_ranges(server, tmp_path):
+    RangeHandler.honour_ranges = False
+    output_file = str(tmp_path / 'memory.bin')
+
+    assert download_segmented(API_KEY, server, '/api/download-memory-dump/1/', output_file, segment_size=16384)
+
+    assert read(output_file) == DATA
+    assert RangeHandler.requests_seen == ['bytes=0-0', None]
+
+
+def test_segmented_download_without_pwrite(server, tmp_path, monkeypatch):
+    monkeypatch.delattr(os, 'pwrite', raising=False)
+    output_file = str(tmp_path / 'memory.bin')
+
+    assert download_segmented(API_KEY, server, '/api/download-memory-dump/1/', output_file,
+                              segment_size=16384, chunk_size=4096)
+
+    assert read(output_file) == DATA
+
+
+def test_pieces_written_through_a_handle_are_flushed_before_hashing(server, tmp_path, monkeypatch):
+    monkeypatch.delattr(os, 'pwrite', raising=False)
+    output_file = str(tmp_path / 'memory.bin')
+    # Without room in the reorder buffer, the later piece is read back from the file
+    hasher = StreamHasher(output_file + '.part', buffer_limit=0)
+    download = SegmentedDownload(API_KEY, server, '/api/download-memory-dump/1/', output_file,
+                                 segment_size=16384, chunk_size=1024, hasher=hasher)
+    assert download.probe()
+    with open(download.part_file, 'wb') as f:
+        f.truncate(download.total_size)
+
+    # Each worker writes through its own handle
+    with open(download.part_file, 'r+b') as first, open(download.part_file, 'r+b') as second:
+        download._fetch_segment(1, first)
+        download._fetch_segment(0, second)
+
+        assert hasher.position == 2 * 16384
+        assert hasher.bytes_reread == 16384
+        hasher.update(DATA[2 * 16384:])
+    assert hasher.hexdigests()['sha256'] == DATA_SHA256
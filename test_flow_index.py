@@ -0,0 +1,147 @@
+import socket
+import struct
+import zipfile
+
+import pytest
+from forensicVmClient import (FlowIndex, FlowIndexer, extract_pcaps, flow_filter, index_pcap_file,
+                              load_flow_indexes, query_flows)
+
+GUEST = '10.0.2.15'
+WEB = '93.184.216.34'
+RESOLVER = '10.0.2.3'
+
+
+def ipv4(source, destination, protocol, payload):
+    header = struct.pack('>BBHHHBBH4s4s', 0x45, 0, 20 + len(payload), 0, 0, 64, protocol, 0,
+                         socket.inet_aton(source), socket.inet_aton(destination))
+    return b'\x02' * 6 + b'\x04' * 6 + b'\x08\x00' + header + payload
+
+
+def tcp(source, source_port, destination, destination_port, data=b''):
+    return ipv4(source, destination, 6, struct.pack('>HHIIBBHHH', source_port, destination_port, 0, 0,
+                                                    0x50, 0x18, 1024, 0, 0) + data)
+
+
+def dns_response(name, address):
+    question = b''.join(bytes([len(label)]) + label.encode() for label in name.split('.')) + b'\0'
+    message = (struct.pack('>HHHHHH', 1, 0x8180, 1, 1, 0, 0) + question + struct.pack('>HH', 1, 1) +
+               struct.pack('>HHHIH', 0xC00C, 1, 1, 60, 4) + socket.inet_aton(address))
+    udp = struct.pack('>HHHH', 53, 40000, 8 + len(message), 0) + message
+    return ipv4(RESOLVER, GUEST, 17, udp)
+
+
+PACKETS = [
+    (100.0, dns_response('www.example.com', WEB)),
+    (101.0, tcp(GUEST, 50000, WEB, 443, b'hello')),
+    (101.5, tcp(WEB, 443, GUEST, 50000, b'x' * 1000)),
+    (102.0, tcp(GUEST, 50000, WEB, 443)),
+    (103.0, tcp(GUEST, 50001, '10.0.2.2', 22)),
+]
+
+
+def make_pcap(packets=PACKETS):
+    data = struct.pack('<IHHiIII', 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1)
+    for timestamp, packet in packets:
+        data += struct.pack('<IIII', int(timestamp), int(timestamp % 1 * 1e6), len(packet), len(packet)) + packet
+    return data
+
+
+def make_pcapng(packets=PACKETS):
+    def block(block_type, body):
+        body += bytes(-len(body) % 4)
+        return struct.pack('<II', block_type, len(body) + 12) + body + struct.pack('<I', len(body) + 12)
+
+    # Nanosecond timestamps on the interface
+    data = block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1))
+    data += block(1, struct.pack('<HHI', 1, 0, 0) + struct.pack('<HHB3x', 9, 1, 9) + struct.pack('<HH', 0, 0))
+    for timestamp, packet in packets:
+        ticks = int(timestamp * 1e9)
+        data += block(6, struct.pack('<IIIII', 0, ticks >> 32, ticks & 0xFFFFFFFF, len(packet), len(packet)) + packet)
+    return data
+
+
+def index_of(data, chunk=7):
+    indexer = FlowIndexer('tap0.pcap')
+    for offset in range(0, len(data), chunk):
+        indexer.feed(data[offset:offset + chunk])
+    assert indexer.valid
+    return indexer.close()
+
+
+@pytest.mark.parametrize('make', [make_pcap, make_pcapng])
+def test_flows_are_grouped_in_both_directions(make):
+    data = make()
+    index = index_of(data)
+
+    assert len(index) == 3
+    assert index.packets == 5
+    web = index.query(port=443)
+    assert len(web) == 1
+    flow = web[0]
+    assert (flow['protocol'], flow['source'], flow['source_port'], flow['destination'], flow['destination_port']) == \
+           ('TCP', GUEST, 50000, WEB, 443)
+    assert flow['packets'] == 3
+    assert flow['bytes'] == sum(len(packet) for _, packet in PACKETS[1:4])
+    assert flow['first_seen'] == pytest.approx(101.0)
+    assert flow['last_seen'] == pytest.approx(102.0)
+    assert flow['names'] == ['www.example.com']
+    # The offsets point at the records of the first and last packets
+    assert data.find(PACKETS[1][1]) > flow['first_offset']
+    assert data.find(PACKETS[3][1]) > flow['last_offset'] > flow['first_offset']
+
+
+def test_queries():
+    index = index_of(make_pcap(), chunk=64)
+
+    assert [flow['destination_port'] for flow in index.query(host=GUEST, protocol='tcp')] == [443, 22]
+    assert [flow['protocol'] for flow in index.query(protocol='UDP')] == ['UDP']
+    assert len(index.query(name='EXAMPLE')) == 1
+    assert index.query(name='example', port=22) == []
+    assert index.query(host='192.0.2.1') == []
+
+
+def test_save_and_load(tmp_path):
+    index = index_of(make_pcap())
+    path = str(tmp_path / 'tap0.pcap.flows')
+    index.save(path)
+
+    loaded = FlowIndex.load(path)
+    assert len(loaded) == len(index)
+    assert [loaded.flow(number) for number in range(len(loaded))] == \
+           [index.flow(number) for number in range(len(index))]
+
+
+def test_zip_extraction_indexes_the_captures(tmp_path):
+    zip_path = str(tmp_path / 'pcap.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr('tap0.pcap', make_pcap())
+        archive.writestr('tap1.pcapng', make_pcapng(PACKETS[:2]))
+        archive.writestr('readme.txt', 'not a capture')
+    folder = str(tmp_path / 'pcap')
+
+    assert len(extract_pcaps(zip_path, folder)) == 2
+    with open(str(tmp_path / 'pcap' / 'tap0.pcap'), 'rb') as f:
+        assert f.read() == make_pcap()
+
+    indexes = load_flow_indexes(folder)
+    flows = query_flows(indexes, **flow_filter('443'))
+    assert [(flow['pcap'], flow['packets']) for flow in flows] == [('tap0.pcap', 3), ('tap1.pcapng', 1)]
+    assert len(query_flows(indexes, limit=2)) == 2
+
+
+def test_index_pcap_file(tmp_path):
+    path = tmp_path / 'tap0.pcap'
+    path.write_bytes(make_pcap())
+    assert len(index_pcap_file(str(path))) == 3
+    assert (tmp_path / 'tap0.pcap.flows').exists()
+
+    path.write_bytes(b'not a capture' * 10)
+    assert index_pcap_file(str(path)) is None
+
+
+def test_flow_filter():
+    assert flow_filter(' 53 ') == {'port': 53}
+    assert flow_filter('udp') == {'protocol': 'udp'}
+    assert flow_filter('10.0.2.15') == {'host': '10.0.2.15'}
+    assert flow_filter('example.com') == {'name': 'example.com'}
+    assert flow_filter('') == {}
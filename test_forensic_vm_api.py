@@ -0,0 +1,57 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests_mock
+import forensicVmClient
+from forensicVmClient import ForensicVMApi, get_api
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 200 if self.headers.get('X-API-KEY') == 'abc123' else 403
+        body = b'{}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_api_returns_shared_client():
+    assert get_api('http://example.com', 'abc123') is get_api('http://example.com/', 'abc123')
+    assert get_api('http://example.com', 'abc123') is not get_api('http://example.com', 'other')
+
+
+def test_api_key_header_is_sent_by_default():
+    with requests_mock.Mocker() as m:
+        m.get('http://example.com/api/test/', status_code=200)
+        assert forensicVmClient.test_api_key('abc123', 'http://example.com') == (0, 'Access granted')
+        assert m.last_request.headers['X-API-KEY'] == 'abc123'
+
+
+def test_connections_are_reused(local_server):
+    api = ForensicVMApi(local_server, 'abc123')
+    for _ in range(5):
+        assert api.get('/api/test/').status_code == 200
+
+    stats = api.stats()
+    assert stats['requests'] == 5
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 4
+    api.close()
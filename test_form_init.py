@@ -0,0 +1,77 @@
+import time
+
+import requests_mock
+import forensicVmClient
+from forensicVmClient import formInit, run_concurrently
+
+BASE_URL = 'http://example.com'
+API_KEY = 'abc123'
+
+
+class FakeElement:
+    def __init__(self):
+        self.calls = []
+
+    def update(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+
+class FakeWindow(dict):
+    def __missing__(self, key):
+        self[key] = FakeElement()
+        return self[key]
+
+
+def test_calls_run_concurrently():
+    calls = {name: (time.sleep, (0.2,)) for name in ('a', 'b', 'c')}
+
+    started = time.perf_counter()
+    names = [name for name, _, error, _ in run_concurrently(calls) if error is None]
+
+    assert sorted(names) == ['a', 'b', 'c']
+    assert time.perf_counter() - started < 0.5
+
+
+def test_failing_call_is_reported():
+    def fail():
+        raise ValueError("boom")
+
+    results = list(run_concurrently({'fail': (fail, ())}))
+
+    assert results[0][0] == 'fail'
+    assert isinstance(results[0][2], ValueError)
+
+
+def test_form_init_applies_results():
+    values = {'forensic_image_path': 'image.E01', 'server_address': BASE_URL, 'forensic_api': API_KEY}
+    uuid_folder = forensicVmClient.string_to_uuid('image.E01' + forensicVmClient.case_name_arg)
+    window = FakeWindow()
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/api/test/", status_code=200)
+        m.get(f"{BASE_URL}/api/get-memory-size/{uuid_folder}/", json={'memory_size': 2048 * 1024})
+        m.get(f"{BASE_URL}/api/get-available-memory/", json={'available_memory': 8192 * 1024})
+        m.get(f"{BASE_URL}/api/snapshots-list/{uuid_folder}/", json={'snapshots': [{'tag': 'snap1', 'vm_size': 10}]})
+        m.get(f"{BASE_URL}/api/list-iso-files/", json={'iso_files': ['tools.iso']})
+        m.get(f"{BASE_URL}/api/list-plugins/", json={'plugins': []})
+        m.post(f"{BASE_URL}/api/check_tap/", json={'status': 'up'})
+        m.get(f"{BASE_URL}/api/forensic-image-vm-status/{uuid_folder}/", json={'vm_status': 'running'})
+        formInit(values, window, folders_created=True)
+
+    assert window['-SNAPSHOT-LIST-'].calls == [((['(snap1) - 10 MB'],), {})]
+    assert window['-CDROM LIST-'].calls == [((['tools.iso'],), {})]
+    assert window['-MB-SLIDER-'].calls == [((), {'range': (0, 8192.0)}), ((2048.0,), {})]
+    assert window['insert_network_button'].calls == [((), {'disabled': True})]
+
+
+def test_form_init_stops_when_the_server_rejects_the_key():
+    values = {'forensic_image_path': 'image.E01', 'server_address': BASE_URL, 'forensic_api': API_KEY}
+    window = FakeWindow()
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/api/test/", status_code=401)
+        formInit(values, window, folders_created=True)
+        requested = [request.path for request in m.request_history]
+
+    assert requested == ['/api/test/']
+    assert window == {}
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import threading
+
+import pytest
+import requests_mock
+import chunked_upload_server
+import forensicVmClient
+from forensicVmClient import find_iso_on_server, hash_iso_file, register_iso_digest, upload_iso
+
+API_KEY = 'abc123'
+ISO_DATA = os.urandom(200000)
+ISO_SHA256 = hashlib.sha256(ISO_DATA).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def local_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(forensicVmClient, 'UPLOAD_STATE_FILE', str(tmp_path / 'uploads.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_HASH_CACHE_FILE', str(tmp_path / 'iso_hashes.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_DIGEST_REGISTRY_FILE', str(tmp_path / 'iso_digests.json'))
+    monkeypatch.setattr(forensicVmClient.sg, 'one_line_progress_meter', lambda *args, **kwargs: True)
+    monkeypatch.setattr(forensicVmClient.sg, 'one_line_progress_meter_cancel', lambda *args, **kwargs: None)
+
+
+@pytest.fixture
+def iso_file(tmp_path):
+    path = tmp_path / 'kali.iso'
+    path.write_bytes(ISO_DATA)
+    return str(path)
+
+
+def test_hash_is_cached_on_path_size_and_mtime(iso_file):
+    assert hash_iso_file(iso_file) == ISO_SHA256
+
+    stat = os.stat(iso_file)
+    with open(iso_file, 'r+b') as f:
+        f.write(b'changed')
+    os.utime(iso_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert hash_iso_file(iso_file) == ISO_SHA256
+
+    os.utime(iso_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert hash_iso_file(iso_file) != ISO_SHA256
+
+
+def test_upload_is_skipped_when_the_server_has_the_content(iso_file, tmp_path, monkeypatch):
+    httpd = chunked_upload_server.make_server('127.0.0.1', 0, str(tmp_path / 'isos'), API_KEY)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        assert upload_iso(API_KEY, base_url, iso_file)
+
+        writes = []
+        monkeypatch.setattr(httpd.RequestHandlerClass.store, 'write_chunk', lambda *args: writes.append(args))
+        copy_of_iso = tmp_path / 'kali-copy.iso'
+        copy_of_iso.write_bytes(ISO_DATA)
+        assert upload_iso(API_KEY, base_url, str(copy_of_iso))
+        assert writes == []
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_registry_needs_the_listed_size_when_the_server_lists_no_digests():
+    base_url = 'http://nodigests.example.com'
+    register_iso_digest(base_url, ISO_SHA256, 'kali.iso', len(ISO_DATA))
+    api = forensicVmClient.get_api(base_url, API_KEY)
+
+    for listing, expected in (
+            ({'iso_files': ['kali.iso'], 'iso_sizes': {'kali.iso': len(ISO_DATA)}}, 'kali.iso'),
+            # Deleted and replaced by another ISO of the same name
+            ({'iso_files': ['kali.iso'], 'iso_sizes': {'kali.iso': len(ISO_DATA) + 1}}, None),
+            # Nothing proves the listed file is the same content
+            ({'iso_files': ['kali.iso']}, None),
+            ({'iso_files': []}, None)):
+        api.cache.invalidate()
+        with requests_mock.Mocker() as m:
+            m.get(f"{base_url}/api/list-iso-files/", json=listing)
+            assert find_iso_on_server(API_KEY, base_url, ISO_SHA256) == expected
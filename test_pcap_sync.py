@@ -0,0 +1,124 @@
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests_mock
+import forensicVmClient
+from forensicVmClient import sync_pcap
+
+API_KEY = 'abc123'
+UUID = 'vm1'
+
+
+class PcapHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    files = {}
+    ranges_seen = []
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == f'/api/list-pcap-files/{UUID}/':
+            body = json.dumps({'pcap_files': {name: len(data) for name, data in self.files.items()}})
+            return self._send(200, body.encode())
+        match = re.fullmatch(rf'/api/download-pcap-file/{UUID}/([^/]+)/', self.path)
+        data = self.files.get(match.group(1)) if match else None
+        if data is None:
+            return self._send(404, b'')
+        range_header = self.headers.get('Range')
+        self.ranges_seen.append((match.group(1), range_header))
+        if not range_header:
+            return self._send(200, data)
+        first, last = range_header.split('=')[1].split('-')
+        start, end = int(first), min(int(last or len(data) - 1), len(data) - 1)
+        if start >= len(data):
+            return self._send(416, b'')
+        self._send(206, data[start:end + 1], [('Content-Range', f"bytes {start}-{end}/{len(data)}")])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(forensicVmClient, 'record_download_hashes', lambda *args: {})
+    PcapHandler.files = {'tap0.pcap': os.urandom(200000), 'tap1.pcap': os.urandom(1000)}
+    PcapHandler.ranges_seen = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), PcapHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_only_appended_data_is_fetched(server, tmp_path):
+    folder = str(tmp_path / 'pcap')
+    assert sync_pcap(API_KEY, UUID, server, folder) == {'tap0.pcap': ('full', 200000), 'tap1.pcap': ('full', 1000)}
+
+    PcapHandler.files['tap0.pcap'] += b'new packets' * 100
+    PcapHandler.ranges_seen = []
+    assert sync_pcap(API_KEY, UUID, server, folder) == {'tap0.pcap': ('append', 1100), 'tap1.pcap': ('unchanged', 0)}
+
+    assert PcapHandler.ranges_seen == [('tap0.pcap', "bytes=0-4095"), ('tap0.pcap', f"bytes={200000 - 65536}-")]
+    for name, data in PcapHandler.files.items():
+        assert read(os.path.join(folder, name)) == data
+
+
+def test_changed_capture_is_fetched_again(server, tmp_path):
+    folder = str(tmp_path / 'pcap')
+    sync_pcap(API_KEY, UUID, server, folder)
+
+    PcapHandler.files['tap0.pcap'] = os.urandom(250000)
+    assert sync_pcap(API_KEY, UUID, server, folder)['tap0.pcap'] == ('full', 250000)
+    assert read(os.path.join(folder, 'tap0.pcap')) == PcapHandler.files['tap0.pcap']
+
+
+def test_rotated_capture_with_the_same_tail_is_fetched_again(server, tmp_path):
+    folder = str(tmp_path / 'pcap')
+    sync_pcap(API_KEY, UUID, server, folder)
+
+    # A new capture whose bytes at the old offset happen to match the end of the synced copy
+    old = PcapHandler.files['tap0.pcap']
+    PcapHandler.files['tap0.pcap'] = os.urandom(len(old) - 65536) + old[-65536:] + b'new packets'
+    assert sync_pcap(API_KEY, UUID, server, folder)['tap0.pcap'] == ('full', 200011)
+    assert read(os.path.join(folder, 'tap0.pcap')) == PcapHandler.files['tap0.pcap']
+
+
+def test_truncated_capture_is_fetched_again(server, tmp_path):
+    folder = str(tmp_path / 'pcap')
+    sync_pcap(API_KEY, UUID, server, folder)
+
+    PcapHandler.files['tap1.pcap'] = b'restarted'
+    assert sync_pcap(API_KEY, UUID, server, folder)['tap1.pcap'] == ('full', 9)
+    assert read(os.path.join(folder, 'tap1.pcap')) == b'restarted'
+
+
+def test_edited_local_copy_is_fetched_again(server, tmp_path):
+    folder = str(tmp_path / 'pcap')
+    sync_pcap(API_KEY, UUID, server, folder)
+    with open(os.path.join(folder, 'tap1.pcap'), 'ab') as f:
+        f.write(b'edited')
+
+    assert sync_pcap(API_KEY, UUID, server, folder)['tap1.pcap'] == ('full', 1000)
+    assert read(os.path.join(folder, 'tap1.pcap')) == PcapHandler.files['tap1.pcap']
+
+
+def test_servers_without_the_list_fall_back_to_the_zip(tmp_path):
+    with requests_mock.Mocker() as m:
+        m.get(f'http://example.com/api/list-pcap-files/{UUID}/', status_code=404)
+        assert sync_pcap(API_KEY, UUID, 'http://example.com', str(tmp_path)) is None
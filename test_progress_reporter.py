@@ -0,0 +1,59 @@
+import threading
+
+import forensicVmClient
+from forensicVmClient import ProgressReporter
+
+
+class FakeDisplay:
+    def __init__(self, cancel_after=None):
+        self.calls = []
+        self.cancel_after = cancel_after
+
+    def __call__(self, title, bytes_done, total_size, message):
+        self.calls.append((bytes_done, total_size, message))
+        return self.cancel_after is None or len(self.calls) < self.cancel_after
+
+
+def test_redraws_are_rate_limited(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(forensicVmClient.time, 'monotonic', lambda: now[0])
+    display = FakeDisplay()
+    progress = ProgressReporter("Downloading", max_rate=4, display=display)
+
+    for done in range(1, 1001):
+        now[0] += 0.001
+        assert progress(done * 1024, 1000 * 1024)
+
+    # One redraw every 0.25 s over one second, plus the forced final one
+    assert len(display.calls) == 5
+    assert display.calls[-1][0] == 1000 * 1024
+    assert progress.updates == 1000
+
+
+def test_throughput_and_eta(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(forensicVmClient.time, 'monotonic', lambda: now[0])
+    progress = ProgressReporter("Downloading", display=FakeDisplay())
+
+    progress(0, 10 * 1048576)
+    now[0] = 1.0
+    progress(1048576, 10 * 1048576)
+
+    assert progress.throughput == 1048576
+    assert progress.eta() == 9
+    assert "1.00 MB/s, 0:00:09 left" in progress.message()
+
+
+def test_worker_threads_never_redraw_and_see_cancel():
+    display = FakeDisplay(cancel_after=1)
+    progress = ProgressReporter("Downloading", display=display)
+    results = []
+
+    worker = threading.Thread(target=lambda: results.append(progress(10, 100)))
+    worker.start()
+    worker.join()
+    assert results == [True]
+    assert display.calls == []
+
+    assert progress.pump() is False
+    assert progress.add(10) is False
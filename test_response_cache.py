@@ -0,0 +1,78 @@
+import requests_mock
+import forensicVmClient
+from forensicVmClient import CACHE_MISS, ResponseCache
+
+BASE_URL = 'http://cache.example.com'
+API_KEY = 'abc123'
+UUID = '123456'
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(forensicVmClient.time, 'monotonic', lambda: now[0])
+    cache = ResponseCache(ttl=30)
+    cache.put('/api/list-plugins/', None, ['plugin_1'])
+
+    assert cache.get('/api/list-plugins/') == ['plugin_1']
+    now[0] += 31
+    assert cache.get('/api/list-plugins/') is CACHE_MISS
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(ttl=30, maxsize=2)
+    cache.put('a', None, 1)
+    cache.put('b', None, 2)
+    cache.get('a')
+    cache.put('c', None, 3)
+
+    assert cache.get('b') is CACHE_MISS
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_invalidate_by_uuid():
+    cache = ResponseCache(ttl=30)
+    cache.put(f'/api/snapshots-list/{UUID}/', UUID, [])
+    cache.put('/api/snapshots-list/other/', 'other', [])
+
+    assert cache.invalidate(uuid=UUID) == 1
+    assert cache.get('/api/snapshots-list/other/', 'other') == []
+
+
+def test_mutation_invalidates_only_affected_entries():
+    with requests_mock.Mocker() as m:
+        iso_list = m.get(f"{BASE_URL}/api/list-iso-files/", json={'iso_files': ['a.iso']})
+        snapshots = m.get(f"{BASE_URL}/api/snapshots-list/{UUID}/", json={'snapshots': []})
+        m.post(f"{BASE_URL}/api/create-snapshot/{UUID}/", json={'snapshot_name': 'snap1'})
+
+        for _ in range(3):
+            forensicVmClient.list_iso_files(API_KEY, BASE_URL)
+            forensicVmClient.get_snapshot_list(API_KEY, UUID, BASE_URL)
+        assert iso_list.call_count == 1
+        assert snapshots.call_count == 1
+
+        forensicVmClient.create_snapshot(API_KEY, UUID, BASE_URL)
+        forensicVmClient.list_iso_files(API_KEY, BASE_URL)
+        forensicVmClient.get_snapshot_list(API_KEY, UUID, BASE_URL)
+        assert iso_list.call_count == 1
+        assert snapshots.call_count == 2
+
+
+def test_vm_power_changes_refresh_the_available_memory():
+    base_url = 'http://memory.example.com'
+    with requests_mock.Mocker() as m:
+        memory = m.get(f"{base_url}/api/get-available-memory/", json={'available_memory': 4194304})
+        m.post(f"{base_url}/api/start-vm/{UUID}/", json={'vm_started': True})
+        m.post(f"{base_url}/api/stop-vm/{UUID}/", json={'vm_stopped': True})
+
+        forensicVmClient.get_available_memory(API_KEY, base_url)
+        forensicVmClient.get_available_memory(API_KEY, base_url)
+        assert memory.call_count == 1
+
+        forensicVmClient.start_vm(API_KEY, UUID, base_url)
+        forensicVmClient.get_available_memory(API_KEY, base_url)
+        assert memory.call_count == 2
+
+        forensicVmClient.stop_vm(API_KEY, UUID, base_url)
+        forensicVmClient.get_available_memory(API_KEY, base_url)
+        assert memory.call_count == 3
@@ -0,0 +1,119 @@
+import socket
+import threading
+
+import pytest
+from conftest import KeyServer
+from forensicVmClient import ReverseTunnel, SSHTransportManager, tunnel_stats_text
+
+
+def copy_stream(read, write):
+    try:
+        while True:
+            data = read(65536)
+            if not data:
+                break
+            write(data)
+    except (OSError, EOFError):
+        pass
+
+
+class ForwardingServer(KeyServer):
+    """
+    For each reverse forward listens on a local port and forwards its connections back.
+    """
+
+    def __init__(self, public_key):
+        super().__init__(public_key)
+        self.listeners = {}
+
+    def check_port_forward_request(self, address, port):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', port))
+        listener.listen(5)
+        port = listener.getsockname()[1]
+        self.listeners[port] = listener
+        threading.Thread(target=self.accept, args=(listener, port), daemon=True).start()
+        return port
+
+    def cancel_port_forward_request(self, address, port):
+        self.listeners.pop(port).close()
+
+    def accept(self, listener, port):
+        while True:
+            try:
+                conn, origin = listener.accept()
+            except OSError:
+                return
+            channel = self.transport.open_forwarded_tcpip_channel(origin, ('127.0.0.1', port))
+            threading.Thread(target=copy_stream, args=(conn.recv, channel.sendall), daemon=True).start()
+            threading.Thread(target=copy_stream, args=(channel.recv, conn.sendall), daemon=True).start()
+
+
+class EchoServer:
+    """
+    Stands in for the local Samba endpoint, answering every request with the same bytes.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=copy_stream, args=(conn.recv, conn.sendall), daemon=True).start()
+
+
+@pytest.fixture
+def ssh_manager(ssh_server):
+    server = ssh_server(ForwardingServer)
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file)
+    yield manager
+    manager.close()
+
+
+def exchange(port, payload):
+    with socket.create_connection(('127.0.0.1', port), timeout=10) as conn:
+        conn.sendall(payload)
+        received = b''
+        while len(received) < len(payload):
+            received += conn.recv(65536)
+    return received
+
+
+def test_tunnel_pumps_bytes_and_counts_them(ssh_manager):
+    echo = EchoServer()
+    tunnel = ReverseTunnel(ssh_manager, '127.0.0.1', echo.port)
+    remote_port = tunnel.start()
+
+    payload = bytes(range(256)) * 2048
+    assert exchange(remote_port, payload) == payload
+
+    stats = tunnel.stats()
+    assert stats['remote_port'] == remote_port
+    assert stats['bytes_to_local'] == len(payload)
+    assert stats['bytes_to_remote'] == len(payload)
+    assert stats['connections'] == 1
+    assert stats['latency'] is not None
+    assert f"127.0.0.1:{remote_port}" in tunnel_stats_text()
+
+    tunnel.stop()
+    assert tunnel_stats_text() == ''
+
+
+def test_free_port_probe_keeps_tunnel_working(ssh_manager):
+    echo = EchoServer()
+    tunnel = ReverseTunnel(ssh_manager, '127.0.0.1', echo.port)
+    remote_port = tunnel.start()
+
+    assert ssh_manager.free_remote_port() != remote_port
+    assert exchange(remote_port, b'smb request') == b'smb request'
+
+    assert ssh_manager.stats()['handshakes'] == 1
+    tunnel.stop()
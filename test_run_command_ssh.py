@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+from conftest import KeyServer
+from forensicVmClient import CommandOutput, SSHTransportManager, run_command_ssh
+
+
+class CommandServer(KeyServer):
+    """
+    Answers every command with 2000 numbered lines on stdout, two on stderr and exit status 3.
+    """
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self.run, args=(channel,), daemon=True).start()
+        return True
+
+    def run(self, channel):
+        time.sleep(0.1)
+        for block in range(4):
+            channel.sendall(''.join(f"line {block * 500 + index}\n" for index in range(500)).encode())
+            if block == 1:
+                channel.sendall_stderr('warning: 1\n'.encode())
+            time.sleep(0.05)
+        # A multi-byte character split across two packets
+        channel.sendall('é'.encode()[:1])
+        channel.sendall('é'.encode()[1:] + b'\n')
+        channel.sendall_stderr(b'warning: 2\n')
+        channel.send_exit_status(3)
+        channel.shutdown_write()
+        channel.close()
+
+
+class FakeElement:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, value, append=False, text_color_for_value=None):
+        assert append
+        self.updates.append((value, text_color_for_value))
+
+
+class FakeWindow:
+    def __init__(self):
+        self.element = FakeElement()
+        self.refreshes = 0
+
+    def __getitem__(self, key):
+        assert key == '-OUTPUT-'
+        return self.element
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+@pytest.fixture
+def ssh_manager(ssh_server):
+    server = ssh_server(CommandServer)
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file)
+    yield manager
+    manager.close()
+
+
+def test_ring_buffer_keeps_the_last_characters_of_each_stream():
+    output = CommandOutput(capacity=10)
+    output.write('stdout', 'hello ')
+    output.write('stderr', 'oops')
+    output.write('stdout', 'world again')
+
+    assert output.text('stdout') == 'orld again'
+    assert output.text('stderr') == 'oops'
+    assert output.dropped == {'stdout': 7, 'stderr': 0}
+    # The console only gets the last capacity characters of what it missed
+    assert output.take_pending() == [('stdout', 'world again')]
+    assert output.take_pending() == []
+
+    output.write('stdout', 'a')
+    output.write('stderr', 'b')
+    output.write('stderr', 'c')
+    assert output.take_pending() == [('stdout', 'a'), ('stderr', 'bc')]
+
+
+def test_output_is_streamed_to_the_console(ssh_manager):
+    window = FakeWindow()
+    refreshed = []
+
+    output = run_command_ssh(ssh_manager, window, 'convert', refresh_rate=20, refresh=refreshed.append)
+
+    assert output.exit_status == 3
+    assert output.text('stdout').startswith('line 0\n')
+    assert output.text('stdout').endswith('line 1999\né\n')
+    assert output.text('stderr') == 'warning: 1\nwarning: 2\n'
+
+    shown = ''.join(text for text, color in window.element.updates if color is None)
+    assert shown == output.text('stdout')
+    assert [text for text, color in window.element.updates if color == 'red'] != []
+    assert window.refreshes == len(refreshed)
+    assert window.refreshes < 20
+
+
+def test_ring_buffer_bounds_memory(ssh_manager):
+    output = run_command_ssh(ssh_manager, None, 'convert', capacity=100)
+
+    assert output.text('stdout').endswith('line 1999\né\n')
+    assert len(output.text('stdout')) == 100
+    assert output.dropped['stdout'] > 0
@@ -0,0 +1,75 @@
+import os
+
+import paramiko
+import pytest
+import forensicVmClient
+from forensicVmClient import SSHTransportManager, sftp_upload_speed_test
+
+
+class SFTPHandle(paramiko.SFTPHandle):
+    pass
+
+
+class LocalSFTP(paramiko.SFTPServerInterface):
+    """
+    SFTP server that stores the files under a local folder.
+    """
+
+    def __init__(self, server, root, writes):
+        super().__init__(server)
+        self.root = root
+        self.writes = writes
+
+    def local(self, path):
+        return os.path.join(self.root, os.path.basename(path))
+
+    def open(self, path, flags, attr):
+        handle = SFTPHandle(flags)
+        handle.writefile = handle.readfile = open(self.local(path), 'w+b')
+        self.writes.append(path)
+        return handle
+
+    def remove(self, path):
+        os.remove(self.local(path))
+        return paramiko.SFTP_OK
+
+
+@pytest.fixture
+def sftp_server(ssh_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(forensicVmClient, 'SFTP_BENCHMARK_CACHE_FILE', str(tmp_path / 'benchmark.json'))
+    root = tmp_path / 'remote'
+    root.mkdir()
+    writes = []
+    server = ssh_server(configure=lambda transport: transport.set_subsystem_handler(
+        'sftp', paramiko.SFTPServer, LocalSFTP, str(root), writes))
+    port, key_file = server.port, server.key_file
+    manager = SSHTransportManager('127.0.0.1', port, key_file)
+    monkeypatch.setattr(forensicVmClient, 'get_ssh', lambda address, port, key_filename=None: manager)
+    yield port, key_file, root, writes
+    manager.close()
+
+
+def test_benchmark_writes_parallel_streams_and_cleans_up(sftp_server):
+    port, key_file, root, writes = sftp_server
+
+    mbps = sftp_upload_speed_test('127.0.0.1', port, key_file, remote_path='/tmp/', streams=3, duration=0.3)
+
+    assert mbps > 0
+    assert len(writes) == 3
+    assert all(path.startswith('/tmp/speedtest-') for path in writes)
+    assert list(root.iterdir()) == []
+    cached = forensicVmClient._read_json_file(forensicVmClient.SFTP_BENCHMARK_CACHE_FILE)
+    assert cached[f"127.0.0.1:{port}"]['mbps'] == mbps
+    assert cached[f"127.0.0.1:{port}"]['bytes'] > 0
+
+
+def test_recent_result_is_reused(sftp_server):
+    port, key_file, root, writes = sftp_server
+
+    first = sftp_upload_speed_test('127.0.0.1', port, key_file, streams=2, duration=0.2)
+    second = sftp_upload_speed_test('127.0.0.1', port, key_file, streams=2, duration=0.2)
+    assert second == first
+    assert len(writes) == 2
+
+    sftp_upload_speed_test('127.0.0.1', port, key_file, streams=2, duration=0.2, cache_ttl=0)
+    assert len(writes) == 4
@@ -0,0 +1,97 @@
+import os
+
+import paramiko
+import pytest
+from forensicVmClient import SSHTransportManager, TransferCancelled, image_segments, sftp_push_image
+
+
+class LocalSFTP(paramiko.SFTPServerInterface):
+    """
+    SFTP server that maps the remote paths into a local folder.
+    """
+
+    def __init__(self, server, root):
+        super().__init__(server)
+        self.root = root
+
+    def local(self, path):
+        return os.path.join(self.root, path.lstrip('/'))
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self.local(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def mkdir(self, path, attr):
+        os.mkdir(self.local(path))
+        return paramiko.SFTP_OK
+
+    def open(self, path, flags, attr):
+        fd = os.open(self.local(path), flags | getattr(os, 'O_BINARY', 0), 0o644)
+        handle = paramiko.SFTPHandle(flags)
+        handle.writefile = handle.readfile = os.fdopen(fd, 'r+b' if flags & os.O_RDWR else 'wb')
+        return handle
+
+
+@pytest.fixture
+def sftp_server(ssh_server, tmp_path):
+    root = tmp_path / 'server'
+    root.mkdir()
+    server = ssh_server(configure=lambda transport: transport.set_subsystem_handler(
+        'sftp', paramiko.SFTPServer, LocalSFTP, str(root)))
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file)
+    yield manager, root
+    manager.close()
+
+
+def write_segments(folder, names, size):
+    paths = []
+    for index, name in enumerate(names):
+        path = folder / name
+        path.write_bytes(bytes([index]) * size)
+        paths.append(str(path))
+    return paths
+
+
+def test_image_segments_finds_split_images(tmp_path):
+    ewf = write_segments(tmp_path, ['disk.E01', 'disk.E02', 'disk.EAA', 'disk.E10'], 1)
+    raw = write_segments(tmp_path, ['raw.001', 'raw.002', 'raw.txt'], 1)
+    single = write_segments(tmp_path, ['single.dd'], 1)
+
+    assert image_segments(ewf[0]) == [ewf[0], ewf[1], ewf[3], ewf[2]]
+    assert image_segments(raw[0]) == raw[:2]
+    assert image_segments(single[0]) == single
+
+
+def test_push_uploads_segments_and_resumes(sftp_server, tmp_path):
+    manager, root = sftp_server
+    images = tmp_path / 'images'
+    images.mkdir()
+    files = write_segments(images, ['disk.E01', 'disk.E02', 'disk.E03'], 300000)
+
+    # A previous push left the first segment complete and the second one half done
+    remote = root / 'forensicVM' / 'mnt' / 'tmp' / 'uuid'
+    remote.mkdir(parents=True)
+    (remote / 'disk.E01').write_bytes(bytes([0]) * 300000)
+    (remote / 'disk.E02').write_bytes(bytes([1]) * 100000)
+
+    updates = []
+    remote_files = sftp_push_image(manager, files, '/forensicVM/mnt/tmp/uuid',
+                                   progress=lambda done, total: updates.append((done, total)),
+                                   block_size=65536)
+
+    assert remote_files == [f'/forensicVM/mnt/tmp/uuid/disk.E0{index}' for index in (1, 2, 3)]
+    for index, path in enumerate(files):
+        assert (remote / os.path.basename(path)).read_bytes() == bytes([index]) * 300000
+    assert updates[-1] == (900000, 900000)
+    assert updates[0][0] >= 400000
+
+
+def test_push_can_be_cancelled(sftp_server, tmp_path):
+    manager, root = sftp_server
+    files = write_segments(tmp_path, ['disk.001'], 5000000)
+
+    with pytest.raises(TransferCancelled):
+        sftp_push_image(manager, files, '/upload', progress=lambda done, total: False, block_size=32768)
+    assert (root / 'upload').is_dir()
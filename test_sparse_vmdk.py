@@ -0,0 +1,200 @@
+import hashlib
+import os
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from forensicVmClient import (VMDK_HEADER, SparseVmdkDownload, StreamHasher, coalesce_ranges,
+                              download_sparse_vmdk, parse_vmdk_layout)
+
+API_KEY = 'abc123'
+SECTOR = 512
+GRAIN_SECTORS = 8
+GRAIN = GRAIN_SECTORS * SECTOR
+OVERHEAD = 24
+SLOTS = 40
+# Grain number -> grain slot in the file, slots 3 to 29 and 31 to 39 are not referenced by any table
+GRAIN_SLOTS = {0: 0, 1: 1, 5: 2, 600: 30}
+ZERO_GRAIN = 7
+
+
+def make_vmdk():
+    header = VMDK_HEADER.pack(b'KDMV', 1, 3, 1024 * GRAIN_SECTORS, GRAIN_SECTORS, 1, 1, 512, 2, 11, OVERHEAD,
+                              0, b'\n \r\n', 0)
+    data = bytearray(header + b'# Disk DescriptorFile\n'.ljust(SECTOR, b'\0'))
+    data += bytes(OVERHEAD * SECTOR - len(data))
+    tables = [[0] * 512, [0] * 512]
+    for grain, slot in GRAIN_SLOTS.items():
+        tables[grain // 512][grain % 512] = OVERHEAD + slot * GRAIN_SECTORS
+    tables[0][ZERO_GRAIN] = 1
+    for directory_sector, first_table in ((2, 3), (11, 12)):
+        struct.pack_into('<2I', data, directory_sector * SECTOR, first_table, first_table + 4)
+        for number, table in enumerate(tables):
+            struct.pack_into('<512I', data, (first_table + 4 * number) * SECTOR, *table)
+    return bytes(data) + os.urandom(SLOTS * GRAIN)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    data = b''
+    ranges_seen = []
+    fail_at = None
+
+    def do_GET(self):
+        start, end = 0, len(self.data) - 1
+        range_header = self.headers.get('Range')
+        self.ranges_seen.append(range_header)
+        if range_header:
+            first, last = range_header.split('=')[1].split('-')
+            start, end = int(first), min(int(last or end), end)
+            if start == self.fail_at:
+                self.send_error(404)
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(self.data)}")
+        else:
+            self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(self.data[start:end + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    RangeHandler.data = make_vmdk()
+    RangeHandler.ranges_seen = []
+    RangeHandler.fail_at = None
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_coalesce_ranges():
+    assert coalesce_ranges([(8192, 512), (0, 512), (512, 512)], gap=0) == [(0, 1024), (8192, 512)]
+    assert coalesce_ranges([(0, 512), (1024, 512)], gap=512) == [(0, 1536)]
+    assert coalesce_ranges([(0, 512), (512, 512)], gap=0, limit=512) == [(0, 512), (512, 512)]
+
+
+def test_layout_lists_allocated_grains():
+    data = make_vmdk()
+    layout = parse_vmdk_layout(lambda offset, length: data[offset:offset + length])
+
+    assert layout['metadata'] == (0, OVERHEAD * SECTOR)
+    assert layout['grains'] == sorted(((OVERHEAD + slot * GRAIN_SECTORS) * SECTOR, GRAIN)
+                                      for slot in GRAIN_SLOTS.values())
+
+
+def test_only_allocated_grains_are_fetched(server, tmp_path):
+    output_file = str(tmp_path / 'evidence.vmdk')
+    hasher = StreamHasher()
+
+    assert download_sparse_vmdk(API_KEY, server, '/api/download-evidence/1/', output_file, hasher=hasher)
+
+    remote = RangeHandler.data
+    local = read(output_file)
+    assert len(local) == len(remote)
+    assert local[:OVERHEAD * SECTOR] == remote[:OVERHEAD * SECTOR]
+    for slot in range(SLOTS):
+        start = (OVERHEAD + slot * GRAIN_SECTORS) * SECTOR
+        expected = remote[start:start + GRAIN] if slot in GRAIN_SLOTS.values() else bytes(GRAIN)
+        assert local[start:start + GRAIN] == expected
+    assert hasher.hexdigests()['sha256'] == hashlib.sha256(local).hexdigest()
+
+    fetched = 0
+    for range_header in RangeHandler.ranges_seen:
+        first, last = range_header.split('=')[1].split('-')
+        fetched += int(last) - int(first) + 1
+    assert fetched < len(remote) / 2
+
+    # The reconstructed file is a VMDK with the same grain tables
+    layout = parse_vmdk_layout(lambda offset, length: local[offset:offset + length])
+    assert len(layout['grains']) == len(GRAIN_SLOTS)
+
+
+def test_other_files_are_downloaded_whole(server, tmp_path):
+    RangeHandler.data = os.urandom(3 * GRAIN + 5)
+    output_file = str(tmp_path / 'evidence.vmdk')
+
+    assert download_sparse_vmdk(API_KEY, server, '/api/download-evidence/1/', output_file)
+    assert read(output_file) == RangeHandler.data
+
+
+def test_failed_download_resumes_with_the_missing_ranges(server, tmp_path):
+    output_file = str(tmp_path / 'evidence.vmdk')
+    last_grain = (OVERHEAD + GRAIN_SLOTS[600] * GRAIN_SECTORS) * SECTOR
+    RangeHandler.fail_at = last_grain
+
+    download = SparseVmdkDownload(API_KEY, server, '/api/download-evidence/1/', output_file)
+    assert download.probe()
+    assert [offset for offset, _ in download.ranges] == [0, last_grain]
+    with pytest.raises(requests.exceptions.HTTPError):
+        download.run()
+    assert not os.path.exists(output_file)
+    assert os.path.exists(output_file + '.part')
+
+    RangeHandler.fail_at = None
+    hasher = StreamHasher()
+    download = SparseVmdkDownload(API_KEY, server, '/api/download-evidence/1/', output_file, hasher=hasher)
+    assert download.probe()
+    RangeHandler.ranges_seen = []
+    assert download.run()
+
+    # Only the range that failed is fetched again
+    assert RangeHandler.ranges_seen == [f"bytes={last_grain}-{last_grain + GRAIN - 1}"]
+    remote = RangeHandler.data
+    local = read(output_file)
+    assert local[:OVERHEAD * SECTOR] == remote[:OVERHEAD * SECTOR]
+    for slot in GRAIN_SLOTS.values():
+        start = (OVERHEAD + slot * GRAIN_SECTORS) * SECTOR
+        assert local[start:start + GRAIN] == remote[start:start + GRAIN]
+    assert hasher.hexdigests()['sha256'] == hashlib.sha256(local).hexdigest()
+    assert not os.path.exists(output_file + '.part.json')
+
+
+class WholeFileResponse:
+    """
+    A 200 response to a Range request, whose body must not be read.
+    """
+    status_code = 200
+    headers = {'Content-Length': str(1 << 40)}
+    closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.closed = True
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        raise AssertionError("the body of a response ignoring Range was read")
+
+    @property
+    def content(self):
+        raise AssertionError("the body of a response ignoring Range was read")
+
+
+def test_response_ignoring_range_is_not_read(tmp_path, monkeypatch):
+    download = SparseVmdkDownload(API_KEY, 'http://127.0.0.1:9', '/api/download-evidence/1/',
+                                  str(tmp_path / 'evidence.vmdk'))
+    response = WholeFileResponse()
+    monkeypatch.setattr(download.api, 'get', lambda *args, **kwargs: response)
+
+    assert not download.probe()
+    assert response.closed
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from forensicVmClient import SparseWriter, StreamHasher, allocated_size, download_resumable, download_segmented
+
+PAGE = 4096
+# Zero pages around and between pages of data, ending with zero pages like a guest RAM dump
+DATA = bytes(64 * PAGE) + os.urandom(3 * PAGE) + bytes(40 * PAGE) + os.urandom(PAGE + 100) + bytes(96 * PAGE)
+API_KEY = 'abc123'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        start, end = 0, len(DATA) - 1
+        range_header = self.headers.get('Range')
+        if range_header:
+            first, last = range_header.split('=')[1].split('-')
+            start, end = int(first), int(last or end)
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(DATA[start:end + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_only_data_blocks_are_written(tmp_path):
+    path = str(tmp_path / 'dump.bin')
+    writer = SparseWriter()
+    with open(path, 'wb') as f:
+        for offset in range(0, len(DATA), 65536):
+            writer.write(f, DATA[offset:offset + 65536], offset)
+        writer.extend(f, len(DATA))
+
+    assert read(path) == DATA
+    assert writer.logical_bytes == len(DATA)
+    assert writer.physical_bytes == 5 * PAGE
+    assert allocated_size(path) < len(DATA)
+
+
+def test_descriptor_targets_are_written_with_pwrite(tmp_path):
+    path = str(tmp_path / 'dump.bin')
+    writer = SparseWriter()
+    fd = os.open(path, os.O_RDWR | os.O_CREAT)
+    try:
+        os.ftruncate(fd, len(DATA))
+        assert writer.write(fd, DATA, 0) == 5 * PAGE
+    finally:
+        os.close(fd)
+
+    assert read(path) == DATA
+
+
+def test_resumable_download_is_sparse_and_hashes_the_same(server, tmp_path):
+    output_file = str(tmp_path / 'memory.bin')
+    hasher = StreamHasher()
+    writer = SparseWriter()
+
+    assert download_resumable(API_KEY, server, '/api/download-memory-dump/1/', output_file, chunk_size=8192,
+                              hasher=hasher, writer=writer)
+
+    assert read(output_file) == DATA
+    assert hasher.hexdigests()['sha256'] == hashlib.sha256(DATA).hexdigest()
+    assert writer.physical_bytes == 5 * PAGE
+    assert 'bytes of zero pages skipped' in writer.report(output_file)
+
+
+def test_segmented_download_is_sparse(server, tmp_path):
+    output_file = str(tmp_path / 'memory.bin')
+    hasher = StreamHasher()
+    writer = SparseWriter()
+
+    assert download_segmented(API_KEY, server, '/api/download-memory-dump/1/', output_file, segment_size=16 * PAGE,
+                              chunk_size=8192, hasher=hasher, writer=writer)
+
+    assert read(output_file) == DATA
+    assert hasher.hexdigests()['sha256'] == hashlib.sha256(DATA).hexdigest()
+    assert writer.logical_bytes == len(DATA)
+    assert writer.physical_bytes == 5 * PAGE
+
+
+def test_stale_part_file_is_not_kept_under_zero_blocks(server, tmp_path):
+    output_file = str(tmp_path / 'memory.bin')
+    # Left over by another download, without a manifest to resume it
+    with open(output_file + '.part', 'wb') as f:
+        f.write(b'\xff' * len(DATA))
+    hasher = StreamHasher()
+
+    assert download_segmented(API_KEY, server, '/api/download-memory-dump/1/', output_file, segment_size=16 * PAGE,
+                              chunk_size=8192, hasher=hasher, writer=SparseWriter())
+
+    assert read(output_file) == DATA
+    assert hasher.hexdigests()['sha256'] == hashlib.sha256(read(output_file)).hexdigest()
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import paramiko
+import pytest
+import forensicVmClient
+from conftest import KeyServer
+from forensicVmClient import SSHTransportManager, get_ssh
+
+USERNAME = 'forensicinvestigator'
+
+
+class StubServer(KeyServer):
+    def check_auth_publickey(self, username, key):
+        if username == USERNAME and key == self.public_key:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self.run_command, args=(channel, command), daemon=True).start()
+        return True
+
+    def run_command(self, channel, command):
+        # Let the transport send the exec reply before the channel is closed
+        time.sleep(0.1)
+        channel.sendall(b'ran ' + command + b'\n')
+        channel.send_exit_status(0)
+        channel.close()
+
+    def check_port_forward_request(self, address, port):
+        return port or 40123
+
+
+def run(manager, command):
+    stdin, stdout, stderr = manager.exec_command(command)
+    return stdout.read().decode()
+
+
+def test_operations_share_one_transport(ssh_server):
+    server = ssh_server(StubServer)
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file, keepalive=5)
+
+    assert run(manager, 'ls -al') == 'ran ls -al\n'
+    assert manager.free_remote_port() == 40123
+    assert run(manager, 'uptime') == 'ran uptime\n'
+
+    stats = manager.stats()
+    assert stats['handshakes'] == 1
+    assert stats['reuses'] == 2
+    assert stats['handshake_time_saved'] == pytest.approx(stats['handshake_time'] * 2)
+    assert len(server.transports) == 1
+    manager.close()
+
+
+def test_dropped_transport_is_reconnected(ssh_server):
+    server = ssh_server(StubServer)
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file)
+
+    assert run(manager, 'ls') == 'ran ls\n'
+    server.drop_connections()
+    manager.transport().close()
+    assert run(manager, 'ls') == 'ran ls\n'
+
+    assert manager.stats()['handshakes'] == 2
+    manager.close()
+
+
+class RecordingForwardServer(StubServer):
+    requested = []
+
+    def check_port_forward_request(self, address, port):
+        self.requested.append(port)
+        return port
+
+
+def test_reverse_forwards_are_requested_again_after_a_reconnect(ssh_server):
+    server = ssh_server(RecordingForwardServer)
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file)
+    routed = []
+    RecordingForwardServer.requested = []
+
+    assert manager.forward_remote_port(lambda channel, origin, server: routed.append(server), 40124) == 40124
+    manager.close()
+    assert run(manager, 'ls') == 'ran ls\n'
+    assert RecordingForwardServer.requested == [40124, 40124]
+
+    # The handler runs without the manager lock, so it can cancel its own forward
+    manager._forwards[40124] = lambda channel, origin, server: manager.cancel_remote_port(server[1])
+    manager._dispatch(None, ('127.0.0.1', 5000), ('', 40124))
+    assert 40124 not in manager._forwards
+    manager.close()
+
+
+def test_get_ssh_returns_shared_manager(tmp_path):
+    key_file = str(tmp_path / 'mykey')
+    assert get_ssh('10.0.0.1', 22, key_file) is get_ssh('10.0.0.1', '22', key_file)
+    assert get_ssh('10.0.0.1', 22, key_file) is not get_ssh('10.0.0.1', 2222, key_file)
+    forensicVmClient.close_ssh_managers()
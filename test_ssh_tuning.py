@@ -0,0 +1,96 @@
+import os
+
+import paramiko
+import pytest
+import forensicVmClient
+from forensicVmClient import (SSHTransportManager, calibrate_ssh, get_ssh, load_ssh_tuning,
+                              ssh_tuning_options, ssh_tuning_supported)
+
+GCM = {'cipher': 'aes128-gcm@openssh.com', 'mac': None, 'compress': False}
+CTR_ZLIB = {'cipher': 'aes128-ctr', 'mac': 'hmac-sha2-256', 'compress': True}
+# AES-GCM needs paramiko 3.3 or later
+needs_gcm = pytest.mark.skipif(not ssh_tuning_supported(GCM), reason="paramiko has no AES-GCM ciphers")
+
+
+class DiscardSFTP(paramiko.SFTPServerInterface):
+    def open(self, path, flags, attr):
+        handle = paramiko.SFTPHandle(flags)
+        handle.writefile = open(os.devnull, 'wb')
+        return handle
+
+    def remove(self, path):
+        return paramiko.SFTP_OK
+
+
+def tuned_server(ssh_server, ciphers=None):
+    def configure(transport):
+        transport.use_compression(True)
+        transport.set_subsystem_handler('sftp', paramiko.SFTPServer, DiscardSFTP)
+        if ciphers:
+            transport.get_security_options().ciphers = ciphers
+
+    return ssh_server(configure=configure)
+
+
+def test_tuning_options_only_leave_the_chosen_algorithms():
+    options = ssh_tuning_options(CTR_ZLIB)
+    assert options['compress'] is True
+    assert 'aes128-ctr' not in options['disabled_algorithms']['ciphers']
+    assert set(options['disabled_algorithms']['ciphers']) == set(paramiko.Transport._preferred_ciphers) - {'aes128-ctr'}
+    assert 'hmac-sha2-256' not in options['disabled_algorithms']['macs']
+    assert 'macs' not in ssh_tuning_options(GCM)['disabled_algorithms']
+    assert ssh_tuning_options(None) == {}
+
+
+@needs_gcm
+def test_calibration_stores_and_applies_the_fastest(ssh_server, tmp_path):
+    server = tuned_server(ssh_server)
+    port, key_file = server.port, server.key_file
+    config_file = str(tmp_path / 'config.json')
+    forensicVmClient.save_config({'server_address': 'https://example.com'}, config_file)
+    steps = []
+
+    best, results = calibrate_ssh('127.0.0.1', port, key_file, remote_path='/tmp/', candidates=(GCM, CTR_ZLIB),
+                                  duration=0.2, config_file=config_file,
+                                  progress=lambda done, total: steps.append((done, total)))
+
+    assert [result['cipher'] for result in results] == ['aes128-gcm@openssh.com', 'aes128-ctr']
+    assert all(result['mbps'] > 0 for result in results)
+    assert best == max(results, key=lambda result: result['mbps'])
+    assert steps == [(0, 2), (1, 2), (2, 2)]
+    assert [transport.remote_cipher for transport in server.transports] == ['aes128-gcm@openssh.com', 'aes128-ctr']
+    assert server.transports[1].remote_compression in ('zlib@openssh.com', 'zlib')
+
+    config = forensicVmClient.load_config(config_file)
+    assert config['server_address'] == 'https://example.com'
+    assert load_ssh_tuning('127.0.0.1', port, config_file) == best
+    assert get_ssh('127.0.0.1', port, key_file).tuning == best
+    forensicVmClient.close_ssh_managers()
+
+
+@needs_gcm
+def test_rejected_tuning_falls_back_to_the_defaults(ssh_server):
+    server = tuned_server(ssh_server, ciphers=('aes128-ctr',))
+    manager = SSHTransportManager('127.0.0.1', server.port, server.key_file, tuning=GCM)
+
+    manager.open_sftp().close()
+
+    assert manager.tuning is None
+    assert server.transports[-1].remote_cipher == 'aes128-ctr'
+    manager.close()
+
+
+def test_ciphers_paramiko_does_not_know_are_skipped(ssh_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(paramiko.Transport, '_preferred_ciphers',
+                        tuple(cipher for cipher in paramiko.Transport._preferred_ciphers if 'gcm' not in cipher))
+    server = tuned_server(ssh_server)
+    port, key_file = server.port, server.key_file
+    config_file = str(tmp_path / 'config.json')
+
+    best, results = calibrate_ssh('127.0.0.1', port, key_file, remote_path='/tmp/', candidates=(GCM, CTR_ZLIB),
+                                  duration=0.2, config_file=config_file)
+
+    assert [result['cipher'] for result in results] == ['aes128-ctr']
+    assert best['cipher'] == 'aes128-ctr'
+    assert load_ssh_tuning('127.0.0.1', port, config_file) == best
+    forensicVmClient.close_ssh_managers()
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+
+import requests_mock
+from forensicVmClient import StreamHasher, record_download_hashes
+
+DATA = os.urandom(10000)
+
+
+def test_out_of_order_segments_are_hashed_in_order(tmp_path):
+    hasher = StreamHasher()
+    for offset in (3000, 6000, 0):
+        hasher.add_segment(offset, len(DATA[offset:offset + 3000]), [DATA[offset:offset + 3000]])
+    hasher.add_segment(9000, 1000, [DATA[9000:]])
+    hasher.finish(len(DATA))
+
+    assert hasher.hexdigests()['sha256'] == hashlib.sha256(DATA).hexdigest()
+    assert hasher.bytes_reread == 0
+
+
+def test_segments_over_the_buffer_limit_are_read_from_disk(tmp_path):
+    path = tmp_path / 'memory.bin.part'
+    path.write_bytes(DATA)
+    hasher = StreamHasher(str(path), buffer_limit=5000)
+    for offset in (5000, 2500, 7500, 0):
+        hasher.add_segment(offset, 2500, [DATA[offset:offset + 2500]])
+    hasher.finish(len(DATA))
+
+    assert hasher.hexdigests()['md5'] == hashlib.md5(DATA).hexdigest()
+    assert hasher.bytes_reread == 2500
+
+
+def test_record_download_hashes(tmp_path):
+    output_file = tmp_path / 'memory.bin'
+    output_file.write_bytes(DATA)
+    hasher = StreamHasher()
+    hasher.update(DATA)
+
+    with requests_mock.Mocker() as m:
+        m.post('http://hash.example.com/api/record_comment/', status_code=200)
+        digests = record_download_hashes('abc123', 'http://hash.example.com', 'vm_uuid', str(output_file),
+                                         hasher, 'Memory dump')
+        comment = m.last_request.json()
+
+    manifest = json.loads((tmp_path / 'memory.bin.hashes.json').read_text())
+    assert manifest['hashes'] == digests
+    assert manifest['size'] == len(DATA)
+    assert comment['uuid'] == 'vm_uuid'
+    assert hashlib.sha256(DATA).hexdigest() in comment['comment']
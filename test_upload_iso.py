@@ -0,0 +1,88 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import forensicVmClient
+from forensicVmClient import upload_iso
+
+ISO_DATA = os.urandom(2 * 1048576)
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    bodies = []
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        if self.path != '/api/upload-iso/':
+            # A server without the chunked upload endpoints
+            self.rfile.read(length)
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b''
+        try:
+            while len(body) < length:
+                data = self.rfile.read(min(65536, length - len(body)))
+                if not data:
+                    break
+                body += data
+        except ConnectionError:
+            pass
+        self.bodies.append((self.headers['Content-Type'], length, body))
+        if len(body) < length:
+            self.close_connection = True
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.setattr(forensicVmClient, 'UPLOAD_STATE_FILE', str(tmp_path / 'uploads.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_HASH_CACHE_FILE', str(tmp_path / 'iso_hashes.json'))
+    monkeypatch.setattr(forensicVmClient, 'ISO_DIGEST_REGISTRY_FILE', str(tmp_path / 'iso_digests.json'))
+    monkeypatch.setattr(forensicVmClient.sg, 'popup_error', lambda *args, **kwargs: None)
+    monkeypatch.setattr(forensicVmClient.sg, 'one_line_progress_meter_cancel', lambda *args, **kwargs: None)
+    UploadHandler.bodies = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), UploadHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def iso_file(tmp_path):
+    path = tmp_path / 'tools.iso'
+    path.write_bytes(ISO_DATA)
+    return str(path)
+
+
+def test_upload_streams_multipart_body(server, iso_file, monkeypatch):
+    progress = []
+    monkeypatch.setattr(forensicVmClient.sg, 'one_line_progress_meter',
+                        lambda title, done, total, *args, **kwargs: progress.append((done, total)) or True)
+
+    assert upload_iso('abc123', server, iso_file)
+
+    content_type, length, body = UploadHandler.bodies[0]
+    assert content_type.startswith('multipart/form-data; boundary=')
+    assert b'name="iso_file"; filename="tools.iso"' in body
+    assert ISO_DATA in body
+    assert progress[-1] == (length, length)
+
+
+def test_cancel_aborts_the_upload(server, iso_file, monkeypatch):
+    monkeypatch.setattr(forensicVmClient.sg, 'one_line_progress_meter', lambda *args, **kwargs: False)
+
+    assert upload_iso('abc123', server, iso_file) is False
+    assert all(len(body) < length for _, length, body in UploadHandler.bodies)
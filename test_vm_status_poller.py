@@ -0,0 +1,61 @@
+import threading
+
+import requests_mock
+from forensicVmClient import VM_STATE_EVENT, VMStatusPoller, fetch_vm_state
+
+BASE_URL = 'http://example.com'
+API_KEY = 'abc123'
+UUID = '123456'
+
+
+class FakeWindow:
+    def __init__(self):
+        self.events = []
+        self.posted = threading.Event()
+
+    def write_event_value(self, key, value):
+        self.events.append((key, value))
+        self.posted.set()
+
+
+def mock_running_vm(m):
+    m.get(f"{BASE_URL}/api/test/", status_code=200)
+    m.get(f"{BASE_URL}/api/check-vm-exists/{UUID}/", json={'vm_exists': True})
+    m.get(f"{BASE_URL}/api/forensic-image-vm-status/{UUID}/", json={'vm_status': 'running'})
+    m.post(f"{BASE_URL}/api/check_tap/", json={'status': 'up'})
+
+
+def test_fetch_vm_state_running_vm():
+    with requests_mock.Mocker() as m:
+        mock_running_vm(m)
+        state = fetch_vm_state(BASE_URL, API_KEY, UUID)
+
+    assert state == {'server_ok': 0, 'vm_exists': True, 'vm_status': {'vm_status': 'running'},
+                     'tap_status': 'up', 'uuid': UUID}
+
+
+def test_fetch_vm_state_server_offline():
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/api/test/", status_code=403)
+        state = fetch_vm_state(BASE_URL, API_KEY, UUID)
+
+    assert state['server_ok'] == 403
+    assert state['vm_exists'] is False
+    assert m.call_count == 1
+
+
+def test_poller_posts_snapshot_to_window():
+    window = FakeWindow()
+    poller = VMStatusPoller(window, interval=0.05)
+
+    with requests_mock.Mocker() as m:
+        mock_running_vm(m)
+        poller.set_target(BASE_URL, API_KEY, UUID)
+        poller.start()
+        assert window.posted.wait(5)
+        poller.stop()
+        poller.join(5)
+
+    key, state = window.events[0]
+    assert key == VM_STATE_EVENT
+    assert state['vm_status'] == {'vm_status': 'running'}
@@ -0,0 +1,48 @@
+from forensicVmClient import WidgetStateModel, compute_widget_states, vm_state_rows
+
+
+class FakeElement:
+    def __init__(self):
+        self.calls = []
+
+    def update(self, **kwargs):
+        self.calls.append(kwargs)
+
+
+class FakeWindow(dict):
+    def __missing__(self, key):
+        self[key] = FakeElement()
+        return self[key]
+
+
+RUNNING = {'server_ok': 0, 'vm_exists': True, 'vm_status': {'vm_status': 'running'}, 'tap_status': True}
+
+
+def test_vm_state_rows():
+    assert vm_state_rows({'server_ok': 403}) == ['server_offline']
+    assert vm_state_rows({'server_ok': 0, 'vm_exists': False}) == ['server_online', 'vm_missing']
+    assert vm_state_rows(RUNNING) == ['server_online', 'vm_exists', 'tap_up', 'vm_running']
+
+
+def test_later_rows_win():
+    states = compute_widget_states('vm_exists', 'vm_running')
+    assert states['delete_vm_button'] == {'disabled': True}
+    assert states['convert_to_vm_button'] == {'disabled': True}
+
+
+def test_unchanged_state_is_skipped():
+    window = FakeWindow()
+    widget_state = WidgetStateModel(window)
+
+    first = widget_state.apply_rows(*vm_state_rows(RUNNING))
+    applied = widget_state.applied
+    assert first > 0
+
+    assert widget_state.apply_rows(*vm_state_rows(RUNNING)) == 0
+    assert widget_state.applied == applied
+    assert widget_state.skipped == applied
+
+    stopped = dict(RUNNING, vm_status={'vm_status': 'stopped'})
+    widget_state.apply_rows(*vm_state_rows(stopped))
+    assert window['start_vm_button'].calls == [{'disabled': True}, {'disabled': False}]
+    assert window['open_forensic_shell_button'].calls == [{'disabled': False}]